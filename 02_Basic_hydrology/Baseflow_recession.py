@@ -1,8 +1,13 @@
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Baseflow recession')
 
@@ -23,7 +28,6 @@ columns = st.columns((1,1), gap = 'large')
 
 # Initialize librarys - This eventually needs adapted
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 from ipywidgets import *
@@ -53,20 +57,20 @@ Q = Q0*(math.e**(a*t*-1))
 Q_point = Q0*(math.e**(a*x_point*-1))
     
 # Plot
-fig = plt.figure(figsize=(8,6))
+fig = plotting.figure(figsize=(8,6))
 ax = fig.add_subplot(1, 1, 1)
 
 ax.plot(t,Q, linewidth =3, label='Baseflow recession')
 ax.set(xlabel='time in d', ylabel='Flow in m3/s',title='Baseflow recession')
 ax.set(xlim=(0, tmax), ylim=(0, 5000))
 ax.fill_between(t, Q, 0, facecolor= 'lightblue')
-plt.plot(x_point,Q_point, marker='o', color='r',linestyle ='None', label='your input')
+ax.plot(x_point,Q_point, marker='o', color='r',linestyle ='None', label='your input')
 xticks = np.arange(0, tmax, 7)
 ax.set_xticks(xticks)
 ax.grid()
-plt.legend()
+ax.legend()
 
-st.pyplot(fig)
+plotting.show(fig)
  
 st.write("Time after beginning of recession: %3i" %x_point)
 st.write('Flow rate in m3/s:  %5.2f' %Q_point)
\ No newline at end of file
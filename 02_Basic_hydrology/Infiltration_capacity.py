@@ -1,9 +1,14 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Infiltration capacity')
 
@@ -52,25 +57,25 @@ y = fc+(f0-fc)*(math.e**(k*t*-1))
 y_point = fc+(f0-fc)*math.e**(k*-1*x_point)
     
 # Plot
-fig = plt.figure(figsize=(8,6))
+fig = plotting.figure(figsize=(8,6))
 ax = fig.add_subplot(1, 1, 1)
 
 ax.plot(t,y, linewidth =3, label='Infiltration rate')
 ax.set(xlabel='time in s', ylabel='infiltration capacity / precipitation rate in cm/hr',title='Infiltration capacity')
 ax.set(xlim=(0, tmax), ylim=(0, max(f0,prec)*1.1))
 if prec <= fc:
-    plt.hlines(prec, 0, tmax, colors='aqua', linestyles='solid', label='precipitation rate')
+    ax.hlines(prec, 0, tmax, colors='aqua', linestyles='solid', label='precipitation rate')
 ax.fill_between(t, prec, 0, facecolor= 'lightblue')
 if prec > fc:
-    plt.hlines(prec, 0, tmax, colors='red', linestyles='solid', label='precipitation rate')
+    ax.hlines(prec, 0, tmax, colors='red', linestyles='solid', label='precipitation rate')
     ax.fill_between(t, prec, y, where=prec > y, facecolor= 'red', alpha=0.5)
-plt.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='your input')
+ax.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='your input')
 xticks = np.arange(0, tmax, 7200)
 ax.set_xticks(xticks)
 ax.grid()
-plt.legend()
+ax.legend()
 
-st.pyplot(fig)
+plotting.show(fig)
  
 st.write("Time after beginning of precipitation: %3i" %x_point)
 st.write('Infiltration rate in cm/hr:  %5.2f' %y_point)
\ No newline at end of file
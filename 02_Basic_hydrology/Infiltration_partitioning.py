@@ -0,0 +1,131 @@
+# Initialize librarys
+import numpy as np
+import pandas as pd
+import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import cache, plotting
+from hydrokit.infiltration import partition, ponded_infiltration
+
+st.title('Infiltration and runoff of a catchment')
+
+st.write('This application splits a rainfall record into infiltration and infiltration-excess (Hortonian) runoff for many soil columns at once. The columns stand for the patches of a catchment; their infiltration parameters scatter log-normally around the median values. Rain infiltrates completely as long as it falls slower than the infiltration capacity. The surface ponds when the capacity has dropped to the rain rate (ponding time of Mein and Larson, 1973); from then on the soil takes its capacity and the rest runs off. The capacity follows Green-Ampt, Horton or Philip and recovers while it does not rain.')
+
+DATA = Path(__file__).parent / 'DATA' / 'GW_recharge_data.csv'
+
+
+@cache.cached(version='1')
+def rain_series(source, storm, years, seed):
+    """Hourly rain depths (mm)."""
+    if source == 'Measured daily rain (2003/04)':
+        daily = pd.read_csv(DATA)['N (mm/d)'].to_numpy()
+        # the rain of a day falls evenly during the first storm hours
+        hours = np.zeros((len(daily), 24))
+        hours[:, :storm] = daily[:, None] / storm
+        return hours.ravel()
+    # storms of exponentially distributed length and intensity at exponentially distributed intervals
+    rng = np.random.default_rng(seed)
+    n = int(years * 8760)
+    rain = np.zeros(n)
+    start = 0.
+    while True:
+        start += rng.exponential(60.)
+        duration, intensity = rng.exponential(storm), rng.exponential(1.5)
+        if start >= n:
+            return rain
+        rain[int(start):int(start + duration) + 1] += intensity
+        start += duration
+
+
+@cache.cached(version='1')
+def run(source, storm, years, seed, model, params, sigma, columns, recovery):
+    rain = rain_series(source, storm, years, seed)
+    rng = np.random.default_rng(1)
+    # log-normal factor of the rate parameters of the columns
+    factor = 10. ** (sigma * rng.standard_normal(columns))
+    params = dict(params)
+    for name in ('Ks', 'f0', 'fc', 'A'):
+        if name in params:
+            params[name] = params[name] * factor
+    return rain, factor, partition(rain, 1., model, params, recovery=recovery / 24.)
+
+
+columns = st.columns((1, 1), gap='large')
+with columns[0]:
+    source = st.radio('**Rain record**', ('Measured daily rain (2003/04)', 'Synthetic hourly storms'))
+    if source == 'Measured daily rain (2003/04)':
+        storm = st.slider('**Duration of the daily rain (h)**', 1, 24, 4, 1)
+        years, seed = 1, 0
+    else:
+        storm = st.slider('**Mean storm duration (h)**', 1, 24, 6, 1)
+        years = st.select_slider('**Years**', (1, 5, 10, 30), 10)
+        seed = st.number_input('**Seed of the storms**', 0, 1000, 1)
+    model = st.selectbox('**Infiltration model**', ('green_ampt', 'horton', 'philip'),
+                         format_func={'green_ampt': 'Green-Ampt (Mein-Larson)', 'horton': 'Horton', 'philip': 'Philip'}.get)
+    n_columns = st.select_slider('**Soil columns**', (100, 1000, 10000), 1000)
+with columns[1]:
+    if model == 'green_ampt':
+        params = dict(Ks=st.slider('**Median Ks (mm/h)**', 0.1, 50.0, 5.0, 0.1),
+                      psi_f=st.slider('**Suction at the wetting front (mm)**', 10.0, 500.0, 110.0, 5.0),
+                      d_theta=st.slider('**Moisture deficit (-)**', 0.01, 0.5, 0.3, 0.01))
+    elif model == 'horton':
+        params = dict(f0=st.slider('**Median initial capacity f0 (mm/h)**', 1.0, 200.0, 50.0, 1.0),
+                      fc=st.slider('**Median final capacity fc (mm/h)**', 0.1, 50.0, 5.0, 0.1),
+                      k=st.slider('**Decay constant k (1/h)**', 0.1, 10.0, 2.0, 0.1))
+        params['f0'] = max(params['f0'], params['fc'])
+    else:
+        params = dict(S=st.slider('**Sorptivity S (mm/h^0.5)**', 1.0, 100.0, 20.0, 1.0),
+                      A=st.slider('**Median A (mm/h)**', 0.05, 25.0, 2.5, 0.05))
+    sigma = st.slider('**Scatter of the rates between the columns (standard deviation of log10)**', 0.0, 1.0, 0.3, 0.05)
+    recovery = st.slider('**Recovery of the capacity (1/d)**', 0.0, 2.0, 0.5, 0.05)
+"---"
+
+with st.spinner('Splitting the rain ...'):
+    rain, factor, result = run(source, storm, years, seed, model, params, sigma, n_columns, recovery)
+total = rain.sum()
+
+columns = st.columns(4)
+columns[0].metric('Rain (mm)', '%.0f' % total)
+columns[1].metric('Infiltration (mm)', '%.0f' % result.infiltration.sum())
+columns[2].metric('Runoff (mm)', '%.1f' % result.runoff.sum())
+columns[3].metric('Runoff coefficient', '%.3f' % (result.runoff.sum() / total if total > 0. else 0.))
+
+# SERIES (daily sums)
+days = len(rain) // 24
+fig, (ax1, ax2) = plotting.subplots(2, 1, figsize=(12, 7), sharex=True)
+ax1.fill_between(np.arange(days), rain[:days * 24].reshape(days, 24).sum(1), step='mid', color='lightblue', label='Rain')
+ax1.fill_between(np.arange(days), result.runoff[:days * 24].reshape(days, 24).sum(1), step='mid', color='red',
+                 label='Runoff (mean of the columns)')
+ax1.set_ylabel('mm/d', fontsize=12)
+ax1.legend()
+ax2.plot(np.arange(days), result.runoff_area[:days * 24].reshape(days, 24).max(1) * 100., color='darkred')
+ax2.set_ylabel('Area with runoff (%)', fontsize=12)
+ax2.set_xlabel('Time (d)', fontsize=12)
+for ax in (ax1, ax2):
+    ax.grid(alpha=0.3)
+plotting.show(fig)
+
+# COLUMNS
+fig, (ax1, ax2) = plotting.subplots(1, 2, figsize=(12, 4.5))
+coefficient = result.column_runoff / total if total > 0. else np.zeros(n_columns)
+ax1.scatter(factor, coefficient, s=4, alpha=0.5)
+ax1.set_xscale('log')
+ax1.set_xlabel('Rate parameter / median', fontsize=12)
+ax1.set_ylabel('Runoff coefficient of the column', fontsize=12)
+ax1.grid(alpha=0.3)
+t = np.linspace(0.01, 6., 200)
+for q in (0.1, 0.5, 0.9):
+    params_q = dict(params)
+    for name in ('Ks', 'f0', 'fc', 'A'):
+        if name in params_q:
+            params_q[name] = params_q[name] * np.quantile(factor, q)
+    ax2.plot(t, ponded_infiltration(t, model, params_q)[1], label='%d %% quantile of the columns' % (q * 100))
+ax2.set_ylim(0., None)
+ax2.set_xlabel('Time of ponding (h)', fontsize=12)
+ax2.set_ylabel('Infiltration capacity (mm/h)', fontsize=12)
+ax2.legend()
+ax2.grid(alpha=0.3)
+plotting.show(fig)
@@ -1,8 +1,14 @@
 # Initialize the needed Python packages
 import math
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
+from hydrokit.soil import Soil
 
 st.title('Soil Water Retention characteristics')
 
@@ -79,39 +85,19 @@ FC2  = tr2 + (ts2 - tr2)/(1+(alpha2*10**1.8)**n2)**m2      # field capacity
 eFC2 = FC2 - PWP2                                      # effective field capacity
 
 # model output
-t_plot1  = []                                        # t  = theta = moisture content
-p_plot1  = []                                        # p  = phi   = suction head
-kr_plot1 = []                                        # kr = rel. permeability
+soil1    = Soil('van_genuchten', dict(theta_r=tr1, theta_s=ts1, alpha=alpha1, n=n1))
+t_plot1  = np.linspace(tr1, ts1, x_max)              # t  = theta = moisture content
+p_plot1  = soil1.suction(t_plot1)                    # p  = phi   = suction head [cm] (infinite at tr)
+kr_plot1 = soil1.relative_conductivity(p_plot1)      # kr = rel. permeability
 
 # model output
-t_plot2  = []                                        # t  = theta = moisture content
-p_plot2  = []                                        # p  = phi   = suction head
-kr_plot2 = []                                        # kr = rel. permeability
-    
-for x in range (0, x_max):
-    t1 = tr1 + (ts1-tr1)*x/(x_max-1)                 # [-] moisture content; please note that range counts up to x_max-1
-    t2 = tr2 + (ts2-tr2)*x/(x_max-1)                 # [-] moisture content; please note that range counts up to x_max-1
-    te1 = (t1-tr1)/(ts1-tr1)                         # [-] effective saturation      
-    te2 = (t2-tr2)/(ts2-tr2)                         # [-] effective saturation
-    if x == 0:
-        p1     = 1E18                                # [cm] suction head
-        p2     = 1E18
-        kr1    = 0                                   # [-] relative hydraulic conductivity
-        kr2    = 0
-    else: 
-        p1     = ((te1**(-1/m1)-1)**(1/n1))/alpha1                      
-        p2     = ((te2**(-1/m2)-1)**(1/n2))/alpha2
-        kr1    = np.sqrt(te1)*(1-(1-te1**(1/m1))**m1)**2
-        kr2    = np.sqrt(te2)*(1-(1-te2**(1/m2))**m2)**2
-    t_plot1.append(t1)
-    p_plot1.append(p1)
-    kr_plot1.append(kr1)
-    t_plot2.append(t2)
-    p_plot2.append(p2)
-    kr_plot2.append(kr2)
+soil2    = Soil('van_genuchten', dict(theta_r=tr2, theta_s=ts2, alpha=alpha2, n=n2))
+t_plot2  = np.linspace(tr2, ts2, x_max)              # t  = theta = moisture content
+p_plot2  = soil2.suction(t_plot2)                    # p  = phi   = suction head [cm] (infinite at tr)
+kr_plot2 = soil2.relative_conductivity(p_plot2)      # kr = rel. permeability
         
     
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax  = fig.add_subplot()
 ax.plot(t_plot1, p_plot1, 'r', markersize=3, label=r'Dataset 1')
 ax.plot(t_plot2, p_plot2, 'g', markersize=3, label=r'Dataset 2')
@@ -128,8 +114,8 @@ ax.vlines(x= FC2, ymin=1e-1, ymax=10**1.8, colors='g')
 
 ax.set(xlabel='water content [-]', ylabel ='suction head [cm]', xlim = [0, 0.7], ylim = [1e-1,1e+5], yscale = 'log' )
 ax.grid(which="both", color='grey',linewidth=0.5)
-plt.legend()
-st.pyplot(fig)
+ax.legend()
+plotting.show(fig)
 
 columns2 = st.columns((1,1), gap = 'large')
 with columns2[0]:
@@ -148,11 +134,11 @@ with columns2[1]:
     st.write('Eff. Field Capacity     eFC:', '{:.2f}'.format(eFC2) )
 
 if plot4 == 1:
-    fig = plt.figure(figsize=(6,4))
+    fig = plotting.figure(figsize=(6,4))
     ax  = fig.add_subplot()
     ax.plot(t_plot1, kr_plot1, 'r', markersize = 3, label=r'Dataset 1')
     ax.plot(t_plot2, kr_plot2, 'g', markersize = 3, label=r'Dataset 1')
     ax.set(xlabel='water content [-]', ylabel='rel hydraulic conductivity [cm/d]', xlim = [0, 0.7], ylim = [0,1] )
     ax.grid(which="major", color='grey',linewidth=0.5)
-    plt.legend()
-    st.pyplot(fig)
\ No newline at end of file
+    ax.legend()
+    plotting.show(fig)
\ No newline at end of file
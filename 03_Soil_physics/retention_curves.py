@@ -3,8 +3,13 @@ import sys
 import subprocess
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
+from hydrokit.soil import Soil
 import streamlit_book as stb
 
 st.title('Soil Water Retention curves 💦')
@@ -17,157 +22,6 @@ st.markdown("""
 """
 )
 
-# FUNCTIONS
-def m_val(n):
-    """Function that returns the value of "m"
-    Parameters
-    ----------
-    n : float
-        value of "n"
-    Returns
-    -------
-    float
-        value of "m"
-    """
-    m = 1 - (1/n)
-    return m
-
-def dimensionless_water_content(t, tr, ts):
-    """Function that calculates the dimensionless water content. 
-    Based on van Genuchten, 1980 (Eq. 2) 
-    Parameters
-    ----------
-    t : float
-        soil-water content
-    tr : float
-        residual values of soil-water content
-    ts : float
-        saturated values of soil-water content
-    Returns
-    -------
-    float
-        dimensionless water content
-    """ 
-    T_dim = (t - tr)/(ts - tr)      
-    return T_dim
-
-
-def water_content(alpha, h, n):  
-    """Function that calculates the water content.  
-    Based on van Genuchten, 1980 (Eq. 3)
-    Parameters
-    ----------
-    alpha : float
-        alpha parameter
-    h : float
-        head pressure (positive)
-    n : float
-        n parameter
-    Returns
-    -------
-    float
-        water content
-    """  
-    T = ((1 + (alpha*h)**(n)))**(-(m_val(n)))  
-    return T
-
-def soil_water_content(tr, ts, alpha, h, n):
-    """Function that calculates the soil-water content. 
-    Based on van Genuchten, 1980 (Eq. 21)
-    Parameters
-    ----------
-    tr : float
-        residual values of soil-water content
-    ts : float
-        saturated values of soil-water content
-    alpha : float
-        alpha parameter
-    n : float
-        n parameter  
-    Returns
-    -------
-    float
-        soil-water content
-    """
-    t = tr + ((ts - tr) / ((1 + (alpha*h)**(n))**m_val(n)))   
-
-    return t  
-
-def relative_hydraulic_conductivity(alpha, n, h, T):
-    """Function that calculates the relative hydraulic conductivity. 
-    Based on van Genuchten, 1980 (Eq. 8 and 9).
-    Parameters
-    ----------
-    alpha : float
-        alpha parameter
-    n : float
-        n parameter
-    h : float 
-        head pressure (positive)
-    T : float
-        water content
-    Returns
-    -------
-    T: float
-        _description_
-    Kr_T: float
-        relative hydraulic conductivity expressed in terms of the dimensionless water content
-    Kr_h: float
-        relative hydraulic conductivity expressed in terms of the head pressure   
-    Raises
-    ------
-    ValueError
-        If m value is not between 0 and 1
-    """
-    
-    # Check that m_val(n) is within the expected range
-    if not (0 < m_val(n) < 1):
-        raise ValueError("Parameter 'm' out of range: must be between 0 and 1")
-
-    #-- Relative hydraulic conductivity expressed in terms of the water content
-    Y = (1 - T**(1 / m_val(n)))**m_val(n)
-    Kr_T = T**0.5 * (1 - Y)**2                     
-    
-    #-- Relative hydraulic conductivity expressed in terms of the pressure head
-    I = (1 - alpha * h)
-    U = I**(n - 1)
-    P = (1 + (alpha * h)**n)**(m_val(n) / 2)
-    
-    if I > 0:
-        Kr_h = ((U * T)**2) / P 
-    else:
-        Kr_h = np.nan                        
-    
-    return Kr_T, Kr_h
-
-def soil_water_diffusivity(Ks, n, ts, tr, T):
-    """Function that calculates the soil water diffusivity.
-    Based on van Genuchten, 1980 (Eq. 11).
-    Parameters
-    ----------
-    Ks : float
-        hydraulic conductivity at saturation
-    n  : float
-        n parameter
-    ts : float
-        satured soil-water content
-    tr : float
-        residual soil-water content
-    T : float
-        dimensionless water content
-    Returns
-    -------
-    D_T : float
-        soil water diffusivity
-    """  
-    I = ((1 - m_val(n))*Ks) / (alpha*m_val(n)*(ts - tr))
-    L = T**(0.5 - (1/m_val(n)))
-    Y = (1 - T**(1 / m_val(n)))**m_val(n)
-    P = ((1/Y) + (Y) - 2)
-    
-    D_T = I * L * P                                        
-
-    return D_T
 
 #  
 #Example from Van Genuchten 1980
@@ -185,20 +39,14 @@ Ks = 100        # cm/day
 #-- Generate pressure head values:
 h_values = np.logspace(0, 6, 100)  
 
-#-- Calculate water content values
-t_values = [soil_water_content(tr, ts, alpha, h, n) for h in h_values]
-T_values = [water_content(alpha, h, n) for h in h_values]
-
-#-- Calculate dimensionless water content and relative hydraulic conductivity
-Kr_T, Kr_h = zip(*[relative_hydraulic_conductivity(alpha, n, h, T) for h, T in zip(h_values, T_values)])
-Kr_T = list(Kr_T)  
-Kr_h = list(Kr_h) 
-
-#-- Calculate the soil-water diffusivity
-D_T = [soil_water_diffusivity(Ks, n, ts, tr, T) for T in T_values]
+#-- Water content, relative hydraulic conductivity and diffusivity (van Genuchten 1980, Eq. 21, 8 and 11)
+soil = Soil('van_genuchten', dict(theta_r=tr, theta_s=ts, alpha=alpha, n=n), Ks=Ks)
+t_values = soil.water_content(h_values)
+Kr_T = soil.relative_conductivity(h_values)
+D_T = soil.diffusivity(t_values)
 
 #-- Plot the 3 figures
-fig, (ax1, ax2, ax3, ax4) = plt.subplots(1, 4, figsize=(15, 5))
+fig, (ax1, ax2, ax3, ax4) = plotting.subplots(1, 4, figsize=(15, 5))
 
 # ax1: Water content vs. Pressure head
 ax1.plot(t_values, np.abs(h_values))
@@ -233,8 +81,8 @@ ax4.set_ylim(1, 1000000)
 ax4.set_xlabel(r'Water Content, $\Theta$')
 ax4.set_ylabel(r'Diffusivity, $D$')
 
-plt.tight_layout()
-st.pyplot(fig)
+fig.tight_layout()
+plotting.show(fig)
 
 #
 # Example for retention curves - Interactive plots
@@ -294,11 +142,11 @@ with columns_i1[1]:
 h_values = np.logspace(0, 6, 100)
       
 #-- Calculating the soil-water content for both soild
-t_sand = [soil_water_content(tr_sand, ts_sand, alpha_sand, h, n_sand) for h in h_values]
-t_silt = [soil_water_content(tr_silt, ts_silt, alpha_silt, h, n_silt) for h in h_values]
+t_sand = Soil('van_genuchten', dict(theta_r=tr_sand, theta_s=ts_sand, alpha=alpha_sand, n=n_sand)).water_content(h_values)
+t_silt = Soil('van_genuchten', dict(theta_r=tr_silt, theta_s=ts_silt, alpha=alpha_silt, n=n_silt)).water_content(h_values)
     
 #-- Plotting the results
-fig, ax = plt.subplots(figsize=(9, 5))
+fig, ax = plotting.subplots(figsize=(9, 5))
 ax.plot(sandSoil["Water Content"], sandSoil["Suction Pressure [hPa]"], 'o', mfc='none', 
         c="green", label="Observations Sand Soil")
 ax.plot(siltSoil["Water Content"], siltSoil["Suction Pressure [hPa]"], 'o', mfc='none',
@@ -316,7 +164,7 @@ ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
 fig.tight_layout()
 #box = ax.get_position()
 #ax.set_position([box.x0, box.y0, box.width * 0.8, box.height])
-st.pyplot(fig)
+plotting.show(fig)
 
 st.write('The app is developed by Oriol Bertran Oller (UPC Barcelona) 2024')
 
@@ -1,7 +1,12 @@
 # Importing necessary libraries
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Steady-State Flow to a Well in an Unconfined Aquifer - Drawdown with the Thiem equation')
 
@@ -57,7 +62,7 @@ rm = r*-1
 h = compute_h(Q, K, H, R, r)
 
 #PLOT    
-fig = plt.figure(figsize=(10,5))
+fig = plotting.figure(figsize=(10,5))
 ax = fig.add_subplot(1, 1, 1)
     
 if dry:
@@ -91,4 +96,4 @@ else:
     ax.text((x_max/2),1,'unconfined aquifer')
 
     
-st.pyplot(fig)
\ No newline at end of file
+plotting.show(fig)
\ No newline at end of file
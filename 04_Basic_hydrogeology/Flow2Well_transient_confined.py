@@ -1,8 +1,13 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting
 
 st.title('Transient Flow towards a well in a confined aquifer')
 st.write('***Drawdown computation with the Theis solution***')
@@ -23,32 +28,7 @@ st.latex(r'''u = \frac{Sr^2}{4Tt}''')
 st.write('Subsequently, the Theis equation is solved with Python routines.')
 "---"
 
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-# (Here, the method computes the data for the well function. Those data can be used to generate a type curve.)
-u_max = 1
-r_max = 10000
-u  = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
+# (The well function $W(u)$ and the Theis solution are provided by the shared hydrokit.wells module)
 
 # This is the function to plot the graph with the data     
 
@@ -88,29 +68,30 @@ r = np.linspace(1, max_r, 200)
 r_neg = r * -1.0
     
 # Compute Q for each hydraulic gradient
-s  = compute_s(T, S, t, Q, r)
+s  = theis(r, t, T, S, Q)
 
 # Compute s for a specific point
 x_point = x_search
-y_point = compute_s(T, S, t, Q, x_search)
+y_point = theis(x_search, t, T, S, Q)
     
 # Plotting
-fig=plt.figure(figsize=(10, 6))
+fig=plotting.figure(figsize=(10, 6))
+ax = fig.add_subplot()
     
-plt.plot(r, s, linewidth=1., color='b', label=r'drawdown prediction')
-plt.plot(r_neg, s, linewidth=1, color='b')
-plt.fill_between(r,s,max_s, facecolor='lightblue')
-plt.fill_between(r_neg,s,max_s, facecolor='lightblue')
-plt.xlim(-max_r, max_r)
-plt.ylim(max_s,-5)
-plt.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='drawdown output') 
-plt.xlabel(r'Distance from the well in m', fontsize=14)
-plt.ylabel(r'Drawdown in m', fontsize=14)
-plt.title('Drawdown prediction with Theis', fontsize=16)
-plt.legend()
-plt.grid(True)
-
-st.pyplot(fig)
+ax.plot(r, s, linewidth=1., color='b', label=r'drawdown prediction')
+ax.plot(r_neg, s, linewidth=1, color='b')
+ax.fill_between(r,s,max_s, facecolor='lightblue')
+ax.fill_between(r_neg,s,max_s, facecolor='lightblue')
+ax.set_xlim(-max_r, max_r)
+ax.set_ylim(max_s,-5)
+ax.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='drawdown output') 
+ax.set_xlabel(r'Distance from the well in m', fontsize=14)
+ax.set_ylabel(r'Drawdown in m', fontsize=14)
+ax.set_title('Drawdown prediction with Theis', fontsize=16)
+ax.legend()
+ax.grid(True)
+
+plotting.show(fig)
 
 st.write("DRAWDOWN output:")
 st.write("Distance from the well (in m): %8.2f" %x_point)
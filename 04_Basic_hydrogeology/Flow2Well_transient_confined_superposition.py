@@ -1,8 +1,14 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
+import pandas as pd
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting, superposition
 
 st.title('Transient Flow towards wells and superposition')
 
@@ -55,32 +61,7 @@ st.subheader('Computation of well drawdown with the principle of superposition',
 st.markdown(r"""
 The menu point '**Use cases**' allows you to choose different scenarios and to modify the pumping rate and the position of the wells.  
 """, unsafe_allow_html=True)
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-# (Here, the method computes the data for the well function. Those data can be used to generate a type curve.)
-u_max = 1
-r_max = 10000
-u  = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
+# (The well function $W(u)$ and the Theis solution are provided by the shared hydrokit.wells module)
 
 # This is the function to plot the graph with the data     
 
@@ -147,72 +128,74 @@ r1_neg = r1 * -1.0 + distanz
 r2_neg = r2 * -1.0 - distanz
     
 # Compute Q for each hydraulic gradient
-s1  = compute_s(T, S, t, Q1, r)
-s2  = compute_s(T, S, t, Q2, r)
+s1  = theis(r, t, T, S, Q1)
+s2  = theis(r, t, T, S, Q2)
+
 
+# Superposition: the wells of the case, the boundaries (the line x = 0) are represented by image wells
+two_wells = st.session_state.case in ('Two wells same pumping', 'Two wells different pumping')
+if two_wells:
+    x_wells, Q_wells, boundaries = [0.5*distanz, -0.5*distanz], [Q1, Q2], []
+else:
+    kind = 'no-flow' if st.session_state.case == 'Well with noflow bc' else 'recharge'
+    x_wells, Q_wells, boundaries = [0.5*distanz], [Q1], [superposition.Boundary(0., 0., np.pi/2, kind)]
 
-# Superposition
 num_steps = 500
 r_super = np.linspace(-1000, 1000, num_steps)
 
-s_super = []
-
-for x in r_super:
-    y1 = compute_s(T, S, t, Q1, x-0.5*distanz)
-    y2 = compute_s(T, S, t, Q2, x+0.5*distanz)
-    y3 = y1 + y2
-    s_super.append(y3)
+wells = superposition.PumpingSchedule(x_wells, np.zeros(len(x_wells)), [0.], np.array(Q_wells)[:, None], T, S, boundaries)
+s_super = wells.drawdown(r_super, np.zeros(num_steps), t)
     
 # Plotting
-fig=plt.figure(figsize=(10, 6))
+fig=plotting.figure(figsize=(10, 6))
 ax = fig.add_subplot(1, 1, 1)
     
-plt.plot(r1, s1,     linewidth=1., color='b', label=r'drawdown well 1')
-plt.plot(r1_neg, s1, linewidth=1., color='b')
-plt.plot(r2, s2,     linewidth=1., color='g', label=r'drawdown well 2')
-plt.plot(r2_neg, s2, linewidth=1., color='g')
-plt.plot(r_super, s_super, linewidth=2, color='black',label=r'resulting drawdown')
+ax.plot(r1, s1,     linewidth=1., color='b', label=r'drawdown well 1')
+ax.plot(r1_neg, s1, linewidth=1., color='b')
+ax.plot(r2, s2,     linewidth=1., color='g', label=r'drawdown well 2')
+ax.plot(r2_neg, s2, linewidth=1., color='g')
+ax.plot(r_super, s_super, linewidth=2, color='black',label=r'resulting drawdown')
 
-plt.fill_between(r_super,s_super,max_s, facecolor='lightblue')
+ax.fill_between(r_super,s_super,max_s, facecolor='lightblue')
 
-plt.xlim(-max_r, max_r)
-plt.ylim(max_s,-5)
-plt.xlabel(r'spatial coordinate in m', fontsize=14)
-plt.ylabel(r'Drawdown in m', fontsize=14)
-plt.title('Drawdown prediction with Theis - principle of superposition', fontsize=16)
+ax.set_xlim(-max_r, max_r)
+ax.set_ylim(max_s,-5)
+ax.set_xlabel(r'spatial coordinate in m', fontsize=14)
+ax.set_ylabel(r'Drawdown in m', fontsize=14)
+ax.set_title('Drawdown prediction with Theis - principle of superposition', fontsize=16)
 
 if st.session_state.case == 'Two wells same pumping':
     ax.vlines(0.5*distanz, max_s, -0.5, linewidth = 3, color='darkblue')
     ax.vlines(-0.5*distanz, max_s, -0.5, linewidth = 3, color='darkgreen')
-    plt.text (  0.5*distanz, -1, 'pumping \n well', horizontalalignment='center', fontsize=12)
-    plt.text (- 0.5*distanz, -1, 'pumping \n well', horizontalalignment='center', fontsize=12)
+    ax.text (  0.5*distanz, -1, 'pumping \n well', horizontalalignment='center', fontsize=12)
+    ax.text (- 0.5*distanz, -1, 'pumping \n well', horizontalalignment='center', fontsize=12)
 if st.session_state.case == 'Two wells different pumping':
     ax.vlines(0.5*distanz, max_s, -0.5, linewidth = 3, color='darkblue')
     ax.vlines(-0.5*distanz, max_s, -0.5, linewidth = 3, color='darkgreen')
-    plt.text (  0.5*distanz, -1, 'pumping \n well 1', horizontalalignment='center', fontsize=12)
-    plt.text (- 0.5*distanz, -1, 'pumping \n well 2', horizontalalignment='center', fontsize=12)
+    ax.text (  0.5*distanz, -1, 'pumping \n well 1', horizontalalignment='center', fontsize=12)
+    ax.text (- 0.5*distanz, -1, 'pumping \n well 2', horizontalalignment='center', fontsize=12)
 if st.session_state.case == 'Well with noflow bc':
     ax.vlines(0, max_s, -5, linestyle="--", linewidth = 2, color='black')
     ax.vlines(0.5*distanz, max_s, -0.5, linewidth = 3, color='darkblue')
     ax.vlines(-0.5*distanz, max_s, -0.5, linestyle=":", linewidth = 3, color='darkgreen')
-    plt.text (120, max_s-1, 'real \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
-    plt.text (-150, max_s-1, 'imaginary \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
-    plt.text (  0.55*distanz, 1, 'real \n pumping well', horizontalalignment='left', fontsize=12)
-    plt.text (- 0.55*distanz, 1, 'imaginary \n pumping well', horizontalalignment='right', fontsize=12)
-    plt.text (-20, max_s-5, 'no flow boundary', rotation=90, horizontalalignment='right', fontsize=12)
+    ax.text (120, max_s-1, 'real \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text (-150, max_s-1, 'imaginary \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text (  0.55*distanz, 1, 'real \n pumping well', horizontalalignment='left', fontsize=12)
+    ax.text (- 0.55*distanz, 1, 'imaginary \n pumping well', horizontalalignment='right', fontsize=12)
+    ax.text (-20, max_s-5, 'no flow boundary', rotation=90, horizontalalignment='right', fontsize=12)
 if st.session_state.case == 'Well with infiltration bc':
     ax.vlines(0, max_s, -5, linestyle="--", linewidth = 2, color='black')
     ax.vlines(0.5*distanz, max_s, -0.5, linewidth = 3, color='darkblue')
     ax.vlines(-0.5*distanz, max_s, -0.5, linestyle=":", linewidth = 3, color='darkgreen')
-    plt.text (120, max_s-1, 'real \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
-    plt.text (-150, max_s-1, 'imaginary \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
-    plt.text (  0.55*distanz, 5, 'real \n pumping well', horizontalalignment='left', fontsize=12)
-    plt.text (- 0.55*distanz, 1, 'imaginary \n infiltration well', horizontalalignment='right',  fontsize=12)
-    plt.text (-20, max_s-5, 'discharge boundary', rotation=90, horizontalalignment='right', fontsize=12)
+    ax.text (120, max_s-1, 'real \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text (-150, max_s-1, 'imaginary \n system', horizontalalignment='center', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text (  0.55*distanz, 5, 'real \n pumping well', horizontalalignment='left', fontsize=12)
+    ax.text (- 0.55*distanz, 1, 'imaginary \n infiltration well', horizontalalignment='right',  fontsize=12)
+    ax.text (-20, max_s-5, 'discharge boundary', rotation=90, horizontalalignment='right', fontsize=12)
     
-plt.legend(loc='lower right', fontsize=12)
+ax.legend(loc='lower right', fontsize=12)
 
-st.pyplot(fig)
+plotting.show(fig)
 if st.session_state.case == 'Well with noflow bc':
     with st.expander('Here you can find additional explanation'):
         st.image('04_Basic_hydrogeology/FIGS/ferris_no_flow.png', caption="Conceptual sketch through an aquifer with one pumping well and an imaginary well to represent a no-flow boundary [Ferris et al. 1962]( https://pubs.usgs.gov/wsp/wsp1536-E/).")
@@ -221,6 +204,49 @@ if st.session_state.case == 'Well with infiltration bc':
     with st.expander('Here you can find additional explanation'):
         st.image('04_Basic_hydrogeology/FIGS/ferris_infiltration.png', caption="Conceptual sketch through an aquifer with one pumping well and an imaginary well to represent an infiltration boundary [Ferris et al. 1962]( https://pubs.usgs.gov/wsp/wsp1536-E/).")
 
+'---'
+st.subheader('Variable pumping rates', divider = 'orange')
+
+st.markdown(r"""
+The principle of superposition also applies in time: every change $\Delta Q$ of the pumping rate at the time $t_j$ adds the drawdown $\frac{\Delta Q}{4\pi T}W\left(\frac{Sr^2}{4T(t-t_j)}\right)$. Edit the pumping schedule of the wells of the selected use case (start of each period in hours, pumping rates in m³/s). Additionally, the wells can pump only during some hours of each day, which changes the rates every hour.
+""", unsafe_allow_html=True)
+
+columns2 = st.columns((1,1))
+with columns2[0]:
+    schedule = {'Start (h)': [0., 48., 96.], 'Well 1 (m³/s)': [Q1, 0., Q1]}
+    if two_wells:
+        schedule['Well 2 (m³/s)'] = [Q2, Q2, 0.]
+    schedule = st.data_editor(pd.DataFrame(schedule), num_rows='dynamic', hide_index=True)
+with columns2[1]:
+    duration = st.slider('**Duration of the simulation** (days)', 1, 30, 7, 1)
+    hours = st.slider('**Pumping hours per day**', 1, 24, 24, 1)
+    x_obs = st.slider('**Position of the observation point** (m)', -1000, 1000, 0, 10)
+
+# hourly rates: the last period of the schedule that started, outside of the pumping hours zero
+schedule = schedule.dropna().sort_values('Start (h)')
+t_hours = np.arange(duration*24 + 1)
+period = np.searchsorted(schedule['Start (h)'].to_numpy(), t_hours[:-1], side='right') - 1
+pumping = (period >= 0) & (t_hours[:-1] % 24 < hours)
+rates = np.where(pumping, schedule.iloc[:, 1:].to_numpy()[period].T, 0.)
+
+wells = superposition.PumpingSchedule(x_wells, np.zeros(len(x_wells)), t_hours[:-1]*3600., rates, T, S, boundaries)
+s_obs = wells.hydrographs([0.5*distanz, x_obs], [0., 0.], t_hours*3600.)
+
+fig, (ax1, ax2) = plotting.subplots(2, 1, sharex=True, figsize=(10, 7), height_ratios=[1, 2])
+for k, q in enumerate(rates):
+    ax1.step(t_hours/24, np.append(q, q[-1]), where='post', label='well %i' % (k + 1))
+ax1.set_ylabel(r'Pumping rate in m³/s', fontsize=12)
+ax1.legend(loc='upper right')
+ax1.grid()
+ax2.plot(t_hours/24, s_obs[0], color='darkblue', label='well 1 (r = 0.1 m)')
+ax2.plot(t_hours/24, s_obs[1], color='black', label='observation point x = %i m' % x_obs)
+ax2.invert_yaxis()
+ax2.set_xlabel(r'Time in days', fontsize=12)
+ax2.set_ylabel(r'Drawdown in m', fontsize=12)
+ax2.legend(loc='lower right')
+ax2.grid()
+plotting.show(fig)
+
 '---'
 
 # Copyright
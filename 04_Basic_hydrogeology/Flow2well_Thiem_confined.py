@@ -1,7 +1,12 @@
 # Importing necessary libraries
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Steady-State Flow to a Well in a Confined Aquifer - Drawdown with the Thiem equation')
 
@@ -43,7 +48,7 @@ rm = r*-1
 h = H - (Q * np.log((R)/(r)))/(2 * np.pi * K* m)
     
 #PLOT    
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
 if((h[0])>m):
     ax.plot(r,h, '--' 'b')
@@ -72,4 +77,4 @@ ax.axvspan(-x_max, x_max, ymin=0, ymax=((H+5)/1), alpha=0.5, color='grey')
     
 ax.text((x_max/2),(m/2),'confined aquifer')
     
-st.pyplot(fig)
\ No newline at end of file
+plotting.show(fig)
\ No newline at end of file
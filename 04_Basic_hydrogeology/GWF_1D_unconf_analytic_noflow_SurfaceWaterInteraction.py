@@ -1,8 +1,13 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 
 st.title('Analytical solution for 1D unconfined flow with one defined head boundary/river boundary')
@@ -175,7 +180,7 @@ def computation():
     h = zb + np.sqrt(2 * (-R / 2 * (x ** 2 - L ** 2) + phiL) / K)
     
     # PLOT FIGURE
-    fig = plt.figure(figsize=(9,12))
+    fig = plotting.figure(figsize=(9,12))
     ax = fig.add_subplot(2, 1, 1)
     ax.plot(x,h)
     if calib == 'Regular data':
@@ -202,9 +207,9 @@ def computation():
             ax.plot(xp3,hp3, 'bo', label=r'measured')
             hm = [zb + np.sqrt(2 * (-R / 2 * (x ** 2 - L ** 2) + phiL) / K) for x in xp3]
     ax.fill_between(x,0,h, facecolor='lightblue')
-    plt.title('Hydraulic head for 1D unconfined flow', fontsize=16)
-    plt.xlabel(r'x in m', fontsize=14)
-    plt.ylabel(r'hydraulic head in m', fontsize=14)
+    ax.set_title('Hydraulic head for 1D unconfined flow', fontsize=16)
+    ax.set_xlabel(r'x in m', fontsize=14)
+    ax.set_ylabel(r'hydraulic head in m', fontsize=14)
     
     # BOUNDARY CONDITIONS hl, hr
     ax.vlines(0, 0, 1000, linewidth = 10, color='lightgrey')
@@ -220,16 +225,16 @@ def computation():
     #ax.hlines(y= h_arrow-(h_arrow*0.0005), xmin=L*0.95, xmax=L*0.97, colors='blue')   
     #ax.hlines(y= h_arrow-(h_arrow*0.001), xmin=L*0.955, xmax=L*0.965, colors='blue')
 
-    plt.ylim(140,hr *(1+y_scale/100))
-    plt.xlim(-50,L+50)
+    ax.set_ylim(140,hr *(1+y_scale/100))
+    ax.set_xlim(-50,L+50)
     x_pos1 = 400
     x_pos2 = 2500
     y_pos1 = ((hr *(1+y_scale/100))-150)*0.9+150
-    plt.text(x_pos1, y_pos1, 'No Flow bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text(x_pos1, y_pos1, 'No Flow bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
     if riv:
-        plt.text(x_pos2, y_pos1, 'River bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+        ax.text(x_pos2, y_pos1, 'River bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
     else:
-        plt.text(x_pos2, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+        ax.text(x_pos2, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
     
     if scatter:
         x45 = [0,200]
@@ -257,19 +262,19 @@ def computation():
             else:
                 ax.plot(hp3, hm, 'ro', label=r'measured')
                 me, mae, rmse = compute_statistics(hm, hp3)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Measured head in m', fontsize=14)
-        plt.ylabel(r'Computed head in m', fontsize=14)
-        plt.ylim(150, hr *(1+y_scale/100))
-        plt.xlim(150, hr *(1+y_scale/100))
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Measured head in m', fontsize=14)
+        ax.set_ylabel(r'Computed head in m', fontsize=14)
+        ax.set_ylim(150, hr *(1+y_scale/100))
+        ax.set_xlim(150, hr *(1+y_scale/100))
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
                              r'$MAE = %.3f$ m' % (mae, ),
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
         x_pos = ((hr *(1+y_scale/100))-150)*0.25+150
         y_pos = ((hr *(1+y_scale/100))-150)*0.82+150
-        plt.text(x_pos, y_pos, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=14)
-    st.pyplot(fig)
+        ax.text(x_pos, y_pos, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=14)
+    plotting.show(fig)
     
     
     if calib != 'No calibration':
@@ -1,6 +1,11 @@
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Streamlit app title and description
 # Developed by Markus Giese University of Gothenburg 2025
@@ -75,7 +80,7 @@ h, z = ghyben_herzberg(hl, rho_f, rho_s, x_land)
 
 
 # Plot figure
-fig, ax = plt.subplots(figsize=(9, 6))
+fig, ax = plotting.subplots(figsize=(9, 6))
 ax.plot(x_land, h, color='steelblue', lw = 1.0, label="Freshwater Head")
 ax.plot(x_land, y_land, c="black")
 ax.plot(x_sea, y_sea, c="black")
@@ -92,16 +97,16 @@ ax.fill_between(x_land, -z, ymin, facecolor='cornflowerblue', hatch = '//') # sa
 ax.fill_between(x_sea-1, y_sea, ymin, facecolor='cornflowerblue', hatch = '//')   # salty aquifer sea
 ax.fill_between(x_sea-1, 0, y_sea, facecolor='royalblue')   # sea
 ax.set_xlabel("x [m]",fontsize=14)
-plt.ylim(ymin,20)
-plt.xlim(0,1200)
+ax.set_ylim(ymin,20)
+ax.set_xlim(0,1200)
 ax.set_ylabel("hydraulic head [m]",fontsize=14)
 ax.set_title("Freshwater-Saltwater Interface",fontsize=16)
 ax.legend(loc = 'lower right', fontsize=12)
-plt.text(1180, -20, 'Sea', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
-plt.text(1180, -80, 'Saltwater', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
-plt.text(150, -10, 'Freshwater', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
+ax.text(1180, -20, 'Sea', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
+ax.text(1180, -80, 'Saltwater', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
+ax.text(150, -10, 'Freshwater', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
     
-st.pyplot(fig)
+plotting.show(fig)
 
 '---'
 
@@ -1,7 +1,13 @@
 # import librarys
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
+from hydrokit.reservoir import linear_reservoir
 import numpy as np
-import matplotlib.pyplot as plt
 
 st.title('Model for a Linear Reservoir')
 
@@ -66,10 +72,8 @@ def generate_data(k, influx_start, influx_end, influx_v, initial_v):
     V = np.zeros_like(i, dtype=float)
     V[0] = initial_v
     Out = np.zeros_like(i, dtype=float)
-    
-    for n in range(1, len(i)):
-        Out[n-1] = V[n-1] * k
-        V[n] = V[n-1] - Out[n-1] + In[n]
+    # explicit steps V[n] = V[n-1] - k V[n-1] + In[n] as a recursive filter
+    Out[:-1], V[1:] = linear_reservoir(In[1:], k, V0=initial_v, scheme='euler')
     
     return i, Out, V, In 
 
@@ -78,7 +82,7 @@ def generate_data(k, influx_start, influx_end, influx_v, initial_v):
     
 i, Out, V, In = generate_data(k, influx_start, influx_end, influx_v, initial_v)
 
-fig, ax1 = plt.subplots(figsize=(12,5)) 
+fig, ax1 = plotting.subplots(figsize=(12,5)) 
 ax1.plot(i, V, color = 'steelblue', label = 'V [L³]')
 ax1.set_xlabel('Timesteps [T]')
 ax1.set_ylabel('Storage volume [L]')
@@ -96,4 +100,4 @@ ax2.spines['top'].set_visible(False)
 
 fig.legend(loc="upper right", bbox_to_anchor=(1,1), bbox_transform=ax1.transAxes)
 
-st.pyplot(fig)
\ No newline at end of file
+plotting.show(fig)
\ No newline at end of file
@@ -1,7 +1,13 @@
 # import librarys
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
+from hydrokit.reservoir import linear_reservoir
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 st.title('Runoff from a linear Reservoir')
@@ -37,21 +43,16 @@ with col2:
 ## Scaling for the y-axis
 ax_scale = st.radio('Scaling of the y-axis',['linear', 'log'])
 
-# calculate the Outflow for a linear reservoir without inflow
+# calculate the Outflow for a linear reservoir without inflow (explicit steps as a recursive filter)
 t = np.arange(100-1)
-V = np.zeros_like(t, dtype=float)
-V[0] = initial_v
-Out = np.zeros_like(t, dtype=float)
-for n in range (1, len(t)):
-    Out[n-1]=V[n-1]*k
-    V[n] = V[n-1] - Out[n-1] 
+Out, V = linear_reservoir(np.zeros_like(t, dtype=float), k, V0=initial_v, scheme='euler')
 
 Out0 = float(Out[0])
 t_a = (np.linspace(0, 100, 10000))
 Out_a = Out0 * np.exp(-k*t_a)
    
 # plot the data
-fig, ax = plt.subplots(figsize=(6, 4))
+fig, ax = plotting.subplots(figsize=(6, 4))
 ax.plot(t, Out, 'r+', label='iterative solution')
 ax.plot(t_a, Out_a, label='analytic solution')
 ax.set_ylabel(r'Runoff [$\frac{L^3}{T}$]')
@@ -61,5 +62,5 @@ ax.grid(which='major')
 ax.grid(which='minor')
 ax.spines['top'].set_visible(False)
 ax.spines['right'].set_visible(False)
-plt.yscale(ax_scale)
-st.pyplot(fig)
+ax.set_yscale(ax_scale)
+plotting.show(fig)
@@ -0,0 +1,100 @@
+# Initialize librarys
+import numpy as np
+import pandas as pd
+import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import cache, plotting
+from hydrokit.climate import bucket_recharge
+from hydrokit.reservoir import BOUNDS, MODELS, calibrate, simulate
+
+st.title('Calibration of a reservoir cascade')
+
+st.write('A catchment is described by a cascade of n equal reservoirs that release $Q = kV$ (linear) or $Q = kV^b$ (nonlinear). The groundwater recharge of a soil-moisture bucket (daily rain and potential evapotranspiration of 2003/04) is routed through a cascade with the *true* parameters; noise turns the outflow into a spring discharge that is *observed*. The calibration then draws thousands of parameter sets at random, computes all of them at once and refines the search around the best set. The dotty plots show how well every sampled set fits: a narrow peak means a well identified parameter, a broad ridge means that other parameters can compensate it.')
+
+DATA = Path(__file__).parent / 'DATA' / 'GW_recharge_data.csv'
+
+
+@cache.cached(version='1')
+def recharge(awc, years):
+    """Daily recharge (mm/d) of the bucket, the record repeated for the years."""
+    data = pd.read_csv(DATA)
+    P = np.tile(data['N (mm/d)'].to_numpy(), years)
+    ETP = np.tile(data['ETP'].to_numpy(), years)
+    return bucket_recharge(P, ETP, awc).recharge
+
+
+@cache.cached(version='1')
+def run(awc, years, true_model, true_params, noise, seed, model, n_samples, objective):
+    R = recharge(awc, years)
+    Q_true = simulate(R, true_model, true_params)
+    rng = np.random.default_rng(seed)
+    Q_obs = Q_true * np.exp(noise * rng.standard_normal(len(R)))
+    # the first year fills the reservoirs and is not scored
+    result = calibrate(R, Q_obs, model, n_samples=n_samples, objective=objective, warmup=365 if years > 1 else 60,
+                       jobs=1, seed=seed)
+    return R, Q_obs, simulate(R, model, result.params), result
+
+
+columns = st.columns((1, 1), gap='large')
+with columns[0]:
+    st.subheader('True catchment')
+    awc = st.slider('**Available water capacity of the soil (mm)**', 50, 300, 150, 10)
+    years = st.select_slider('**Years (the record of 2003/04 repeated)**', (1, 3, 10), 3)
+    true_model = st.radio('**Reservoirs**', ('linear', 'nonlinear'), horizontal=True)
+    true_params = dict(k=10. ** st.slider('**log10 of k**', -2.5, 0.0, -1.3, 0.05),
+                       n=st.slider('**Number of reservoirs n**', 1, 5, 3, 1))
+    if true_model == 'nonlinear':
+        true_params['b'] = st.slider('**Exponent b**', 0.5, 2.5, 1.5, 0.05)
+    noise = st.slider('**Noise of the observed discharge (log standard deviation)**', 0.0, 0.5, 0.1, 0.01)
+with columns[1]:
+    st.subheader('Calibration')
+    model = st.radio('**Model**', ('linear', 'nonlinear'), horizontal=True)
+    n_samples = st.select_slider('**Parameter sets**', (1000, 3000, 10000, 30000), 3000)
+    objective = st.selectbox('**Objective**', ('nse', 'kge', 'rmse'),
+                             format_func={'nse': 'Nash-Sutcliffe efficiency', 'kge': 'Kling-Gupta efficiency',
+                                          'rmse': 'Root mean squared error'}.get)
+    seed = st.number_input('**Seed**', 0, 1000, 1)
+"---"
+
+with st.spinner('Calibrating ...'):
+    R, Q_obs, Q_fit, result = run(awc, years, true_model, true_params, noise, seed, model, n_samples, objective)
+
+columns = st.columns(len(MODELS[model]) + 1)
+for column, name in zip(columns, MODELS[model]):
+    column.metric('Calibrated %s' % name, '%.3g' % result.params[name],
+                  '%.3g true' % true_params[name] if name in true_params else None, delta_color='off')
+columns[-1].metric(objective.upper(), '%.3f' % abs(result.score))
+
+# HYDROGRAPH
+fig, ax = plotting.subplots(figsize=(12, 4.5))
+days = np.arange(len(R))
+ax.fill_between(days, R, step='mid', color='lightblue', label='Recharge')
+ax.plot(days, Q_obs, '.', color='grey', markersize=3, label='Observed discharge')
+ax.plot(days, Q_fit, color='red', label='Calibrated cascade')
+ax.set_xlabel('Time (d)', fontsize=12)
+ax.set_ylabel('mm/d', fontsize=12)
+ax.grid(alpha=0.3)
+ax.legend()
+plotting.show(fig)
+
+# DOTTY PLOTS
+names = MODELS[model]
+fig, axes = plotting.subplots(1, len(names), figsize=(12, 4), sharey=True)
+scores = result.scores
+shown = scores >= np.quantile(scores, 0.5)
+for ax, name in zip(axes, names):
+    ax.scatter(result.samples[name][shown], scores[shown], s=3, alpha=0.3)
+    if name in true_params:
+        ax.axvline(true_params[name], color='k', linestyle='--', label='true')
+        ax.legend()
+    if name == 'k':
+        ax.set_xscale('log')
+        ax.set_xlim(*BOUNDS['k'])
+    ax.set_xlabel(name, fontsize=12)
+    ax.grid(alpha=0.3)
+axes[0].set_ylabel('%s (better half of the sets)' % ('- RMSE' if objective == 'rmse' else objective.upper()), fontsize=12)
+plotting.show(fig)
@@ -1,6 +1,11 @@
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.special import erfc, erf
 import math
 
@@ -153,7 +158,7 @@ new_sealevel = np.piecewise(
 )
 
     # PLOT FIGURE - needs to be fixed/extended
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
 
 # Freshwater heads
@@ -190,10 +195,10 @@ ax.fill_between(x_land, 0, -z_x, facecolor='lightskyblue', alpha=0.5)
 #plt.text(1180, -80, 'Saltwater', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
 #plt.text(150, -10, 'Freshwater', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=10)
 ax.set(xlabel='x [m]', ylabel='head [m]',title='Sea level rise')
-plt.ylim(-z0, 15)
-plt.xlim(0,L0 + xmax)
+ax.set_ylim(-z0, 15)
+ax.set_xlim(0,L0 + xmax)
 
-st.pyplot(fig)
+plotting.show(fig)
 
 st.write("Initial position of interface toe:", x_T, "m")
 st.write("Change of interface toe position:", delta_x_T, "m")
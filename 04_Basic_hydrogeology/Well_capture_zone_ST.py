@@ -1,10 +1,15 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 from math import pi, tan
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Well capture zone for a confined aquifer')
 
@@ -66,7 +71,7 @@ x_plot = 500 * x_scale
 y_plot = 1000 * y_scale
     
 # Plot
-fig = plt.figure(figsize=(8,6))
+fig = plotting.figure(figsize=(8,6))
 ax = fig.add_subplot(1, 1, 1)
 
 ax.plot(x,y, label='Well capture zone')
@@ -79,12 +84,12 @@ ax.set(xlim=(-x_plot,10*x_plot), ylim=(-y_plot, y_plot))
 #    ax.set(xlim=(-x_plot,10*x_plot), ylim=(-y_plot, y_plot))
     
 
-plt.fill_between(x,y,color='blue', alpha=.1)
-plt.fill_between(x,-y,color='blue', alpha=.1)
+ax.fill_between(x,y,color='blue', alpha=.1)
+ax.fill_between(x,-y,color='blue', alpha=.1)
 ax.grid()
-plt.legend()
+ax.legend()
 
-st.pyplot(fig)
+plotting.show(fig)
     
 st.write("Width of capture zone (m): %5.2f" %(2*ymax))
 st.write('Culmination point x_0 (m):  %5.2f' %x0)
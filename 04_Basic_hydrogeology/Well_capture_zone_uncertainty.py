@@ -1,13 +1,28 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 from math import pi, tan
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import capture, plotting
+from scipy import stats
 
 st.title('Well capture zone for a confined aquifer')
 
+# Distributions of the Monte Carlo ensemble
+def lognormal(value, sigma_log10):
+    # log-normal distribution with the median value and the standard deviation of log10
+    return stats.lognorm(sigma_log10*np.log(10), scale=value) if sigma_log10 > 0 else value
+
+def uniform(value, p):
+    # uniform distribution within +/- p % of value
+    return stats.uniform(value*(1 - p/100), value*2*p/100) if p > 0 else value
+
 # Function for catchment width (maximale Breite des Einzugsgebietes)
 def ymax_conf(Q, K, i, b):
     ymax = Q/(2.*K*i*b)
@@ -40,6 +55,11 @@ with columns[1]:
     uncert = st.toggle('Add uncertainty for hydr. conductivity')
     if uncert:
         p_uncert = st.slider('+/- % deviation of hydraulic conductivity?', 0, 50, 10,1)
+    ensemble = st.toggle('Monte Carlo ensemble (probability of capture)')
+    if ensemble:
+        n_real = st.select_slider('Number of realizations', [10**4, 10**5, 10**6], 10**5)
+        sigma_K = st.slider('Standard deviation of log10 _K_', 0., 1., 0.3, 0.05)
+        p_iQ = st.slider('+/- % deviation of gradient, thickness and pumping rate', 0, 50, 10, 1)
 with columns[2]:
     b = st.slider('**Aquifer thickness (m)**', 1., 100.,25., 0.1, format="%5.2f")
     i_slider_value=st.slider('(log of) **Regional flow gradient (dimensionless)**', log_min2,log_max2,-3.0,0.01,format="%4.2f" )
@@ -82,19 +102,29 @@ x_plot = 500 * x_scale
 y_plot = 1000 * y_scale
     
 # Plot
-fig = plt.figure(figsize=(8,6))
+fig = plotting.figure(figsize=(8,6))
 ax = fig.add_subplot(1, 1, 1)
 
+if ensemble:
+    # probability of capture on a grid, refined with every chunk of realizations
+    xg = np.linspace(-10*x_plot, x_plot, 400)
+    yg = np.linspace(-y_plot, y_plot, 300)
+    image = ax.imshow(np.zeros((yg.size, xg.size)), extent=(xg[0], xg[-1], yg[0], yg[-1]), origin='lower',
+                      aspect='auto', cmap='Blues', vmin=0., vmax=1., alpha=0.7, zorder=0)
+    fig.colorbar(image, ax=ax, label='Probability of capture')
+    envelopes = [ax.plot([], [], color=c, linestyle='dotted', label='Probability of capture %i %%' % (100 - p))[0]
+                 for p, c in zip((5, 50, 95), ('navy', 'blue', 'cornflowerblue'))]
+
 if uncert:
     ax.plot(x1,y1, label='Well capture zone lower range',color='lightblue', linestyle='dashed')
     ax.plot(x,y, label='Well capture zone')
     ax.plot(x2,y2, label='Well capture zone upper range',color='grey', linestyle='dashed')
-    plt.fill_between(x1,x2,y1,y2,  color='blue', alpha=.07)
-    plt.fill_between(x2,y2,    color='blue', alpha=.1)
+    ax.fill_between(x1,x2,y1,y2,  color='blue', alpha=.07)
+    ax.fill_between(x2,y2,    color='blue', alpha=.1)
 else:
     ax.plot(x,y, label='Well capture zone')
-    plt.fill_between(x,y,color='blue', alpha=.1)
-    plt.fill_between(x,-y,color='blue', alpha=.1)
+    ax.fill_between(x,y,color='blue', alpha=.1)
+    ax.fill_between(x,-y,color='blue', alpha=.1)
 if accident:
     ax.plot(-1400,400, marker='o', color='r',linestyle ='None', label='Accident')
 if plume:
@@ -105,9 +135,19 @@ ax.set(xlabel='x (m)', ylabel='y (m)',title='Well capture zone of a pumping well
 ax.set(xlim=(-10*x_plot,x_plot), ylim=(-y_plot, y_plot))
 
 ax.grid()
-plt.legend()
-
-st.pyplot(fig)
+ax.legend()
+
+if ensemble:
+    runs = capture.capture_probability(lognormal(K, sigma_K), uniform(i, p_iQ), uniform(b, p_iQ), uniform(Q, p_iQ),
+                                       xg[None, :], yg[:, None], n=n_real, chunk=max(n_real//20, 10000))
+    with plotting.Animation(fig, st.empty(), fps=4) as animation:
+        for state in runs:
+            image.set_data(state.probability)
+            for line, width in zip(envelopes, state.width):
+                line.set_data(*capture.capture_boundary(width))
+            animation.frame()
+else:
+    plotting.show(fig)
     
 if uncert:
     st.write("Width of capture zone (m) from: %5.2f" %(2*ymax1), " to %5.2f" %(2*ymax2))
@@ -115,4 +155,6 @@ if uncert:
 else:
     st.write("Width of capture zone (m): %5.2f" %(2*ymax))
     st.write('Culmination point x_0 (m):  %5.2f' %x0)
-    
+if ensemble:
+    st.write("Width of capture zone (m) in %i realizations, 5 / 50 / 95 %% percentiles: %5.2f / %5.2f / %5.2f"
+             % (state.n, *state.width))
@@ -1,8 +1,13 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 
 st.title('Analytical solution for 1D unconfined flow with two defined head boundaries')
@@ -103,7 +108,7 @@ def computation():
     h=(hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
     
     # PLOT FIGURE
-    fig = plt.figure(figsize=(9,6))
+    fig = plotting.figure(figsize=(9,6))
     ax = fig.add_subplot(1, 1, 1)
     ax.plot(x,h)
     if calib == 'Regular data':
@@ -140,12 +145,12 @@ def computation():
     max_x = x[h.argmax()]
     R_min_ms=K*abs(hl**2-hr**2)/L**2
     if R>R_min_ms:
-        plt.vlines(max_x,0,max_y, color="r")
+        ax.vlines(max_x,0,max_y, color="r")
 
-    plt.ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
-    plt.xlim(-50,L+50)
-    plt.text(L, (hr*1.016), 'R: {:.2e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=14)
-    st.pyplot(fig)
+    ax.set_ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
+    ax.set_xlim(-50,L+50)
+    ax.text(L, (hr*1.016), 'R: {:.2e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=14)
+    plotting.show(fig)
     
 computation()
 
@@ -1,9 +1,14 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import pandas as pd
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, hantush_well_function
+from hydrokit import plotting
 
 st.title('Hantush Jacob parameter estimation')
 st.subheader('Understanding the Hantush Jacob (1955) solution  for :blue[leaky aquifers]', divider="blue")
@@ -56,9 +61,6 @@ st.markdown("""
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
 # (Here, the methode computes the data for the well function. Those data can be used to generate a type curve.)
 u_min = -5
 u_max = 4
@@ -66,40 +68,7 @@ u_max = 4
 u = np.logspace(u_min,u_max)
 u_inv = 1/u
 w_u = well_function(u)
-
-u_HAN = [1.00E-05, 2.00E-05, 4.00E-05, 6.00E-05, 1.00E-04, 2.00E-04, 4.00E-04, 6.00E-04, 1.00E-03, 2.00E-03, 4.00E-03, 6.00E-03, 1.00E-02, 2.00E-02, 4.00E-02, 6.00E-02, 1.00E-01, 2.00E-01, 4.00E-01, 6.00E-01, 1 , 2]
-
-t_HAN     = [0]*len(u_HAN)
-s_HAN     = [0]*len(u_HAN)
-u_inv_HAN = [0]*len(u_HAN)
-
-for x in range(0,len(u_HAN)):
-        u_inv_HAN[x] = 1/u_HAN[x]
-
-# Hantush Jacob type curve data from tables
-
-w_u_HAN = [[9.420E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.300E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.010E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [8.770E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [8.400E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [7.820E+00, 6.620E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [7.190E+00, 6.450E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [6.800E+00, 6.270E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [6.310E+00, 5.970E+00, 4.830E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 5.450E+00, 4.710E+00, 3.500E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.850E+00, 4.420E+00, 3.480E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.480E+00, 4.180E+00, 3.430E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.000E+00, 3.810E+00, 3.290E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 3.340E+00, 3.240E+00, 2.950E+00, 2.180E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 2.630E+00, 2.480E+00, 2.020E+00, 1.520E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 2.260E+00, 2.170E+00, 1.850E+00, 1.460E+00, 8.390E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 1.800E+00, 1.750E+00, 1.560E+00, 1.310E+00, 8.190E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 1.190E+00, 1.110E+00, 9.960E-01, 7.150E-01, 4.100E-01, 2.270E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 6.930E-01, 6.650E-01, 6.210E-01, 5.020E-01, 3.400E-01, 2.100E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 4.500E-01, 4.360E-01, 4.150E-01, 3.540E-01, 2.550E-01, 1.770E-01, 1.100E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 2.130E-01, 2.060E-01, 1.850E-01, 1.509E-01, 1.140E-01, 8.030E-02],
-           [9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 4.700E-02, 4.400E-02, 9.990E+02, 3.400E-02, 2.500E-02]]
+u_HAN = np.logspace(-5, 0.5, 100)
 
 
 # Select data
@@ -146,9 +115,9 @@ def inverse():
         st.write("_Storativity_ (dimensionless): %5.2e" %S)
         refine_plot = st.toggle("**Refine** the range of the **Data matching plot**")
     with columns2[1]:
-        r_div_B_choice = st.selectbox("r/B",('0.01', '0.04', '0.1', '0.2', '0.4', '0.6', '1', '1.5', '2', '2.5'),)
-        r_div_B_list = ['0.01', '0.04', '0.1', '0.2', '0.4', '0.6', '1', '1.5', '2', '2.5']
-        r_div_B = r_div_B_list.index(r_div_B_choice)
+        r_div_B_slider_value = st.slider("(log of) r/B", -3.0, 1.0, -2.0, 0.01, format="%4.2f")
+        r_div_B = 10 ** r_div_B_slider_value
+        st.write("**r/B:** %5.3f" %r_div_B)
         show_data = st.toggle("**Show measured data from Viterbo 2023**")
     
     # Compute K and SS to provide parameters for plausability check
@@ -163,29 +132,25 @@ def inverse():
     s = w_u * s_term
 
     # Hantush Jacob curve
-    for x in range(0,len(u_HAN)):
-        t_HAN[x] = u_inv_HAN[x] * t_term
-        if (w_u_HAN[x][r_div_B] == 999):
-            s_HAN[x] = well_function(1/u_inv_HAN[x]) * s_term
-        else:
-            s_HAN[x] = w_u_HAN[x][r_div_B] * s_term
+    t_HAN = t_term / u_HAN
+    s_HAN = hantush_well_function(u_HAN, r_div_B) * s_term
         
-    fig = plt.figure(figsize=(10,7))
+    fig = plotting.figure(figsize=(10,7))
     ax = fig.add_subplot(1, 1, 1)
     ax.plot(t, s, label=r'Computed drawdown - Theis')
     ax.plot(t_HAN, s_HAN, 'b--', label=r'Computed drawdown - Hantush Jacob')
     if show_data:
         ax.plot(m_time_s, m_ddown,'ro', label=r'measured drawdown')
-    plt.yscale("log")
-    plt.xscale("log")
+    ax.set_yscale("log")
+    ax.set_xscale("log")
     if refine_plot:
-        plt.axis([1E1,1E5,1E-3,1E+1])
+        ax.axis([1E1,1E5,1E-3,1E+1])
     else:
-        plt.axis([1E-1,1E8,1E-4,1E+1])
+        ax.axis([1E-1,1E8,1E-4,1E+1])
     ax.set(xlabel='t', ylabel='s',title='Hantush Jacob drawdown')
     ax.grid(which="both")
-    plt.legend()
-    st.pyplot(fig)
+    ax.legend()
+    plotting.show(fig)
 
     columns3 = st.columns((1,1), gap = 'medium')
     with columns3[0]:
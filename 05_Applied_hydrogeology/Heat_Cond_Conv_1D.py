@@ -1,11 +1,16 @@
 # Initialize librarys
 from scipy.special import erfc, erf
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 from scipy import special
 import math
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title("1D transient heat transport by conduction and convection")
 
@@ -110,14 +115,14 @@ R = 1 + (1-n_e)/n_e * rho_s * Kd
 T1 = temp(T0, x, v, t, alpha, D_H, 1) + T_ini
 T  = temp(T0, x, v, t, alpha, D_H, R) + T_ini
 
-fig, ax = plt.subplots()
+fig, ax = plotting.subplots()
 ax.plot(t,T1, 'r', label= 'without heat storage')
 if heatstor:
     ax.plot(t,T, 'g', label= 'with heat storage')
 ax.set(xlabel='time in days', ylabel='temperature (in Celsius)',title='1D Conductive heat transfer')
-plt.axis([0,tmax,T_ini-1,T_BC+1])
-plt.legend(loc='lower right')
-st.pyplot(fig=fig)
+ax.axis([0,tmax,T_ini-1,T_BC+1])
+ax.legend(loc='lower right')
+plotting.show(fig)
 
 st.write("D_H: ",D_H)
 st.write("K_H: ",Kd)
@@ -1,10 +1,15 @@
 # Initialize librarys
 from scipy.special import erfc, erf
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 from streamlit_extras.stateful_button import button
 
 st.title("1D transient :red[heat transport] and :blue[groundwater flow] in an unconfined aquifer")
@@ -184,7 +189,7 @@ if show_flow:
     h = h_ini + h0 * erfc(x/np.sqrt(4.*D_F*(t*86400.)))
  
 # Plotting
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
 
 ax.plot(t, T_w, 'c', label = 'Heat cond. in water only')
@@ -198,16 +203,16 @@ if show_porous:
     
 if show_flow:
     ax.plot(t,h, 'bo', mfc='none', label = 'Groundwater flow')
-    plt.ylabel("temp. (in Celsius) / head (in m)",fontsize=14)
+    ax.set_ylabel("temp. (in Celsius) / head (in m)",fontsize=14)
 else:
-    plt.ylabel("temperature (in Celsius)",fontsize=14)
+    ax.set_ylabel("temperature (in Celsius)",fontsize=14)
     
-plt.axis([0,tmax,T_ini-1,TB+1])
-plt.title(f"1D heat conduction & groundwater flow at x = {x} m", fontsize=16)
-plt.xlabel("time in days",fontsize=14)
-plt.legend(frameon=False, fontsize=12)
+ax.axis([0,tmax,T_ini-1,TB+1])
+ax.set_title(f"1D heat conduction & groundwater flow at x = {x} m", fontsize=16)
+ax.set_xlabel("time in days",fontsize=14)
+ax.legend(frameon=False, fontsize=12)
 
-st.pyplot(fig=fig)
+plotting.show(fig)
 
 st.write(':red[Thermal] diffusivity pure water:  %5.2e' %D_H_w)
 if show_rock:
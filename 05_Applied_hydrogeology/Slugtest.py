@@ -1,8 +1,13 @@
 import numpy as np
 import pandas as pd
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import io
-import matplotlib.pyplot as plt
 
 st.title('Slugtest evaluation 📉')
 
@@ -275,7 +280,7 @@ def slug():
     
     max_s = 1
     # Plot figure
-    fig = plt.figure(figsize=(12,14))
+    fig = plotting.figure(figsize=(12,14))
     ax = fig.add_subplot(2,1,1)
     # Info-Box
     props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
@@ -283,14 +288,14 @@ def slug():
                          r'$K$ (m/s) = %10.2E' % (K, ),
                          r'$t_{off}$ (s) = %4i' % (t_off, )))
     ax.plot(t_plot,exp_decay, color='magenta', label='computed')
-    plt.plot(st.session_state.m_time,h_norm, 'bo', mfc='none', label='measured')
-    plt.axis([0,x_plot,0,1])
+    ax.plot(st.session_state.m_time,h_norm, 'bo', mfc='none', label='measured')
+    ax.axis([0,x_plot,0,1])
 
-    plt.xlabel(r'time t in (s)', fontsize=14)
-    plt.ylabel(r'H/Ho', fontsize=14)
-    plt.title('Slugtest evaluation (positive slug)', fontsize=16)
-    plt.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
-    plt.legend(fontsize=14)
+    ax.set_xlabel(r'time t in (s)', fontsize=14)
+    ax.set_ylabel(r'H/Ho', fontsize=14)
+    ax.set_title('Slugtest evaluation (positive slug)', fontsize=16)
+    ax.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+    ax.legend(fontsize=14)
 
     if scatter:
         x45 = [0,200]
@@ -299,18 +304,16 @@ def slug():
         ax.plot(x45,y45, '--')
         ax.plot(h_norm, scatter_computed,  'ro', label=r'measured')
         me, mae, rmse = compute_statistics(h_norm, scatter_computed)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Measured s in m', fontsize=14)
-        plt.ylabel(r'Computed s in m', fontsize=14)
-        plt.ylim(0, max_s)
-        plt.xlim(0, max_s)
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Measured s in m', fontsize=14)
+        ax.set_ylabel(r'Computed s in m', fontsize=14)
+        ax.set_ylim(0, max_s)
+        ax.set_xlim(0, max_s)
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
                              r'$MAE = %.3f$ m' % (mae, ),
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
-        plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
-    
-    st.pyplot(fig=fig)
+        ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
     
     # Safe the figure
     # Convert figure to a BytesIO object
@@ -318,6 +321,8 @@ def slug():
     fig.savefig(img_buffer, format="png")
     img_buffer.seek(0)  # Reset buffer position
     
+    plotting.show(fig)
+    
     columns5 = st.columns((1,1,1), gap = 'large')
     with columns5[1]:
         # Add download button
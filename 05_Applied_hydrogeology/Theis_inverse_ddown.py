@@ -1,8 +1,13 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, theis_u, theis_wu, theis
+from hydrokit import plotting
 
 st.title('Theis drawdown prediction - Fitting Formation parameter to measured data')
 st.markdown("""
@@ -45,41 +50,12 @@ st.markdown("""
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
 # (Here, the methode computes the data for the well function. Those data can be used to generate a type curve.)
 u_max = 1
 r_max = 100000
-u  = [u_max for x in range(r_max)]
-um = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-um_inv = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-w_um = [well_function(u_max/r_max) for x in range(r_max)]
-
-for x in range(1,r_max,1):
-    if x>0:
-        u[x] = x*u_max/r_max
-        u_inv[x] = 1/u[x]
-        w_u[x] = well_function(u[x])
+u = np.arange(1, r_max) * u_max / r_max
+u_inv = 1 / u
+w_u = well_function(u)
 
 # Data from SYMPLE exercise
 m_time = [1,1.5,2,2.5,3,4,5,6,8,10,12,14,18,24,30,40,50,60,100,120] # time in minutes
@@ -137,12 +113,9 @@ def inverse():
 
     # PLOT MEASURED DATA
     max_s = 20
-    x = 0
-    for t1 in m_time_s:
-        um[x] = theis_u(T,S,r,t1)
-        um_inv[x] = 1/um[x]
-        w_um[x] = theis_wu(Qs,T,m_ddown[x])
-        x = x+1
+    um = theis_u(T, S, r, np.array(m_time_s))
+    um_inv = 1 / um
+    w_um = theis_wu(Qs, T, np.array(m_ddown))
 
     # PLOT DRAWDOWN VS TIME
     # Range of delta_h / delta_l values (hydraulic gradient)
@@ -152,64 +125,64 @@ def inverse():
     t2_mo = t2/2629800
 
     # Compute s for prediction
-    s  = compute_s(T, S, t2, Q_pred, r_pred)
+    s  = theis(r_pred, t2, T, S, Q_pred)
 
     # Compute s for a specific point
     x_point = t_search
-    y_point = compute_s(T, S, t_search, Q_pred, r_pred)
+    y_point = theis(r_pred, t_search, T, S, Q_pred)
     
-    fig = plt.figure(figsize=(12,7))
+    fig = plotting.figure(figsize=(12,7))
     ax = fig.add_subplot(1, 2, 1)
     ax.plot(u_inv, w_u)
-    ax.plot(um_inv[:num_times], w_um[:num_times],'ro')
-    plt.yscale("log")
-    plt.xscale("log")
+    ax.plot(um_inv, w_um,'ro')
+    ax.set_yscale("log")
+    ax.set_xscale("log")
     if refine_theis:
-        plt.axis([1,1E5,1E-2,1E+2])
+        ax.axis([1,1E5,1E-2,1E+2])
     else:
-        plt.axis([1e-1,1E7,1E-4,1E+4])
+        ax.axis([1e-1,1E7,1E-4,1E+4])
         ax.text((2E-1),5E+3,'Coarse plot - Refine for final fitting')
-    plt.xlabel(r'1/u', fontsize=14)
-    plt.ylabel(r'w(u)', fontsize=14)
-    plt.title('Theis drawdown', fontsize=16)
+    ax.set_xlabel(r'1/u', fontsize=14)
+    ax.set_ylabel(r'w(u)', fontsize=14)
+    ax.set_title('Theis drawdown', fontsize=16)
     ax.grid(which="both")
-    plt.legend(('well function','measured'))
+    ax.legend(('well function','measured'))
 
     ax = fig.add_subplot(1, 2, 2)
     if per_pred <= 3:
-        plt.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in sec', fontsize=14)
-        plt.xlim(0, max_t)
+        ax.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in sec', fontsize=14)
+        ax.set_xlim(0, max_t)
     elif per_pred <= 7:
-        plt.plot(t2_h, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search_h,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in hours', fontsize=14)
-        plt.xlim(0, max_t/3600)
+        ax.plot(t2_h, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search_h,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in hours', fontsize=14)
+        ax.set_xlim(0, max_t/3600)
     elif per_pred <= 366:
-        plt.plot(t2_d, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search_d,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in days', fontsize=14)
-        plt.xlim(0, max_t/86400)
+        ax.plot(t2_d, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search_d,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in days', fontsize=14)
+        ax.set_xlim(0, max_t/86400)
     else:
-        plt.plot(t2_mo, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search_mo,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in months', fontsize=14)
-        plt.xlim(0, max_t/2629800)
+        ax.plot(t2_mo, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search_mo,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in months', fontsize=14)
+        ax.set_xlim(0, max_t/2629800)
 
     #plt.ylim(max_s, 0)
     if auto_y:
-        plt.ylim(bottom=0, top=None)
+        ax.set_ylim(bottom=0, top=None)
     else:
-        plt.ylim(bottom=0, top=max_s)
+        ax.set_ylim(bottom=0, top=max_s)
     ax.invert_yaxis()
-    plt.plot(x_point,y_point, marker='o', color='b',linestyle ='None', label='drawdown output') 
-    plt.ylabel(r'Drawdown in m', fontsize=14)
-    plt.title('Drawdown prediction with Theis', fontsize=16)
-    plt.legend()
-    plt.grid(True)
+    ax.plot(x_point,y_point, marker='o', color='b',linestyle ='None', label='drawdown output') 
+    ax.set_ylabel(r'Drawdown in m', fontsize=14)
+    ax.set_title('Drawdown prediction with Theis', fontsize=16)
+    ax.legend()
+    ax.grid(True)
     
-    st.pyplot(fig)
+    plotting.show(fig)
 
     columns3 = st.columns((1,1), gap = 'medium')
     with columns3[0]:
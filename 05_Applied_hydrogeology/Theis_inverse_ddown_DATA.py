@@ -1,9 +1,15 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import pandas as pd
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, theis_u, theis_wu, theis
+from hydrokit.fitting import fit_pumping_test
+from hydrokit import cache, plotting
 
 st.title('Theis parameter estimation and drawdown prediction')
 st.subheader('Fitting formation parameter to :rainbow[REAL measured] data', divider="rainbow")
@@ -46,41 +52,12 @@ st.markdown("""
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
 # (Here, the methode computes the data for the well function. Those data can be used to generate a type curve.)
 u_max = 1
 r_max = 100000
-u  = [u_max for x in range(r_max)]
-um = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-um_inv = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-w_um = [well_function(u_max/r_max) for x in range(r_max)]
-
-for x in range(1,r_max,1):
-    if x>0:
-        u[x] = x*u_max/r_max
-        u_inv[x] = 1/u[x]
-        w_u[x] = well_function(u[x])
+u = np.arange(1, r_max) * u_max / r_max
+u_inv = 1 / u
+w_u = well_function(u)
 
 # Select data
 columns = st.columns((10,80,10), gap = 'large')
@@ -181,10 +158,86 @@ num_times = len(m_time)
 st.subheader(':green[Inverse parameter fitting]', divider="rainbow")
 
 st.markdown("""
-            Subsequently, you can modify the transmissivity and the storativity to fit your measured data to the Theis type curve. For precise fitting, you can change the plot resolution with the toogle. Additionally, you can perform a prediction of drawdown for specific times/spaces.
+            Subsequently, you can modify the transmissivity and the storativity to fit your measured data to the Theis type curve. For precise fitting, you can change the plot resolution with the toogle. Alternatively, the parameters can be fitted automatically by least squares, which also provides their confidence intervals. Additionally, you can perform a prediction of drawdown for specific times/spaces.
 """
 )
 
+def plot_theis(m_time_s, m_ddown, Qs, r, T, S, refine_theis, per_pred, t_search, r_pred, Q_pred, auto_y):
+    # PLOT MEASURED DATA
+    max_s = 20
+    max_t = 86400*per_pred
+    um = theis_u(T, S, r, np.array(m_time_s))
+    um_inv = 1 / um
+    w_um = theis_wu(Qs, T, np.array(m_ddown))
+
+    # PLOT DRAWDOWN VS TIME
+    # Range of delta_h / delta_l values (hydraulic gradient)
+    t2 = np.linspace(1, max_t, 100)
+    t2_h = t2/3600
+    t2_d = t2/86400
+    t2_mo = t2/2629800
+
+    # Compute s for prediction
+    s  = theis(r_pred, t2, T, S, Q_pred)
+
+    # Compute s for a specific point
+    x_point = t_search
+    y_point = theis(r_pred, t_search, T, S, Q_pred)
+    t_search_h, t_search_d, t_search_mo = t_search/3600, t_search/86400, t_search/2629800
+
+    fig = plotting.figure(figsize=(12,7))
+    ax = fig.add_subplot(1, 2, 1)
+    ax.plot(u_inv, w_u)
+    ax.plot(um_inv, w_um,'ro')
+    ax.set_yscale("log")
+    ax.set_xscale("log")
+    if refine_theis:
+        ax.axis([1,1E5,1E-2,1E+2])
+    else:
+        ax.axis([1e-1,1E7,1E-4,1E+4])
+        ax.text((2E-1),5E+3,'Coarse plot - Refine for final fitting')
+    ax.set_xlabel(r'1/u', fontsize=14)
+    ax.set_ylabel(r'w(u)', fontsize=14)
+    ax.set_title('Theis drawdown', fontsize=16)
+    ax.grid(which="both")
+    ax.legend(('well function','measured'))
+
+    ax = fig.add_subplot(1, 2, 2)
+    if per_pred <= 3:
+        ax.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in sec', fontsize=14)
+        ax.set_xlim(0, max_t)
+    elif per_pred <= 7:
+        ax.plot(t2_h, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search_h,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in hours', fontsize=14)
+        ax.set_xlim(0, max_t/3600)
+    elif per_pred <= 366:
+        ax.plot(t2_d, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search_d,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in days', fontsize=14)
+        ax.set_xlim(0, max_t/86400)
+    else:
+        ax.plot(t2_mo, s, linewidth=3., color='r', label=r'Drawdown prediction')
+        ax.plot(t_search_mo,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+        ax.set_xlabel(r'Time in months', fontsize=14)
+        ax.set_xlim(0, max_t/2629800)
+
+    #plt.ylim(max_s, 0)
+    if auto_y:
+        ax.set_ylim(bottom=0, top=None)
+    else:
+        ax.set_ylim(bottom=0, top=max_s)
+    ax.invert_yaxis()
+    ax.plot(x_point,y_point, marker='o', color='b',linestyle ='None', label='drawdown output') 
+    ax.set_ylabel(r'Drawdown in m', fontsize=14)
+    ax.set_title('Drawdown prediction with Theis', fontsize=16)
+    ax.legend()
+    ax.grid(True)
+
+    return fig
+
 @st.fragment
 def inverse():
     # This is the function to plot the graph with the data     
@@ -197,14 +250,21 @@ def inverse():
    
     columns2 = st.columns((1,1), gap = 'large')
     with columns2[0]:
-        T_slider_value=st.slider('(log of) **Transmissivity** in m2/s', log_min1,log_max1,-3.0,0.01,format="%4.2f" )
+        # Automatic least-squares fit instead of the slider values
+        auto_fit = st.toggle("**Fit** $T$ and $S$ **automatically** (least squares)") and len(m_time) > 0
+        T_slider_value=st.slider('(log of) **Transmissivity** in m2/s', log_min1,log_max1,-3.0,0.01,format="%4.2f", disabled=auto_fit)
         # Convert the slider value to the logarithmic scale
         T = 10 ** T_slider_value
+        if auto_fit:
+            fit = cache.cached(fit_pumping_test)(m_time_s, m_ddown, r, Qs, 'theis')
+            T = fit.params[0]
         # Display the logarithmic value
         st.write("_Transmissivity_ in m2/s: %5.2e" %T)
-        S_slider_value=st.slider('(log of) **Storativity**', log_min2,log_max2,-4.0,0.01,format="%4.2f" )
+        S_slider_value=st.slider('(log of) **Storativity**', log_min2,log_max2,-4.0,0.01,format="%4.2f", disabled=auto_fit)
         # Convert the slider value to the logarithmic scale
         S = 10 ** S_slider_value
+        if auto_fit:
+            S = fit.params[1]
         # Display the logarithmic value
         st.write("_Storativity_ (dimensionless):** %5.2e" %S)
         refine_theis = st.toggle("**Refine** the range of the **Theis matching plot**")
@@ -226,81 +286,13 @@ def inverse():
             t_search = t_search_mo*2629800
         auto_y = st.toggle("Adjust the range of drawdown plotting")
     
-    # PLOT MEASURED DATA
-    max_s = 20
-    x = 0
-    for t1 in m_time_s:
-        um[x] = theis_u(T,S,r,t1)
-        um_inv[x] = 1/um[x]
-        w_um[x] = theis_wu(Qs,T,m_ddown[x])
-        x = x+1
-
-    # PLOT DRAWDOWN VS TIME
-    # Range of delta_h / delta_l values (hydraulic gradient)
-    t2 = np.linspace(1, max_t, 100)
-    t2_h = t2/3600
-    t2_d = t2/86400
-    t2_mo = t2/2629800
-
-    # Compute s for prediction
-    s  = compute_s(T, S, t2, Q_pred, r_pred)
-
     # Compute s for a specific point
     x_point = t_search
-    y_point = compute_s(T, S, t_search, Q_pred, r_pred)
-    
-    fig = plt.figure(figsize=(12,7))
-    ax = fig.add_subplot(1, 2, 1)
-    ax.plot(u_inv, w_u)
-    ax.plot(um_inv[:num_times], w_um[:num_times],'ro')
-    plt.yscale("log")
-    plt.xscale("log")
-    if refine_theis:
-        plt.axis([1,1E5,1E-2,1E+2])
-    else:
-        plt.axis([1e-1,1E7,1E-4,1E+4])
-        ax.text((2E-1),5E+3,'Coarse plot - Refine for final fitting')
-    plt.xlabel(r'1/u', fontsize=14)
-    plt.ylabel(r'w(u)', fontsize=14)
-    plt.title('Theis drawdown', fontsize=16)
-    ax.grid(which="both")
-    plt.legend(('well function','measured'))
+    y_point = theis(r_pred, t_search, T, S, Q_pred)
 
-    ax = fig.add_subplot(1, 2, 2)
-    if per_pred <= 3:
-        plt.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in sec', fontsize=14)
-        plt.xlim(0, max_t)
-    elif per_pred <= 7:
-        plt.plot(t2_h, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search_h,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in hours', fontsize=14)
-        plt.xlim(0, max_t/3600)
-    elif per_pred <= 366:
-        plt.plot(t2_d, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search_d,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in days', fontsize=14)
-        plt.xlim(0, max_t/86400)
-    else:
-        plt.plot(t2_mo, s, linewidth=3., color='r', label=r'Drawdown prediction')
-        plt.plot(t_search_mo,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-        plt.xlabel(r'Time in months', fontsize=14)
-        plt.xlim(0, max_t/2629800)
-
-    #plt.ylim(max_s, 0)
-    if auto_y:
-        plt.ylim(bottom=0, top=None)
-    else:
-        plt.ylim(bottom=0, top=max_s)
-    ax.invert_yaxis()
-    plt.plot(x_point,y_point, marker='o', color='b',linestyle ='None', label='drawdown output') 
-    plt.ylabel(r'Drawdown in m', fontsize=14)
-    plt.title('Drawdown prediction with Theis', fontsize=16)
-    plt.legend()
-    plt.grid(True)
-    
-    st.pyplot(fig)
+    # The figure is cached for all users (hydrokit.plotting.show_cached)
+    plotting.show_cached(plot_theis, m_time_s, m_ddown, Qs, r, T, S, refine_theis, per_pred, t_search, r_pred, Q_pred,
+                         auto_y)
 
     columns3 = st.columns((1,1), gap = 'medium')
     with columns3[0]:
@@ -311,6 +303,10 @@ def inverse():
         st.write("Transmissivity T = ","% 10.2E"% T, " m^2/s")
         st.write("(Hydr. cond. K) = ","% 10.2E"% (T/b), " m^2/s")
         st.write("Storativity    S = ","% 10.2E"% S, "[-]")
+        if auto_fit:
+            st.write("95%% confidence interval of T: % 10.2E to % 10.2E m^2/s" % tuple(fit.ci[0]))
+            st.write("95%% confidence interval of S: % 10.2E to % 10.2E" % tuple(fit.ci[1]))
+            st.write("RMSE of the fit: %5.3f m" % fit.stats['rmse'])
 
     with columns3[1]:
         st.write("**Prediction**")
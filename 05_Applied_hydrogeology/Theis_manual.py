@@ -1,9 +1,14 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import io
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function
+from hydrokit import plotting
 
 ### 01 TITLE AND HEADER
 
@@ -27,21 +32,6 @@ st.markdown('''
 
 #Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
 def deriv(t, tm, s, sm):
     #d = (s-sm)/(np.log(t)-np.log(tm))
     d=((t+tm)/2)*((s-sm)/(t-tm))
@@ -64,20 +54,10 @@ Qd = Qs*60*60*24 # m^3/d
 u_max = 10
 r_max = 1000000
 t_max = len(m_time)
-u  = [u_max for x in range(r_max)]
-um = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-um_inv = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-w_um = [well_function(u_max/r_max) for x in range(r_max)]
+u = np.arange(1, r_max) * u_max / r_max
+u_inv = 1 / u
+w_u = well_function(u)
 d = [0 for x in range(t_max)]
-
-### 07 COMPUTATION
-for x in range(1,r_max,1):
-    if x>0:
-        u[x] = x*u_max/r_max
-        u_inv[x] = 1/u[x]
-        w_u[x] = well_function(u[x])
         
 ### 08 PLOTTING
 # Plotting the Theis curve
@@ -97,9 +77,9 @@ matchgrid_x=[match_u_inv, match_u_inv]
 matchgrid_y=[match_wu, match_wu]
 matchgrid  =[0.001, 1000000]
 
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
-plt.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.9)  # adjust plot area
+fig.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.9)  # adjust plot area
 
 #plot the data
 ax.plot(u_inv, w_u, color = 'black', linewidth = 2)
@@ -108,9 +88,9 @@ ax.plot(matchgrid_x,matchgrid,color ='lime', linewidth = 1)
 ax.plot(matchgrid,matchgrid_y,color = 'lime', linewidth = 1)
 
 #set up the diagramm
-plt.yscale("log")
-plt.xscale("log")
-plt.axis([0.1,1E4,1E-2,1E+1])
+ax.set_yscale("log")
+ax.set_xscale("log")
+ax.axis([0.1,1E4,1E-2,1E+1])
 ax.set(xlabel='1/u', ylabel='w(u)',
        title='Theis type curve for manual evaluation')
 ax.grid(which="both",color='whitesmoke', linewidth=0.5)
@@ -123,14 +103,14 @@ ax.spines['left'].set_color('lightgrey')
 
 ax.tick_params(which='both', colors='lightgrey')
 
-st.pyplot(fig)
-
 # Safe the figure
 # Convert figure to a BytesIO object
 img_buffer = io.BytesIO()
 fig.savefig(img_buffer, format="png", dpi=300)
 img_buffer.seek(0)  # Reset buffer position
 
+plotting.show(fig)
+
 columns5 = st.columns((1,1,1), gap = 'large')
 with columns5[1]:
     # Add download button
@@ -143,25 +123,25 @@ with columns5[1]:
         
 # PLOTTING DATA
 
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
-plt.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.9)  # adjust plot area
+fig.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.9)  # adjust plot area
 ax.plot(m_time, m_ddown,'bo', markersize=3)
-plt.yscale("log")
-plt.xscale("log")
-plt.axis([0.1,1E4,1E-2,1E+1])
+ax.set_yscale("log")
+ax.set_xscale("log")
+ax.axis([0.1,1E4,1E-2,1E+1])
 ax.set(xlabel='time t (min)', ylabel='drawdown s (m)',
        title='Measured data')
 ax.grid(which="both", color='grey',linewidth=0.5)
 
-st.pyplot(fig)
-
 # Safe the figure
 # Convert figure to a BytesIO object
 img_buffer = io.BytesIO()
 fig.savefig(img_buffer, transparent='true', format="png", dpi=300)
 img_buffer.seek(0)  # Reset buffer position
 
+plotting.show(fig)
+
 columns6 = st.columns((1,1,1), gap = 'large')
 with columns6[1]:
     # Add download button
@@ -1,9 +1,14 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import pandas as pd
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function
+from hydrokit import plotting
 
 st.title('Theis parameter estimation')
 st.subheader('Understanding the Theis solution for :red [REAL measured] data', divider="red")
@@ -55,9 +60,6 @@ st.markdown("""
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
 # (Here, the methode computes the data for the well function. Those data can be used to generate a type curve.)
 u_min = -5
 u_max = 4
@@ -123,20 +125,20 @@ def inverse():
     t = u_inv * t_term
     s = w_u * s_term
         
-    fig = plt.figure(figsize=(10,7))
+    fig = plotting.figure(figsize=(10,7))
     ax = fig.add_subplot(1, 1, 1)
     ax.plot(t, s, label=r'Computed drawdown - Theis')
     ax.plot(m_time_s, m_ddown,'ro', label=r'measured drawdown')
-    plt.yscale("log")
-    plt.xscale("log")
+    ax.set_yscale("log")
+    ax.set_xscale("log")
     if refine_plot:
-        plt.axis([1E-0,1E4,1E-1,1E+1])
+        ax.axis([1E-0,1E4,1E-1,1E+1])
     else:
-        plt.axis([1E-1,1E5,1E-4,1E+1])
+        ax.axis([1E-1,1E5,1E-4,1E+1])
     ax.set(xlabel='t', ylabel='s',title='Neuman drawdown')
     ax.grid(which="both")
-    plt.legend()
-    st.pyplot(fig)
+    ax.legend()
+    plotting.show(fig)
 
     columns3 = st.columns((1,1), gap = 'medium')
     with columns3[0]:
@@ -1,61 +1,16 @@
 import matplotlib
-import matplotlib.pyplot as plt
-from scipy import special
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.transport import breakthrough, advection_front
+from hydrokit import plotting
 
 #FUNCTIONS FOR COMPUTATION; ADS = ADVECTION, DISPERSION AND SORPTION - EVENTUALLY SET RETARDATION TO 1 FOR NO SORPTION
-
-def IC(PE,r_time):
-    IC1 = np.sqrt(0.25*PE/r_time)*(1-r_time)
-    if (IC1>0):
-        IC2 = 1-(1-special.erfc(abs(IC1)))
-    else:
-        IC2 = 1+(1-special.erfc(abs(IC1)))
-    IC3 = np.sqrt(0.25*PE/r_time)*(1+r_time)
-    if (IC3>0):
-        IC4 = 1-(1-special.erfc(abs(IC3)))
-    else:
-        IC4 = 1+(1-special.erfc(abs(IC3)))
-    if IC4 == 0:
-        IC5 = IC2
-    else:
-        IC5 = IC2+np.exp(PE)*IC4
-    IC  = 1-0.5*IC5
-    return IC
-
-def BC(PE,r_time, r_dur):
-    # BCx positive pulse
-    BC1 = np.sqrt(0.25*PE/r_time)*(1-r_time)
-    if (BC1>0):
-        BC2 = 1-(1-special.erfc(abs(BC1)))
-    else:
-        BC2 = 1+(1-special.erfc(abs(BC1)))
-    BC3 = np.sqrt(0.25*PE/r_time)*(1+r_time)
-    BC4 = special.erfc(BC3)
-    if BC4 == 0:
-        BC5 = BC2
-    else:
-        BC5 = BC2 + np.exp(PE) * BC4
-    
-    # BCCx negative pulse
-    if r_time > r_dur:
-        BCC1 = np.sqrt(0.25 * PE / (r_time - r_dur)) * (1 - (r_time - r_dur))
-        if BCC1 > 0:
-            BCC2 = 1 - (1 - special.erfc(abs(BCC1)))
-        else:
-            BCC2 = 1 + (1 - special.erfc(abs(BCC1)))  
-        BCC3 = np.sqrt(0.25 * PE / (r_time - r_dur)) * (1 + (r_time - r_dur))
-        BCC4 = special.erfc(BCC3)
-        if BCC4 == 0:
-            BCC5 = BCC2
-        else:
-            BCC5 = BCC2 + np.exp(PE) * BCC4      
-    if r_time <= r_dur:
-        BC = 0.5 * BC5
-    else:
-        BC = 0.5 * (BC5 - BCC5)
-    return BC
+# see hydrokit/transport.py (breakthrough, advection_front)
 
 st.title('1D Transport with advection and dispersion')
 
@@ -102,37 +57,20 @@ r_dur = dur/tPV
 r_dt =  dt/tPV
 
 #Festlegung Zeitbereich
-t = np.arange(t0, t1, dt)
+time = np.arange(t0, t1, dt)
 
-#Berechnung Konzentration - Klammerterme
-#Set fraction of distance
-r_time = []
-time   = []
-conc   = []
-conca  = []
-   
-#compute concentration  
-for t in range(t0, t1, dt):      
-    r_time = t/tPV
-    # ADVECTION-DISPERSION
-    c = ci*IC(PE,r_time)+c0*BC(PE,r_time, r_dur)
-    conc.append(c)
-    # ADVECTION ONLY
-    if r_time < 1:
-        ca = 0
-    elif r_time > 1+r_dur:
-        ca = 0
-    else:
-        ca = c0
-    conca.append(ca)
-    time.append(t)
+#compute concentration for all times at once
+# ADVECTION-DISPERSION
+conc = breakthrough(l, time, v, D, c0, ci, dur)
+# ADVECTION ONLY
+conca = advection_front(l, time, v, c0, ci, dur)
         
 # measurements
 t_obs = [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]
 c_obs = [1e-3, 5e-2, 8.5e-2, 9.7e-2, 9.9e-2, 9e-2, 5e-2, 1.5e-2, 2e-3, 5e-4]
    
 #PLOT FIGURE
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
 ax.set_title('1D solute transport with advection-dispersion', fontsize=14)
 ax.set_xlabel ('Time (s)', fontsize=14)
@@ -147,11 +85,11 @@ if plot_AD == 1:
 if plot_DATA == 1:
     ax.plot(t_obs, c_obs, 'ro', label="Measured")
 #ax.scatter(t_obs, c_obs, marker="x", c="red", zorder=10)
-plt.ylim(0, cp)
-plt.xlim(0,t1)
-plt.xticks(fontsize=14)
-plt.yticks(fontsize=14)
+ax.set_ylim(0, cp)
+ax.set_xlim(0,t1)
+ax.tick_params(axis='x', labelsize=14)
+ax.tick_params(axis='y', labelsize=14)
 if not plot_A !=1 and plot_AD != 1 and plot_DATA != 1:
-    plt.legend(frameon=False, loc='upper right', fontsize=14)
+    ax.legend(frameon=False, loc='upper right', fontsize=14)
     
-st.pyplot(fig)
\ No newline at end of file
+plotting.show(fig)
\ No newline at end of file
@@ -1,8 +1,13 @@
 import matplotlib
-import matplotlib.pyplot as plt
 from scipy import special
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('1D Transport with advection and dispersion')
 st.subheader('Tracer input as :green[Dirac Pulse] data', divider="green")
@@ -109,7 +114,7 @@ t_obs = [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]
 c_obs = [1e-3, 5e-2, 8.5e-2, 9.7e-2, 9.9e-2, 10e-2, 10e-2, 10e-2, 10e-2, 10e-2]
    
 #PLOT FIGURE
-fig = plt.figure(figsize=(9,12))
+fig = plotting.figure(figsize=(9,12))
 ax = fig.add_subplot(2, 1, 1)
 ax.set_title('1D solute transport with advection-dispersion', fontsize=16)
 ax.set_xlabel ('Time (s)', fontsize=14)
@@ -119,11 +124,11 @@ ax.set_ylabel ('Concentration (g/m³)', fontsize=14)
 ax.plot(time,conc, 'navy', linewidth=2, label="Breakthrough observation 1")
 if multi:
     ax.plot(time,conc2, 'lightblue', linewidth=2, label="Breakthrough observation 2")
-plt.ylim(0,cmax*0.5)
-plt.xlim(0,t1)
-plt.xticks(fontsize=14)
-plt.yticks(fontsize=14)
-plt.legend(frameon=False, loc='upper right', fontsize=14)
+ax.set_ylim(0,cmax*0.5)
+ax.set_xlim(0,t1)
+ax.tick_params(axis='x', labelsize=14)
+ax.tick_params(axis='y', labelsize=14)
+ax.legend(frameon=False, loc='upper right', fontsize=14)
 
 ax = fig.add_subplot(2, 1, 2)
 ax.set_xlabel ('Distance from source along flow directions (m)', fontsize=14)
@@ -131,12 +136,12 @@ ax.set_ylabel ('Concentration (g/m³)', fontsize=14)
       
 # PLOT HERE
 ax.plot(space,concp, 'orange', linewidth=2, label="Concentration profile")
-plt.ylim(0,cmax*0.5)
-plt.xlim(0,100)
-plt.xticks(fontsize=14)
-plt.yticks(fontsize=14)
-plt.legend(frameon=False, loc='upper right', fontsize=14)
+ax.set_ylim(0,cmax*0.5)
+ax.set_xlim(0,100)
+ax.tick_params(axis='x', labelsize=14)
+ax.tick_params(axis='y', labelsize=14)
+ax.legend(frameon=False, loc='upper right', fontsize=14)
     
-st.pyplot(fig)
+plotting.show(fig)
 
 st.write("Average velocity _v_ (m/s) = ","% 7.3E"% v)
\ No newline at end of file
@@ -1,9 +1,14 @@
 import matplotlib
-import matplotlib.pyplot as plt
 from matplotlib import cm, ticker
-from scipy import special
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.transport import PlumeField
+from hydrokit import plotting
 
 st.title('3D Transport with advection and dispersion')
 st.subheader('Tracer input as :orange[Continous injection]', divider="orange")
@@ -31,29 +36,8 @@ st.markdown("""
 
 #FUNCTIONS FOR COMPUTATION; ADS = ADVECTION, DISPERSION AND SORPTION - EVENTUALLY SET RETARDATION TO 1 FOR NO SORPTION
 
-# Define the function
-def concentration(Y, Z, x, y, z, t, ax, ay, az, v, C0, down_only):
-    Dx = v * ax
-    Dy = v * ay
-    Dz = v * az
-    
-    if t == 0:
-        return np.zeros_like(X)  # Avoid division by zero
-    
-    coeff = C0/8
-    
-    erf1 = special.erfc((x-v*t)/(2*np.sqrt(Dx*t)))
-    erf2 = special.erf((y+Y/2)/(2*np.sqrt(Dy*x/v)))
-    erf3 = special.erf((y-Y/2)/(2*np.sqrt(Dy*x/v)))
-    if down_only:
-        erf4 = special.erf((z+Z)/(2*np.sqrt(Dz*x/v)))
-        erf5 = special.erf((z-Z)/(2*np.sqrt(Dz*x/v)))
-    else:
-        erf4 = special.erf((z+Z/2)/(2*np.sqrt(Dz*x/v)))
-        erf5 = special.erf((z-Z/2)/(2*np.sqrt(Dz*x/v)))
-    
-    return coeff * (erf1*(erf2-erf3)*(erf4-erf5))
-    
+# The field is evaluated slice by slice with hydrokit.transport.PlumeField
+
 columns1 = st.columns((1,1,1), gap = 'large')
 
 with columns1[0]:
@@ -76,6 +60,7 @@ with columns1[2]:
         down_only = st.toggle("Spreading is only downward")
         Zp = st.slider(f'**Slice at z (top view plot)**',-25,25,0,1)
         Yp = st.slider(f'**Slice at y (side view plot)**',-100,100,0,1)
+        resolution = st.select_slider('**Plot resolution (points per axis)**', [150, 300, 600, 1000], 300)
     td  = st.slider(f'**Time for the concentration profile (d)**',1.,1800.,1.,1.)
     t = td * 86400
     
@@ -87,44 +72,53 @@ az = ax/rat_x_z
 xmax = 1000
 ymax = 100
 zmax = 40
-x_vals = np.linspace(-0.1*xmax, xmax, 300)
-y_vals = np.linspace(-ymax, ymax, 300)
-z_vals = np.linspace(-zmax, zmax, 300)
-xxy, yxy = np.meshgrid(x_vals, y_vals)
-xxz, zxz = np.meshgrid(x_vals, z_vals)
 
-# Compute concentration values
-Cxy =    concentration(Y, Z, xxy, yxy, Zp, t, ax, ay, az, v, C0, down_only)
-Cxz =    concentration(Y, Z, xxz, Yp, zxz, t, ax, ay, az, v, C0, down_only)
+# The plume factors are kept between the reruns, so that only the parts
+# affected by a changed widget are recomputed
+if 'plume_continuous' not in st.session_state:
+    st.session_state['plume_continuous'] = PlumeField((-0.1*xmax, xmax), (-ymax, ymax), (-zmax, zmax), source='continuous')
+field = st.session_state['plume_continuous'].update(c0=C0, v=v, Dx=v*ax, Dy=v*ay, Dz=v*az, t=t, Y=Y, Z=Z, down_only=down_only)
 
 # Plot the concentration field
 lev_exp = 10.**np.arange(-8, 3)
 
-fig = plt.figure(figsize=(16,8))
-gs = matplotlib.gridspec.GridSpec(3,2, width_ratios=[8,1.1], height_ratios=[5,0.2,2])
+def plot_field(field):
+    xxy, yxy = np.meshgrid(field.x, field.y)
+    xxz, zxz = np.meshgrid(field.x, field.z)
+    Cxy = field.xy(Zp)
+    Cxz = field.xz(Yp)
+    fig = plotting.figure(figsize=(16,8))
+    gs = matplotlib.gridspec.GridSpec(3,2, width_ratios=[8,1.1], height_ratios=[5,0.2,2])
 
-ax = fig.add_subplot(gs[0,:])
-if isolines:
-    contour = plt.contour(xxy, yxy, Cxy, lev_exp, locator=ticker.LogLocator())
-else:
-    contour = plt.contourf(xxy, yxy, Cxy, lev_exp, locator=ticker.LogLocator())
-ax.vlines(0, -Y/2, Y/2, linewidth = 10, color='fuchsia', label='Source of contamination')
-plt.colorbar(contour, label="Concentration (g/m3)", format='%.0e')
-plt.xlabel("x in m",fontsize=14)
-plt.ylabel("y in m",fontsize=14)
-plt.xlim(-0.1*xmax,xmax)
-plt.legend(fontsize=14)
-plt.title(f"Contaminant Concentration (top view) at t = {t}, z = {Zp}", fontsize=16)
+    ax = fig.add_subplot(gs[0,:])
+    if isolines:
+        contour = ax.contour(xxy, yxy, Cxy, lev_exp, locator=ticker.LogLocator())
+    else:
+        contour = ax.contourf(xxy, yxy, Cxy, lev_exp, locator=ticker.LogLocator())
+    ax.vlines(0, -Y/2, Y/2, linewidth = 10, color='fuchsia', label='Source of contamination')
+    fig.colorbar(contour, label="Concentration (g/m3)", format='%.0e')
+    ax.set_xlabel("x in m",fontsize=14)
+    ax.set_ylabel("y in m",fontsize=14)
+    ax.set_xlim(-0.1*xmax,xmax)
+    ax.legend(fontsize=14)
+    ax.set_title(f"Contaminant Concentration (top view) at t = {t}, z = {Zp}", fontsize=16)
 
-ax = fig.add_subplot(gs[2,0])
-if isolines:
-    contour2 = plt.contour(xxz, zxz, Cxz, lev_exp, locator=ticker.LogLocator())
-else:
-    contour2 = plt.contourf(xxz, zxz, Cxz, lev_exp, locator=ticker.LogLocator())
-ax.vlines(0, -Z/2, Z/2, linewidth = 10, color='fuchsia', label='Source of contamination')
-plt.xlabel("x in m",fontsize=14)
-plt.ylabel("z in m",fontsize=14)
-plt.xlim(-0.1*xmax,xmax)
-plt.title(f"Contaminant Concentration (side view) at t = {t}, y = {Yp}", fontsize=16)
+    ax = fig.add_subplot(gs[2,0])
+    if isolines:
+        ax.contour(xxz, zxz, Cxz, lev_exp, locator=ticker.LogLocator())
+    else:
+        ax.contourf(xxz, zxz, Cxz, lev_exp, locator=ticker.LogLocator())
+    ax.vlines(0, -Z/2, Z/2, linewidth = 10, color='fuchsia', label='Source of contamination')
+    ax.set_xlabel("x in m",fontsize=14)
+    ax.set_ylabel("z in m",fontsize=14)
+    ax.set_xlim(-0.1*xmax,xmax)
+    ax.set_title(f"Contaminant Concentration (side view) at t = {t}, y = {Yp}", fontsize=16)
+    return fig
 
-st.pyplot(fig)
\ No newline at end of file
+# A coarse plot is shown first and replaced by the selected resolution; if a
+# widget changes in between, the rerun starts before the fine plot is drawn
+plot_area = st.empty()
+for n in sorted({100, resolution}):
+    field.n = n
+    fig = plot_field(field)
+    plotting.show(fig, plot_area)
@@ -1,9 +1,14 @@
 import matplotlib as mpl
-import matplotlib.pyplot as plt
 from matplotlib import cm, ticker
-from scipy import special
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.transport import PlumeField
+from hydrokit import plotting
 from streamlit_extras.stateful_button import button
 
 st.title('3D :red-background[Heat transport] with convection, conduction, and dispersion')
@@ -33,39 +38,8 @@ st.markdown("""
 
 #FUNCTIONS FOR COMPUTATION; ADS = CONVECTION, DISPERSION AND SORPTION - EVENTUALLY SET RETARDATION TO 1 FOR NO SORPTION
 
-# Define the function
-def heat(Y, Z, x, y, z, t, ax, ay, az, q, n_e, T0, lambda_s, c_s, rho_s, T_ini, down_only):
-    lambda_w = 0.598
-    c_w = 4186.
-    rho_w = 1000.
-    
-    v = q/n_e
-    
-    D_H = (n_e * lambda_w + (1-n_e)*lambda_s) /(n_e * c_w * rho_w)
-    Kd = c_s/(c_w * rho_w)
-    R = 1 + (1-n_e)/n_e * rho_s * Kd
+# The field is evaluated slice by slice with hydrokit.transport.PlumeField
 
-    Dx = v * ax + D_H
-    Dy = v * ay + D_H
-    Dz = v * az + D_H
-    
-    if t == 0:
-        return np.zeros_like(X)  # Avoid division by zero
-    
-    coeff = T0/8
-    
-    erf1 = special.erfc((x-v*t)/(2*np.sqrt(Dx*t)))
-    erf2 = special.erf((y+Y/2)/(2*np.sqrt(Dy*x/v)))
-    erf3 = special.erf((y-Y/2)/(2*np.sqrt(Dy*x/v)))
-    if down_only:
-        erf4 = special.erf((z+Z)/(2*np.sqrt(Dz*x/v)))
-        erf5 = special.erf((z-Z)/(2*np.sqrt(Dz*x/v)))
-    else:
-        erf4 = special.erf((z+Z/2)/(2*np.sqrt(Dz*x/v)))
-        erf5 = special.erf((z-Z/2)/(2*np.sqrt(Dz*x/v)))
-    
-    return  T_ini + coeff * (erf1*(erf2-erf3)*(erf4-erf5))
-    
 # Computation
 
 # Defined/fixed parameters (sand)
@@ -96,6 +70,7 @@ with columns1[2]:
         down_only = st.toggle("Spreading is only downward")
         Zp = st.slider(f'**Slice at z (top view plot)**',-25,25,0,1)
         Yp = st.slider(f'**Slice at y (side view plot)**',-100,100,0,1)
+        resolution = st.select_slider('**Plot resolution (points per axis)**', [150, 300, 600, 1000], 300)
         xmax = st.slider(f'**Extension in x-direction**',0,1000,200,50)
     td = st.slider(f'**Time to plot (d)**',1.,1800.,183.,1.)
     t = td * 86400
@@ -108,56 +83,68 @@ az = ax/rat_x_z
 # xmax = 500
 ymax = xmax/10
 zmax = xmax/25
-x_vals = np.linspace(-0.1*xmax, xmax, 300)
-y_vals = np.linspace(-ymax, ymax, 300)
-z_vals = np.linspace(-zmax, zmax, 300)
-xxy, yxy = np.meshgrid(x_vals, y_vals)
-xxz, zxz = np.meshgrid(x_vals, z_vals)
 
-# Compute temperature values
-Txy =    heat(Y, Z, xxy, yxy, Zp, t, ax, ay, az,  q, n_e, T0, lambda_s, c_s, rho_s, T_ini, down_only)
-Txz =    heat(Y, Z, xxz, Yp, zxz, t, ax, ay, az,  q, n_e, T0, lambda_s, c_s, rho_s, T_ini, down_only)
+# Seepage velocity and thermal diffusivity (water properties)
+lambda_w = 0.598
+c_w = 4186.
+rho_w = 1000.
+v = q/n_e
+D_H = (n_e * lambda_w + (1-n_e)*lambda_s) /(n_e * c_w * rho_w)
 
-# Replace NaN numbers for negative x by T_ini
-Txy[np.isnan(Txy)] = T_ini
-Txz[np.isnan(Txz)] = T_ini
+# The plume factors are kept between the reruns, so that only the parts
+# affected by a changed widget are recomputed
+if 'plume_heat' not in st.session_state:
+    st.session_state['plume_heat'] = PlumeField((-0.1*xmax, xmax), (-ymax, ymax), (-zmax, zmax), source='continuous')
+field = st.session_state['plume_heat'].update(c0=T0, v=v, Dx=v*ax+D_H, Dy=v*ay+D_H, Dz=v*az+D_H, t=t, Y=Y, Z=Z, down_only=down_only)
+field.x_range, field.y_range, field.z_range = (-0.1*xmax, xmax), (-ymax, ymax), (-zmax, zmax)
 
 # Plot the temperature field
 lev_exp = 10.**np.arange(-8, 3)
 
-fig = plt.figure(figsize=(16,8))
-gs = mpl.gridspec.GridSpec(3,2, width_ratios=[8,1.1], height_ratios=[5,0.2,2])
-
-ax = fig.add_subplot(gs[0,:])
-if isolines:
-    #contour = plt.contour(xxy, yxy, Txy, lev_exp, locator=ticker.LogLocator())
-    contour = plt.contour(xxy, yxy, Txy)
-else:
-    #contour = plt.contourf(xxy, yxy, Txy, lev_exp, locator=ticker.LogLocator())
-    contour = plt.contourf(xxy, yxy, Txy)
-ax.vlines(0, -Y/2, Y/2, linewidth = 10, color='fuchsia', label='Source of heat')
-
-cmap = mpl.cm.cool
-norm = mpl.colors.Normalize(vmin=T_ini, vmax=TB)
-
-plt.colorbar(contour, label="Temperature (degree Celsius)", format='%5.2f')
-plt.xlabel("x in m",fontsize=14)
-plt.ylabel("y in m",fontsize=14)
-plt.xlim(-0.1*xmax,xmax)
-plt.legend(fontsize=14)
-plt.title(f"Temperature (top view) at t = {t}, z = {Zp}", fontsize=16)
-
-ax = fig.add_subplot(gs[2,0])
-if isolines:
-    #contour2 = plt.contour(xxz, zxz, Txz, lev_exp, locator=ticker.LogLocator())
-    contour2 = plt.contour(xxz, zxz, Txz)
-else:
-    #contour2 = plt.contourf(xxz, zxz, Txz, lev_exp, locator=ticker.LogLocator())
-    contour2 = plt.contourf(xxz, zxz, Txz)
-ax.vlines(0, -Z/2, Z/2, linewidth = 10, color='fuchsia', label='Source of heat')
-plt.xlabel("x in m",fontsize=14)
-plt.ylabel("z in m",fontsize=14)
-plt.xlim(-0.1*xmax,xmax)
-plt.title(f"Temperature (side view) at t = {t}, y = {Yp}", fontsize=16)
-
-st.pyplot(fig)
\ No newline at end of file
+def plot_field(field):
+    xxy, yxy = np.meshgrid(field.x, field.y)
+    xxz, zxz = np.meshgrid(field.x, field.z)
+    # Temperatures, NaN numbers for negative x replaced by T_ini
+    Txy = np.nan_to_num(T_ini + field.xy(Zp), nan=T_ini)
+    Txz = np.nan_to_num(T_ini + field.xz(Yp), nan=T_ini)
+    fig = plotting.figure(figsize=(16,8))
+    gs = mpl.gridspec.GridSpec(3,2, width_ratios=[8,1.1], height_ratios=[5,0.2,2])
+
+    ax = fig.add_subplot(gs[0,:])
+    if isolines:
+        #contour = plt.contour(xxy, yxy, Txy, lev_exp, locator=ticker.LogLocator())
+        contour = ax.contour(xxy, yxy, Txy)
+    else:
+        #contour = plt.contourf(xxy, yxy, Txy, lev_exp, locator=ticker.LogLocator())
+        contour = ax.contourf(xxy, yxy, Txy)
+    ax.vlines(0, -Y/2, Y/2, linewidth = 10, color='fuchsia', label='Source of heat')
+
+
+    fig.colorbar(contour, label="Temperature (degree Celsius)", format='%5.2f')
+    ax.set_xlabel("x in m",fontsize=14)
+    ax.set_ylabel("y in m",fontsize=14)
+    ax.set_xlim(-0.1*xmax,xmax)
+    ax.legend(fontsize=14)
+    ax.set_title(f"Temperature (top view) at t = {t}, z = {Zp}", fontsize=16)
+
+    ax = fig.add_subplot(gs[2,0])
+    if isolines:
+        #contour2 = plt.contour(xxz, zxz, Txz, lev_exp, locator=ticker.LogLocator())
+        ax.contour(xxz, zxz, Txz)
+    else:
+        #contour2 = plt.contourf(xxz, zxz, Txz, lev_exp, locator=ticker.LogLocator())
+        ax.contourf(xxz, zxz, Txz)
+    ax.vlines(0, -Z/2, Z/2, linewidth = 10, color='fuchsia', label='Source of heat')
+    ax.set_xlabel("x in m",fontsize=14)
+    ax.set_ylabel("z in m",fontsize=14)
+    ax.set_xlim(-0.1*xmax,xmax)
+    ax.set_title(f"Temperature (side view) at t = {t}, y = {Yp}", fontsize=16)
+    return fig
+
+# A coarse plot is shown first and replaced by the selected resolution; if a
+# widget changes in between, the rerun starts before the fine plot is drawn
+plot_area = st.empty()
+for n in sorted({100, resolution}):
+    field.n = n
+    fig = plot_field(field)
+    plotting.show(fig, plot_area)
@@ -1,9 +1,14 @@
 import matplotlib
-import matplotlib.pyplot as plt
 from matplotlib import cm, ticker
-from scipy import special
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.transport import PlumeField
+from hydrokit import plotting
 
 st.title('3D Transport with advection and dispersion')
 st.subheader('Tracer input as :green[Dirac Pulse] data', divider="green")
@@ -30,27 +35,15 @@ st.markdown("""
 
 #FUNCTIONS FOR COMPUTATION; ADS = ADVECTION, DISPERSION AND SORPTION - EVENTUALLY SET RETARDATION TO 1 FOR NO SORPTION
 
-# Define the function
-def concentration(X, Y, Z, t, M, ax, ay, az, v):
-    Dx = v * ax
-    Dy = v * ay
-    Dz = v * az
-    
-    if t == 0:
-        return np.zeros_like(X)  # Avoid division by zero
-    
-    coeff = M / (8 * (np.pi * t) ** (3/2) * np.sqrt(Dx * Dy * Dz))
-    
-    exponent = -(((X- v * t)**2) / (4 * Dx * t) + (Y**2) / (4 * Dy * t) + (Z**2) / (4 * Dz * t))
-    
-    return coeff * np.exp(exponent)
-    
+# The field is evaluated slice by slice with hydrokit.transport.PlumeField
+
 columns1 = st.columns((1,1,1), gap = 'large')
 
 with columns1[0]:
     t = st.slider(f'**Time for the concentration profile (s)**',1.,1800.,1.,1.)
     Zp = st.slider(f'**Slice at z (top view plot)**',-25,25,0,1)
     Yp = st.slider(f'**Slice at y (side view plot)**',-100,100,0,1)
+    resolution = st.select_slider('**Plot resolution (points per axis)**', [150, 300, 600, 1000], 300)
     
 with columns1[1]:
     #M = st.slider(f'**Input mass (g)**',0.01,5.0,1.0,0.01)  
@@ -70,44 +63,56 @@ az = ax/rat_x_z
 xmax = 1000
 ymax = 100
 zmax = 25
-X_vals = np.linspace(-0.1*xmax, xmax, 300)
-Y_vals = np.linspace(-ymax, ymax, 300)
-Z_vals = np.linspace(-zmax, zmax, 300)
-Xxy, Yxy = np.meshgrid(X_vals, Y_vals)
-Xxz, Zxz = np.meshgrid(X_vals, Z_vals)
 
-# Compute concentration values
-Cxy =    concentration(Xxy, Yxy, Zp, t, M, ax, ay, az, v)
-Cxz =    concentration(Xxz, Yp, Zxz, t, M, ax, ay, az, v)
+# The plume factors are kept between the reruns, so that only the parts
+# affected by a changed widget are recomputed
+if 'plume_pulse' not in st.session_state:
+    st.session_state['plume_pulse'] = PlumeField((-0.1*xmax, xmax), (-ymax, ymax), (-zmax, zmax), source='pulse')
+params = dict(M=M, v=v, Dx=v*ax, Dy=v*ay, Dz=v*az, t=t)
 
 # Plot the concentration field
 lev_exp = 10.**np.arange(-12, 1)
 
-fig = plt.figure(figsize=(16,8))
-gs = matplotlib.gridspec.GridSpec(3,2, width_ratios=[8,1.1], height_ratios=[4,0.2,1])
+# The figures are cached for all users (hydrokit.plotting.show_cached); the
+# field is only evaluated for parameters that nobody has plotted before
+def plot_field(n, Zp, Yp, isolines, **params):
+    field = st.session_state['plume_pulse'].update(**params)
+    field.n = n
+    t = params['t']
+    Xxy, Yxy = np.meshgrid(field.x, field.y)
+    Xxz, Zxz = np.meshgrid(field.x, field.z)
+    Cxy = field.xy(Zp)
+    Cxz = field.xz(Yp)
+    fig = plotting.figure(figsize=(16,8))
+    gs = matplotlib.gridspec.GridSpec(3,2, width_ratios=[8,1.1], height_ratios=[4,0.2,1])
 
-ax = fig.add_subplot(gs[0,:])
-ax.plot(0,0, marker='o', color='r',linestyle ='None', label='Source of contamination')
-if isolines:
-    contour = plt.contourf(Xxy, Yxy, Cxy, lev_exp, locator=ticker.LogLocator())
-else:
-    contour = plt.contour(Xxy, Yxy, Cxy, lev_exp, locator=ticker.LogLocator())
-plt.colorbar(contour, label="Concentration (g/m3)", format='%.0e')
-plt.xlabel("x in m",fontsize=14)
-plt.ylabel("y in m",fontsize=14)
-plt.xlim(-0.1*xmax,xmax)
-plt.legend(fontsize=14)
-plt.title(f"Contaminant Concentration (top view) at t = {t}, z = {Zp}", fontsize=16)
+    ax = fig.add_subplot(gs[0,:])
+    ax.plot(0,0, marker='o', color='r',linestyle ='None', label='Source of contamination')
+    if isolines:
+        contour = ax.contourf(Xxy, Yxy, Cxy, lev_exp, locator=ticker.LogLocator())
+    else:
+        contour = ax.contour(Xxy, Yxy, Cxy, lev_exp, locator=ticker.LogLocator())
+    fig.colorbar(contour, label="Concentration (g/m3)", format='%.0e')
+    ax.set_xlabel("x in m",fontsize=14)
+    ax.set_ylabel("y in m",fontsize=14)
+    ax.set_xlim(-0.1*xmax,xmax)
+    ax.legend(fontsize=14)
+    ax.set_title(f"Contaminant Concentration (top view) at t = {t}, z = {Zp}", fontsize=16)
 
-ax = fig.add_subplot(gs[2,0])
-ax.plot(0,0, marker='o', color='r',linestyle ='None', label='Source of contamination')
-if isolines:
-    contour2 = plt.contourf(Xxz, Zxz, Cxz, lev_exp, locator=ticker.LogLocator())
-else:
-    contour2 = plt.contour(Xxz, Zxz, Cxz, lev_exp, locator=ticker.LogLocator())
-plt.xlabel("x in m",fontsize=14)
-plt.ylabel("z in m",fontsize=14)
-plt.xlim(-0.1*xmax,xmax)
-plt.title(f"Contaminant Concentration (side view) at t = {t}, y = {Yp}", fontsize=16)
+    ax = fig.add_subplot(gs[2,0])
+    ax.plot(0,0, marker='o', color='r',linestyle ='None', label='Source of contamination')
+    if isolines:
+        ax.contourf(Xxz, Zxz, Cxz, lev_exp, locator=ticker.LogLocator())
+    else:
+        ax.contour(Xxz, Zxz, Cxz, lev_exp, locator=ticker.LogLocator())
+    ax.set_xlabel("x in m",fontsize=14)
+    ax.set_ylabel("z in m",fontsize=14)
+    ax.set_xlim(-0.1*xmax,xmax)
+    ax.set_title(f"Contaminant Concentration (side view) at t = {t}, y = {Yp}", fontsize=16)
+    return fig
 
-st.pyplot(fig)
\ No newline at end of file
+# A coarse plot is shown first and replaced by the selected resolution; if a
+# widget changes in between, the rerun starts before the fine plot is drawn
+plot_area = st.empty()
+for n in sorted({100, resolution}):
+    plotting.show_cached(plot_field, n, Zp, Yp, isolines, target=plot_area, **params)
@@ -1,7 +1,12 @@
 from scipy.special import erfc, erf
 import numpy as np
 import streamlit as st
-import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Visualization of erf(x)/erfc(x)')
 
@@ -19,20 +24,20 @@ s2_print = erfc(x_print)
 st.subheader('erf(x)/erfc(x)')
 
 # Plot figure
-fig = plt.figure(figsize=(12,7))
+fig = plotting.figure(figsize=(12,7))
 ax = fig.add_subplot()
 ax.plot(x,s1, color='magenta', label='erf(x)')
 ax.plot(x,s2, color='darkblue', label='erfc(x)')
 ax.plot(x_print,s1_print, marker='o', color='magenta',linestyle ='None', label='erf(x_print)')
 ax.plot(x_print,s2_print, marker='o', color='darkblue',linestyle ='None', label='erfc(x_print)')
-plt.axis([-3,3,-1.5,2.5])
+ax.axis([-3,3,-1.5,2.5])
 ax.set(xlabel='x', ylabel='erf(x) / erfc(x)', title='Gauss error functions erf(x) and erfc(x)')
 ax.grid()
-plt.legend()
+ax.legend()
     
 #plt.show()
 
-st.pyplot(fig=fig)
+plotting.show(fig)
     
 st.write('Computed values for x =:',"% 3.2F"%  x_print)
 st.write('erf(x)  =',"% 5.4F"% s1_print)
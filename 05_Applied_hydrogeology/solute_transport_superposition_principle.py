@@ -2,8 +2,13 @@
 # Import libraries                     #
 #--------------------------------------#
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import numpy as np
-import matplotlib.pyplot as plt
 import ipywidgets as widgets
 from scipy import special
 import warnings
@@ -213,7 +218,7 @@ if st.button("Click to Solve"):
     st.write(f"C - The max concentration value is **{np.nanmax(Ctot_list):.2f} mg/l**")
 
     # Plot
-    fig, ax = plt.subplots(figsize=(6, 5))
+    fig, ax = plotting.subplots(figsize=(6, 5))
     ax.plot(time, Ctot, label=None)
     ax.scatter(time[idx_max], np.nanmax(Ctot), color="red", label="Max Concentration")
     ax.scatter(440, Ctot[440], color="blue", label="Concentration day 440")
@@ -224,4 +229,4 @@ if st.button("Click to Solve"):
     ax.set_xlabel("Time [days]")
     ax.set_ylabel("Concentration [mg/l]")
     ax.legend()
-    st.pyplot(fig)
+    plotting.show(fig)
@@ -1,10 +1,15 @@
 # Initialize librarys
 from scipy.special import erfc, erf
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Reservoir head - Introductionary Example to Model Calibration -  (based on materials from John Doherty)')
 
@@ -90,15 +95,15 @@ t = np.arange(0, t_max, t_max/100)
 h=h_i+(R/K-h_i)*(1-math.e**(-K*t/S))
     
 # PLOT FIGURE
-fig = plt.figure(figsize=(10,6))
+fig = plotting.figure(figsize=(10,6))
 ax = fig.add_subplot(1, 1, 1)
 ax.plot(t,h, linewidth=2, label='Computed')
 ax.plot(t_meas, h_meas, 'ro', label='Measured')
-plt.xlim(-1000,t_max*1.05)
-plt.ylim(0,150)
-plt.xlabel('t',fontsize=14)
-plt.ylabel('head',fontsize=14)
-plt.title('Hydraulic head in the reservoir', fontsize=16)
-plt.legend(fontsize=14)
-
-st.pyplot(fig)
\ No newline at end of file
+ax.set_xlim(-1000,t_max*1.05)
+ax.set_ylim(0,150)
+ax.set_xlabel('t',fontsize=14)
+ax.set_ylabel('head',fontsize=14)
+ax.set_title('Hydraulic head in the reservoir', fontsize=16)
+ax.legend(fontsize=14)
+
+plotting.show(fig)
\ No newline at end of file
@@ -1,39 +1,25 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
 import streamlit_book as stb
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting
 
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
 def compute_linU(s, s_U0, s_U1):
     u = (s-s_U0)/(s_U1-s_U0)
     u = u.clip(0,1)
     return u
 
-fig = plt.figure(figsize=(12,7))
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
 
 st.markdown(
     """
@@ -100,24 +86,25 @@ with columns[1]:
 
 # Compute s through time
 t2 = np.linspace(per_pred_min, per_pred, 100)     # in years
-s  = compute_s(T, S, t2*365 *24 *60 *60, Q, r_pred)   # in m
+s  = theis(r_pred, t2*365 *24 *60 *60, T, S, Q)   # in m
 
 # Compute s for a specific point
-y_point = compute_s(T, S, t_pred, Q, r_pred)
+y_point = theis(r_pred, t_pred, T, S, Q)
 
-plt.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
-plt.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-plt.xlabel(r'Time in years', fontsize=14)
-plt.ylabel(r'Drawdown in m', fontsize=14)
+ax.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
+ax.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+ax.set_xlabel(r'Time in years', fontsize=14)
+ax.set_ylabel(r'Drawdown in m', fontsize=14)
 
-st.pyplot(fig)
+plotting.show(fig)
 
 st.write('')   
 st.write("The predicted drawdown at the reporting time and distance (in m) is:  %5.2f" %y_point)
 
 
 
-fig = plt.figure(figsize=(12,7))
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
 
 log_minT1 = -7.0 # T / Corresponds to 10^-7 = 0.0000001
 log_maxT1 = 0.0  # T / Corresponds to 10^0 = 1
@@ -152,17 +139,17 @@ rmin = 10
 rmax = 5000
 r2 = np.linspace(rmin, rmax, 100)     # in years
 
-s1  = compute_s(T1, S1, t_predboth*365 *24 *60 *60, Qboth, r2)   # in m
-s2  = compute_s(T2, S2, t_predboth*365 *24 *60 *60, Qboth, r2)   # in m
+s1  = theis(r2, t_predboth*365 *24 *60 *60, T1, S1, Qboth)   # in m
+s2  = theis(r2, t_predboth*365 *24 *60 *60, T2, S2, Qboth)   # in m
 
 # Compute s for a specific point
-plt.plot(r2, -s1, linewidth=3., color='r', label=r'Case 1 drawdown')
-plt.plot(r2, -s2, linewidth=3., color='b', label=r'Case 2 drawdown')
-plt.xlabel(r'Distance from the pumped well in meters', fontsize=14)
-plt.ylabel(r'Negative value of drawdown in m', fontsize=14)
-plt.legend()
+ax.plot(r2, -s1, linewidth=3., color='r', label=r'Case 1 drawdown')
+ax.plot(r2, -s2, linewidth=3., color='b', label=r'Case 2 drawdown')
+ax.set_xlabel(r'Distance from the pumped well in meters', fontsize=14)
+ax.set_ylabel(r'Negative value of drawdown in m', fontsize=14)
+ax.legend()
 
-st.pyplot(fig)
+plotting.show(fig)
 
 st.write('')   
 
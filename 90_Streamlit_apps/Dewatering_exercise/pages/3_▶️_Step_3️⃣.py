@@ -10,9 +10,14 @@ Created on Sun Oct 13 15:28:58 2024
 
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
 import scipy.special
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import streamlit_book as stb
 
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
@@ -24,7 +29,8 @@ def compute_linU(s, s_U0, s_U1):
     return u
 
 
-fig = plt.figure(figsize=(12,7))
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
 
 # I found U slightly confusing because it is also used in the Theis context
 
@@ -100,10 +106,10 @@ else:
     yvals = [1, 1, 0, 0]
     xvals = [s_min, s_U1_value, s_U0_value, 2*s_max]
 
-plt.plot(xvals, yvals, linewidth=3., color='r', label=r'Drawdown prediction')
-plt.xlabel(r'Drawdown, m', fontsize=14)
-plt.ylabel(r'Utility', fontsize=14)
-st.pyplot(fig)
+ax.plot(xvals, yvals, linewidth=3., color='r', label=r'Drawdown prediction')
+ax.set_xlabel(r'Drawdown, m', fontsize=14)
+ax.set_ylabel(r'Utility', fontsize=14)
+plotting.show(fig)
 
 st.markdown(
     """
@@ -10,43 +10,33 @@ Created on Sun Oct 13 15:28:58 2024
 
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting, profiling, uncertainty
+
+# Reruns are timed if HYDROKIT_PROFILE is set (see hydrokit/profiling.py)
+profiling.start()
 
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
 def compute_linU(s, s_U0, s_U1):
     u = (s-s_U0)/(s_U1-s_U0)
     u = u.clip(0,1)
     return u
 
+profiling.mark('sensitivity')
 r_preds = np.array([100, 2500, 7500])
 
 t2 = np.linspace(.1, 10, 100)     # in years
 
-fig = plt.figure(figsize=(12,7))
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
 st.markdown(
     """
     ### Dewatering exercise 💦
@@ -116,22 +106,22 @@ counter=-1
 for T in T_values:
     counter += 1
     S = S_values[counter]
-    s = compute_s(T, S, t2*365 *24 *60 *60, Q, r)
+    s = theis(r, t2*365 *24 *60 *60, T, S, Q)
     if counter == 0:
-        plt.plot(t2, s, linewidth=3., color='r', label=r'low T / low S')
+        ax.plot(t2, s, linewidth=3., color='r', label=r'low T / low S')
     if counter == 1:
-        plt.plot(t2, s, linewidth=3., color='g', label=r'low T / high S')
+        ax.plot(t2, s, linewidth=3., color='g', label=r'low T / high S')
     if counter == 2:
-        plt.plot(t2, s, linewidth=3., color='b', label=r'high T / low S')
+        ax.plot(t2, s, linewidth=3., color='b', label=r'high T / low S')
     if counter == 3:
-        plt.plot(t2, s, linewidth=3., color='k', label=r'high T / high S')
+        ax.plot(t2, s, linewidth=3., color='k', label=r'high T / high S')
 
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Utility', fontsize=14)
-plt.axis([0, None, 0, None])
-plt.legend()
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Utility', fontsize=14)
+ax.axis([0, None, 0, None])
+ax.legend()
     
-st.pyplot(fig)
+plotting.show(fig)
 
 st.markdown(
     """
@@ -145,7 +135,9 @@ st.markdown(
 """
 )
 
-fig = plt.figure(figsize=(12,7))
+profiling.mark('utility curves')
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
 
 columns = st.columns((1,1,1), gap = 'large')
    
@@ -181,15 +173,15 @@ mine_uvals = compute_linU(s_vals, mine_s_U0_value, mine_s_U1_value)
 town_uvals = compute_linU(s_vals, town_s_U0_value, town_s_U1_value)
 env_uvals = compute_linU(s_vals, env_s_U0_value, env_s_U1_value)
     
-plt.plot(s_vals, mine_uvals, linewidth=3., color='r', label=r'Mine')
-plt.plot(s_vals, town_uvals, linewidth=3., color='g', label=r'Town')
-plt.plot(s_vals, env_uvals, linewidth=3., color='b', label=r'Environment')
-plt.xlabel(r'Drawdown, m', fontsize=14)
-plt.ylabel(r'Utility', fontsize=14)
-plt.axis([0, None, None, None])
-plt.legend()
+ax.plot(s_vals, mine_uvals, linewidth=3., color='r', label=r'Mine')
+ax.plot(s_vals, town_uvals, linewidth=3., color='g', label=r'Town')
+ax.plot(s_vals, env_uvals, linewidth=3., color='b', label=r'Environment')
+ax.set_xlabel(r'Drawdown, m', fontsize=14)
+ax.set_ylabel(r'Utility', fontsize=14)
+ax.axis([0, None, None, None])
+ax.legend()
     
-st.pyplot(fig)
+plotting.show(fig)
 
 st.markdown(
     """
@@ -213,6 +205,7 @@ st.markdown(
 """
 )
 
+profiling.mark('assessment')
 Q_temp=st.slider('Pumping rate', 10.,400.,200.,10.,format="%4.0f" )
 Q = Q_temp / 24 / 60 / 60
 st.write('')
@@ -243,9 +236,9 @@ counter=-1
 for r in r_preds:
     counter += 1 
     if r==np.min(r_preds):           # mine
-        s_forrs[counter,:] = np.squeeze(compute_s(T*multiplier1[0], S*multiplier2[0], t2*365 *24 *60 *60, Q, r))   # in m
+        s_forrs[counter,:] = np.squeeze(theis(r, t2*365 *24 *60 *60, T*multiplier1[0], S*multiplier2[0], Q))   # in m
     else:
-        s_forrs[counter,:] = np.squeeze(compute_s(T*multiplier1[1], S*multiplier2[1], t2*365 *24 *60 *60, Q, r))   # in 
+        s_forrs[counter,:] = np.squeeze(theis(r, t2*365 *24 *60 *60, T*multiplier1[1], S*multiplier2[1], Q))   # in 
   
 s_mine = np.squeeze(s_forrs[0,np.min(np.where(t2>mine_t_value))])      # use minimum drawdown for mine      
 u_mine = compute_linU(s_mine, mine_s_U0_value, mine_s_U1_value)
@@ -254,48 +247,47 @@ u_env = compute_linU(s_env, env_s_U0_value, env_s_U1_value)
 s_town = np.squeeze(s_forrs[1,np.min(np.where(t2>town_t_value))])      # town          
 u_town = compute_linU(s_town, town_s_U0_value, town_s_U1_value)
         
-fig = plt.figure(figsize=(12,7))
-plt.plot(t2, np.squeeze(s_forrs[0,:]), linewidth=3., color='r', label=r'Mine')
-plt.plot(t2[np.min(np.where(t2>mine_t_value))],s_mine, marker='o', color='r',linestyle ='None', label='@mine')
-plt.plot(t2, np.squeeze(s_forrs[1,:]), linewidth=3., color='b', label=r'Town')
-plt.plot(t2[np.min(np.where(t2>town_t_value))],s_town, marker='o', color='b',linestyle ='None', label='@town')
-plt.plot(t2, np.squeeze(s_forrs[2,:]), linewidth=3., color='g', label=r'Env')
-plt.plot(t2[np.min(np.where(t2>env_t_value))],s_env, marker='o', color='g',linestyle ='None', label='@env')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown, m', fontsize=14)
-plt.axis([0, None, 0, None])
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(t2, np.squeeze(s_forrs[0,:]), linewidth=3., color='r', label=r'Mine')
+ax.plot(t2[np.min(np.where(t2>mine_t_value))],s_mine, marker='o', color='r',linestyle ='None', label='@mine')
+ax.plot(t2, np.squeeze(s_forrs[1,:]), linewidth=3., color='b', label=r'Town')
+ax.plot(t2[np.min(np.where(t2>town_t_value))],s_town, marker='o', color='b',linestyle ='None', label='@town')
+ax.plot(t2, np.squeeze(s_forrs[2,:]), linewidth=3., color='g', label=r'Env')
+ax.plot(t2[np.min(np.where(t2>env_t_value))],s_env, marker='o', color='g',linestyle ='None', label='@env')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown, m', fontsize=14)
+ax.axis([0, None, 0, None])
+ax.legend(fontsize=14)
     
 st.write("The utility for the **mine** at the assessment time is:  %5.2f" %u_mine)
 st.write("The utility for the **town** at the assessment time is:  %5.2f" %u_town)
 st.write("The utility for the **environment** at the assessment time is:  %5.2f" %u_env)
   
-st.pyplot(fig)
+plotting.show(fig)
     
 st.markdown(
     """
 
     ---
 
-    #### Finally, consider this tradeoff curve made for the mine and the town for multiple Q values.
+    #### Finally, consider the tradeoff curves for the mine, the town and the environment for many Q values.
     
-    Change T and S to see how it impacts the Pareto optimal designs.')    
-
-    Plot the matched utilities for the town against those of the mine.')    
+    Change T and S to see how it impacts the Pareto optimal designs.
 
-    Be prepared to explain how this plot can be used for Pareto optimization.')
+    Instead of a single low or high value, T and S are now described by an **ensemble** of possible values around your choice. For every pumping rate, the utility of each stakeholder is computed for all members of the ensemble, and you can choose whether the stakeholders use the **expected** (mean) utility or take a **conservative** view (the utility that is reached with a probability of 95%).
 
-    Repeat the exercise for a different S and T pair.')
-
-    Is the optimal pumping rate the same for both S and T pairs?')
+    A pumping rate is **Pareto optimal** if no other rate gives at least the same utility to every stakeholder and a higher utility to one of them.
 
     Pumping rates will be examined ranging linearly from the min and max that you choose.
 """
 )
 
+profiling.mark('Pareto sweep')
 Q_min_value=st.slider('**Minimum pumping rate** to consider', 10.,400.,20.,10.,format="%4.1f" )
 Q_max_value=st.slider('**Maximum pumping rate** to consider', Q_min_value+10.,500.,325.,10.,format="%4.1f" )
-Q_values = np.linspace(Q_min_value, Q_max_value, 50)
+# a dense grid of rates (m3/d -> m3/s); the sweep costs about as much for 1000 rates as for 20
+Q_values = np.linspace(Q_min_value, Q_max_value, 1000)
 Q_values = Q_values / 24. / 60. / 60.
 st.write('')
 st.write('')
@@ -309,59 +301,44 @@ S_min_slider_value2=st.slider('Choose (log of) **Storativity** - unitless', log_
 S =  10 ** S_min_slider_value2
 st.write('')
 st.write('')
-st.write('It is assumed that T and S are only known within +- 10%.')
-st.write('The stakeholders take a conservative view: the mine uses lower T and S and the town and environement use the higher values.')
-st.write('')
-st.write('')
 
-multiplier_num = ([0, 1])
-multiplier1 = ([0.9, 1.1])     # only need paired lowT-LowS (max) and HighT-HighS (min)
-multiplier2 = ([0.9, 1.1])
-    
-s_forrs = np.zeros([len(r_preds)*len(Q_values),len(t2)])
-u_mine = np.zeros([len(Q_values)])
-u_town = np.zeros([len(Q_values)])
-s_town = np.zeros([len(Q_values)])
-u_env = np.zeros([len(Q_values)])
-Q_hold = np.zeros([len(r_preds)*len(Q_values)])
-            
-counter=-1
-Qcounter=-1
-for Q in Q_values:
-    Qcounter += 1 
-    for r in r_preds:
-        counter += 1 
-        Q_hold[counter] = Q * 24. * 60. * 60.
-        if r==np.min(r_preds):           # mine
-            s_forrs[counter,:] = np.squeeze(compute_s(T*multiplier1[0], S*multiplier2[0], t2*365 *24 *60 *60, Q, r))   # in m
-        else:
-            s_forrs[counter,:] = np.squeeze(compute_s(T*multiplier1[1], S*multiplier2[1], t2*365 *24 *60 *60, Q, r))   # in    
-        
-        if r == np.min(r_preds):          # mine
-            s_current = np.squeeze(s_forrs[counter,np.min(np.where(t2>mine_t_value))])      # use minimum drawdown for mine                     
-            u_mine[Qcounter:] = compute_linU(s_current, mine_s_U0_value, mine_s_U1_value)   # in m
-        elif r == np.max(r_preds):          # env
-            s_current = np.squeeze(s_forrs[counter,np.min(np.where(t2>env_t_value))])      # env    
-            u_env[Qcounter:] = compute_linU(s_current, env_s_U0_value, env_s_U1_value)   # in m
-           
-        else:          # town
-            s_current = np.squeeze(s_forrs[counter,np.min(np.where(t2>town_t_value))])      # town      
-            u_town[Qcounter:] = compute_linU(s_current, town_s_U0_value, town_s_U1_value)   # in m
-            s_town[Qcounter:] = s_current   # in m
-            
-fig = plt.figure(figsize=(12,7))
-plt.plot(u_mine, u_town, marker='o', color='r',linestyle ='None', label=r'Utility')
-plt.xlabel(r'Utility for the Mine', fontsize=14)
-plt.ylabel(r'Utility for the Town', fontsize=14)
-plt.legend()
-st.pyplot(fig)
-
-fig = plt.figure(figsize=(12,7))
-plt.plot(u_env, u_town, marker='o', color='r',linestyle ='None', label=r'Utility')
-plt.xlabel(r'Utility for the Environment', fontsize=14)
-plt.ylabel(r'Utility for the Town', fontsize=14)
-plt.legend()
-st.pyplot(fig)
+columns3 = st.columns((1,1,1), gap = 'large')
+with columns3[0]:
+    sigma_log = st.slider('**Uncertainty** of T and S (standard deviation of the log)', 0.0, 1.0, 0.05, 0.01, format="%4.2f")
+with columns3[1]:
+    n_samples = st.select_slider('**Members** of the ensemble', [100, 1000, 10000], 10000)
+with columns3[2]:
+    risk = st.radio('The stakeholders use', ['Expected utility', 'Conservative utility (95% probability)'])
+
+# ensemble of (T, S) and the utilities of all stakeholders for all rates
+T_samples, S_samples = uncertainty.lognormal_ensemble(T, S, sigma_log, n_samples, seed=1)
+t_assess = np.maximum([mine_t_value, town_t_value, env_t_value], 0.1) * 365 *24 *60 *60
+sweep = uncertainty.utility_sweep(Q_values, T_samples, S_samples, r_preds, t_assess,
+                                  [mine_s_U0_value, town_s_U0_value, env_s_U0_value],
+                                  [mine_s_U1_value, town_s_U1_value, env_s_U1_value], percentiles=(5., 50., 95.))
+utilities = sweep.mean if risk == 'Expected utility' else sweep.percentiles[0]
+u_mine, u_town, u_env = utilities.T
+pareto = uncertainty.pareto_front(utilities)
+Q_plot = Q_values * 24. * 60. * 60.
+
+Q_inspect = st.slider('**Inspect** a pumping rate (m3/d)', Q_min_value, Q_max_value, (Q_min_value+Q_max_value)/2, 1., format="%4.0f")
+i_inspect = np.argmin(np.abs(Q_plot - Q_inspect))
+st.write("With **%4.0f m3/d** the utilities are (5th to 95th percentile in brackets): **mine** %4.2f (%4.2f - %4.2f), **town** %4.2f (%4.2f - %4.2f), **environment** %4.2f (%4.2f - %4.2f). This rate is %sPareto optimal."
+         % ((Q_plot[i_inspect],) + tuple(v for k in range(3) for v in (utilities[i_inspect, k], sweep.percentiles[0, i_inspect, k], sweep.percentiles[2, i_inspect, k]))
+            + ('' if pareto[i_inspect] else 'not ',)))
+
+profiling.mark('Pareto plots')
+for u_x, label_x in ((u_mine, 'Mine'), (u_env, 'Environment')):
+    fig = plotting.figure(figsize=(12,7))
+    ax = fig.add_subplot()
+    points = ax.scatter(u_x, u_town, c=Q_plot, s=12, cmap='viridis', label=r'Utility')
+    ax.plot(u_x[pareto], u_town[pareto], 'o', markerfacecolor='none', markeredgecolor='k', markersize=7, label=r'Pareto optimal')
+    ax.plot(u_x[i_inspect], u_town[i_inspect], '*', color='r', markersize=18, label=r'Inspected rate')
+    fig.colorbar(points, ax=ax, label='Dewatering rate, m3/d')
+    ax.set_xlabel(r'Utility for the %s' % label_x, fontsize=14)
+    ax.set_ylabel(r'Utility for the Town', fontsize=14)
+    ax.legend()
+    plotting.show(fig)
 
 st.markdown(
     """
@@ -378,14 +355,16 @@ st.markdown(
 )
 
 u_sum = u_mine + u_town + u_env
-fig = plt.figure(figsize=(12,7))
-plt.plot(Q_values* 24. * 60. * 60., u_sum, marker='o', color='r',linestyle ='None', label=r'Total')
-plt.plot(Q_values* 24. * 60. * 60., u_mine, marker='o', color='b',linestyle ='None', label=r'Mine')
-plt.plot(Q_values* 24. * 60. * 60., u_mine + u_town, marker='o', color='g',linestyle ='None', label=r'Mine+Town')
-plt.xlabel(r'Dewatering rate, m3/d', fontsize=14)
-plt.ylabel(r'Sum of utilities', fontsize=14)
-plt.legend()
-st.pyplot(fig)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(Q_plot, u_sum, color='r', linewidth=3., label=r'Total')
+ax.plot(Q_plot, u_mine, color='b', linewidth=3., label=r'Mine')
+ax.plot(Q_plot, u_mine + u_town, color='g', linewidth=3., label=r'Mine+Town')
+ax.plot(Q_plot[np.argmax(u_sum)], u_sum.max(), '*', color='k', markersize=18, label=r'Highest total utility')
+ax.set_xlabel(r'Dewatering rate, m3/d', fontsize=14)
+ax.set_ylabel(r'Sum of utilities', fontsize=14)
+ax.legend()
+plotting.show(fig)
 st.markdown(
     """
 
@@ -396,17 +375,15 @@ st.markdown(
 """
 )
 
-u_vector = np.zeros((3,len(u_mine)))
-u_vector[0,:] = u_mine
-u_vector[1,:] = u_town
-u_vector[2,:] = u_env
-
-fig = plt.figure(figsize=(12,7))
-plt.plot(Q_values* 24. * 60. * 60., np.var(u_vector,0), marker='o', color='r',linestyle ='None', label=r'Utility')
-plt.xlabel(r'Dewatering rate, m3/d', fontsize=14)
-plt.ylabel(r'Variance of utilities', fontsize=14)
-plt.legend()
-st.pyplot(fig)
+u_var = np.var(utilities, 1)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(Q_plot, u_var, color='r', linewidth=3., label=r'Utility')
+ax.plot(Q_plot[np.argmin(u_var)], u_var.min(), '*', color='k', markersize=18, label=r'Lowest variance')
+ax.set_xlabel(r'Dewatering rate, m3/d', fontsize=14)
+ax.set_ylabel(r'Variance of utilities', fontsize=14)
+ax.legend()
+plotting.show(fig)
 
 st.markdown(
     """
@@ -418,14 +395,13 @@ st.markdown(
 """
 )
 
-u_vector = np.zeros((3,len(u_mine)))
-u_vector[0,:] = u_mine
-u_vector[1,:] = u_town
-u_vector[2,:] = u_env
-
-fig = plt.figure(figsize=(12,7))
-plt.plot(Q_values* 24. * 60. * 60., np.min(u_vector,0), marker='o', color='r',linestyle ='None', label=r'Utility')
-plt.xlabel(r'Dewatering rate, m3/d', fontsize=14)
-plt.ylabel(r'Highest minimum utility over stakeholders', fontsize=14)
-plt.legend()
-st.pyplot(fig)
+u_min = np.min(utilities, 1)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(Q_plot, u_min, color='r', linewidth=3., label=r'Utility')
+ax.plot(Q_plot[np.argmax(u_min)], u_min.max(), '*', color='k', markersize=18, label=r'Highest minimum utility')
+ax.set_xlabel(r'Dewatering rate, m3/d', fontsize=14)
+ax.set_ylabel(r'Highest minimum utility over stakeholders', fontsize=14)
+ax.legend()
+plotting.show(fig)
+profiling.finish()
@@ -10,33 +10,18 @@ Created on Sun Oct 13 15:28:58 2024
 
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting
 
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
 def compute_linU(s, s_U0, s_U1):
     u = (s-s_U0)/(s_U1-s_U0)
     u = u.clip(0,1)
@@ -64,15 +49,16 @@ T_test = 3.2 * 10**-4
 S_test = 2.1 * 10**-3
 r_test = 25
 
-s_test = compute_s(T_test, S_test, t2*24 *60 *60, Q_test, r_test)   # in 
+s_test = theis(r_test, t2*24 *60 *60, T_test, S_test, Q_test)   # in 
 
-fig = plt.figure(figsize=(12,7))
-plt.plot(t2, s_test, marker='o', color='r',linestyle ='None', label='Measured drawdown')
-plt.xlabel(r'Time, days', fontsize=14)
-plt.ylabel(r'Drawdown', fontsize=14)
-plt.legend(fontsize=14)
-plt.axis([0, None, 0, None])
-st.pyplot(fig)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(t2, s_test, marker='o', color='r',linestyle ='None', label='Measured drawdown')
+ax.set_xlabel(r'Time, days', fontsize=14)
+ax.set_ylabel(r'Drawdown', fontsize=14)
+ax.legend(fontsize=14)
+ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.markdown(
     """
@@ -97,16 +83,17 @@ with columns[1]:
 st.write('')
 st.write('')
 
-s_fit = compute_s(T_fit, S_fit, t2*24 *60 *60, Q_test, r_test)   # in 
+s_fit = theis(r_test, t2*24 *60 *60, T_fit, S_fit, Q_test)   # in 
 
-fig = plt.figure(figsize=(12,7))
-plt.plot(t2, s_test, marker='o', color='r',linestyle ='None', label=r'Data')
-plt.plot(t2, s_fit, linewidth=3., color='b', linestyle ='solid', label=r'Model')
-plt.xlabel(r'Time, days', fontsize=14)
-plt.ylabel(r'Drawdown', fontsize=14)
-plt.legend(fontsize=14)
-plt.axis([0, None, 0, None])
-st.pyplot(fig)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(t2, s_test, marker='o', color='r',linestyle ='None', label=r'Data')
+ax.plot(t2, s_fit, linewidth=3., color='b', linestyle ='solid', label=r'Model')
+ax.set_xlabel(r'Time, days', fontsize=14)
+ax.set_ylabel(r'Drawdown', fontsize=14)
+ax.legend(fontsize=14)
+ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.markdown(
     """
@@ -130,7 +117,7 @@ with columns2[0]:
     st.write('')
     S_min_slider_value_fit1=st.slider('1st (log of) Storativity - unitless', log_min_fit,0.9*log_max_fit,(log_min_fit+0.9*log_max_fit)/2,0.01,format="%4.2f" )
     S_fit1 =  10 ** S_min_slider_value_fit1
-    s_fit_noisy1 = compute_s(T_fit1, S_fit1, t2*24 *60 *60, Q_test, r_test)   # in 
+    s_fit_noisy1 = theis(r_test, t2*24 *60 *60, T_fit1, S_fit1, Q_test)   # in 
     
 with columns2[1]:
     st.write('**MODEL 2**')
@@ -139,7 +126,7 @@ with columns2[1]:
     st.write('')
     S_min_slider_value_fit2=st.slider('2nd (log of) Storativity - unitless', log_min_fit,0.9*log_max_fit,(log_min_fit+0.9*log_max_fit)/2,0.01,format="%4.2f" )
     S_fit2 =  10 ** S_min_slider_value_fit2
-    s_fit_noisy2 = compute_s(T_fit2, S_fit2, t2*24 *60 *60, Q_test, r_test)   # in 
+    s_fit_noisy2 = theis(r_test, t2*24 *60 *60, T_fit2, S_fit2, Q_test)   # in 
     
 with columns2[2]:
     st.write('**MODEL 3**')
@@ -148,18 +135,19 @@ with columns2[2]:
     st.write('')
     S_min_slider_value_fit3=st.slider('3rd (log of) Storativity - unitless', log_min_fit,0.9*log_max_fit,(log_min_fit+0.9*log_max_fit)/2,0.01,format="%4.2f" )
     S_fit3 =  10 ** S_min_slider_value_fit3
-    s_fit_noisy3 = compute_s(T_fit3, S_fit3, t2*24 *60 *60, Q_test, r_test)   # in 
-
-fig = plt.figure(figsize=(12,7))
-plt.plot(t2, s_noisy, marker='o', color='r',linestyle ='None', label=r'Data')
-plt.plot(t2, s_fit_noisy1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_fit_noisy2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_fit_noisy3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.xlabel(r'Time, days', fontsize=14)
-plt.ylabel(r'Drawdown', fontsize=14)
-plt.legend(fontsize=14)
-plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    s_fit_noisy3 = theis(r_test, t2*24 *60 *60, T_fit3, S_fit3, Q_test)   # in 
+
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(t2, s_noisy, marker='o', color='r',linestyle ='None', label=r'Data')
+ax.plot(t2, s_fit_noisy1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_fit_noisy2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_fit_noisy3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.set_xlabel(r'Time, days', fontsize=14)
+ax.set_ylabel(r'Drawdown', fontsize=14)
+ax.legend(fontsize=14)
+ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.markdown(
     """
@@ -173,68 +161,71 @@ st.markdown(
 t2 = np.linspace(.1, 10, 100)     # in days    
 r_preds = np.array([100, 2500, 7500])
 
-s_test_mine1 = compute_s(T_fit1, S_fit1, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[0])   # in 
-s_test_mine2 = compute_s(T_fit2, S_fit2, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[0])   # in 
-s_test_mine3 = compute_s(T_fit3, S_fit3, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[0])   # in 
+s_test_mine1 = theis(r_preds[0], t2*365 *24 *60 *60, T_fit1, S_fit1, 250 / 24. / 60. / 60.)   # in 
+s_test_mine2 = theis(r_preds[0], t2*365 *24 *60 *60, T_fit2, S_fit2, 250 / 24. / 60. / 60.)   # in 
+s_test_mine3 = theis(r_preds[0], t2*365 *24 *60 *60, T_fit3, S_fit3, 250 / 24. / 60. / 60.)   # in 
 
-s_test_town1 = compute_s(T_fit1, S_fit1, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[1])   # in 
-s_test_town2 = compute_s(T_fit2, S_fit2, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[1])   # in 
-s_test_town3 = compute_s(T_fit3, S_fit3, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[1])   # in 
+s_test_town1 = theis(r_preds[1], t2*365 *24 *60 *60, T_fit1, S_fit1, 250 / 24. / 60. / 60.)   # in 
+s_test_town2 = theis(r_preds[1], t2*365 *24 *60 *60, T_fit2, S_fit2, 250 / 24. / 60. / 60.)   # in 
+s_test_town3 = theis(r_preds[1], t2*365 *24 *60 *60, T_fit3, S_fit3, 250 / 24. / 60. / 60.)   # in 
 
-s_test_env1 = compute_s(T_fit1, S_fit1, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[2])   # in 
-s_test_env2 = compute_s(T_fit2, S_fit2, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[2])   # in 
-s_test_env3 = compute_s(T_fit3, S_fit3, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[2])   # in 
+s_test_env1 = theis(r_preds[2], t2*365 *24 *60 *60, T_fit1, S_fit1, 250 / 24. / 60. / 60.)   # in 
+s_test_env2 = theis(r_preds[2], t2*365 *24 *60 *60, T_fit2, S_fit2, 250 / 24. / 60. / 60.)   # in 
+s_test_env3 = theis(r_preds[2], t2*365 *24 *60 *60, T_fit3, S_fit3, 250 / 24. / 60. / 60.)   # in 
 
 s_max_plot = max(s_test_mine1+s_test_mine2+s_test_mine3+s_test_town1+s_test_town2+s_test_town3+s_test_env1+s_test_env2+s_test_env3)
 norm_plots = st.toggle('Same range of drawdown for all plots')
 
-fig = plt.figure(figsize=(12,7))
-plt.title('Drawdown at the mine', fontsize=16)
-plt.plot(t2, s_test_mine1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_test_mine2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_test_mine3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown at the mine', fontsize=14)
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.set_title('Drawdown at the mine', fontsize=16)
+ax.plot(t2, s_test_mine1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_test_mine2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_test_mine3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown at the mine', fontsize=14)
+ax.legend(fontsize=14)
 if norm_plots:
-    plt.axis([0, None, 0, s_max_plot])
+    ax.axis([0, None, 0, s_max_plot])
 else:
-    plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.write('')
 st.write('')
 
-fig = plt.figure(figsize=(12,7))
-plt.title('Drawdown at the town', fontsize=16)
-plt.plot(t2, s_test_town1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_test_town2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_test_town3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown at the town', fontsize=14)
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.set_title('Drawdown at the town', fontsize=16)
+ax.plot(t2, s_test_town1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_test_town2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_test_town3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown at the town', fontsize=14)
+ax.legend(fontsize=14)
 if norm_plots:
-    plt.axis([0, None, 0, s_max_plot])
+    ax.axis([0, None, 0, s_max_plot])
 else:
-    plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.write('')
 st.write('')
 
-fig = plt.figure(figsize=(12,7))
-plt.title('Drawdown at the environment', fontsize=16)
-plt.plot(t2, s_test_env1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_test_env2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_test_env3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown at the env', fontsize=14)
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.set_title('Drawdown at the environment', fontsize=16)
+ax.plot(t2, s_test_env1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_test_env2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_test_env3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown at the env', fontsize=14)
+ax.legend(fontsize=14)
 if norm_plots:
-    plt.axis([0, None, 0, s_max_plot])
+    ax.axis([0, None, 0, s_max_plot])
 else:
-    plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.markdown(
     """
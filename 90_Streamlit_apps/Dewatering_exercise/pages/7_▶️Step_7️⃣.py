@@ -10,33 +10,18 @@ Created on Sun Oct 13 15:28:58 2024
 
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting, uncertainty
 
 # (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
 # Define a function, class, and object for Theis Well analysis
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def theis_wu(Q, T, s):
-    wu = s * 4. * np.pi * T / Q
-    return wu
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
 def compute_linU(s, s_U0, s_U1):
     u = (s-s_U0)/(s_U1-s_U0)
     u = u.clip(0,1)
@@ -62,7 +47,7 @@ T_test = 3.2 * 10**-4
 S_test = 2.1 * 10**-3
 r_test = 25
 
-s_test = compute_s(T_test, S_test, t2*24 *60 *60, Q_test, r_test)   # in 
+s_test = theis(r_test, t2*24 *60 *60, T_test, S_test, Q_test)   # in 
 
 st.markdown(
     """
@@ -89,7 +74,7 @@ with columns[0]:
     st.write('')
     S_min_slider_value_fit1=st.slider('1st (log of) Storativity - unitless', log_min_fit,0.9*log_max_fit,-3.19,0.01, format="%4.2f" )
     S_fit1 =  10 ** S_min_slider_value_fit1
-    s_fit_noisy1 = compute_s(T_fit1, S_fit1, t2*24 *60 *60, Q_test, r_test)   # in 
+    s_fit_noisy1 = theis(r_test, t2*24 *60 *60, T_fit1, S_fit1, Q_test)   # in 
     
 with columns[1]:
     st.write('**MODEL 2**')
@@ -98,7 +83,7 @@ with columns[1]:
     st.write('')
     S_min_slider_value_fit2=st.slider('2nd (log of) Storativity - unitless', log_min_fit,0.9*log_max_fit,-2.48,0.01, format="%4.2f" )
     S_fit2 =  10 ** S_min_slider_value_fit2
-    s_fit_noisy2 = compute_s(T_fit2, S_fit2, t2*24 *60 *60, Q_test, r_test)   # in 
+    s_fit_noisy2 = theis(r_test, t2*24 *60 *60, T_fit2, S_fit2, Q_test)   # in 
     
 with columns[2]:
     st.write('**MODEL 3**')
@@ -107,18 +92,19 @@ with columns[2]:
     st.write('')
     S_min_slider_value_fit3=st.slider('3rd (log of) Storativity - unitless', log_min_fit,0.9*log_max_fit,-2.6,0.01, format="%4.2f" )
     S_fit3 =  10 ** S_min_slider_value_fit3
-    s_fit_noisy3 = compute_s(T_fit3, S_fit3, t2*24 *60 *60, Q_test, r_test)   # in 
-
-fig = plt.figure(figsize=(12,7))
-plt.plot(t2, s_noisy, marker='o', color='r',linestyle ='None', label=r'Data')
-plt.plot(t2, s_fit_noisy1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_fit_noisy2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_fit_noisy3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.xlabel(r'Time, days', fontsize=14)
-plt.ylabel(r'Drawdown', fontsize=14)
-plt.legend(fontsize=14)
-plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    s_fit_noisy3 = theis(r_test, t2*24 *60 *60, T_fit3, S_fit3, Q_test)   # in 
+
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.plot(t2, s_noisy, marker='o', color='r',linestyle ='None', label=r'Data')
+ax.plot(t2, s_fit_noisy1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_fit_noisy2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_fit_noisy3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.set_xlabel(r'Time, days', fontsize=14)
+ax.set_ylabel(r'Drawdown', fontsize=14)
+ax.legend(fontsize=14)
+ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 diff_model1 = s_fit_noisy1 - s_test
 se_model1 = diff_model1**2
@@ -168,74 +154,77 @@ st.write('')
 t2 = np.linspace(.1, 10, 100)     # in days    
 r_preds = np.array([100, 2500, 7500])
 
-s_test_mine1 = compute_s(T_fit1, S_fit1, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[0])   # in 
-s_test_mine2 = compute_s(T_fit2, S_fit2, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[0])   # in 
-s_test_mine3 = compute_s(T_fit3, S_fit3, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[0])   # in 
+s_test_mine1 = theis(r_preds[0], t2*365 *24 *60 *60, T_fit1, S_fit1, 250 / 24. / 60. / 60.)   # in 
+s_test_mine2 = theis(r_preds[0], t2*365 *24 *60 *60, T_fit2, S_fit2, 250 / 24. / 60. / 60.)   # in 
+s_test_mine3 = theis(r_preds[0], t2*365 *24 *60 *60, T_fit3, S_fit3, 250 / 24. / 60. / 60.)   # in 
 s_Lw_mine = s_test_mine1 * L_model1 + s_test_mine2 * L_model2 + s_test_mine3 * L_model3   
 
-s_test_town1 = compute_s(T_fit1, S_fit1, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[1])   # in 
-s_test_town2 = compute_s(T_fit2, S_fit2, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[1])   # in 
-s_test_town3 = compute_s(T_fit3, S_fit3, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[1])   # in 
+s_test_town1 = theis(r_preds[1], t2*365 *24 *60 *60, T_fit1, S_fit1, 250 / 24. / 60. / 60.)   # in 
+s_test_town2 = theis(r_preds[1], t2*365 *24 *60 *60, T_fit2, S_fit2, 250 / 24. / 60. / 60.)   # in 
+s_test_town3 = theis(r_preds[1], t2*365 *24 *60 *60, T_fit3, S_fit3, 250 / 24. / 60. / 60.)   # in 
 s_Lw_town = s_test_town1 * L_model1 + s_test_town2 * L_model2 + s_test_town3 * L_model3   
 
-s_test_env1 = compute_s(T_fit1, S_fit1, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[2])   # in 
-s_test_env2 = compute_s(T_fit2, S_fit2, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[2])   # in 
-s_test_env3 = compute_s(T_fit3, S_fit3, t2*365 *24 *60 *60, 250 / 24. / 60. / 60., r_preds[2])   # in 
+s_test_env1 = theis(r_preds[2], t2*365 *24 *60 *60, T_fit1, S_fit1, 250 / 24. / 60. / 60.)   # in 
+s_test_env2 = theis(r_preds[2], t2*365 *24 *60 *60, T_fit2, S_fit2, 250 / 24. / 60. / 60.)   # in 
+s_test_env3 = theis(r_preds[2], t2*365 *24 *60 *60, T_fit3, S_fit3, 250 / 24. / 60. / 60.)   # in 
 s_Lw_env = s_test_env1 * L_model1 + s_test_env2 * L_model2 + s_test_env3 * L_model3  
 
 s_max_plot = max(s_test_mine1+s_test_mine2+s_test_mine3+s_test_town1+s_test_town2+s_test_town3+s_test_env1+s_test_env2+s_test_env3)
 norm_plots = st.toggle('Same range of drawdown for all plots')
 
-fig = plt.figure(figsize=(12,7))
-plt.title('Drawdown at the mine', fontsize=16)
-plt.plot(t2, s_test_mine1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_test_mine2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_test_mine3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.plot(t2, s_Lw_mine, linewidth=3., color='r', linestyle ='dashed', label=r'Lw')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown at the mine', fontsize=14)
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.set_title('Drawdown at the mine', fontsize=16)
+ax.plot(t2, s_test_mine1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_test_mine2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_test_mine3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.plot(t2, s_Lw_mine, linewidth=3., color='r', linestyle ='dashed', label=r'Lw')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown at the mine', fontsize=14)
+ax.legend(fontsize=14)
 if norm_plots:
-    plt.axis([0, None, 0, s_max_plot])
+    ax.axis([0, None, 0, s_max_plot])
 else:
-    plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.write('')
 st.write('')
 
-fig = plt.figure(figsize=(12,7))
-plt.title('Drawdown at the town', fontsize=16)
-plt.plot(t2, s_test_town1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_test_town2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_test_town3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.plot(t2, s_Lw_town, linewidth=3., color='r', linestyle ='dashed', label=r'Lw')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown at the town', fontsize=14)
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.set_title('Drawdown at the town', fontsize=16)
+ax.plot(t2, s_test_town1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_test_town2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_test_town3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.plot(t2, s_Lw_town, linewidth=3., color='r', linestyle ='dashed', label=r'Lw')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown at the town', fontsize=14)
+ax.legend(fontsize=14)
 if norm_plots:
-    plt.axis([0, None, 0, s_max_plot])
+    ax.axis([0, None, 0, s_max_plot])
 else:
-    plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.write('')
 st.write('')
     
-fig = plt.figure(figsize=(12,7))
-plt.title('Drawdown at the environment', fontsize=16)
-plt.plot(t2, s_test_env1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
-plt.plot(t2, s_test_env2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
-plt.plot(t2, s_test_env3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
-plt.plot(t2, s_Lw_env, linewidth=3., color='r', linestyle ='dashed', label=r'Lw')
-plt.xlabel(r'Time, years', fontsize=14)
-plt.ylabel(r'Drawdown at the env', fontsize=14)
-plt.legend(fontsize=14)
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+ax.set_title('Drawdown at the environment', fontsize=16)
+ax.plot(t2, s_test_env1, linewidth=3., color='b', linestyle ='solid', label=r'Model_1')
+ax.plot(t2, s_test_env2, linewidth=3., color='g', linestyle ='solid', label=r'Model_2')
+ax.plot(t2, s_test_env3, linewidth=3., color='k', linestyle ='solid', label=r'Model_3')
+ax.plot(t2, s_Lw_env, linewidth=3., color='r', linestyle ='dashed', label=r'Lw')
+ax.set_xlabel(r'Time, years', fontsize=14)
+ax.set_ylabel(r'Drawdown at the env', fontsize=14)
+ax.legend(fontsize=14)
 if norm_plots:
-    plt.axis([0, None, 0, s_max_plot])
+    ax.axis([0, None, 0, s_max_plot])
 else:
-    plt.axis([0, None, 0, None])
-st.pyplot(fig)
+    ax.axis([0, None, 0, None])
+plotting.show(fig)
 
 st.markdown(
     """
@@ -247,6 +236,93 @@ st.markdown(
 """
 )
 
+st.markdown(
+    """
+
+    ---
+
+    #### From three models to thousands.
+    
+    Instead of three hand-picked fits, we can let the computer find **all** combinations of T and S that are consistent with the data and weight each of them by its likelihood:
+    
+    * **GLUE** draws T and S at random over the whole range of the sliders, keeps the _behavioural_ models whose RMSE is at most twice the best RMSE and weights them with 1/RMSE, as above.
+    * **Metropolis** walks through the parameter space and visits each combination as often as its (Gaussian) likelihood says, assuming measurement errors of 0.02 m.
+"""
+)
+
+columns3 = st.columns((1,1), gap = 'medium')
+with columns3[0]:
+    sampler = st.selectbox('Method', ['GLUE', 'Metropolis'])
+with columns3[1]:
+    n_models = st.select_slider('Number of models', [1000, 10000, 20000], 10000)
+
+t_data = np.linspace(.1, 2, 12) * 24 * 60 * 60     # times of the data in s
+if sampler == 'GLUE':
+    ensemble = uncertainty.glue(t_data, s_noisy, r_test, Q_test, n=n_models, log10_T=(log_min_fit, 0.9*log_max_fit),
+                                log10_S=(log_min_fit, 0.9*log_max_fit), seed=1)
+    st.write("%d of %d models (%4.1f%%) are behavioural." % (len(ensemble.T), n_models, 100 * ensemble.acceptance))
+else:
+    ensemble = uncertainty.metropolis(t_data, s_noisy, r_test, Q_test, 0.02, n=n_models,
+                                      x0=(T_min_slider_value_fit1, S_min_slider_value_fit1), seed=1)
+    st.write("%d models, %4.1f%% of the proposed steps were accepted." % (len(ensemble.T), 100 * ensemble.acceptance))
+
+fig = plotting.figure(figsize=(12,7))
+ax = fig.add_subplot()
+points = ax.scatter(np.log10(ensemble.T), np.log10(ensemble.S), c=ensemble.weights, s=6, cmap='viridis')
+ax.plot([T_min_slider_value_fit1, T_min_slider_value_fit2, T_min_slider_value_fit3],
+        [S_min_slider_value_fit1, S_min_slider_value_fit2, S_min_slider_value_fit3], '*', color='r', markersize=18, label=r'Models 1-3')
+fig.colorbar(points, ax=ax, label='Weight')
+ax.set_xlabel(r'(log of) Transmissivity in m2/s', fontsize=14)
+ax.set_ylabel(r'(log of) Storativity', fontsize=14)
+ax.legend(fontsize=14)
+plotting.show(fig)
+
+st.write('**The likelihood-weighted ensemble predicts these drawdowns (median and 5th to 95th percentile) for a well pumped at 250 m3/d.**')
+
+labels = ['mine', 'town', 'environment']
+Q_pred = 250 / 24. / 60. / 60.
+for k in range(3):
+    s_ensemble = theis(r_preds[k], t2[None]*365 *24 *60 *60, ensemble.T[:, None], ensemble.S[:, None], Q_pred)
+    s_lo, s_med, s_hi = uncertainty.weighted_quantile(s_ensemble, ensemble.weights, [0.05, 0.5, 0.95])
+    fig = plotting.figure(figsize=(12,7))
+    ax = fig.add_subplot()
+    ax.set_title('Drawdown at the %s' % labels[k], fontsize=16)
+    ax.fill_between(t2, s_lo, s_hi, color='r', alpha=0.2, label=r'5% - 95%')
+    ax.plot(t2, s_med, linewidth=3., color='r', label=r'Median')
+    ax.plot(t2, [s_Lw_mine, s_Lw_town, s_Lw_env][k], linewidth=3., color='k', linestyle ='dashed', label=r'Lw of models 1-3')
+    ax.set_xlabel(r'Time, years', fontsize=14)
+    ax.set_ylabel(r'Drawdown at the %s' % labels[k], fontsize=14)
+    ax.legend(fontsize=14)
+    if norm_plots:
+        ax.axis([0, None, 0, s_max_plot])
+    else:
+        ax.axis([0, None, 0, None])
+    plotting.show(fig)
+
+st.markdown(
+    """
+
+    #### And the utilities?
+
+    With the utility functions of step 5 (mine: U = 0 at 5 m and U = 1 at 8 m after 1 year, town: U = 0 at 4.5 m and U = 1 at 1 m after 5 years, environment: U = 0 at 1 m and U = 1 at 0.5 m after 9.9 years), every model of the ensemble gives a utility to each stakeholder.
+"""
+)
+
+s_U0, s_U1, t_U = np.array([5., 4.5, 1.]), np.array([8., 1., 0.5]), np.array([1., 5., 9.9]) * 365 *24 *60 *60
+sweep = uncertainty.utility_sweep([Q_pred], ensemble.T, ensemble.S, r_preds, t_U, s_U0, s_U1, weights=ensemble.weights)
+fig, axes = plotting.subplots(1, 3, figsize=(15,5), sharey=True)
+for k, ax in enumerate(axes):
+    u = uncertainty.linear_utility(theis(r_preds[k], t_U[k], ensemble.T, ensemble.S, Q_pred), s_U0[k], s_U1[k])
+    ax.hist(u, bins=np.linspace(0, 1, 21), weights=ensemble.weights, color='b', alpha=0.6)
+    ax.axvline(sweep.mean[0, k], color='r', linewidth=3., label=r'Expected utility')
+    ax.set_title('Utility for the %s' % labels[k], fontsize=14)
+    ax.set_xlabel(r'Utility', fontsize=14)
+    ax.legend()
+axes[0].set_ylabel(r'Probability', fontsize=14)
+plotting.show(fig)
+st.write("Expected utilities: **mine** %4.2f, **town** %4.2f, **environment** %4.2f; with a probability of 95%% they are at least %4.2f, %4.2f and %4.2f."
+         % (tuple(sweep.mean[0]) + tuple(sweep.percentiles[0, 0])))
+
 # If there is time
     # add plots to show utilities for each stakeholder for each fit and for the likelihood weighted average
     # discuss whether stakeholders should use the Lweighted average
@@ -1,8 +1,13 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import streamlit_book as stb
 
 
@@ -61,6 +66,53 @@ st.markdown(
 
 "---"
 
+# The figure of the three parts of the exercise (in different colours) is
+# cached for all users with hydrokit.plotting.show_cached
+def plot_head(y_scale, hl, hr, L, R, K, fill, boundary):
+    x = np.arange(0, L,L/1000)
+    h=(hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
+    
+    # PLOT FIGURE
+    fig = plotting.figure(figsize=(9,6))
+    ax = fig.add_subplot(1, 1, 1)
+    ax.plot(x,h)
+    ax.set(xlabel='x (m)', ylabel='Druckpotential (m)',title='Potentialhöhe für die 1D ungespannte Grundwasserströmung')
+    ax.fill_between(x,0,h, facecolor=fill)
+    
+    # BOUNDARY CONDITIONS hl, hr
+    ax.vlines(0, 0, hl, linewidth = 10, color=boundary)
+    ax.vlines(L, 0, hr, linewidth = 10, color=boundary)
+    
+    # MAKE 'WATER'-TRIANGLE
+    y_range = abs((hl*(1-y_scale/100))-(hr*(1+y_scale/100)))
+    h_arrow = (hl**2-(hl**2-hr**2)/L*(L*0.96)+(R/K*(L*0.96)*(L-(L*0.96))))**0.5  #water level at arrow
+    ax.arrow(L*0.96,(h_arrow+(h_arrow*0.002)), 0, -0.01, fc="k", ec="k", head_width=(L*0.015), head_length=(h_arrow*0.0015))
+    ax.hlines(y= h_arrow-(h_arrow*0.0005), xmin=L*0.95, xmax=L*0.97, colors='blue')   
+    ax.hlines(y= h_arrow-(h_arrow*0.001), xmin=L*0.955, xmax=L*0.965, colors='blue')
+
+    #ARROWS FOR RECHARGE 
+    if R != 0:
+        head_length=(R*86400*365.25*1000*0.002)*y_scale/2
+        h_rch1 = (hl**2-(hl**2-hr**2)/L*(L*0.25)+(R/K*(L*0.25)*(L-(L*0.25))))**0.5  #water level at arrow for Recharge Posotion 1
+        ax.arrow(L*0.25,(h_rch1+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
+        h_rch2 = (hl**2-(hl**2-hr**2)/L*(L*0.50)+(R/K*(L*0.50)*(L-(L*0.50))))**0.5  #water level at arrow for Recharge Postition 2
+        ax.arrow(L*0.50,(h_rch2+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
+        h_rch3 = (hl**2-(hl**2-hr**2)/L*(L*0.75)+(R/K*(L*0.75)*(L-(L*0.75))))**0.5  #water level at arrow for Recharge Position 3
+        ax.arrow(L*0.75,(h_rch3+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
+
+    #Groundwater divide
+    max_y = max(h)
+    max_x = x[h.argmax()]
+    R_min_ms=K*abs(hl**2-hr**2)/L**2
+    if R>R_min_ms:
+        ax.vlines(max_x,0,max_y, color="r")
+
+    ax.set_ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
+    ax.set_xlim(-50,L+50)
+    ax.text(L, (hr*(1+y_scale/100))-0.1*y_range, r'GWN: {:.3e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='azure'),fontsize=12)
+    ax.grid()
+    return fig
+
 # Input data
 
 # Define the minimum and maximum for the logarithmic scale
@@ -84,50 +136,8 @@ with columns[1]:
     # Display the logarithmic value
     st.write("_Hydraulische Leitfähigkeit_ in m/s: %5.2e" %K)
     
-x = np.arange(0, L,L/1000)
 R=R/1000/365.25/86400
-h=(hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
-    
-# PLOT FIGURE
-fig = plt.figure(figsize=(9,6))
-ax = fig.add_subplot(1, 1, 1)
-ax.plot(x,h)
-ax.set(xlabel='x (m)', ylabel='Druckpotential (m)',title='Potentialhöhe für die 1D ungespannte Grundwasserströmung')
-ax.fill_between(x,0,h, facecolor='lightblue')
-    
-# BOUNDARY CONDITIONS hl, hr
-ax.vlines(0, 0, hl, linewidth = 10, color='b')
-ax.vlines(L, 0, hr, linewidth = 10, color='b')
-    
-# MAKE 'WATER'-TRIANGLE
-y_range = abs((hl*(1-y_scale/100))-(hr*(1+y_scale/100)))
-h_arrow = (hl**2-(hl**2-hr**2)/L*(L*0.96)+(R/K*(L*0.96)*(L-(L*0.96))))**0.5  #water level at arrow
-ax.arrow(L*0.96,(h_arrow+(h_arrow*0.002)), 0, -0.01, fc="k", ec="k", head_width=(L*0.015), head_length=(h_arrow*0.0015))
-ax.hlines(y= h_arrow-(h_arrow*0.0005), xmin=L*0.95, xmax=L*0.97, colors='blue')   
-ax.hlines(y= h_arrow-(h_arrow*0.001), xmin=L*0.955, xmax=L*0.965, colors='blue')
-
-#ARROWS FOR RECHARGE 
-if R != 0:
-    head_length=(R*86400*365.25*1000*0.002)*y_scale/2
-    h_rch1 = (hl**2-(hl**2-hr**2)/L*(L*0.25)+(R/K*(L*0.25)*(L-(L*0.25))))**0.5  #water level at arrow for Recharge Posotion 1
-    ax.arrow(L*0.25,(h_rch1+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-    h_rch2 = (hl**2-(hl**2-hr**2)/L*(L*0.50)+(R/K*(L*0.50)*(L-(L*0.50))))**0.5  #water level at arrow for Recharge Postition 2
-    ax.arrow(L*0.50,(h_rch2+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-    h_rch3 = (hl**2-(hl**2-hr**2)/L*(L*0.75)+(R/K*(L*0.75)*(L-(L*0.75))))**0.5  #water level at arrow for Recharge Position 3
-    ax.arrow(L*0.75,(h_rch3+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-
-#Groundwater divide
-max_y = max(h)
-max_x = x[h.argmax()]
-R_min_ms=K*abs(hl**2-hr**2)/L**2
-if R>R_min_ms:
-    plt.vlines(max_x,0,max_y, color="r")
-
-plt.ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
-plt.xlim(-50,L+50)
-plt.text(L, (hr*(1+y_scale/100))-0.1*y_range, r'GWN: {:.3e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='azure'),fontsize=12)
-ax.grid()
-st.pyplot(fig)
+plotting.show_cached(plot_head, y_scale, hl, hr, L, R, K, 'lightblue', 'b')
 
 st.markdown(
     """
@@ -212,50 +222,8 @@ with columns3[1]:
     # Display the logarithmic value
     st.write("_Hydraulische Leitfähigkeit_ in m/s: %5.2e" %K)
     
-x = np.arange(0, L,L/1000)
 R=R/1000/365.25/86400
-h=(hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
-    
-# PLOT FIGURE
-fig = plt.figure(figsize=(9,6))
-ax = fig.add_subplot(1, 1, 1)
-ax.plot(x,h)
-ax.set(xlabel='x (m)', ylabel='Druckpotential (m)',title='Potentialhöhe für die 1D ungespannte Grundwasserströmung')
-ax.fill_between(x,0,h, facecolor='lightgreen')
-    
-# BOUNDARY CONDITIONS hl, hr
-ax.vlines(0, 0, hl, linewidth = 10, color='green')
-ax.vlines(L, 0, hr, linewidth = 10, color='green')
-    
-# MAKE 'WATER'-TRIANGLE
-y_range = abs((hl*(1-y_scale/100))-(hr*(1+y_scale/100)))
-h_arrow = (hl**2-(hl**2-hr**2)/L*(L*0.96)+(R/K*(L*0.96)*(L-(L*0.96))))**0.5  #water level at arrow
-ax.arrow(L*0.96,(h_arrow+(h_arrow*0.002)), 0, -0.01, fc="k", ec="k", head_width=(L*0.015), head_length=(h_arrow*0.0015))
-ax.hlines(y= h_arrow-(h_arrow*0.0005), xmin=L*0.95, xmax=L*0.97, colors='blue')   
-ax.hlines(y= h_arrow-(h_arrow*0.001), xmin=L*0.955, xmax=L*0.965, colors='blue')
-
-#ARROWS FOR RECHARGE 
-if R != 0:
-    head_length=(R*86400*365.25*1000*0.002)*y_scale/2
-    h_rch1 = (hl**2-(hl**2-hr**2)/L*(L*0.25)+(R/K*(L*0.25)*(L-(L*0.25))))**0.5  #water level at arrow for Recharge Posotion 1
-    ax.arrow(L*0.25,(h_rch1+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-    h_rch2 = (hl**2-(hl**2-hr**2)/L*(L*0.50)+(R/K*(L*0.50)*(L-(L*0.50))))**0.5  #water level at arrow for Recharge Postition 2
-    ax.arrow(L*0.50,(h_rch2+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-    h_rch3 = (hl**2-(hl**2-hr**2)/L*(L*0.75)+(R/K*(L*0.75)*(L-(L*0.75))))**0.5  #water level at arrow for Recharge Position 3
-    ax.arrow(L*0.75,(h_rch3+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-
-#Groundwater divide
-max_y = max(h)
-max_x = x[h.argmax()]
-R_min_ms=K*abs(hl**2-hr**2)/L**2
-if R>R_min_ms:
-    plt.vlines(max_x,0,max_y, color="r")
-
-plt.ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
-plt.xlim(-50,L+50)
-plt.text(L, (hr*(1+y_scale/100))-0.1*y_range, r'GWN: {:.3e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='azure'),fontsize=12)
-ax.grid()
-st.pyplot(fig)
+plotting.show_cached(plot_head, y_scale, hl, hr, L, R, K, 'lightgreen', 'green')
 
 st.markdown(
     """    
@@ -300,47 +268,5 @@ with columns2[1]:
     # Display the logarithmic value
     st.write("_Hydraulische Leitfähigkeit_ in m/s: %5.2e" %K)
     
-x = np.arange(0, L,L/1000)
 R=R/1000/365.25/86400
-h=(hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
-    
-# PLOT FIGURE
-fig = plt.figure(figsize=(9,6))
-ax = fig.add_subplot(1, 1, 1)
-ax.plot(x,h)
-ax.set(xlabel='x (m)', ylabel='Druckpotential (m)',title='Potentialhöhe für die 1D ungespannte Grundwasserströmung')
-ax.fill_between(x,0,h, facecolor='lightgrey')
-    
-# BOUNDARY CONDITIONS hl, hr
-ax.vlines(0, 0, hl, linewidth = 10, color='orange')
-ax.vlines(L, 0, hr, linewidth = 10, color='orange')
-    
-# MAKE 'WATER'-TRIANGLE
-y_range = abs((hl*(1-y_scale/100))-(hr*(1+y_scale/100)))
-h_arrow = (hl**2-(hl**2-hr**2)/L*(L*0.96)+(R/K*(L*0.96)*(L-(L*0.96))))**0.5  #water level at arrow
-ax.arrow(L*0.96,(h_arrow+(h_arrow*0.002)), 0, -0.01, fc="k", ec="k", head_width=(L*0.015), head_length=(h_arrow*0.0015))
-ax.hlines(y= h_arrow-(h_arrow*0.0005), xmin=L*0.95, xmax=L*0.97, colors='blue')   
-ax.hlines(y= h_arrow-(h_arrow*0.001), xmin=L*0.955, xmax=L*0.965, colors='blue')
-
-#ARROWS FOR RECHARGE 
-if R != 0:
-    head_length=(R*86400*365.25*1000*0.002)*y_scale/2
-    h_rch1 = (hl**2-(hl**2-hr**2)/L*(L*0.25)+(R/K*(L*0.25)*(L-(L*0.25))))**0.5  #water level at arrow for Recharge Posotion 1
-    ax.arrow(L*0.25,(h_rch1+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-    h_rch2 = (hl**2-(hl**2-hr**2)/L*(L*0.50)+(R/K*(L*0.50)*(L-(L*0.50))))**0.5  #water level at arrow for Recharge Postition 2
-    ax.arrow(L*0.50,(h_rch2+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-    h_rch3 = (hl**2-(hl**2-hr**2)/L*(L*0.75)+(R/K*(L*0.75)*(L-(L*0.75))))**0.5  #water level at arrow for Recharge Position 3
-    ax.arrow(L*0.75,(h_rch3+head_length), 0, -0.01, fc="k", ec="k", head_width=(head_length*300/y_scale), head_length=head_length)
-
-#Groundwater divide
-max_y = max(h)
-max_x = x[h.argmax()]
-R_min_ms=K*abs(hl**2-hr**2)/L**2
-if R>R_min_ms:
-    plt.vlines(max_x,0,max_y, color="r")
-
-plt.ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
-plt.xlim(-50,L+50)
-plt.text(L, (hr*(1+y_scale/100))-0.1*y_range, r'GWN: {:.3e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='azure'),fontsize=12)
-ax.grid()
-st.pyplot(fig)
\ No newline at end of file
+plotting.show_cached(plot_head, y_scale, hl, hr, L, R, K, 'lightgrey', 'orange')
\ No newline at end of file
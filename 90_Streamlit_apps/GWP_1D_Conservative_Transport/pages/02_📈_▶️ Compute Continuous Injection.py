@@ -1,11 +1,16 @@
 import matplotlib
-import matplotlib.pyplot as plt
-from scipy import special
 import numpy as np
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stateful_button import button
 from decimal import Decimal
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.transport import breakthrough, advection_front
+from hydrokit import plotting
 
 st.title('1D Transport with advection and dispersion')
 st.subheader('Solute input as :orange[Continuous Injection]', divider="orange")
@@ -60,29 +65,7 @@ if quiz:
 "---"
 
 #FUNCTIONS FOR COMPUTATION
-def concentration(x, t, a, v, c0, R):
-    # Computes 1D advection-dispersion with retardation
-    D = v * a
-    
-    coeff = c0/2
-    
-    erf1 = special.erfc((x-v*t/R)/(2*np.sqrt(D*t/R)))
-    erf2 = special.erfc((x+v*t/R)/(2*np.sqrt(D*t/R)))
-    exp  = np.exp(v*x/D)
-    
-    return coeff * (erf1 + exp * erf2)
-    
-def concentration_a(x, t, v, c0, R):
-    # Computes 1D advection with retardation
-    tPV =   x/v*R
-    residence_time = t/tPV
-    
-    if residence_time <= 1:
-        conc = 0
-    else:
-        conc = c0
-    
-    return conc
+# see hydrokit/transport.py (breakthrough, advection_front)
 
 # Data for the scenario
 
@@ -124,31 +107,19 @@ v =     q/n
 
 # Compute concentration for profile
 loc = np.arange(0., lmax, lmax/150)
-conc_p = concentration(loc, time_p, a, v, c0, 1)
+conc_p = breakthrough(loc, time_p, v, a*v, c0)
     
 # Advection only
-loca =    []
-conca_p = []
-
-for x in np.linspace(0, lmax, num=150):
-    ca_p = concentration_a(x, time_p, v, c0, 1)
-    conca_p.append(ca_p)
-    loca.append(x)
-
+loca = np.linspace(0, lmax, num=150)
+conca_p = advection_front(loca, time_p, v, c0)
 
 # Computation of breakthrough
 time = np.arange(0., tmax, tmax/150)
-conc = concentration(l, time, a, v, c0, 1)
+conc = breakthrough(l, time, v, a*v, c0)
 
 # Computation of breakthrough for advection only
-timea  = []
-conca  = []
-
-for t in range(0, tmax, dt):
-    ca = concentration_a(l, t, v, c0, 1)
-    
-    conca.append(ca)
-    timea.append(t)
+timea = np.arange(0, tmax, dt)
+conca = advection_front(l, timea, v, c0)
     
          
 # measurements
@@ -160,7 +131,7 @@ st.write("Concentration for an average velocity _v_ = ","% 7.3E"% v, " (m/s)")
 # PLOT FIGURE
 
 # General figure settings
-fig = plt.figure(figsize=(16,20))
+fig = plotting.figure(figsize=(16,20))
 gs = matplotlib.gridspec.GridSpec(3,1, height_ratios=[1,0.02,0.7])
 
 # Upper figure 
@@ -176,11 +147,12 @@ if plot_DATA == 1:
     ax.plot(t_obs, c_obs, 'ro', label="Measured")
 #ax.scatter(t_obs, c_obs, marker="x", c="red", zorder=10)
 
-plt.ylim(0, 1.12*c0)
-plt.xlim(0, tmax)
-plt.xticks(np.arange(0, 11000, 1000),fontsize=14)
-plt.yticks(fontsize=14)
-legend = plt.legend(loc='upper right', fontsize=14, framealpha=0.8)
+ax.set_ylim(0, 1.12*c0)
+ax.set_xlim(0, tmax)
+ax.set_xticks(np.arange(0, 11000, 1000))
+ax.tick_params(axis='x', labelsize=14)
+ax.tick_params(axis='y', labelsize=14)
+legend = ax.legend(loc='upper right', fontsize=14, framealpha=0.8)
 legend.get_frame().set_linewidth(0.0)
 
 # Lower figure
@@ -193,14 +165,15 @@ ax.set_ylabel ('Concentration (g/m³)', fontsize=14)
 ax.plot(loca, conca_p, 'orange', linewidth=2, label="Computed: ONLY Advection")  
 ax.plot(loc,  conc_p,  'green',    linewidth=2, label="Computed: Advection-Dispersion")
 
-plt.ylim(0, 1.19*c0)
-plt.xlim(0, lmax)
-plt.xticks(np.arange(0, 1.01*lmax, 0.1),fontsize=14)
-plt.yticks(fontsize=14)
-legend = plt.legend(loc='upper right', fontsize=14, framealpha=0.8)
+ax.set_ylim(0, 1.19*c0)
+ax.set_xlim(0, lmax)
+ax.set_xticks(np.arange(0, 1.01 * lmax, 0.1))
+ax.tick_params(axis='x', labelsize=14)
+ax.tick_params(axis='y', labelsize=14)
+legend = ax.legend(loc='upper right', fontsize=14, framealpha=0.8)
 legend.get_frame().set_linewidth(0.0)
 
-st.pyplot(fig)
+plotting.show(fig)
 
 if plot_DATA:
     columns4 = st.columns((1,1,1), gap = 'large')
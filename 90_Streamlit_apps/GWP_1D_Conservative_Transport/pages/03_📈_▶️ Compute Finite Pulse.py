@@ -1,11 +1,16 @@
 import matplotlib
-import matplotlib.pyplot as plt
-from scipy import special
 import numpy as np
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stateful_button import button
 from decimal import Decimal
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.transport import breakthrough, advection_front
+from hydrokit import plotting
 
 st.title('1D Transport with advection and dispersion')
 st.subheader('Solute input as :orange[Finite Pulse] ', divider="orange")
@@ -87,58 +92,7 @@ columns1 = st.columns((1,1,1), gap = 'large')
 columns1 = st.columns((1,1,1), gap = 'large')
 
 #FUNCTIONS FOR COMPUTATION; ADS = ADVECTION, DISPERSION AND SORPTION - EVENTUALLY SET RETARDATION TO 1 FOR NO SORPTION
-
-def IC(PE,r_time):
-    IC1 = np.sqrt(0.25*PE/r_time)*(1-r_time)
-    if (IC1>0):
-        IC2 = 1-(1-special.erfc(abs(IC1)))
-    else:
-        IC2 = 1+(1-special.erfc(abs(IC1)))
-    IC3 = np.sqrt(0.25*PE/r_time)*(1+r_time)
-    if (IC3>0):
-        IC4 = 1-(1-special.erfc(abs(IC3)))
-    else:
-        IC4 = 1+(1-special.erfc(abs(IC3)))
-    if IC4 == 0:
-        IC5 = IC2
-    else:
-        IC5 = IC2+np.exp(PE)*IC4
-    IC  = 1-0.5*IC5
-    return IC
-
-def BC(PE,r_time, r_dur):
-    
-    # BCx positive pulse
-    BC1 = np.sqrt(0.25*PE/r_time)*(1-r_time)
-    if (BC1>0):
-        BC2 = 1-(1-special.erfc(abs(BC1)))
-    else:
-        BC2 = 1+(1-special.erfc(abs(BC1)))
-    BC3 = np.sqrt(0.25*PE/r_time)*(1+r_time)
-    BC4 = special.erfc(BC3)
-    if BC4 == 0:
-        BC5 = BC2
-    else:
-        BC5 = BC2 + np.exp(PE) * BC4
-    
-    # BCCx negative pulse
-    if r_time > r_dur:
-        BCC1 = np.sqrt(0.25 * PE / (r_time - r_dur)) * (1 - (r_time - r_dur))
-        if BCC1 > 0:
-            BCC2 = 1 - (1 - special.erfc(abs(BCC1)))
-        else:
-            BCC2 = 1 + (1 - special.erfc(abs(BCC1)))  
-        BCC3 = np.sqrt(0.25 * PE / (r_time - r_dur)) * (1 + (r_time - r_dur))
-        BCC4 = special.erfc(BCC3)
-        if BCC4 == 0:
-            BCC5 = BCC2
-        else:
-            BCC5 = BCC2 + np.exp(PE) * BCC4      
-    if r_time <= r_dur:
-        BC = 0.5 * BC5
-    else:
-        BC = 0.5 * (BC5 - BCC5)
-    return BC
+# see hydrokit/transport.py (breakthrough, advection_front)
 
 
 columns = st.columns((1,1), gap = 'large')
@@ -183,60 +137,20 @@ r_dur = dur/tPV
 r_dt =  dt/tPV
 
 # Defining time range
-t = np.arange(t0, t1+1, dt)
+time = np.arange(t0, t1+1, dt)
+
+# Compute concentration breakthrough for all times at once
+# ADVECTION-DISPERSION
+conc = breakthrough(l, time, v, D, c0, ci, dur)
+# Input pulse
+conca = advection_front(l, time, v, c0, ci, dur)
 
-# Computation of concentration (terms in brackets)
-# Set fraction of distance
-r_time = []
-time   = []
-conc   = []
-conca  = []
-   
-#compute concentration
-for t in range(t0, t1+1, dt):      
-    r_time = t/tPV
-    
-    # ADVECTION-DISPERSION
-    c = ci*IC(PE,r_time)+c0*BC(PE,r_time, r_dur)
-    conc.append(c)
-    
-    # Input pulse
-    if r_time < 1:
-        ca = 0
-    elif r_time > 1+r_dur:
-        ca = 0
-    else:
-        ca = c0
-    
-    conca.append(ca)
-    
-    time.append(t)
-        
 # measurements
 t_obs = [1000,	1250,	1500,	1750,	2000,	2250,	2500,	2750,	3000,	3250,	3500,	3750,	4000,	4250,	4500,	4750,	5000,	5250,	5500,	5750,	6000,	6250]
 c_obs = [16.08,	69.12,	168.85,	300.32,	440.37,	570.62,	681.23,	769.41,	836.55,	884.15,	901.09,	866.78,	778.96,	656.93,	525.37,	402.76,	298.71,	215.88,	152.87,	106.53,	73.29,	49.90]
 
-#compute concentration breakthrough
-for t in range(t0, t1+1, dt):      
-    r_time = t/tPV
-    	   
-    # ADVECTION-DISPERSION
-    c = ci*IC(PE,r_time)+c0*BC(PE,r_time, r_dur)
-    conc.append(c) 
-    # Input pulse
-    if r_time < 1:
-        ca = 0
-    elif r_time > 1+r_dur:
-        ca = 0
-    else:
-        ca = c0
-    
-    conca.append(ca)
-    
-    time.append(t)
-
 #PLOT FIGURE
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
 ax.set_title(f"Concentration breakthrough curve at x = {l} meters", fontsize=18)
 ax.set_xlabel ('Time (s)', fontsize=14)
@@ -247,17 +161,18 @@ ax.plot(time,conca, 'fuchsia', linewidth=2, label="Computed: ONLY Advection")
 ax.plot(time,conc, 'navy', linewidth=2, label="Computed: Advection-Dispersion")
 if plot_DATA == 1:
     ax.plot(t_obs, c_obs, 'ro', label="Measured")
-plt.ylim(0, 1.05*1000)
-plt.xlim(0,t1-1)
-plt.xticks(np.arange(0, 20001, 2500),fontsize=14)
-plt.yticks(fontsize=14)
-legend = plt.legend(loc='upper right', fontsize=14, framealpha=0.8)
+ax.set_ylim(0, 1.05*1000)
+ax.set_xlim(0,t1-1)
+ax.set_xticks(np.arange(0, 20001, 2500))
+ax.tick_params(axis='x', labelsize=14)
+ax.tick_params(axis='y', labelsize=14)
+legend = ax.legend(loc='upper right', fontsize=14, framealpha=0.8)
 legend.get_frame().set_linewidth(0.0)
 
 st.write("Concentration for an average velocity _v_ = ","% 7.3E"% v, " (m/s)")
 st.write("Source Duration = ","% 7.3E"% dur, " (s)")
     
-st.pyplot(fig)
+plotting.show(fig)
 
 if plot_DATA:
     columns1 = st.columns((1,1,1), gap = 'large')
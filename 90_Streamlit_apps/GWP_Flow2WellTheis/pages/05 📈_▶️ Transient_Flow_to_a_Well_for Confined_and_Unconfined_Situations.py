@@ -1,9 +1,14 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
 import streamlit_book as stb
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis, theis_unconfined
+from hydrokit import plotting
 
 st.title('Theis drawdown prediction for confined and unconfined aquifers')
 
@@ -58,38 +63,7 @@ st.markdown("""
 
 "---"
 
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-# (Here, the method computes the data for the well function. Those data can be used to generate a type curve.)
-u_max = 1
-r_max = 10000
-u  = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
-def compute_s_unconfined(T, SY, t, Q, r, b):
-    S_u = SY*b
-    u = theis_u(T, S_u, r, t)
-    s = theis_s(Q, T, u)
-    s_u = b - b * np.sqrt(1-2*s/b)
-    return s_u
+# (The well function $W(u)$, the Theis solution and the Jacob correction for unconfined aquifers are provided by the shared hydrokit.wells module)
 
 # This is the function to plot the graph with the data     
 
@@ -140,42 +114,43 @@ r = np.linspace(1, max_r, 200)
 r_neg = r * -1.0
     
 # Compute Q for each hydraulic gradient
-s  = compute_s(T, S, t, Q, r)
-s_u  = compute_s_unconfined(T, SY, t, Q, r, b)
+s  = theis(r, t, T, S, Q)
+s_u  = theis_unconfined(r, t, T, SY*b, Q, b)
 
 # Compute s for a specific point
 x_point = x_search
 x_point_u = x_search*-1
-y_point = compute_s(T, S, t, Q, x_point)
-y_point_u = compute_s_unconfined(T, SY, t, Q, x_point_u, b)
+y_point = theis(x_point, t, T, S, Q)
+y_point_u = theis_unconfined(x_point_u, t, T, SY*b, Q, b)
 
 textstr1 =('Unconfined')
 textstr2 =('Confined (above aquifer top)')
     
 # Plotting
-fig =plt.figure(figsize=(10, 6))
-
-plt.title('Drawdown prediction with Theis', fontsize=16)    
-plt.plot(r, s, linewidth=1.5, color='r', label=r'drawdown prediction confined')
-plt.plot(r_neg, s, linewidth=0.25, color='r', linestyle='dashed')
-plt.plot(r, s_u, linewidth=0.25, color='b', linestyle='dashed')
-plt.plot(r_neg, s_u, linewidth=1.5, color='b',label=r'drawdown prediction unconfined')
-plt.fill_between(r,s,max_s, facecolor='lightgrey')
-plt.fill_between(r_neg,s_u,max_s, facecolor='lightblue')
-plt.xlim(-max_r, max_r)
-plt.ylim(max_s,-5)
-plt.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='drawdown output confined') 
-plt.plot(x_point_u,y_point_u, marker='o', color='b',linestyle ='None', label='drawdown output unconfined') 
-plt.xlabel(r'Distance from the well in m', fontsize=14)
-plt.ylabel(r'Drawdown in m', fontsize=14)
-plt.text(-max_r*0.9, max_s*0.9, textstr1, fontsize=14,
+fig =plotting.figure(figsize=(10, 6))
+ax = fig.add_subplot()
+
+ax.set_title('Drawdown prediction with Theis', fontsize=16)    
+ax.plot(r, s, linewidth=1.5, color='r', label=r'drawdown prediction confined')
+ax.plot(r_neg, s, linewidth=0.25, color='r', linestyle='dashed')
+ax.plot(r, s_u, linewidth=0.25, color='b', linestyle='dashed')
+ax.plot(r_neg, s_u, linewidth=1.5, color='b',label=r'drawdown prediction unconfined')
+ax.fill_between(r,s,max_s, facecolor='lightgrey')
+ax.fill_between(r_neg,s_u,max_s, facecolor='lightblue')
+ax.set_xlim(-max_r, max_r)
+ax.set_ylim(max_s,-5)
+ax.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='drawdown output confined') 
+ax.plot(x_point_u,y_point_u, marker='o', color='b',linestyle ='None', label='drawdown output unconfined') 
+ax.set_xlabel(r'Distance from the well in m', fontsize=14)
+ax.set_ylabel(r'Drawdown in m', fontsize=14)
+ax.text(-max_r*0.9, max_s*0.9, textstr1, fontsize=14,
         verticalalignment='top')
-plt.text(max_r*0.25, max_s*0.9, textstr2, fontsize=14,
+ax.text(max_r*0.25, max_s*0.9, textstr2, fontsize=14,
         verticalalignment='top')
-plt.legend()
+ax.legend()
 #plt.grid(True)
 
-st.pyplot(fig)
+plotting.show(fig)
 
 # Result output below the interactive plot    
 columns2 = st.columns((2.0,5.0,0.1))
@@ -1,12 +1,17 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stylable_container import stylable_container
 from streamlit_extras.stateful_button import button
 from streamlit_extras.stodo import to_do
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import theis
+from hydrokit import plotting
 
 
 st.title('🙋 Transient Flow toward a well in a confined aquifer')
@@ -94,27 +99,8 @@ st.markdown('''
             '''
 )
 
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-# (Here, the method computes the data for the well function. Those data can be used to generate a type curve.)
+# (The well function $W(u)$ and the Theis solution are provided by the shared hydrokit.wells module)
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s 
-    
-    
 # Callback function to update session state
 def update_T():
     st.session_state.T_slider_value = st.session_state.T_input
@@ -136,12 +122,6 @@ st.session_state.Q = 0.000
 st.session_state.number_input = False  # Default to number_input
 
 # Fixed values
-u_max = 1
-r_max = 10000
-u  = [u_max for x in range(r_max)]
-u_inv  = [r_max/u_max for x in range(r_max)]
-w_u  = [well_function(u_max/r_max) for x in range(r_max)]
-
 max_s = 20
 max_r = 1000
 
@@ -214,55 +194,55 @@ def transient_flow_well():
     t = np.linspace(1, 604800, 200)
     
     # Compute drawdown for  1 and 2
-    s1 = compute_s(T, S, t_show, Q, r)
-    s2  = compute_s(T, S, t, Q, r_show)
+    s1 = theis(r, t_show, T, S, Q)
+    s2  = theis(r_show, t, T, S, Q)
     if comparison:
         # Compute drawdown for  1_2
-        s1_2 = compute_s(T2, S2, t_show, Q, r)
-        s2_2 = compute_s(T2, S2, t, Q, r_show)
+        s1_2 = theis(r, t_show, T2, S2, Q)
+        s2_2 = theis(r_show, t, T2, S2, Q)
     
     # Compute drawdown for a specific point
     x_point = r_show
-    y_point = compute_s(T, S, t_show, Q, r_show)
+    y_point = theis(r_show, t_show, T, S, Q)
     x2_point = t_show
-    y2_point = compute_s(T, S, t_show, Q, r_show)
+    y2_point = theis(r_show, t_show, T, S, Q)
     
     # Plotting and printing of results
-    fig=plt.figure(figsize=(15, 6))
+    fig=plotting.figure(figsize=(15, 6))
     
-    plt.subplot(1, 2, 1)    
-    plt.title('Drawdown vs Distance at seconds =  %8i' %x2_point, fontsize=16)
-    plt.plot(r, s1, linewidth=1., color='b', label=r'drawdown')
-    plt.plot(r_neg, s1, linewidth=1, color='b')
+    ax = fig.add_subplot(1, 2, 1)    
+    ax.set_title('Drawdown vs Distance at seconds =  %8i' %x2_point, fontsize=16)
+    ax.plot(r, s1, linewidth=1., color='b', label=r'drawdown')
+    ax.plot(r_neg, s1, linewidth=1, color='b')
     if comparison:
-        plt.plot(r, s1_2, linewidth=1., color='black', label=r'drawdown for T2 & S2', linestyle='dashed')
-        plt.plot(r_neg, s1_2, linewidth=1, color='black', linestyle='dashed')
-    plt.fill_between(r,s1,max_s, facecolor='lightblue')
-    plt.fill_between(r_neg,s1,max_s, facecolor='lightblue')
-    plt.xlim(-max_r, max_r)
-    plt.ylim(max_s,-5)
-    plt.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='drawdown plotted & printed below graph') 
-    plt.xlabel(r'Distance from well in m', fontsize=14)
-    plt.ylabel(r'Drawdown in m', fontsize=14)
-    plt.legend()
-    plt.grid(True)
+        ax.plot(r, s1_2, linewidth=1., color='black', label=r'drawdown for T2 & S2', linestyle='dashed')
+        ax.plot(r_neg, s1_2, linewidth=1, color='black', linestyle='dashed')
+    ax.fill_between(r,s1,max_s, facecolor='lightblue')
+    ax.fill_between(r_neg,s1,max_s, facecolor='lightblue')
+    ax.set_xlim(-max_r, max_r)
+    ax.set_ylim(max_s,-5)
+    ax.plot(x_point,y_point, marker='o', color='r',linestyle ='None', label='drawdown plotted & printed below graph') 
+    ax.set_xlabel(r'Distance from well in m', fontsize=14)
+    ax.set_ylabel(r'Drawdown in m', fontsize=14)
+    ax.legend()
+    ax.grid(True)
     
-    plt.subplot(1, 2, 2)
-    plt.title('Drawdown vs Time at meters =  %8i' %x_point, fontsize=16)
-    plt.plot(t, s2, linewidth=1., color='r', label=r'drawdown')
+    ax1 = fig.add_subplot(1, 2, 2)
+    ax1.set_title('Drawdown vs Time at meters =  %8i' %x_point, fontsize=16)
+    ax1.plot(t, s2, linewidth=1., color='r', label=r'drawdown')
     if comparison:
-        plt.plot(t, s2_2, linewidth=1., color='black', label=r'drawdown for T2 & S2', linestyle='dashed')
-    plt.fill_between(t,s2,max_s, facecolor='mistyrose')
-    plt.plot(x2_point,y2_point, marker='o', color='b',linestyle ='None', label='drawdown plotted & printed below graph') 
-    plt.xlim(0, 86400*7)
-    plt.ylim(max_s,-5)
-    plt.xlabel(r'time in s', fontsize=14)
-    plt.ylabel(r'Drawdown in m', fontsize=14)
-    plt.xticks(np.arange(0, 7*86400, step=86400))  # Set label locations.
-    plt.legend()
-    plt.grid(True)
+        ax1.plot(t, s2_2, linewidth=1., color='black', label=r'drawdown for T2 & S2', linestyle='dashed')
+    ax1.fill_between(t,s2,max_s, facecolor='mistyrose')
+    ax1.plot(x2_point,y2_point, marker='o', color='b',linestyle ='None', label='drawdown plotted & printed below graph') 
+    ax1.set_xlim(0, 86400*7)
+    ax1.set_ylim(max_s,-5)
+    ax1.set_xlabel(r'time in s', fontsize=14)
+    ax1.set_ylabel(r'Drawdown in m', fontsize=14)
+    ax1.set_xticks(np.arange(0, 7*86400, step=86400))  # Set label locations.
+    ax1.legend()
+    ax1.grid(True)
     
-    st.pyplot(fig)
+    plotting.show(fig)
     
     st.write('**Drawdown  =  %5.2f' %y_point, ' m at distance = %8.2f' %x_point, ' m and time =  %8i' %x2_point, ' sec**')
     
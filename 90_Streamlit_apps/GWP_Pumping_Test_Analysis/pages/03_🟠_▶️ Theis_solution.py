@@ -1,12 +1,18 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import math
 import pandas as pd
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stateful_button import button
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, theis
+from hydrokit.fitting import compute_statistics
+from hydrokit import plotting
 
 st.title('🟠 :red[Theis] parameter estimation')
 
@@ -116,48 +122,8 @@ st.markdown("""
 """
 )
 # Computation
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-
-def well_function(u):
-    return scipy.special.exp1(u)
-    
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-    
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-    
-def compute_statistics(measured, computed):
-    # Calculate the number of values
-    n = len(measured)
-
-    # Initialize a variable to store the sum of squared differences
-    total_me = 0
-    total_mae = 0
-    total_rmse = 0
-
-    # Loop through each value
-    for i in range(n): # Add the squared difference to the total
-        total_me   += (computed[i] - measured[i])
-        total_mae  += (abs(computed[i] - measured[i]))
-        total_rmse += (computed[i] - measured[i])**2
-
-    # Calculate the me, mae, mean squared error
-    me = total_me / n
-    mae = total_mae / n
-    meanSquaredError = total_rmse / n
-
-    # Raise the mean squared error to the power of 0.5 
-    rmse = (meanSquaredError) ** (1/2)
-    return me, mae, rmse
+# (The well function $W(u)$ and the Theis solution are provided by the shared hydrokit.wells module,
+# the fit statistics by hydrokit.fitting)
 
 # Callback function to update session state
 def update_T(v):
@@ -268,12 +234,12 @@ def inverse(v):
     s = w_u * s_term
     
     # Compute point data for scatter plot 
-    m_ddown_theis = [compute_s(T, S, i, Qs, r) for i in m_time_s]
+    m_ddown_theis = theis(r, np.array(m_time_s), T, S, Qs)
     
     # Find the max for the scatter plot
     max_s = math.ceil(max(m_ddown)*10)/10
         
-    fig = plt.figure(figsize=(10,14))
+    fig = plotting.figure(figsize=(10,14))
     ax = fig.add_subplot(2, 1, 1)
     # Info-Box
     props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
@@ -287,21 +253,21 @@ def inverse(v):
         ax.plot(m_time_s, m_ddown,'go', label=r'measured drawdown - Varnum16/R12')
     else:
         ax.plot(m_time_s, m_ddown,'ro', label=r'measured drawdown - ideal data')
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.xticks(fontsize=14)
-    plt.yticks(fontsize=14)
+    ax.set_yscale("log")
+    ax.set_xscale("log")
+    ax.tick_params(axis='x', labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
     if refine_plot:
-        plt.axis([1E0,1E4,1E-2,1E+1])
+        ax.axis([1E0,1E4,1E-2,1E+1])
     else:
-        plt.axis([1E-1,1E5,1E-4,1E+1])
+        ax.axis([1E-1,1E5,1E-4,1E+1])
         ax.text((0.2),1.8E-4,'Coarse plot - Refine for final fitting')
     ax.grid(which="both")
-    plt.xlabel(r'time t in (s)', fontsize=14)
-    plt.ylabel(r'drawdown s in (m)', fontsize=14)
-    plt.title('Theis drawdown', fontsize=16)
-    plt.legend(fontsize=14)
-    plt.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+    ax.set_xlabel(r'time t in (s)', fontsize=14)
+    ax.set_ylabel(r'drawdown s in (m)', fontsize=14)
+    ax.set_title('Theis drawdown', fontsize=16)
+    ax.legend(fontsize=14)
+    ax.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
     
     if scatter:
         x45 = [0,200]
@@ -315,19 +281,19 @@ def inverse(v):
         else:
             ax.plot(m_ddown, m_ddown_theis,  'ro', label=r'measured')
         me, mae, rmse = compute_statistics(m_ddown, m_ddown_theis)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Measured s in m', fontsize=14)
-        plt.ylabel(r'Computed s in m', fontsize=14)
-        plt.ylim(0, max_s)
-        plt.xlim(0, max_s)
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Measured s in m', fontsize=14)
+        ax.set_ylabel(r'Computed s in m', fontsize=14)
+        ax.set_ylim(0, max_s)
+        ax.set_xlim(0, max_s)
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
                              r'$MAE = %.3f$ m' % (mae, ),
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
-        plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
+        ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
     
     
-    st.pyplot(fig)
+    plotting.show(fig)
     
     columns3 = st.columns((1,10,1), gap = 'medium')
     with columns3[1]:
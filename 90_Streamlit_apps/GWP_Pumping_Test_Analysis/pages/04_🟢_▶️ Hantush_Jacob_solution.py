@@ -1,13 +1,18 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
-import scipy.interpolate as interp
 import math
 import pandas as pd
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stateful_button import button
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, hantush_jacob, hantush_well_function
+from hydrokit.fitting import compute_statistics
+from hydrokit import plotting
 
 st.title('🟢 :green[Hantush-Jacob] parameter estimation')
 
@@ -128,54 +133,9 @@ with st.expander('**Click here for more information** about the underlying theor
 "---" 
           
 # Computation
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
+# (The well functions $W(u)$ and $W(u, r/B)$ are provided by the shared hydrokit.wells module,
+# the fit statistics by hydrokit.fitting)
 
-def well_function(u):
-    return scipy.special.exp1(u)
-    
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-    
-def Hantush_s(Q, T, u, u_HAN, w_u_HAN,r_div_B):
-    #Interpolate for discrete w_u_HAN
-    if r_div_B in [0, 1]:
-        method = 'nearest'
-    else:
-        method = 'linear'
-    w_u_HAN_interpolated = interp.interp1d(u_HAN, w_u_HAN[:, r_div_B], kind=method, fill_value="extrapolate")
-    s = Q / 4. / np.pi / T * w_u_HAN_interpolated(u)
-    return s
-    
-def compute_s(T, S, t, Q, r, u_HAN, w_u_HAN, r_div_B):
-    u = theis_u(T, S, r, t)
-    s = Hantush_s(Q, T, u, u_HAN, w_u_HAN,r_div_B)
-    return s
-
-def compute_statistics(measured, computed):
-    # Calculate the number of values
-    n = len(measured)
-
-    # Initialize a variable to store the sum of squared differences
-    total_me = 0
-    total_mae = 0
-    total_rmse = 0
-
-    # Loop through each value
-    for i in range(n): # Add the squared difference to the total
-        total_me   += (computed[i] - measured[i])
-        total_mae  += (abs(computed[i] - measured[i]))
-        total_rmse += (computed[i] - measured[i])**2
-
-    # Calculate the me, mae, mean squared error
-    me = total_me / n
-    mae = total_mae / n
-    meanSquaredError = total_rmse / n
-
-    # Raise the mean squared error to the power of 0.5 
-    rmse = (meanSquaredError) ** (1/2)
-    return me, mae, rmse
     
 # Callback function to update session state
 def update_T(v):
@@ -193,42 +153,8 @@ u_max = 4
 u = np.logspace(u_min,u_max)
 u_inv = 1/u
 w_u = well_function(u)
+u_HAN = np.logspace(-5, 0.5, 100)
 
-u_HAN = np.array([1.00E-05, 2.00E-05, 4.00E-05, 6.00E-05, 1.00E-04, 2.00E-04, 4.00E-04, 6.00E-04, 1.00E-03, 2.00E-03, 4.00E-03, 6.00E-03, 1.00E-02, 2.00E-02, 4.00E-02, 6.00E-02, 1.00E-01, 2.00E-01, 4.00E-01, 6.00E-01, 1 , 2])
-
-t_HAN     = [0]*len(u_HAN)
-s_HAN     = [0]*len(u_HAN)
-u_inv_HAN = [0]*len(u_HAN)
-
-for x in range(0,len(u_HAN)):
-        u_inv_HAN[x] = 1/u_HAN[x]
-
-# Hantush Jacob type curve data from tables
-
-w_u_HAN = [[9.420E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.300E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.010E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [8.770E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [8.400E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [7.820E+00, 6.620E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [7.190E+00, 6.450E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [6.800E+00, 6.270E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [6.310E+00, 5.970E+00, 4.830E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 5.450E+00, 4.710E+00, 3.500E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.850E+00, 4.420E+00, 3.480E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.480E+00, 4.180E+00, 3.430E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.000E+00, 3.810E+00, 3.290E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 3.340E+00, 3.240E+00, 2.950E+00, 2.180E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 2.630E+00, 2.480E+00, 2.020E+00, 1.520E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 2.260E+00, 2.170E+00, 1.850E+00, 1.460E+00, 8.390E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 1.800E+00, 1.750E+00, 1.560E+00, 1.310E+00, 8.190E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 1.190E+00, 1.110E+00, 9.960E-01, 7.150E-01, 4.100E-01, 2.270E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 6.930E-01, 6.650E-01, 6.210E-01, 5.020E-01, 3.400E-01, 2.100E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 4.500E-01, 4.360E-01, 4.150E-01, 3.540E-01, 2.550E-01, 1.770E-01, 1.100E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 2.130E-01, 2.060E-01, 1.850E-01, 1.509E-01, 1.140E-01, 8.030E-02],
-           [9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 4.700E-02, 4.400E-02, 9.990E+02, 3.400E-02, 2.500E-02]]
-
-w_u_HAN = np.array(w_u_HAN)
 
 st.subheader(':green[Estimate $T$, $S$, and Leakage Factor $r/B$ by matching a Hantush-Jacob Curve to measured drawdown data]', divider="rainbow")
 
@@ -290,9 +216,9 @@ def inverse(v):
         S = 10 ** S_slider_value_new
         container.write("**Storativity (dimensionless)**: %5.2e" %S)
         # r/B
-        r_div_B_choice = st.selectbox("$r/B$",('0.01', '0.04', '0.1', '0.2', '0.4', '0.6', '1', '1.5', '2', '2.5'), key = 60+v,)
-        r_div_B_list = ['0.01', '0.04', '0.1', '0.2', '0.4', '0.6', '1', '1.5', '2', '2.5']
-        r_div_B = r_div_B_list.index(r_div_B_choice)
+        r_div_B_slider_value = st.slider("(log of) $r/B$", -3.0, 1.0, -2.0, 0.01, format="%4.2f", key = 60+v)
+        r_div_B = 10 ** r_div_B_slider_value
+        st.write("**r/B:** %5.3f" %r_div_B)
     
     # Select data
      # Drawdown data from Varnum 2016 / R12 
@@ -329,21 +255,17 @@ def inverse(v):
     s = w_u * s_term
 
     # Hantush Jacob curve
-    for x in range(0,len(u_HAN)):
-        t_HAN[x] = u_inv_HAN[x] * t_term
-        if (w_u_HAN[x][r_div_B] == 999):
-            s_HAN[x] = well_function(1/u_inv_HAN[x]) * s_term
-        else:
-            s_HAN[x] = w_u_HAN[x][r_div_B] * s_term
+    t_HAN = t_term / u_HAN
+    s_HAN = hantush_well_function(u_HAN, r_div_B) * s_term
         
     # Compute point data for scatter plot
-    m_ddown_Hantush = [compute_s(T, S, i, Qs, r, u_HAN, w_u_HAN, r_div_B) for i in m_time_s]
+    m_ddown_Hantush = hantush_jacob(r, np.array(m_time_s), T, S, Qs, r_div_B)
     
     # Find the max for the scatter plot
     max_s = math.ceil(max(m_ddown)*10)/10
         
         
-    fig = plt.figure(figsize=(10,14))
+    fig = plotting.figure(figsize=(10,14))
     ax = fig.add_subplot(2, 1, 1)
     # Info-Box
     props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
@@ -356,21 +278,21 @@ def inverse(v):
         ax.plot(m_time_s, m_ddown,'o', color='mediumorchid', label=r'measured drawdown - Pirna 24')
     else:
         ax.plot(m_time_s, m_ddown,'go', label=r'measured drawdown - Varnum 16')
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.xticks(fontsize=14)
-    plt.yticks(fontsize=14)
+    ax.set_yscale("log")
+    ax.set_xscale("log")
+    ax.tick_params(axis='x', labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
     if refine_plot:
-        plt.axis([1E1,1E5,1E-3,1E+1])
+        ax.axis([1E1,1E5,1E-3,1E+1])
     else:
-        plt.axis([1E-1,1E8,1E-4,1E+1])
+        ax.axis([1E-1,1E8,1E-4,1E+1])
         ax.text((0.2),1.8E-4,'Coarse plot - Refine for final fitting')
-    plt.xlabel(r'time t in (s)', fontsize=14)
-    plt.ylabel(r'drawdown s in (m)', fontsize=14)
-    plt.title(f"Hantush-Jacob drawdown with $r/B$ = {r_div_B_choice}", fontsize=16)
+    ax.set_xlabel(r'time t in (s)', fontsize=14)
+    ax.set_ylabel(r'drawdown s in (m)', fontsize=14)
+    ax.set_title(f"Hantush-Jacob drawdown with $r/B$ = {r_div_B:.3g}", fontsize=16)
     ax.grid(which="both")
-    plt.legend(fontsize=14)
-    plt.text(0.3, 0.95,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+    ax.legend(fontsize=14)
+    ax.text(0.3, 0.95,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
     
     if scatter:
         x45 = [0,200]
@@ -382,17 +304,17 @@ def inverse(v):
         else:
             ax.plot(m_ddown, m_ddown_Hantush,  'go', label=r'measured')
         me, mae, rmse = compute_statistics(m_ddown, m_ddown_Hantush)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Measured s in m', fontsize=14)
-        plt.ylabel(r'Computed s in m', fontsize=14)
-        plt.ylim(0, max_s)
-        plt.xlim(0, max_s)
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Measured s in m', fontsize=14)
+        ax.set_ylabel(r'Computed s in m', fontsize=14)
+        ax.set_ylim(0, max_s)
+        ax.set_xlim(0, max_s)
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
                              r'$MAE = %.3f$ m' % (mae, ),
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
-        plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
-    st.pyplot(fig)
+        ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
+    plotting.show(fig)
     
     columns3 = st.columns((1,10,1), gap = 'medium')
     with columns3[1]:
@@ -403,7 +325,7 @@ def inverse(v):
             st.write("- Transmissivity **$T$ = % 10.2E"% T, " m²/s**")
             st.write("- Storativity    **$S$ = % 10.2E"% S, "[dimensionless]**")
             st.write("- Thickness of aquitard **$b'$ = % 5.2f"% b2, " m**")
-            st.write("- Aquitard Vertical Hydraulic Conductivity **$K'$ = % 10.2E"% (T*b2*float(r_div_B_list[r_div_B])*float(r_div_B_list[r_div_B])/r/r), " m²/s**")
+            st.write("- Aquitard Vertical Hydraulic Conductivity **$K'$ = % 10.2E"% (T*b2*r_div_B*r_div_B/r/r), " m²/s**")
  
 inverse(1)
 
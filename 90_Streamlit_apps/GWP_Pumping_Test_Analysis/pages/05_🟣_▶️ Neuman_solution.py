@@ -1,13 +1,18 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
-import scipy.interpolate as interp
 import math
 import pandas as pd
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stateful_button import button
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, neuman, neuman_well_function
+from hydrokit.fitting import compute_statistics
+from hydrokit import plotting
 
 st.title('🟣 :violet[Neuman] parameter estimation')
 
@@ -126,55 +131,8 @@ with st.expander('**Click here for more information** about the underlying theor
 
 "---" 
 # Computation
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-
-def well_function(u):
-    return scipy.special.exp1(u)
-    
-def theis_u_inv(T,S,r,t):
-    u_inv = 1/(r ** 2 * S / 4. / T / t)
-    return u_inv
-
-def second_u_inv(T,SY,r,t):
-    u_inv = 1/(r ** 2 * SY / 4. / T / t)
-    return u_inv
-    
-def Neuman_s(Q, T, u, u_inv_NEU, w_u, beta):
-    #Interpolate for discrete w_u
-    method = 'linear'
-    w_u_interpolated = interp.interp1d(u_inv_NEU, w_u[:, beta], kind=method, fill_value="extrapolate")
-    s = Q / 4. / np.pi / T * w_u_interpolated(u)
-    return s
-
-def compute_s(T, S, t, Q, r, u_inv_NEU, w_u, beta):
-    u_inv = theis_u_inv(T, S, r, t)
-    s = Neuman_s(Q, T, u_inv, u_inv_NEU, w_u, beta)
-    return s
-    
-def compute_statistics(measured, computed):
-    # Calculate the number of values
-    n = len(measured)
-
-    # Initialize a variable to store the sum of squared differences
-    total_me = 0
-    total_mae = 0
-    total_rmse = 0
-
-    # Loop through each value
-    for i in range(n): # Add the squared difference to the total
-        total_me   += (computed[i] - measured[i])
-        total_mae  += (abs(computed[i] - measured[i]))
-        total_rmse += (computed[i] - measured[i])**2
-
-    # Calculate the me, mae, mean squared error
-    me = total_me / n
-    mae = total_mae / n
-    meanSquaredError = total_rmse / n
-
-    # Raise the mean squared error to the power of 0.5 
-    rmse = (meanSquaredError) ** (1/2)
-    return me, mae, rmse
+# (The well functions $W(u)$ and $W(u_A, u_B, \beta)$ are provided by the shared hydrokit.wells module,
+# the fit statistics by hydrokit.fitting)
 
 # Callback function to update session state
 def update_T():
@@ -196,62 +154,11 @@ u_max = 4
 
 u = np.logspace(u_min,u_max)
 u_inv = 1/u
-u_inv_a = np.array([4.00E-01, 8.00E-01, 1.40E+00, 2.40E+00, 4.00E+00, 8.00E+00, 1.40E+01, 2.40E+01, 4.00E+01, 8.00E+01, 1.40E+02, 2.40E+02, 4.00E+02, 8.00E+02, 1.40E+03, 2.40E+03, 4.00E+03, 8.00E+03])
-u_inv_b = np.array([1.40E-02, 2.40E-02, 4.00E-02, 8.00E-02, 1.40E-01, 2.40E-01, 4.00E-01, 8.00E-01, 1.40E+00, 2.40E+00, 4.00E+00, 8.00E+00, 1.40E+01, 2.40E+01, 4.00E+01, 8.00E+01, 1.40E+02, 2.40E+02, 4.00E+02, 8.00E+02, 1.00E+03])
 
 w_u = well_function(u)
+u_inv_a = np.logspace(-0.5, 4, 100)
+u_inv_b = np.logspace(-2, 3, 100)
 
-# Neuman type curve data from tables
-
-w_u_a = [[2.48E-02, 2.41E-02, 2.30E-02, 2.14E-02, 1.88E-02, 1.70E-02, 1.38E-02, 1.00E-02, 1.00E-02],
-         [1.45E-01, 1.40E-01, 1.31E-01, 1.19E-01, 9.88E-02, 8.49E-02, 6.03E-02, 3.17E-02, 1.74E-02],
-         [3.58E-01, 3.45E-01, 3.18E-01, 2.79E-01, 2.17E-01, 1.75E-01, 1.07E-01, 4.45E-02, 2.10E-02],
-         [6.62E-01, 6.33E-01, 5.70E-01, 4.83E-01, 3.43E-01, 2.56E-01, 1.33E-01, 4.76E-02, 2.14E-02],
-         [1.02E+00, 9.63E-01, 8.49E-01, 6.88E-01, 4.38E-01, 3.00E-01, 1.40E-01, 4.78E-02, 2.15E-02],
-         [1.57E+00, 1.46E+00, 1.23E+00, 9.18E-01, 4.97E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [2.05E+00, 1.88E+00, 1.51E+00, 1.03E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [2.52E+00, 2.27E+00, 1.73E+00, 1.07E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [2.97E+00, 2.61E+00, 1.85E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [3.56E+00, 3.00E+00, 1.92E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [4.01E+00, 3.23E+00, 1.93E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [4.42E+00, 3.37E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [4.77E+00, 3.43E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.16E+00, 3.45E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.40E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.54E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.59E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02]]
-
-w_u_a = np.array(w_u_a)
-
-w_u_b = [[5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.12E-01, 3.23E-01, 1.45E-01, 5.09E-02, 2.39E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.12E-01, 3.23E-01, 1.47E-01, 5.32E-02, 2.57E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.16E-01, 3.27E-01, 1.52E-01, 5.68E-02, 2.86E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.24E-01, 3.37E-01, 1.62E-01, 6.61E-02, 3.62E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.10E+00, 5.37E-01, 3.50E-01, 1.78E-01, 8.06E-02, 4.86E-02],
-         [5.62E+00, 3.46E+00, 1.95E+00, 1.11E+00, 5.57E-01, 3.74E-01, 2.05E-01, 1.06E-01, 7.14E-02],
-         [5.62E+00, 3.46E+00, 1.96E+00, 1.13E+00, 5.89E-01, 4.12E-01, 2.48E-01, 1.49E-01, 1.13E-01],
-         [5.62E+00, 3.46E+00, 1.98E+00, 1.18E+00, 6.67E-01, 5.06E-01, 3.57E-01, 2.66E-01, 2.31E-01],
-         [5.63E+00, 3.47E+00, 2.01E+00, 1.24E+00, 7.80E-01, 6.42E-01, 5.17E-01, 4.45E-01, 4.19E-01],
-         [5.63E+00, 3.49E+00, 2.06E+00, 1.35E+00, 9.54E-01, 8.50E-01, 7.63E-01, 7.18E-01, 7.03E-01],
-         [5.63E+00, 3.51E+00, 2.13E+00, 1.50E+00, 1.20E+00, 1.13E+00, 1.08E+00, 1.06E+00, 1.05E+00],
-         [5.64E+00, 3.56E+00, 2.31E+00, 1.85E+00, 1.68E+00, 1.65E+00, 1.63E+00, 9.99E+02, 9.99E+02],
-         [5.65E+00, 3.63E+00, 2.55E+00, 2.23E+00, 2.15E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.67E+00, 3.74E+00, 2.86E+00, 2.68E+00, 2.65E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.70E+00, 3.90E+00, 3.24E+00, 3.15E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.76E+00, 4.22E+00, 3.85E+00, 3.82E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.85E+00, 4.58E+00, 4.38E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.99E+00, 5.00E+00, 4.91E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [6.16E+00, 5.46E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [6.47E+00, 6.11E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [6.60E+00, 6.50E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02]]
-
-w_u_b = np.array(w_u_b)
-
-t_a_NEU = [0]*len(u_inv_a)
-s_a_NEU = [0]*len(u_inv_a)
-t_b_NEU = [0]*len(u_inv_b)
-s_b_NEU = [0]*len(u_inv_b)
 
 # Select data
 # Data from Pirna 2023
@@ -305,9 +212,9 @@ def inverse():
         T = 10 ** T_slider_value_new
         container.write("**Transmissivity in m²/s**: %5.2e" %T)
         # Parameter beta
-        beta_choice = st.selectbox("**beta**",('0.001','0.01', '0.06', '0.2', '0.6', '1', '2', '4', '6'),)
-        beta_list = ['0.001','0.01', '0.06', '0.2', '0.6', '1', '2', '4', '6']
-        beta = beta_list.index(beta_choice)
+        beta_slider_value = st.slider("**(log of) beta**", -3.0, 1.0, -3.0, 0.01, format="%4.2f")
+        beta = 10 ** beta_slider_value
+        st.write("**beta:** %5.3f" %beta)
         refine_plot = st.toggle("**Zoom in** on the **data in the graph**")
         scatter = st.toggle('Show scatter plot')
     with columns2[1]:
@@ -341,48 +248,22 @@ def inverse():
     s = w_u * s_term
 
     # Early Neuman curve
-    for x in range(0,len(u_inv_a)):
-        t_a_NEU[x] = u_inv_a[x] * t_a_term
-        s_a_NEU[x] = w_u_a[x][beta] * s_term
+    t_a_NEU = u_inv_a * t_a_term
+    s_a_NEU = neuman_well_function(1/u_inv_a, np.inf, beta) * s_term
     
     # Late Neuman curve
-    for x in range(0,len(u_inv_b)):
-        t_b_NEU[x] = u_inv_b[x] * t_b_term
-        if (w_u_b[x][beta] == 999):
-            s_b_NEU[x] = well_function(1/u_inv_b[x]) * s_term
-        else:
-            s_b_NEU[x] = w_u_b[x][beta] * s_term
+    t_b_NEU = u_inv_b * t_b_term
+    s_b_NEU = neuman_well_function(0, 1/u_inv_b, beta) * s_term
      
-    # Compute the switch time between the early and late curve
-    diffs_a_NEU = np.abs(np.gradient(s_a_NEU, t_a_NEU))
-    diffs_b_NEU = np.abs(np.gradient(s_b_NEU, t_b_NEU))
-
-    # Find indices where change is below threshold
-    threshold = 0.000001
-    plateau_indices_a = np.where(diffs_a_NEU < threshold)[0]
-    plateau_indices_b = np.where(diffs_b_NEU < threshold)[0]
-
-     # Get start and end times of the plateau
-    if len(plateau_indices_a) > 0:
-        plateau_start_a = t_a_NEU[plateau_indices_a[0]]
-    if len(plateau_indices_b) > 0:
-        plateau_start_b = t_b_NEU[plateau_indices_b[0]]  
-    switch_time = plateau_start_a + plateau_start_b / 2
-    
-    # Compute point data for scatter plot
-    m_ddown_Neuman_a = [compute_s(T, Sa, i, Qs, r, u_inv_a, w_u_a, beta) for i in m_time_s]
-    m_ddown_Neuman_b = [compute_s(T, SY, i, Qs, r, u_inv_b, w_u_b, beta) for i in m_time_s]
-    
-    # Recompile data and combine them according to switch time
+    # Compute point data for scatter plot (complete Neuman solution)
     if scatter:
-        m_ddown_Neuman_combined = [m1 if t <= switch_time else m2 for t, m1, m2 in zip(m_time_s, m_ddown_Neuman_a, m_ddown_Neuman_b)]
+        m_ddown_Neuman_combined = neuman(r, np.array(m_time_s), T, Sa, SY, Qs, beta)
         # Find the max for the scatter plot
         max_s1 = math.ceil(max(m_ddown*10))/10
-        max_s2 = math.ceil(max(m_ddown_Neuman_a)*10)/10
-        max_s3 = math.ceil(max(m_ddown_Neuman_b)*10)/10
-        max_s = max(max_s1, max_s2, max_s3)
+        max_s2 = math.ceil(max(m_ddown_Neuman_combined)*10)/10
+        max_s = max(max_s1, max_s2)
     
-    fig = plt.figure(figsize=(10,14))
+    fig = plotting.figure(figsize=(10,14))
     ax = fig.add_subplot(2, 1, 1)
     # Info-Box
     props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
@@ -395,41 +276,41 @@ def inverse():
     ax.plot(t_a_NEU, s_a_NEU, '--', color='dodgerblue',label=r'Computed ddown early - Neuman')
     ax.plot(t_b_NEU, s_b_NEU, '--', color='darkblue', label=r'Computed ddown late - Neuman')
     ax.plot(m_time_s, m_ddown,'o', color='mediumorchid', label=r'measured drawdown - Pirna 25')
-    plt.xticks(fontsize=14)
-    plt.yticks(fontsize=14)
-    plt.yscale("log")
-    plt.xscale("log")
+    ax.tick_params(axis='x', labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    ax.set_yscale("log")
+    ax.set_xscale("log")
     if refine_plot:
-        plt.axis([1E1,1E6,1E-3,1E+1])
+        ax.axis([1E1,1E6,1E-3,1E+1])
     else:
-        plt.axis([1E-1,1E8,1E-4,1E+1])
+        ax.axis([1E-1,1E8,1E-4,1E+1])
         ax.text((0.2),1.8E-4,'Coarse plot - Refine for final fitting')
-    plt.xlabel(r'time t in (s)', fontsize=14)
-    plt.ylabel(r'drawdown s in (m)', fontsize=14)
-    plt.title(f"Neuman drawdown with beta = {beta_choice}", fontsize=16)
+    ax.set_xlabel(r'time t in (s)', fontsize=14)
+    ax.set_ylabel(r'drawdown s in (m)', fontsize=14)
+    ax.set_title(f"Neuman drawdown with beta = {beta:.3g}", fontsize=16)
     ax.grid(which="both")
-    plt.legend(fontsize=14)
-    plt.text(0.3, 0.95,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+    ax.legend(fontsize=14)
+    ax.text(0.3, 0.95,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
     
     if scatter:
         x45 = [0,200]
         y45 = [0,200]
         ax = fig.add_subplot(2, 1, 2)
         ax.plot(x45,y45, '--')
-        plt.plot(m_ddown, m_ddown_Neuman_combined,  'o', color='mediumorchid')
+        ax.plot(m_ddown, m_ddown_Neuman_combined,  'o', color='mediumorchid')
         me, mae, rmse = compute_statistics(m_ddown, m_ddown_Neuman_combined)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Measured s in m', fontsize=14)
-        plt.ylabel(r'Computed s in m', fontsize=14)
-        plt.ylim(0, max_s)
-        plt.xlim(0, max_s)
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Measured s in m', fontsize=14)
+        ax.set_ylabel(r'Computed s in m', fontsize=14)
+        ax.set_ylim(0, max_s)
+        ax.set_xlim(0, max_s)
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
                              r'$MAE = %.3f$ m' % (mae, ),
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
-        plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
+        ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
    
-    st.pyplot(fig)
+    plotting.show(fig)
     
     columns3 = st.columns((1,10,1), gap = 'medium')
     with columns3[1]:
@@ -1,13 +1,18 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
-import scipy.interpolate as interp
 import math
 import io
 import pandas as pd
 import streamlit as st
 import streamlit_book as stb
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, theis, hantush_jacob, hantush_well_function, neuman, neuman_well_function
+from hydrokit.fitting import compute_statistics, fit_pumping_test
+from hydrokit import plotting, profiling
 
 st.title('🎯 Pumping Test Analysis with the :red[Theis], :green[Hantush-Jacob], and :violet[Neuman] solutions')
 
@@ -24,83 +29,8 @@ st.markdown("""
 "---"   
       
 # Computation
-# (Here the necessary functions like the well function $W(u)$ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
-
-def well_function(u):
-    return scipy.special.exp1(u)
-    
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-    
-def theis_u_inv(T,S,r,t):
-    u_inv = 1/(r ** 2 * S / 4. / T / t)
-    return u_inv
-    
-def second_u_inv(T,SY,r,t):
-    u_inv = 1/(r ** 2 * SY / 4. / T / t)
-    return u_inv    
-    
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-    
-def Hantush_s(Q, T, u, u_HAN, w_u_HAN,r_div_B):
-    #Interpolate for discrete w_u_HAN
-    if r_div_B in [0, 1]:
-        method = 'nearest'
-    else:
-        method = 'linear'
-    w_u_HAN_interpolated = interp.interp1d(u_HAN, w_u_HAN[:, r_div_B], kind=method, fill_value="extrapolate")
-    s = Q / 4. / np.pi / T * w_u_HAN_interpolated(u)
-    return s
-    
-def Neuman_s(Q, T, u, u_inv_NEU, w_u, beta):
-    #Interpolate for discrete w_u
-    method = 'linear'
-    w_u_interpolated = interp.interp1d(u_inv_NEU, w_u[:, beta], kind=method, fill_value="extrapolate")
-    s = Q / 4. / np.pi / T * w_u_interpolated(u)
-    return s
-    
-def compute_s_HAN(T, S, t, Q, r, u_HAN, w_u_HAN, r_div_B):
-    u = theis_u(T, S, r, t)
-    s = Hantush_s(Q, T, u, u_HAN, w_u_HAN,r_div_B)
-    return s
-    
-def compute_s_Theis(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-
-def compute_s_NEU(T, S, t, Q, r, u_inv_NEU, w_u, beta):
-    u_inv = theis_u_inv(T, S, r, t)
-    s = Neuman_s(Q, T, u_inv, u_inv_NEU, w_u, beta)
-    return s    
-    
-def compute_statistics(measured, computed):
-    # Calculate the number of values
-    n = len(measured)
-
-    # Initialize a variable to store the sum of squared differences
-    total_me = 0
-    total_mae = 0
-    total_rmse = 0
-
-    # Loop through each value
-    for i in range(n): # Add the squared difference to the total
-        total_me   += (computed[i] - measured[i])
-        total_mae  += (abs(computed[i] - measured[i]))
-        total_rmse += (computed[i] - measured[i])**2
-
-    # Calculate the me, mae, mean squared error
-    me = total_me / n
-    mae = total_mae / n
-    meanSquaredError = total_rmse / n
-
-    # Raise the mean squared error to the power of 0.5 
-    rmse = (meanSquaredError) ** (1/2)
-    return me, mae, rmse
+# (The well functions of the Theis, Hantush-Jacob and Neuman solutions are provided by the shared hydrokit.wells module,
+# the fit statistics by hydrokit.fitting)
 
 # Callback function to update session state
 def update_T():
@@ -111,6 +41,39 @@ def update_Ss():
     st.session_state.Ss_slider_value = st.session_state.Ss_input
 def update_SY():
     st.session_state.SY = st.session_state.SY_input
+def update_beta():
+    st.session_state.beta_slider_value = st.session_state.beta_input
+def update_r_div_B():
+    st.session_state.r_div_B_slider_value = st.session_state.r_div_B_input
+
+# Callback function for the automatic least-squares fit. The current input
+# values are used as starting values and replaced by the best-fit values.
+def auto_fit():
+    T = 10 ** st.session_state.T_slider_value
+    if st.session_state.Solution == 'Theis':
+        p0 = (T, 10 ** st.session_state.S_slider_value)
+        fit = fit_pumping_test(m_time_s, m_ddown, r, Qs, 'theis', p0)
+    elif st.session_state.Solution == 'Hantush-Jacob':
+        p0 = (T, 10 ** st.session_state.S_slider_value, 10 ** st.session_state.r_div_B_slider_value)
+        fit = fit_pumping_test(m_time_s, m_ddown, r, Qs, 'hantush_jacob', p0)
+    else:
+        p0 = (T, 10 ** st.session_state.Ss_slider_value * b, st.session_state.SY, 10 ** st.session_state.beta_slider_value)
+        fit = fit_pumping_test(m_time_s, m_ddown, r, Qs, 'neuman', p0)
+    st.session_state.fit = (st.session_state.Solution, st.session_state.Data, fit)
+    p = dict(zip(fit.names, fit.params))
+    new_values = {'T_slider_value': np.clip(np.log10(p['T']), -7.0, 0.0)}
+    if st.session_state.Solution == 'Neuman':
+        new_values['Ss_slider_value'] = np.clip(np.log10(p['S'] / b), -7.0, 0.0)
+        new_values['SY'] = np.clip(p['Sy'], 0.01, 0.50)
+        new_values['beta_slider_value'] = np.clip(np.log10(p['beta']), -3.0, 1.0)
+    else:
+        new_values['S_slider_value'] = np.clip(np.log10(p['S']), -7.0, 0.0)
+    if st.session_state.Solution == 'Hantush-Jacob':
+        new_values['r_div_B_slider_value'] = np.clip(np.log10(p['r_div_B']), -3.0, 1.0)
+    for key, value in new_values.items():
+        st.session_state[key] = round(float(value), 2)
+        # Remove the widget state, so that the inputs show the new values
+        st.session_state.pop(key.replace('_slider_value', '') + '_input', None)
     
 # (Here, the methode computes the data for the well function. Those data can be used to generate a type curve.)
 u_min = -5
@@ -118,96 +81,19 @@ u_max = 4
 
 u = np.logspace(u_min,u_max)
 u_inv = 1/u
-u_inv_a = np.array([4.00E-01, 8.00E-01, 1.40E+00, 2.40E+00, 4.00E+00, 8.00E+00, 1.40E+01, 2.40E+01, 4.00E+01, 8.00E+01, 1.40E+02, 2.40E+02, 4.00E+02, 8.00E+02, 1.40E+03, 2.40E+03, 4.00E+03, 8.00E+03])
-u_inv_b = np.array([1.40E-02, 2.40E-02, 4.00E-02, 8.00E-02, 1.40E-01, 2.40E-01, 4.00E-01, 8.00E-01, 1.40E+00, 2.40E+00, 4.00E+00, 8.00E+00, 1.40E+01, 2.40E+01, 4.00E+01, 8.00E+01, 1.40E+02, 2.40E+02, 4.00E+02, 8.00E+02, 1.00E+03])
 
-u_HAN = np.array([1.00E-05, 2.00E-05, 4.00E-05, 6.00E-05, 1.00E-04, 2.00E-04, 4.00E-04, 6.00E-04, 1.00E-03, 2.00E-03, 4.00E-03, 6.00E-03, 1.00E-02, 2.00E-02, 4.00E-02, 6.00E-02, 1.00E-01, 2.00E-01, 4.00E-01, 6.00E-01, 1 , 2])
 
 w_u = well_function(u)
+u_HAN = np.logspace(-5, 0.5, 100)
+u_inv_a = np.logspace(-0.5, 4, 100)
+u_inv_b = np.logspace(-2, 3, 100)
 
-t_HAN     = [0]*len(u_HAN)
-s_HAN     = [0]*len(u_HAN)
-u_inv_HAN = [0]*len(u_HAN)
-
-t_a_NEU = [0]*len(u_inv_a)
-s_a_NEU = [0]*len(u_inv_a)
-t_b_NEU = [0]*len(u_inv_b)
-s_b_NEU = [0]*len(u_inv_b)
 
-for x in range(0,len(u_HAN)):
-        u_inv_HAN[x] = 1/u_HAN[x]
-
-# Neuman type curve data from tables
-w_u_a = [[2.48E-02, 2.41E-02, 2.30E-02, 2.14E-02, 1.88E-02, 1.70E-02, 1.38E-02, 1.00E-02, 1.00E-02],
-         [1.45E-01, 1.40E-01, 1.31E-01, 1.19E-01, 9.88E-02, 8.49E-02, 6.03E-02, 3.17E-02, 1.74E-02],
-         [3.58E-01, 3.45E-01, 3.18E-01, 2.79E-01, 2.17E-01, 1.75E-01, 1.07E-01, 4.45E-02, 2.10E-02],
-         [6.62E-01, 6.33E-01, 5.70E-01, 4.83E-01, 3.43E-01, 2.56E-01, 1.33E-01, 4.76E-02, 2.14E-02],
-         [1.02E+00, 9.63E-01, 8.49E-01, 6.88E-01, 4.38E-01, 3.00E-01, 1.40E-01, 4.78E-02, 2.15E-02],
-         [1.57E+00, 1.46E+00, 1.23E+00, 9.18E-01, 4.97E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [2.05E+00, 1.88E+00, 1.51E+00, 1.03E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [2.52E+00, 2.27E+00, 1.73E+00, 1.07E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [2.97E+00, 2.61E+00, 1.85E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [3.56E+00, 3.00E+00, 1.92E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [4.01E+00, 3.23E+00, 1.93E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [4.42E+00, 3.37E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [4.77E+00, 3.43E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.16E+00, 3.45E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.40E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.54E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.59E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.08E+00, 5.07E-01, 3.17E-01, 1.41E-01, 4.78E-02, 2.15E-02]]
          
-w_u_a = np.array(w_u_a)
 
-w_u_b = [[5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.12E-01, 3.23E-01, 1.45E-01, 5.09E-02, 2.39E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.12E-01, 3.23E-01, 1.47E-01, 5.32E-02, 2.57E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.16E-01, 3.27E-01, 1.52E-01, 5.68E-02, 2.86E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.09E+00, 5.24E-01, 3.37E-01, 1.62E-01, 6.61E-02, 3.62E-02],
-         [5.62E+00, 3.46E+00, 1.94E+00, 1.10E+00, 5.37E-01, 3.50E-01, 1.78E-01, 8.06E-02, 4.86E-02],
-         [5.62E+00, 3.46E+00, 1.95E+00, 1.11E+00, 5.57E-01, 3.74E-01, 2.05E-01, 1.06E-01, 7.14E-02],
-         [5.62E+00, 3.46E+00, 1.96E+00, 1.13E+00, 5.89E-01, 4.12E-01, 2.48E-01, 1.49E-01, 1.13E-01],
-         [5.62E+00, 3.46E+00, 1.98E+00, 1.18E+00, 6.67E-01, 5.06E-01, 3.57E-01, 2.66E-01, 2.31E-01],
-         [5.63E+00, 3.47E+00, 2.01E+00, 1.24E+00, 7.80E-01, 6.42E-01, 5.17E-01, 4.45E-01, 4.19E-01],
-         [5.63E+00, 3.49E+00, 2.06E+00, 1.35E+00, 9.54E-01, 8.50E-01, 7.63E-01, 7.18E-01, 7.03E-01],
-         [5.63E+00, 3.51E+00, 2.13E+00, 1.50E+00, 1.20E+00, 1.13E+00, 1.08E+00, 1.06E+00, 1.05E+00],
-         [5.64E+00, 3.56E+00, 2.31E+00, 1.85E+00, 1.68E+00, 1.65E+00, 1.63E+00, 9.99E+02, 9.99E+02],
-         [5.65E+00, 3.63E+00, 2.55E+00, 2.23E+00, 2.15E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.67E+00, 3.74E+00, 2.86E+00, 2.68E+00, 2.65E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.70E+00, 3.90E+00, 3.24E+00, 3.15E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.76E+00, 4.22E+00, 3.85E+00, 3.82E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.85E+00, 4.58E+00, 4.38E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [5.99E+00, 5.00E+00, 4.91E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [6.16E+00, 5.46E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [6.47E+00, 6.11E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02],
-         [6.60E+00, 6.50E+00, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02, 9.99E+02]]
          
-w_u_b = np.array(w_u_b)
          
-# Hantush Jacob type curve data from tables
-w_u_HAN = [[9.420E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.300E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.010E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [8.770E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [8.400E+00, 6.670E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [7.820E+00, 6.620E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [7.190E+00, 6.450E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [6.800E+00, 6.270E+00, 4.850E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [6.310E+00, 5.970E+00, 4.830E+00, 3.510E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 5.450E+00, 4.710E+00, 3.500E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.850E+00, 4.420E+00, 3.480E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.480E+00, 4.180E+00, 3.430E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 4.000E+00, 3.810E+00, 3.290E+00, 2.230E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 3.340E+00, 3.240E+00, 2.950E+00, 2.180E+00, 1.550E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 2.630E+00, 2.480E+00, 2.020E+00, 1.520E+00, 8.420E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 2.260E+00, 2.170E+00, 1.850E+00, 1.460E+00, 8.390E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 1.800E+00, 1.750E+00, 1.560E+00, 1.310E+00, 8.190E-01, 4.271E-01, 2.280E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 1.190E+00, 1.110E+00, 9.960E-01, 7.150E-01, 4.100E-01, 2.270E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 6.930E-01, 6.650E-01, 6.210E-01, 5.020E-01, 3.400E-01, 2.100E-01, 1.174E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 4.500E-01, 4.360E-01, 4.150E-01, 3.540E-01, 2.550E-01, 1.770E-01, 1.100E-01],
-           [9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 2.130E-01, 2.060E-01, 1.850E-01, 1.509E-01, 1.140E-01, 8.030E-02],
-           [9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 9.990E+02, 4.700E-02, 4.400E-02, 9.990E+02, 3.400E-02, 2.500E-02]]  
 
-w_u_HAN = np.array(w_u_HAN)
 
 # Select data and solution
 columns = st.columns((1,1), gap = 'large')
@@ -342,6 +228,9 @@ st.markdown("""
 @st.fragment
 def inverse():
     # This is the function to plot the graph with the data   
+    # (timed per rerun of the fragment if HYDROKIT_PROFILE is set, see hydrokit/profiling.py)
+    profiling.start('Pumping_Test_Analysis')
+    profiling.mark('input')
 
     # Initialize session state for value and toggle state
     if "T_slider_value" not in st.session_state:
@@ -353,10 +242,14 @@ def inverse():
             st.session_state["Ss_slider_value"] = -5.0
         if "SY" not in st.session_state:
             st.session_state["SY"] = 0.25
+        if "beta_slider_value" not in st.session_state:
+            st.session_state["beta_slider_value"] = -3.0
     # This for Theis / Hantush-Jacob
     else:
         if "S_slider_value" not in st.session_state:
             st.session_state["S_slider_value"] = -4.0
+        if "r_div_B_slider_value" not in st.session_state:
+            st.session_state["r_div_B_slider_value"] = -2.0
 
     # Get input data
     # Define the minimum and maximum for the logarithmic scale
@@ -401,6 +294,7 @@ def inverse():
             container.write("**Storativity (dimensionless):** %5.2e" %S)            
         refine_plot = st.toggle("**Refine** the range of the **Data matching plot**")
         scatter = st.toggle('Show scatter plot')
+        st.button('**Fit automatically** (least squares)', on_click=auto_fit)
     with columns2[1]:
         if st.session_state.Solution == 'Neuman':
             # Specific Yield Sy
@@ -410,15 +304,18 @@ def inverse():
                 SY = st.slider('**Specific Yield**', 0.01, 0.50, st.session_state["SY"], 0.01, format="%4.2f", key="SY_input",on_change=update_SY)
             st.session_state["SY"] = SY
             # beta
-            beta_choice = st.selectbox("beta",('0.001','0.01', '0.06', '0.2', '0.6', '1', '2', '4', '6'),)
-            beta_list = ['0.001','0.01', '0.06', '0.2', '0.6', '1', '2', '4', '6']
-            beta = beta_list.index(beta_choice)
+            beta_slider_value = st.slider("(log of) beta", -3.0, 1.0, st.session_state["beta_slider_value"], 0.01, format="%4.2f", key="beta_input", on_change=update_beta)
+            st.session_state["beta_slider_value"] = beta_slider_value
+            beta = 10 ** beta_slider_value
+            st.write("**beta:** %5.3f" %beta)
         if st.session_state.Solution == 'Hantush-Jacob':
             # r/B
-            r_div_B_choice = st.selectbox("r/B",('0.01', '0.04', '0.1', '0.2', '0.4', '0.6', '1', '1.5', '2', '2.5'),)
-            r_div_B_list = ['0.01', '0.04', '0.1', '0.2', '0.4', '0.6', '1', '1.5', '2', '2.5']
-            r_div_B = r_div_B_list.index(r_div_B_choice)
+            r_div_B_slider_value = st.slider("(log of) r/B", -3.0, 1.0, st.session_state["r_div_B_slider_value"], 0.01, format="%4.2f", key="r_div_B_input", on_change=update_r_div_B)
+            st.session_state["r_div_B_slider_value"] = r_div_B_slider_value
+            r_div_B = 10 ** r_div_B_slider_value
+            st.write("**r/B:** %5.3f" %r_div_B)
     
+    profiling.mark('compute and plot')
     # Compute K and SS to provide parameters for plausibility check
     # (i.e. are the parameter in a reasonable range)
     K = T/b     # m/s
@@ -428,7 +325,7 @@ def inverse():
     s_term = Qs/(4 * np.pi * T)
     t_term = r**2 * S / 4 / T
       
-    fig = plt.figure(figsize=(10,14))
+    fig = plotting.figure(figsize=(10,14))
     ax = fig.add_subplot(2, 1, 1)
     
     # Info-Box
@@ -449,42 +346,19 @@ def inverse():
                      r'$S_y$ (-) = %3.2f' % (SY, )))
 
         # Early Neuman curve
-        for x in range(0,len(u_inv_a)):
-            t_a_NEU[x] = u_inv_a[x] * t_a_term
-            s_a_NEU[x] = w_u_a[x][beta] * s_term
+        t_a_NEU = u_inv_a * t_a_term
+        s_a_NEU = neuman_well_function(1/u_inv_a, np.inf, beta) * s_term
     
         # Late Neuman curve
-        for x in range(0,len(u_inv_b)):
-            t_b_NEU[x] = u_inv_b[x] * t_b_term
-            if (w_u_b[x][beta] == 999):
-                s_b_NEU[x] = well_function(1/u_inv_b[x]) * s_term
-            else:
-                s_b_NEU[x] = w_u_b[x][beta] * s_term
+        t_b_NEU = u_inv_b * t_b_term
+        s_b_NEU = neuman_well_function(0, 1/u_inv_b, beta) * s_term
                 
-        # Compute the switch time between the early and late curve
-        diffs_a_NEU = np.abs(np.gradient(s_a_NEU, t_a_NEU))
-        diffs_b_NEU = np.abs(np.gradient(s_b_NEU, t_b_NEU))
-    
-        # Find indices where change is below threshold
-        threshold = 0.000001
-        plateau_indices_a = np.where(diffs_a_NEU < threshold)[0]
-        plateau_indices_b = np.where(diffs_b_NEU < threshold)[0]
-    
-         # Get start and end times of the plateau
-        if len(plateau_indices_a) > 0:
-            plateau_start_a = t_a_NEU[plateau_indices_a[0]]
-        if len(plateau_indices_b) > 0:
-            plateau_start_b = t_b_NEU[plateau_indices_b[0]]  
-        switch_time = plateau_start_a + plateau_start_b / 2
-        
-        plt.title(f"Neuman drawdown with beta = {beta_choice}", fontsize=16)
+        ax.set_title(f"Neuman drawdown with beta = {beta:.3g}", fontsize=16)
         ax.plot(t_a, s, color='deepskyblue',label=r'Computed drawdown early - Theis')
         ax.plot(t_b, s, color='blue',label=r'Computed drawdown late - Theis')
         ax.plot(t_a_NEU, s_a_NEU, '--', color='dodgerblue', label=r'Computed drawdown early - Neuman')
         ax.plot(t_b_NEU, s_b_NEU, '--', color='darkblue', label=r'Computed drawdown late - Neuman')
         ax.plot(m_time_s, m_ddown, 'o', color='mediumorchid', label=r'measured drawdown')
-        #if scatter:
-        #    plt.vlines(switch_time,1E-4,1E+1,color='orangered',linestyles='dashdot', label='switch time scatter plot and statistics')
 
     if st.session_state.Solution == 'Hantush-Jacob':  
         # Theis curve
@@ -496,14 +370,10 @@ def inverse():
                      r'$S$ (-) = %10.2E' % (S, )))
 
         # Hantush Jacob curve
-        for x in range(0,len(u_HAN)):
-            t_HAN[x] = u_inv_HAN[x] * t_term
-            if (w_u_HAN[x][r_div_B] == 999):
-                s_HAN[x] = well_function(1/u_inv_HAN[x]) * s_term
-            else:
-                s_HAN[x] = w_u_HAN[x][r_div_B] * s_term
+        t_HAN = t_term / u_HAN
+        s_HAN = hantush_well_function(u_HAN, r_div_B) * s_term
       
-        plt.title(f"Hantush Jacob drawdown with $r/B$ = {r_div_B_choice}", fontsize=16)
+        ax.set_title(f"Hantush Jacob drawdown with $r/B$ = {r_div_B:.3g}", fontsize=16)
         ax.plot(t, s, label=r'Computed drawdown - Theis')
         ax.plot(t_HAN, s_HAN, 'b--', label=r'Computed drawdown - Hantush Jacob')
         ax.plot(m_time_s, m_ddown,'go', label=r'measured drawdown')
@@ -518,35 +388,33 @@ def inverse():
                      r'$T$ (m²/s) = %10.2E' % (T, ),
                      r'$S$ (-) = %10.2E' % (S, )))
         
-        plt.title('Theis drawdown', fontsize=16)
+        ax.set_title('Theis drawdown', fontsize=16)
         ax.plot(t, s, label=r'Computed drawdown - Theis')
         ax.plot(m_time_s, m_ddown,'ro', label=r'measured drawdown')
 
     if refine_plot:
-        plt.axis([1E1,1E5,1E-3,1E+1])
+        ax.axis([1E1,1E5,1E-3,1E+1])
     else:
-        plt.axis([1,1E8,1E-4,1E+1])
+        ax.axis([1,1E8,1E-4,1E+1])
         ax.text((2),1.8E-4,'Coarse plot - Refine for final fitting')
-    plt.yscale("log")
-    plt.xscale("log")
-    plt.xlabel(r'time t in (s)', fontsize=14)
-    plt.ylabel(r'drawdown s in (m)', fontsize=14)
+    ax.set_yscale("log")
+    ax.set_xscale("log")
+    ax.set_xlabel(r'time t in (s)', fontsize=14)
+    ax.set_ylabel(r'drawdown s in (m)', fontsize=14)
     ax.grid(which="both")
-    plt.legend(fontsize=14)
-    plt.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+    ax.legend(fontsize=14)
+    ax.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
     
     if scatter:
         # Compute point data for scatter plot
         if st.session_state.Solution == 'Theis':
-            m_ddown_Theis = [compute_s_Theis(T, S, i, Qs, r) for i in m_time_s]
+            m_ddown_Theis = theis(r, np.array(m_time_s), T, S, Qs)
             
         if st.session_state.Solution == 'Hantush-Jacob':
-            m_ddown_Hantush = [compute_s_HAN(T, S, i, Qs, r, u_HAN, w_u_HAN, r_div_B) for i in m_time_s]
+            m_ddown_Hantush = hantush_jacob(r, np.array(m_time_s), T, S, Qs, r_div_B)
     
         if st.session_state.Solution == 'Neuman':
-            m_ddown_Neuman_a = [compute_s_NEU(T, Sa, i, Qs, r, u_inv_a, w_u_a, beta) for i in m_time_s]
-            m_ddown_Neuman_b = [compute_s_NEU(T, SY, i, Qs, r, u_inv_b, w_u_b, beta) for i in m_time_s]
-            m_ddown_Neuman_combined = [m1 if t <= switch_time else m2 for t, m1, m2 in zip(m_time_s, m_ddown_Neuman_a, m_ddown_Neuman_b)]
+            m_ddown_Neuman_combined = neuman(r, np.array(m_time_s), T, Sa, SY, Qs, beta)
       
         # Find the max for the scatter plot
         max_s = math.ceil(max(m_ddown)*10)/10
@@ -561,26 +429,34 @@ def inverse():
             ax.plot(m_ddown, m_ddown_Hantush,  'go', label=r'measured')
             me, mae, rmse = compute_statistics(m_ddown, m_ddown_Hantush)
         if st.session_state.Solution == 'Neuman':
-            plt.plot(m_ddown, m_ddown_Neuman_combined,  'o', color='mediumorchid')
+            ax.plot(m_ddown, m_ddown_Neuman_combined,  'o', color='mediumorchid')
             me, mae, rmse = compute_statistics(m_ddown, m_ddown_Neuman_combined)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Measured s in m', fontsize=14)
-        plt.ylabel(r'Computed s in m', fontsize=14)
-        plt.ylim(0, max_s)
-        plt.xlim(0, max_s)
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Measured s in m', fontsize=14)
+        ax.set_ylabel(r'Computed s in m', fontsize=14)
+        ax.set_ylim(0, max_s)
+        ax.set_xlim(0, max_s)
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
                              r'$MAE = %.3f$ m' % (mae, ),
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
-        plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
-    
-    st.pyplot(fig)
+        ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
     
     # Safe the figure
     # Convert figure to a BytesIO object
-    img_buffer = io.BytesIO()
-    fig.savefig(img_buffer, format="png")
-    img_buffer.seek(0)  # Reset buffer position
+    with profiling.phase('render'):
+        img_buffer = io.BytesIO()
+        fig.savefig(img_buffer, format="png")
+        img_buffer.seek(0)  # Reset buffer position
+    
+    plotting.show(fig)
+    profiling.mark('output')
+    
+    # Result of the automatic fit with the 95% confidence intervals
+    if "fit" in st.session_state and st.session_state.fit[:2] == (st.session_state.Solution, st.session_state.Data):
+        fit = st.session_state.fit[2]
+        st.write("**Automatic fit** (%s, %i iterations): RMSE = %5.3f m, R² = %5.3f" % ('converged' if fit.success else 'not converged', fit.n_iter, fit.stats['rmse'], fit.stats['r2']))
+        st.dataframe(pd.DataFrame({'best fit': fit.params, 'lower 95% bound': fit.ci[:, 0], 'upper 95% bound': fit.ci[:, 1]}, index=fit.names).style.format('{:.3e}'))
     
     columns5 = st.columns((1,1,1), gap = 'large')
     with columns5[1]:
@@ -608,7 +484,7 @@ def inverse():
                 st.write("- Transmissivity **$T$ = % 10.2E"% T, " m²/s**")
                 st.write("- Storativity    **$S$ = % 10.2E"% S, "[dimensionless]**")
                 #st.write("- Thickness of aquitard **$b'$ = % 5.2f"% b, " m**")
-                #st.write("- Aquitard Vertical Hydraulic Conductivity **$K'$ = % 10.2E"% (T*b*float(r_div_B_list[r_div_B])*float(r_div_B_list[r_div_B])/r/r), " m²/s**")           
+                #st.write("- Aquitard Vertical Hydraulic Conductivity **$K'$ = % 10.2E"% (T*b*r_div_B*r_div_B/r/r), " m²/s**")           
             elif st.session_state.Solution == 'Neuman':
                 st.write("**Parameters and Results**")
                 st.write("- Distance of measurement from the well **$r$ = %3i" %r," m**")
@@ -621,6 +497,7 @@ def inverse():
                 st.write("- Specific Yield **$Sy$ = %5.3f"% SY, "[dimensionless]**")
                 #st.write("- Horizontal Hydraulic Conductivity **$K_h$ = % 10.2E"% (T/b), " m²/s**")
                 #st.write("- Vertical Hydraulic Conductivity **$K_v$ = % 10.2E"% (beta*(T/b)*b*b/r/r), " m²/s**")
+    profiling.finish()
 inverse()
 
 "---"
@@ -1,12 +1,18 @@
 # Loading the required Python libraries
 import numpy as np
-import matplotlib.pyplot as plt
-import scipy.special
 import math
 import streamlit as st
 import streamlit_book as stb
 from streamlit_extras.stateful_button import button
 from streamlit_extras.stodo import to_do
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.wells import well_function, theis
+from hydrokit.fitting import compute_statistics
+from hydrokit import plotting
 
 st.title('📈 Exercise and Application')
 
@@ -107,48 +113,9 @@ with st.expander(":blue[**Detailed instructions for the exercise are provided by
         ,"\n - **Use different values for the 'measurement noise'** while you repeat the procedure. You can define the measurement noise with the toggle 'Define the noise in the data' on the left control panel above the plot."
         ,"\n - **Use different lengths of measurement data by using the 'Provide data for a longer pumping test.**'")],"td09",)        
 
-# (Here the necessary functions like the well function _W(u)_ are defined. Later, those functions are used in the computation)
-# Define a function, class, and object for Theis Well analysis
+# (The well function _W(u)_ and the Theis solution are provided by the shared hydrokit.wells module,
+# the fit statistics by hydrokit.fitting)
 
-def well_function(u):
-    return scipy.special.exp1(u)
-
-def theis_u(T,S,r,t):
-    u = r ** 2 * S / 4. / T / t
-    return u
-
-def theis_s(Q, T, u):
-    s = Q / 4. / np.pi / T * well_function(u)
-    return s
-    
-def compute_s(T, S, t, Q, r):
-    u = theis_u(T, S, r, t)
-    s = theis_s(Q, T, u)
-    return s
-    
-def compute_statistics(measured, computed):
-    # Calculate the number of values
-    n = len(measured)
-
-    # Initialize a variable to store the sum of squared differences
-    total_me = 0
-    total_mae = 0
-    total_rmse = 0
-
-    # Loop through each value
-    for i in range(n): # Add the squared difference to the total
-        total_me   += (computed[i] - measured[i])
-        total_mae  += (abs(computed[i] - measured[i]))
-        total_rmse += (computed[i] - measured[i])**2
-
-    # Calculate the me, mae, mean squared error
-    me = total_me / n
-    mae = total_mae / n
-    meanSquaredError = total_rmse / n
-
-    # Raise the mean squared error to the power of 0.5 
-    rmse = (meanSquaredError) ** (1/2)
-    return me, mae, rmse
     
 def update_T():
     st.session_state.T_slider_value = st.session_state.T_input
@@ -188,7 +155,7 @@ m_time_all_s = [i*60 for i in m_time_all] # time in seconds
 max_noise = 50 # max noise - should not be smaller than 20 - see input slider 
 
 # Compute all random data 
-m_ddown_all = [compute_s(st.session_state.T_random, st.session_state.S_random, i, Qs, r) for i in m_time_all_s]
+m_ddown_all = theis(r, np.array(m_time_all_s), st.session_state.T_random, st.session_state.S_random, Qs)
 # Compute the random noise
 m_ddown_noise = [np.random.randint((100-max_noise), (100+max_noise))/100 for i in m_time_all_s]
 
@@ -281,7 +248,7 @@ def inverse():
     s1 = w_u * s_term
     
     # Compute point data for scatter plot 
-    m_ddown_theis = [compute_s(T, S, i, Qs, r) for i in m_time_s]
+    m_ddown_theis = theis(r, np.array(m_time_s), T, S, Qs)
     
     # Find the max for the scatter plot
     max_s = math.ceil(max(m_ddown)*10)/10
@@ -301,72 +268,72 @@ def inverse():
         t2_mo = t2/2629800
 
         # Compute s for prediction h
-        s  = compute_s(T, S, t2, Q_pred, r_pred)
+        s  = theis(r_pred, t2, T, S, Q_pred)
         # Compute s for a specific point
         x_point = t_search
-        y_point = compute_s(T, S, t_search, Q_pred, r_pred)
+        y_point = theis(r_pred, t_search, T, S, Q_pred)
 
         # Compute true s for prediction
-        true_s  = compute_s(T_random, S_random, t2, Q_pred, r_pred)
-        true_y_point = compute_s(T_random, S_random, t_search, Q_pred, r_pred)
+        true_s  = theis(r_pred, t2, T_random, S_random, Q_pred)
+        true_y_point = theis(r_pred, t_search, T_random, S_random, Q_pred)
             
-        fig = plt.figure(figsize=(12,14))
+        fig = plotting.figure(figsize=(12,14))
         ax = fig.add_subplot(2, 2, 1)
         ax.plot(t1, s1, label=r'Computed drawdown - Theis')
         ax.plot(m_time_s, m_ddown,'ro', label=r'synthetic drawdown with random noise')
-        plt.yscale("log")
-        plt.xscale("log")
+        ax.set_yscale("log")
+        ax.set_xscale("log")
         if refine_plot:
-            plt.axis([1,1E5,1E-3,10])
+            ax.axis([1,1E5,1E-3,10])
         else:
-            plt.axis([1,1E7,1E-4,1E+4])
+            ax.axis([1,1E7,1E-4,1E+4])
             ax.text((2),1.8E-4,'Coarse plot - Refine for final fitting')
-        plt.xlabel(r'time t in (s)', fontsize=14)
-        plt.ylabel(r'drawdown s in (m)', fontsize=14)
-        plt.title('Theis drawdown', fontsize=16)
+        ax.set_xlabel(r'time t in (s)', fontsize=14)
+        ax.set_ylabel(r'drawdown s in (m)', fontsize=14)
+        ax.set_title('Theis drawdown', fontsize=16)
         ax.grid(which="both")
-        plt.legend(('well function','measured'))
+        ax.legend(('well function','measured'))
 
         ax = fig.add_subplot(2, 2, 2)
         if per_pred <= 3:
-            plt.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
+            ax.plot(t2, s, linewidth=3., color='r', label=r'Drawdown prediction')
             if show_truth:
-                plt.plot(t2, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters')
-                plt.plot(t_search,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')            
-            plt.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-            plt.xlabel(r'Time in sec', fontsize=14)
-            plt.xlim(0, max_t)
+                ax.plot(t2, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters')
+                ax.plot(t_search,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')            
+            ax.plot(t_search,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+            ax.set_xlabel(r'Time in sec', fontsize=14)
+            ax.set_xlim(0, max_t)
         elif per_pred <= 7:
-            plt.plot(t2_h, s, linewidth=3., color='r', label=r'Drawdown prediction')
+            ax.plot(t2_h, s, linewidth=3., color='r', label=r'Drawdown prediction')
             if show_truth:
-                plt.plot(t2_h, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters')   
-                plt.plot(t_search_h,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')
-            plt.plot(t_search_h,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-            plt.xlabel(r'Time in hours', fontsize=14)
-            plt.xlim(0, max_t/3600)
+                ax.plot(t2_h, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters')   
+                ax.plot(t_search_h,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')
+            ax.plot(t_search_h,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+            ax.set_xlabel(r'Time in hours', fontsize=14)
+            ax.set_xlim(0, max_t/3600)
         elif per_pred <= 366:
-            plt.plot(t2_d, s, linewidth=3., color='r', label=r'Drawdown prediction')
+            ax.plot(t2_d, s, linewidth=3., color='r', label=r'Drawdown prediction')
             if show_truth:
-                plt.plot(t2_d, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters') 
-                plt.plot(t_search_d,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')            
-            plt.plot(t_search_d,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-            plt.xlabel(r'Time in days', fontsize=14)
-            plt.xlim(0, max_t/86400)
+                ax.plot(t2_d, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters') 
+                ax.plot(t_search_d,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')            
+            ax.plot(t_search_d,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+            ax.set_xlabel(r'Time in days', fontsize=14)
+            ax.set_xlim(0, max_t/86400)
         else:
-            plt.plot(t2_mo, s, linewidth=3., color='r', label=r'Drawdown prediction')
+            ax.plot(t2_mo, s, linewidth=3., color='r', label=r'Drawdown prediction')
             if show_truth:
-                plt.plot(t2_mo, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters')
-                plt.plot(t_search_mo,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')            
-            plt.plot(t_search_mo,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
-            plt.xlabel(r'Time in months', fontsize=14)
-            plt.xlim(0, max_t/2629800)
+                ax.plot(t2_mo, true_s, linewidth=3., color='g', label=r'Drawdown prediction with "true" parameters')
+                ax.plot(t_search_mo,true_y_point, marker='o', color='g',linestyle ='None', label='"true" drawdown output')            
+            ax.plot(t_search_mo,y_point, marker='o', color='b',linestyle ='None', label='drawdown output')
+            ax.set_xlabel(r'Time in months', fontsize=14)
+            ax.set_xlim(0, max_t/2629800)
 
-        plt.ylim(bottom=0, top=None)
+        ax.set_ylim(bottom=0, top=None)
         ax.invert_yaxis()
-        plt.ylabel(r'Drawdown in m', fontsize=14)
-        plt.title('Drawdown prediction with Theis', fontsize=16)
-        plt.legend()
-        plt.grid(True)
+        ax.set_ylabel(r'Drawdown in m', fontsize=14)
+        ax.set_title('Drawdown prediction with Theis', fontsize=16)
+        ax.legend()
+        ax.grid(True)
         
         if scatter:
             x45 = [0,200]
@@ -375,39 +342,39 @@ def inverse():
             ax.plot(x45,y45, '--')
             ax.plot(m_ddown, m_ddown_theis,  'ro', label=r'measured')
             me, mae, rmse = compute_statistics(m_ddown, m_ddown_theis)
-            plt.title('Scatter plot', fontsize=16)
-            plt.xlabel(r'Measured s in m', fontsize=14)
-            plt.ylabel(r'Computed s in m', fontsize=14)
-            plt.ylim(0, max_s)
-            plt.xlim(0, max_s)
+            ax.set_title('Scatter plot', fontsize=16)
+            ax.set_xlabel(r'Measured s in m', fontsize=14)
+            ax.set_ylabel(r'Computed s in m', fontsize=14)
+            ax.set_ylim(0, max_s)
+            ax.set_xlim(0, max_s)
             out_txt = '\n'.join((
                                  r'$ME = %.3f$ m' % (me, ),
                                  r'$MAE = %.3f$ m' % (mae, ),
                                  r'$RMSE = %.3f$ m' % (rmse, ))) 
-            plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
+            ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
         
         
-        st.pyplot(fig)
+        plotting.show(fig)
     else:
-        fig = plt.figure(figsize=(10,14))
+        fig = plotting.figure(figsize=(10,14))
         ax = fig.add_subplot(2, 1, 1)
         ax.plot(t1, s1, label=r'Computed drawdown - Theis')
         ax.plot(m_time_s, m_ddown,'ro', label=r'synthetic drawdown with random noise')
-        plt.yscale("log")
-        plt.xscale("log")
-        plt.xticks(fontsize=14)
-        plt.yticks(fontsize=14)
+        ax.set_yscale("log")
+        ax.set_xscale("log")
+        ax.tick_params(axis='x', labelsize=14)
+        ax.tick_params(axis='y', labelsize=14)
         if refine_plot:
-            plt.axis([1E1,1E5,1E-3,1E+1])
+            ax.axis([1E1,1E5,1E-3,1E+1])
         else:
-            plt.axis([1,1E7,1E-4,1E+2])
+            ax.axis([1,1E7,1E-4,1E+2])
             ax.text((2),1.8E-4,'Coarse plot - Refine for final fitting')
         ax.grid(which="both")
-        plt.xlabel(r'time t in (s)', fontsize=14)
-        plt.ylabel(r'drawdown s in (m)', fontsize=14)
-        plt.title('Theis drawdown', fontsize=16)
-        plt.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
-        plt.legend(fontsize=14)
+        ax.set_xlabel(r'time t in (s)', fontsize=14)
+        ax.set_ylabel(r'drawdown s in (m)', fontsize=14)
+        ax.set_title('Theis drawdown', fontsize=16)
+        ax.text(0.97, 0.15,out_txt, horizontalalignment='right', transform=ax.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+        ax.legend(fontsize=14)
         
         if scatter:
             x45 = [0,200]
@@ -416,18 +383,18 @@ def inverse():
             ax.plot(x45,y45, '--')
             ax.plot(m_ddown, m_ddown_theis,  'ro', label=r'measured')
             me, mae, rmse = compute_statistics(m_ddown, m_ddown_theis)
-            plt.title('Scatter plot', fontsize=16)
-            plt.xlabel(r'Measured s in m', fontsize=14)
-            plt.ylabel(r'Computed s in m', fontsize=14)
-            plt.ylim(0, max_s)
-            plt.xlim(0, max_s)
+            ax.set_title('Scatter plot', fontsize=16)
+            ax.set_xlabel(r'Measured s in m', fontsize=14)
+            ax.set_ylabel(r'Computed s in m', fontsize=14)
+            ax.set_ylim(0, max_s)
+            ax.set_xlim(0, max_s)
             out_txt = '\n'.join((
                                  r'$ME = %.3f$ m' % (me, ),
                                  r'$MAE = %.3f$ m' % (mae, ),
                                  r'$RMSE = %.3f$ m' % (rmse, ))) 
-            plt.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
+            ax.text(0.97*max_s, 0.05*max_s, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='wheat'), fontsize=14)
         
-        st.pyplot(fig)
+        plotting.show(fig)
     
     columns3 = st.columns((1,1), gap = 'medium')
     with columns3[0]:
@@ -1,8 +1,14 @@
 # Initialize the needed Python packages
 import math
 import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
+from hydrokit.soil import Soil
 import streamlit_book as stb
 
 st.title('Soil Water Retention characteristics')
@@ -73,24 +79,12 @@ FC  = tr + (ts - tr)/(1+(alpha*10**1.8)**n)**m      # field capacity
 eFC = FC - PWP                                      # effective field capacity
 
 # model output
-t_plot  = []                                        # t  = theta = moisture content
-p_plot  = []                                        # p  = phi   = suction head
-kr_plot = []                                        # kr = rel. permeability
-    
-for x in range (0, x_max):
-    t = tr + (ts-tr)*x/(x_max-1)                    # [-] moisture content; please note that range counts up to x_max-1
-    te = (t-tr)/(ts-tr)                             # [-] effective saturation      
-    if x == 0:
-        p     = 1E18                                # [cm] suction head
-        kr    = 0                                   # [-] relative hydraulic conductivity
-    else: 
-        p     = ((te**(-1/m)-1)**(1/n))/alpha                      
-        kr    = np.sqrt(te)*(1-(1-te**(1/m))**m)**2
-    t_plot.append(t)
-    p_plot.append(p)
-    kr_plot.append(kr)
+soil    = Soil('van_genuchten', dict(theta_r=tr, theta_s=ts, alpha=alpha, n=n))
+t_plot  = np.linspace(tr, ts, x_max)                # t  = theta = moisture content
+p_plot  = soil.suction(t_plot)                      # p  = phi   = suction head [cm] (infinite at tr)
+kr_plot = soil.relative_conductivity(p_plot)        # kr = rel. permeability
         
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax  = fig.add_subplot()
 ax.plot(t_plot, p_plot, 'r', markersize=3)
 ax.vlines(x= tr, ymin=1e-1, ymax=1e+5, linestyle='--')      
@@ -100,15 +94,15 @@ ax.hlines(y= 10**1.8, xmin=0, xmax=FC, colors='b')     #bottom green line
 ax.vlines(x= FC, ymin=1e-1, ymax=10**1.8, colors='b')
 ax.set(xlabel='water content [-]', ylabel ='suction head [cm]', xlim = [0, 0.7], ylim = [1e-1,1e+5], yscale = 'log' )
 ax.grid(which="both", color='grey',linewidth=0.5)
-st.pyplot(fig)
+plotting.show(fig)
 
 if plot4 == 1:
-    fig = plt.figure(figsize=(6,4))
+    fig = plotting.figure(figsize=(6,4))
     ax  = fig.add_subplot()
     ax.plot(t_plot, kr_plot, 'b', markersize = 3)
     ax.set(xlabel='water content [-]', ylabel='rel hydraulic conductivity [cm/d]', xlim = [0, 0.7], ylim = [0,1] )
     ax.grid(which="major", color='grey',linewidth=0.5)
-    st.pyplot(fig)
+    plotting.show(fig)
     
 st.write('Van Genuchten             m:', '{:.5f}'.format(m) )
 st.write('Permanent Wilting Point PWP:', '{:.2f}'.format(PWP) )
@@ -1,10 +1,16 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 import math
 from math import pi, tan
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import capture, plotting, tracking
 
 st.title('Well capture zone for a confined aquifer')
 
@@ -67,7 +73,7 @@ x_plot = 500 * x_scale
 y_plot = 1000 * y_scale
     
 # Plot
-fig = plt.figure(figsize=(8,6))
+fig = plotting.figure(figsize=(8,6))
 ax = fig.add_subplot(1, 1, 1)
 
 ax.plot(x,y, label='Well capture zone')
@@ -80,13 +86,57 @@ ax.set(xlim=(-10*x_plot,x_plot), ylim=(-y_plot, y_plot))
 #    ax.set(xlim=(-x_plot,10*x_plot), ylim=(-y_plot, y_plot))
     
 
-plt.fill_between(x,y,color='blue', alpha=.1)
-plt.fill_between(x,-y,color='blue', alpha=.1)
+ax.fill_between(x,y,color='blue', alpha=.1)
+ax.fill_between(x,-y,color='blue', alpha=.1)
 ax.grid()
-plt.legend()
+ax.legend()
 
-st.pyplot(fig)
+plotting.show(fig)
     
 st.write("Width of capture zone (m): %5.2f" %(2*ymax))
 st.write('Culmination point x_0 (m):  %5.2f' %x0)
     
+
+"---"
+st.subheader('Well field: Capture zones of several wells')
+st.markdown("""
+    The capture zones of several pumping and injection wells are computed by superposition of the complex potentials of the wells and of the regional flow (_K_, _i_ and _b_ from above, regional flow in x direction). Positive pumping rates stand for pumping, negative rates for injection. The boundaries of the capture zones are streamlines that run upstream from the stagnation points (points without flow) of the flow field. The isochrones (lines of equal travel time to the wells) are computed by tracking particles backward from the pumping wells.
+"""
+)
+
+if st.toggle('Compute the capture zones of a well field'):
+    porosity = st.slider('**Effective porosity (-)** for the travel times', 0.05, 0.5, 0.25, 0.01)
+    wells = st.data_editor(pd.DataFrame({'x (m)': [0., 0., -1500.], 'y (m)': [-300., 300., 0.], 'Q (m3/s)': [0.005, 0.005, -0.002]}),
+                           num_rows='dynamic')
+    wells = wells.dropna().to_numpy(dtype=float)
+    field = capture.WellField(wells, q0=K*i*b)
+
+    extent = (-10*x_plot, x_plot, -y_plot, y_plot)
+    xg = np.linspace(extent[0], extent[1], 600)
+    yg = np.linspace(extent[2], extent[3], 600)
+    psi = field.stream_function(xg[None, :], yg[:, None], cut_width=np.hypot(xg[1]-xg[0], yg[1]-yg[0]))
+    stagnation = field.stagnation_points()
+    lines = field.dividing_streamlines(extent)
+    days = (50, 100, 365)
+    zones = tracking.isochrones(lambda x, y, t: tracking.track(field, x, y, t, porosity, b, backward=True),
+                                wells[wells[:, 2] > 0, :2], np.array(days)*86400., radius=1.)
+
+    fig = plotting.figure(figsize=(8,6))
+    ax = fig.add_subplot(1, 1, 1)
+    ax.contour(xg, yg, psi, levels=40, colors='lightgrey', linewidths=0.8, negative_linestyles='solid')
+    for line in lines:
+        ax.plot(line.x, line.y, color='blue' if line.boundary else 'lightblue', linestyle='-' if line.boundary else '--')
+    ax.plot([], [], color='blue', label='Capture zone boundaries')
+    ax.plot([], [], color='lightblue', linestyle='--', label='Other dividing streamlines')
+    for k, zone in enumerate(zones):
+        ax.plot(zone.x, zone.y, color=('gold', 'darkorange', 'brown')[k % 3], label='%i days' % days[k] if k < 3 else None)
+    ax.plot(wells[wells[:, 2] > 0, 0], wells[wells[:, 2] > 0, 1], marker='o', color='r', linestyle='None', label='pumping wells')
+    ax.plot(wells[wells[:, 2] < 0, 0], wells[wells[:, 2] < 0, 1], marker='o', color='g', linestyle='None', label='injection wells')
+    ax.plot(stagnation.real, stagnation.imag, marker='x', color='k', linestyle='None', label='stagnation points')
+    ax.set(xlabel='x (m)', ylabel='y (m)',title='Capture zones of a well field (grey: streamlines)')
+    ax.set(xlim=extent[:2], ylim=extent[2:])
+    ax.legend()
+
+    plotting.show(fig)
+
+    st.write('Stagnation points: ', ', '.join('(%.1f, %.1f)' % (z.real, z.imag) for z in stagnation))
@@ -1,10 +1,15 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import math
 from math import pi, tan
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import streamlit_book as stb
 from streamlit_extras.stylable_container import stylable_container
 
@@ -97,27 +102,27 @@ def wellcapture(v):
     y_plot = 1000 * st.session_state.y_scale
     
     # Plot
-    fig = plt.figure(figsize=(8,6))
+    fig = plotting.figure(figsize=(8,6))
     ax = fig.add_subplot(1, 1, 1)
 
     if uncert:
         ax.plot(x1,y1, label='Well capture zone lower range',color='lightblue', linestyle='dashed')
         ax.plot(x,y, label='Well capture zone')
         ax.plot(x2,y2, label='Well capture zone upper range',color='grey', linestyle='dashed')
-        plt.fill_between(x1,x2,y1,y2,  color='blue', alpha=.07)
-        plt.fill_between(x2,y2,    color='blue', alpha=.1)
+        ax.fill_between(x1,x2,y1,y2,  color='blue', alpha=.07)
+        ax.fill_between(x2,y2,    color='blue', alpha=.1)
     else:
         ax.plot(x,y, label='Well capture zone')
-        plt.fill_between(x,y,color='blue', alpha=.1)
-        plt.fill_between(x,-y,color='blue', alpha=.1)
+        ax.fill_between(x,y,color='blue', alpha=.1)
+        ax.fill_between(x,-y,color='blue', alpha=.1)
     if accident:
         ax.plot(-1400,400, marker='o', color='r',linestyle ='None', label='Accident')
     ax.plot(x_well,y_well, marker='o', color='g',linestyle ='None', label='pumping well') 
     ax.set(xlabel='x (m)', ylabel='y (m)',title='Well capture zone of a pumping well')
     ax.set(xlim=(-10*x_plot,x_plot), ylim=(-y_plot, y_plot))
     ax.grid()
-    plt.legend()
-    st.pyplot(fig)
+    ax.legend()
+    plotting.show(fig)
     
     if uncert:
         st.write("Width of capture zone (m) from: %5.2f" %(2*ymax1), " to %5.2f" %(2*ymax2))
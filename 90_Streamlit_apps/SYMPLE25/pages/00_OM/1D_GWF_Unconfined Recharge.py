@@ -1,8 +1,13 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import streamlit_book as stb
 from streamlit_extras.stylable_container import stylable_container
 from streamlit_extras.stateful_button import button
@@ -200,12 +205,12 @@ R = R/1000/365.25/86400
 h = (hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
     
 # PLOT FIGURE
-fig = plt.figure(figsize=(9,6))
+fig = plotting.figure(figsize=(9,6))
 ax = fig.add_subplot(1, 1, 1)
-plt.title('Hydraulic head for 1D unconfined flow', fontsize=16)
+ax.set_title('Hydraulic head for 1D unconfined flow', fontsize=16)
 ax.plot(x,h)
-plt.xlabel(r'x in m', fontsize=14)
-plt.ylabel(r'hydraulic head in m', fontsize=14)
+ax.set_xlabel(r'x in m', fontsize=14)
+ax.set_ylabel(r'hydraulic head in m', fontsize=14)
 ax.fill_between(x,0,h, facecolor='lightblue')
     
 # Show BOUNDARY CONDITIONS hl, hr
@@ -233,11 +238,11 @@ max_y = max(h)
 max_x = x[h.argmax()]
 R_min_ms = K*abs(hl**2-hr**2)/L**2
 if R>R_min_ms:
-    plt.vlines(max_x,0,max_y, color="r")
-plt.ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
-plt.xlim(-50,L+50)
-plt.text(L, (hl*1.016), 'R: {:.2e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'))
-st.pyplot(fig)
+    ax.vlines(max_x,0,max_y, color="r")
+ax.set_ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
+ax.set_xlim(-50,L+50)
+ax.text(L, (hl*1.016), 'R: {:.2e} m/s '.format(R), horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'))
+plotting.show(fig)
 
 "---"
 
@@ -1,8 +1,13 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 st.title('Analytical solution for 1D unconfined flow with two defined head boundaries')
 st.subheader('Understanding :rainbow[Model Calibration]', divider="blue")
@@ -138,7 +143,7 @@ def computation():
     h=(hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5
     
     # PLOT FIGURE
-    fig = plt.figure(figsize=(9,12))
+    fig = plotting.figure(figsize=(9,12))
     ax = fig.add_subplot(2, 1, 1)
     ax.plot(x,h)
     if calib == 'Regular data':
@@ -154,9 +159,9 @@ def computation():
         # compute heads for measurments
         hm = [((hl**2-(hl**2-hr**2)/L*x+(R/K*x*(L-x)))**0.5) for x in xp3]
     ax.fill_between(x,0,h, facecolor='lightblue')
-    plt.title('Hydraulic head for 1D unconfined flow', fontsize=16)
-    plt.xlabel(r'x in m', fontsize=14)
-    plt.ylabel(r'hydraulic head in m', fontsize=14)
+    ax.set_title('Hydraulic head for 1D unconfined flow', fontsize=16)
+    ax.set_xlabel(r'x in m', fontsize=14)
+    ax.set_ylabel(r'hydraulic head in m', fontsize=14)
     
     # BOUNDARY CONDITIONS hl, hr
     ax.vlines(0, 0, hl, linewidth = 10, color='b')
@@ -173,15 +178,15 @@ def computation():
     max_x = x[h.argmax()]
     R_min_ms=K*abs(hl**2-hr**2)/L**2
     if R>R_min_ms:
-        plt.vlines(max_x,0,max_y, color="r")
+        ax.vlines(max_x,0,max_y, color="r")
 
-    plt.ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
-    plt.xlim(-50,L+50)
+    ax.set_ylim(hl*(1-y_scale/100),hr*(1+y_scale/100))
+    ax.set_xlim(-50,L+50)
     x_pos1 = 500
     x_pos2 = 2500
     y_pos1 = ((hr *(1+y_scale/100))-150)*0.9+150
-    plt.text(x_pos1, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
-    plt.text(x_pos2, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text(x_pos1, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text(x_pos2, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
     
     if scatter:
         x45 = [0,200]
@@ -197,11 +202,11 @@ def computation():
         if calib == 'Irregular data with noise':
             ax.plot(hm,hp3, 'bo', label=r'measured')
             me, mae, rmse = compute_statistics(hm, hp3)
-        plt.title('Scatter plot', fontsize=16)
-        plt.xlabel(r'Computed head in m', fontsize=14)
-        plt.ylabel(r'Measured head in m', fontsize=14)
-        plt.ylim(150, hr *(1+y_scale/100))
-        plt.xlim(150, hr *(1+y_scale/100))
+        ax.set_title('Scatter plot', fontsize=16)
+        ax.set_xlabel(r'Computed head in m', fontsize=14)
+        ax.set_ylabel(r'Measured head in m', fontsize=14)
+        ax.set_ylim(150, hr *(1+y_scale/100))
+        ax.set_xlim(150, hr *(1+y_scale/100))
         # Generate the data for printing in the plot
         out_txt = '\n'.join((
                              r'$ME = %.3f$ m' % (me, ),
@@ -209,9 +214,9 @@ def computation():
                              r'$RMSE = %.3f$ m' % (rmse, ))) 
         x_pos3 = ((hr *(1+y_scale/100))-150)*0.25+150
         y_pos3 = ((hr *(1+y_scale/100))-150)*0.82+150
-        plt.text(x_pos3, y_pos3, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=14)
+        ax.text(x_pos3, y_pos3, out_txt, horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=14)
         
-    st.pyplot(fig)
+    plotting.show(fig)
     
     if calib != 'No calibration':
         lc2, cc2, rc2 = st.columns((1,1,1), gap = 'large')
@@ -1,8 +1,13 @@
 # Initialize librarys
 import matplotlib
-import matplotlib.pyplot as plt
 import numpy as np
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 
 
 st.title('Analytical solution for 1D unconfined flow with one defined head boundary/river boundary')
@@ -93,13 +98,13 @@ def computation():
     h = zb + np.sqrt(2 * (-R / 2 * (x ** 2 - L ** 2) + phiL) / K)
     
     # PLOT FIGURE
-    fig = plt.figure(figsize=(9,12))
+    fig = plotting.figure(figsize=(9,12))
     ax = fig.add_subplot(2, 1, 1)
     ax.plot(x,h)
     ax.fill_between(x,0,h, facecolor='lightblue')
-    plt.title('Hydraulic head for 1D unconfined flow', fontsize=16)
-    plt.xlabel(r'x in m', fontsize=14)
-    plt.ylabel(r'hydraulic head in m', fontsize=14)
+    ax.set_title('Hydraulic head for 1D unconfined flow', fontsize=16)
+    ax.set_xlabel(r'x in m', fontsize=14)
+    ax.set_ylabel(r'hydraulic head in m', fontsize=14)
     
     # BOUNDARY CONDITIONS hl, hr
     ax.vlines(0, 0, 1000, linewidth = 10, color='lightgrey')
@@ -110,17 +115,17 @@ def computation():
     else:
         ax.vlines(L, 0, hr, linewidth = 10, color='blue')
 
-    plt.ylim(hr *(1-y_scale/100),hr *(1+y_scale/100))
-    plt.xlim(-50,L+50)
+    ax.set_ylim(hr *(1-y_scale/100),hr *(1+y_scale/100))
+    ax.set_xlim(-50,L+50)
     x_pos1 = 400
     x_pos2 = 2500
     y_pos1 = ((hr *(1+y_scale/100))-150)*0.9+150
-    plt.text(x_pos1, y_pos1, 'No Flow bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+    ax.text(x_pos1, y_pos1, 'No Flow bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
     if riv:
-        plt.text(x_pos2, y_pos1, 'River bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+        ax.text(x_pos2, y_pos1, 'River bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
     else:
-        plt.text(x_pos2, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
+        ax.text(x_pos2, y_pos1, 'Defined head bc', horizontalalignment='right', bbox=dict(boxstyle="square", facecolor='lightgrey'), fontsize=12)
    
-    st.pyplot(fig)
+    plotting.show(fig)
     
 computation()
\ No newline at end of file
@@ -1,7 +1,12 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import pandas as pd 
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import decay, plotting
 
 st.title('Mass balance for a decay chain')
 
@@ -59,14 +64,25 @@ for i in range(0,n_simulation-1):
     A[i+1] = A[i]-R_A*A[i]
     B[i+1] = B[i]+R_A*A[i]-R_B*B[i] 
     C[i+1] = C[i]+R_B*B[i]
-    summ = A[i]+B[i]+C[i]  
+
+# exact solution of the mass budgets for continuous time (Bateman equations), all times at once
+time_exact = np.linspace(0, n_simulation-1, 1001)
+chain = decay.DecayChain([R_A, R_B, 0.])
+A_exact, B_exact, C_exact = chain.masses(time_exact, [A_0, B_0, C_0]).T
+
+steps = st.toggle('Show the yearly steps of the counting loop (spreadsheet computation)')
 
 # Output of results
 label = ["mass A (kg)", "mass B (kg)", "mass C (kg)"]
 
-fig = plt.figure(figsize=(9,6))
-plt.plot(time, A, time, B, time, C, linewidth=3);  # plotting the results
-plt.xlabel("Time [years]"); plt.ylabel("Mass [kg]") # placing axis labels
-plt.legend(label, loc=0);plt.grid(); plt.xlim([0,n_simulation-1]); plt.ylim(bottom=0) # legends, grids, x,y limits
-
-st.pyplot(fig)
\ No newline at end of file
+fig = plotting.figure(figsize=(9,6))
+ax = fig.add_subplot()
+ax.plot(time_exact, A_exact, time_exact, B_exact, time_exact, C_exact, linewidth=3);  # plotting the results
+if steps:
+    ax.set_prop_cycle(None)
+    ax.plot(time, A, 'o', time, B, 'o', time, C, 'o', markersize=3)
+    label = label + ["mass A (kg), yearly steps", "mass B (kg), yearly steps", "mass C (kg), yearly steps"]
+ax.set_xlabel("Time [years]"); ax.set_ylabel("Mass [kg]") # placing axis labels
+ax.legend(label, loc=0);ax.grid(); ax.set_xlim([0,n_simulation-1]); ax.set_ylim(bottom=0) # legends, grids, x,y limits
+
+plotting.show(fig)
\ No newline at end of file
@@ -1,5 +1,4 @@
 # Necessary libraries
-import matplotlib.pyplot as plt
 import matplotlib.animation
 import numpy as np
 from numpy import nan as NaN
@@ -8,6 +7,14 @@ import pandas as pd
 from IPython.display import clear_output
 import math
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.fdm import solve_confined_1d, iterations_1d
+from hydrokit.plotting import Animation
+from hydrokit import plotting
 
 st.title('Finite-Difference Numerical scheme')
 st.subheader('1D groundwater flow in a confined aquifer with uniform recharge', divider='blue')
@@ -35,10 +42,17 @@ with column[0]:
     st.write("_hydraulic conductivity_ in m/s: %5.2e" %K)
 with column[1]:
     st.write('**Parameter for the numerical solution**')
-    cells   = st.number_input('Number of cells', 3, 100, 11, 1)
+    cells   = st.number_input('Number of cells', 3, 100000, 11, 1)
     dx      = st.number_input('Spatial increment dx (in m)',1,1000,500,1)   
     st.session_state.i_max   = st.number_input('Max number of iterations', 5, 500, 50, 1)    
     st.session_state.epsilon = st.number_input('Closure criteria (in m)', 0.00001, 10., 0.001, 0.00001, format="%0.4f")
+    solver = st.selectbox('Solver', ['Jacobi', 'Gauss-Seidel', 'SOR', 'Direct (tridiagonal)'],
+                          help='The iterative solvers show every iteration, the direct solver computes the heads in one step')
+    if solver == 'SOR':
+        omega = st.slider('Relaxation factor ω', 1.0, 1.99, 1.5, 0.01)
+    else:
+        omega = 1.
+    fps = st.select_slider('Animation frames per second', [1, 2, 5, 10, 'every iteration'], 5, help='The figure is redrawn at most this often during the iterations; with every iteration all iterations are shown (slow)')
     st.session_state.analytic = st.toggle("Show analytic solution", help="Press here to start the iteration with the analytic solution")    
 
 i = 0
@@ -51,60 +65,55 @@ L = (cells-1) * dx
 # Transmissivität = Konstant in der Variante homogen / gespannt
 T = K * m
     
-# Recharge (GWN) and initial head (h)
-st.session_state.R =   [RCH_IN for x in range(cells)]        # Initialisieren von h und RCH (Anfangswasserstand und Grundwasserneubilung)
-h =   [(BC_R+BC_L)/2 for x in range(cells)] # Anfangswasserstand = Mittel beider Randbedingungen
-R_out = [0 for x in range(cells)]           # Ausgabeformat
-h_out = [0 for x in range(cells)]           # Ausgabeformat
-        
-# Recharge in m/s 
-for x in range(0, cells):
-    st.session_state.R[x] = st.session_state.R[x]/1000/24/3600/365.25
-    R_out[x] = "%7.1e"% (st.session_state.R[x])
+# Recharge (GWN) in m/s and initial head (h)
 RA = RCH_IN/1000/24/3600/365.25
+h = np.full(cells, (BC_R+BC_L)/2) # Anfangswasserstand = Mittel beider Randbedingungen
     
 # Boundary conditions (defined head)
 h[0]  = BC_L
 h[-1] = BC_R
-st.session_state.h_old = h.copy()
         
 # Maximaler / Minimaler Anfangswasserstand für Skalierung der Abbildung
-h_max = max(h)
-h_min = min(h)
+h_max = np.max(h)
+h_min = np.min(h)
 h_range = (h_max-h_min)
     
 # Analytical solution
-xa = np.arange(0, L,L/((cells-1)*dx))
+# at most 1001 points of the analytical solution, whatever the number of cells
+xa = np.linspace(0, L, min(cells, 1001))
 st.session_state.ha = RA/(2*T)*(L*xa-xa**2)+((BC_R-BC_L)/L)*xa+BC_L
-ymax = math.ceil(max(st.session_state.ha)*1.1)
+ymax = math.ceil(np.max(st.session_state.ha)*1.1)
 
 # Generate empty container for plot
 empty = st.empty()
 
+def head_figure(h, out_txt):
+    # Figure of the heads; the line of the heads and the info box are returned to update them during the iterations
+    props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
+    fig = plotting.figure(figsize=(10,7))
+    ax1 = fig.add_subplot(1, 1, 1)
+    ax2 = ax1.twiny() 
+    line, = ax1.plot(h, '--o')
+    ax1.set_ylim(h_min-h_range,ymax)
+    ax1.set_xlabel('Index cells (starting with 0)', fontsize=14)  
+    ax2.set_xlabel('Distance in m', fontsize=14)    
+    ax1.set_ylabel('Hydraulic head (m)',fontsize=14)
+    ax2.set_title('Finite Difference computation for 1D GW flow, confined / homogeneous', fontsize=16)
+    ax1.set_xlim(0,cells-1)      # Primäre X-Achse
+    ax2.set_xlim(0,L)            # Sekundäre X-Achse
+    info = ax1.text(0.75, 0.95,out_txt,transform=ax1.transAxes, fontsize=14, verticalalignment='top', bbox=props)
+    if st.session_state.analytic:
+        ax2.plot(xa,st.session_state.ha,'g')
+    return fig, line, info
+
 # Generate the initial figure
-# Info-Box
-props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
 out_txt = '\n'.join((
                          r'$i = %i$' % (i, ),
                          r'$i_{max} = %i$' % (st.session_state.i_max, ),
                          r'$eps = %.4f$' % (st.session_state.epsilon, )))   
-fig = plt.figure(figsize=(10,7))
-ax1 = fig.add_subplot(1, 1, 1)
-ax2 = ax1.twiny() 
-ax1.plot(h, '--o')
-plt.ylim(h_min-h_range,ymax)
-ax1.set_xlabel('Index cells (starting with 0)', fontsize=14)  
-ax2.set_xlabel('Distance in m', fontsize=14)    
-plt.ylabel('Hydraulic head (m)',fontsize=14)
-plt.title('Finite Difference computation for 1D GW flow, confined / homogeneous', fontsize=16)
-ax1.set_xlim(0,cells-1)      # Primäre X-Achse
-ax2.set_xlim(0,L)            # Sekundäre X-Achse
-plt.text(0.75, 0.95,out_txt,transform=ax1.transAxes, fontsize=14, verticalalignment='top', bbox=props)
-if st.session_state.analytic:
-    ax2.plot(xa,st.session_state.ha,'g')
-        
+fig, line, info = head_figure(h, out_txt)
 with empty.container():
-   st.pyplot(fig)
+   plotting.show(fig)
 
 # Run iterations
 
@@ -114,53 +123,54 @@ def computation():
     i = 0
     convergence = False
     if run:
+        if solver == 'Direct (tridiagonal)':
+            # One direct solution of the tridiagonal system (no head change)
+            steps = iter([(solve_confined_1d(cells, dx, T, RA, BC_L, BC_R), 0., 0.)])
+        else:
+            # Vectorized iterations, the heads are returned after every iteration
+            steps = iterations_1d(cells, dx, T, RA, BC_L, BC_R, solver.lower(), omega)
+        history = []
+        # The figure is built once, the iterations only update the heads and the info box
+        fig, line, info = head_figure(np.full(cells, np.nan), '')
+        animation = Animation(fig, empty, None if fps == 'every iteration' else fps)
         while i < st.session_state.i_max:
             # Increase iteration count
             i = i + 1       
             
             # Compute heads and head change
-            for x in range(1, (cells-1)):
-                h[x] = 0.5*(st.session_state.h_old[x-1]+st.session_state.h_old[x+1]+st.session_state.R[x]/T*dx**2)               
-            head_change = [(abs(h[x] - st.session_state.h_old[x])) for x in range(1, cells-1)]
-            max_head_change = max(head_change)
+            h, max_head_change, residual = next(steps)
+            history.append((max_head_change, residual))
 
-            # Save the current results
-            st.session_state.h_old = h.copy()
-        
             # Check closure criterion
             if(max_head_change <= st.session_state.epsilon):       # stop iteration
                 convergence = True
         
-            # Generate figure
-            # Info-Box
-            props   = dict(boxstyle='round', facecolor='wheat', alpha=0.5)
+            # Update figure (redrawn at most fps times per second)
             out_txt = '\n'.join((
                                      r'$i = %i$' % (i, ),
                                      r'$i_{max} = %i$' % (st.session_state.i_max, ),
                                      r'$dh_{max} = %.4f$' % (max_head_change, )))   
-            fig = plt.figure(figsize=(10,7))
-            ax1 = fig.add_subplot(1, 1, 1)
-            ax2 = ax1.twiny()
-            ax1.set_xlabel('Index cells (starting with 0)', fontsize=14)  
-            ax2.set_xlabel('Distance in m', fontsize=14)             
-            plt.ylabel('Hydraulic head (m)',fontsize=14)
-            plt.title('Finite Difference computation for 1D GW flow, confined / homogeneous', fontsize=16)
-            ax1.plot(h, '--o')
-            plt.ylim(h_min-h_range,ymax)
-            ax1.set_xlim(0,cells-1)      # Primäre X-Achse
-            ax2.set_xlim(0,L)            # Sekundäre X-Achse
-            plt.text(0.75, 0.95,out_txt,transform=ax1.transAxes, fontsize=14, verticalalignment='top', bbox=props)
-            if st.session_state.analytic:
-                ax2.plot(xa,st.session_state.ha,'g')
-        
-            with empty.container():
-               st.pyplot(fig)
+            line.set_ydata(h)
+            info.set_text(out_txt)
+            animation.frame()
                                
 # Abbruchkriterium der Iterationsschleife
             if convergence:       # Abbruch der Iteration
                 st.write('Convergence achieved')
                 break
+        # Show the last iteration and close the figure
+        animation.close()
         
+    # Convergence history of the iterative solvers
+    if run and solver != 'Direct (tridiagonal)':
+        fig_h, ax_h = plotting.subplots(figsize=(10,3))
+        ax_h.semilogy(range(1, len(history)+1), [dh for dh, r in history], 'o-', label='max. head change (m)')
+        ax_h.semilogy(range(1, len(history)+1), [r for dh, r in history], 's-', label='max. residual (m/s)')
+        ax_h.axhline(st.session_state.epsilon, color='grey', linestyle='--', label='closure criterion')
+        ax_h.set_xlabel('Iteration', fontsize=12)
+        ax_h.legend(fontsize=10)
+        plotting.show(fig_h)
+
     # If no convergence
     if convergence == False:        
         st.write('NO CONVERGENCE YET')
@@ -1,6 +1,14 @@
 # Loading the required Python libraries
 import streamlit as st
 from streamlit_extras.stodo import to_do
+import numpy as np
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import examples, fdm
+from hydrokit import plotting
 
 st.title('Modflow-2005/MODELMUSE Tutorial')
 
@@ -330,6 +338,63 @@ with st.expander(":blue[**Step 5: Postprocessing**] - Expand to see the instruct
         
     st.video(videourl5)
     
+# MODEL IN THE APP
+
+with st.expander(":green[**Compare: The catchment model computed in this app**] - Expand to run the model without MODFLOW"):
+    st.markdown("""
+            #### The synthetic catchment computed in the app
+            The same model (grid, parameters, CHD, RCH, RIV and WEL) is computed here with a finite-difference model in Python (block centred like MODFLOW, unconfined layer). Compare the heads and the budget with your MODFLOW results and see how the parameters change the results.
+           """)
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        K_log = st.slider('**Hydraulic conductivity** log10(Kx) in m/s', -4., -1., np.log10(0.005), 0.01, format="%4.2f")
+        Kz_log = st.slider('**Conductivity of the K zone** log10(Kx) in m/s', -4., -1., np.log10(0.002), 0.01, format="%4.2f")
+        K, K_zone = 10**K_log, 10**Kz_log
+        st.write("_Kx = %5.2e m/s, K zone = %5.2e m/s_" %(K, K_zone))
+    with c2:
+        rch_left = st.slider('**Recharge west** of x = 2000 m in mm/a', 0, 500, 150, 10)
+        rch_right = st.slider('**Recharge east** of x = 2000 m in mm/a', 0, 500, 200, 10)
+        C_riv = st.slider('**River conductance** in m²/d per m', 10, 5000, 1000, 10)
+    with c3:
+        Q1 = st.slider('**Pumping rate well 1** in m³/d', 0, 10000, 2000, 100)
+        Q2 = st.slider('**Pumping rate well 2** in m³/d', 0, 10000, 5000, 100)
+
+    model = examples.synthetic_catchment(K, K_zone, rch_left, rch_right, (-Q1, -Q2), C_riv)
+    result = fdm.solve_flow(**model)
+    # cells with heads below the aquifer bottom (250 m) are dry
+    head = np.where(result.head[0] > 250., result.head[0], np.nan)
+    x = np.arange(40) * 100. + 50.
+    y = 2500. - (np.arange(25) * 100. + 50.)
+
+    fig, ax = plotting.subplots(figsize=(10, 6.5))
+    cf = ax.contourf(x, y, head, levels=20, cmap='Blues')
+    cs = ax.contour(x, y, head, levels=20, colors='black', linewidths=0.8)
+    ax.clabel(cs, fmt='%.1f', fontsize=8)
+    ax.plot([-5, 2506], [-9, 1490], color='navy', linewidth=3, label='river')
+    ax.plot([2500, 2500, 4000], [2500, 1500, 1500], '--', color='grey', label='K zone')
+    for name, xw, yw in examples.SYNTHETIC_WELLS:
+        ax.plot(xw, yw, 'o', color='red')
+        ax.annotate(name, (xw, yw), xytext=(5, 5), textcoords='offset points')
+    fig.colorbar(cf, ax=ax, label='hydraulic head in m')
+    ax.set_xlim(0, 4000)
+    ax.set_ylim(0, 2500)
+    ax.set_aspect('equal')
+    ax.set_xlabel('x in m')
+    ax.set_ylabel('y in m')
+    ax.set_title('Computed hydraulic heads')
+    ax.legend(loc='lower right')
+    plotting.show(fig)
+
+    st.markdown("""
+            #### Water budget (compare with the budget of the MODFLOW listing file)
+           """)
+    budget = {name: (q_in * 86400, q_out * 86400) for name, (q_in, q_out) in result.budget.items() if q_in or q_out}
+    st.table({'Package': list(budget), 'IN (m³/d)': ['%.1f' % q[0] for q in budget.values()],
+              'OUT (m³/d)': ['%.1f' % q[1] for q in budget.values()]})
+    st.write('Percent discrepancy: %.2e %%, Picard iterations: %i' %(fdm.budget_discrepancy(result.budget), result.n_outer))
+    if not result.converged or np.isnan(head).any():
+        st.warning('The model did not converge or cells fell dry (white). Reduce the pumping rates or increase the conductivity.')
+
 # OPTIONALLY STEPS
     
 with st.expander(":blue[**OPTIONALLY Steps: Some further things to do**] - Expand to see the instructions"):
@@ -53,6 +53,7 @@ Section7 = st.Page(
 )
 
 section7proxy = st.Page("pages/Section_7/section7proxy.py", title="Section 7 topic", icon=":material/bug_report:")
+richards_1d = st.Page("pages/Section_7/richards_1d.py", title="Unsaturated flow - Richards equation 1D", icon=":material/bug_report:")
 
 Section8 = st.Page(
     "pages/Section_8/section8.py", title="Section 8", icon=":material/dashboard:", default=True
@@ -81,7 +82,7 @@ pg = st.navigation(
             "Section4": [Transport_1D_A,Transport_1D_AD,Transport_1D_ADR,Transport_1D_ADRD],
             "Section5": [section5proxy],
             "Section6": [section6proxy],
-            "Section7": [section7proxy],
+            "Section7": [section7proxy, richards_1d],
             "Section8": [section8proxy],
             "Section9": [section9proxy],
             "Section10": [section10proxy],
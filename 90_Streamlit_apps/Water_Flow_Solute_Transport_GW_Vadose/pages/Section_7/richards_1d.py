@@ -0,0 +1,122 @@
+import matplotlib
+import numpy as np
+import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit.soil import Soil
+from hydrokit.richards import solve_richards, hydrostatic
+from hydrokit import cache, plotting
+
+st.title('1D unsaturated flow with the Richards equation')
+
+st.write('The app simulates the water in a soil column above a water table. The mixed form of the Richards equation is solved with the modified Picard iteration (Celia et al. 1990) and adaptive time steps; the soil is described by the van Genuchten - Mualem model with the mean parameters of Carsel and Parrish (1988). Water is either ponded on the surface (infiltration experiment) or the surface receives a series of daily rain and evaporation. The water balance of the run shows how well the numerical solution conserves the mass.')
+"---"
+
+# van Genuchten parameters of Carsel and Parrish (1988): theta_r, theta_s, alpha (1/m), n, Ks (m/s)
+SOILS = {
+    'Sand':       (0.045, 0.43, 14.5, 2.68, 8.25e-5),
+    'Loamy sand': (0.057, 0.41, 12.4, 2.28, 4.05e-5),
+    'Sandy loam': (0.065, 0.41, 7.5, 1.89, 1.23e-5),
+    'Loam':       (0.078, 0.43, 3.6, 1.56, 2.89e-6),
+    'Silt loam':  (0.067, 0.45, 2.0, 1.41, 1.25e-6),
+    'Clay loam':  (0.095, 0.41, 1.9, 1.31, 7.22e-7),
+}
+
+
+@cache.cached(version='1')
+def run(texture, depth, water_table, nodes, scenario, duration, rain_probability, rain_mean, evaporation, bottom, seed):
+    """Simulation of the column (elevations from 0 at the bottom to depth at the surface)."""
+    theta_r, theta_s, alpha, n, Ks = SOILS[texture]
+    soil = Soil('van_genuchten', dict(theta_r=theta_r, theta_s=theta_s, alpha=alpha, n=n), Ks=Ks)
+    z = np.linspace(0., depth, nodes)
+    psi0 = hydrostatic(z, depth - water_table)
+    if scenario == 'Ponded infiltration':
+        t_end = duration * 3600.
+        return z, None, solve_richards(z, soil, psi0, t_end, psi_top=0., bottom=bottom, psi_bottom=psi0[0],
+                                       t_out=np.linspace(t_end / 6., t_end, 6))
+    days = int(duration * 365)
+    rng = np.random.default_rng(seed)
+    rain = np.where(rng.uniform(size=days) < rain_probability, rng.exponential(rain_mean, days), 0.)
+    # daily rain and evaporation (mm/d) as a step function in m/s
+    q_top = (np.arange(days) * 86400., (rain - evaporation) / 1000. / 86400.)
+    return z, rain, solve_richards(z, soil, psi0, days * 86400., q_top=q_top, bottom=bottom, psi_bottom=psi0[0],
+                                   t_out=np.linspace(days / 6., days, 6).round() * 86400.)
+
+
+columns = st.columns((1, 1), gap='large')
+
+with columns[0]:
+    texture = st.selectbox('**Soil texture**', list(SOILS), index=2)
+    scenario = st.radio('**Surface**', ('Ponded infiltration', 'Daily rain and evaporation'), horizontal=True)
+    if scenario == 'Ponded infiltration':
+        duration = st.slider('**Duration (h)**', 1, 72, 24, 1)
+    else:
+        duration = st.select_slider('**Duration (years)**', (0.25, 0.5, 1, 2, 3), 1)
+    bottom = st.radio('**Bottom of the column**', ('head', 'free', 'flux'), horizontal=True,
+                      format_func={'head': 'water table', 'free': 'free drainage', 'flux': 'impermeable'}.get)
+
+with columns[1]:
+    depth = st.slider('**Length of the column (m)**', 0.5, 10.0, 2.0, 0.5)
+    water_table = st.slider('**Initial depth of the water table (m)**', 0.0, depth, depth, 0.1)
+    nodes = st.select_slider('**Nodes**', (51, 101, 201, 501, 1001, 2001), 201)
+    if scenario == 'Ponded infiltration':
+        rain_probability, rain_mean, evaporation, seed = 0., 0., 0., 0
+    else:
+        rain_probability = st.slider('**Probability of a rain day**', 0.0, 1.0, 0.3, 0.05)
+        rain_mean = st.slider('**Mean rain of a rain day (mm)**', 1.0, 30.0, 8.0, 0.5)
+        evaporation = st.slider('**Evaporation demand (mm/d)**', 0.0, 5.0, 1.5, 0.1)
+        seed = st.number_input('**Seed of the rain series**', 0, 1000, 1)
+"---"
+
+with st.spinner('Solving the Richards equation ...'):
+    z, rain, result = run(texture, depth, water_table, nodes, scenario, duration, rain_probability, rain_mean,
+                          evaporation, bottom, seed)
+balance = result.balance
+unit = 3600. if scenario == 'Ponded infiltration' else 86400.
+label = 'h' if scenario == 'Ponded infiltration' else 'd'
+
+# PROFILES
+fig, (ax1, ax2) = plotting.subplots(1, 2, figsize=(12, 6), sharey=True)
+depth_below = depth - z
+colors = matplotlib.colormaps['viridis'](np.linspace(0., 0.9, len(result.times)))
+for t, psi, theta, color in zip(result.times, result.psi, result.theta, colors):
+    ax1.plot(theta, depth_below, color=color, label='%g %s' % (t / unit, label))
+    ax2.plot(psi, depth_below, color=color)
+ax1.set_xlabel(r'Water content $\theta$ (-)', fontsize=12)
+ax1.set_ylabel('Depth below surface (m)', fontsize=12)
+ax1.invert_yaxis()
+ax1.legend()
+ax2.set_xlabel(r'Pressure head $\psi$ (m)', fontsize=12)
+ax2.set_xscale('symlog', linthresh=1.)
+for ax in (ax1, ax2):
+    ax.grid(alpha=0.3)
+plotting.show(fig)
+
+# FLUXES
+fig, ax = plotting.subplots(figsize=(12, 4))
+t_mid = (result.t - result.dt / 2.) / unit
+ax.step(t_mid, result.q_top * 86400e3, where='mid', label='Infiltration (- evaporation)')
+ax.step(t_mid, result.q_bottom * 86400e3, where='mid', label='Inflow at the bottom')
+if balance['runoff'] > 0.:
+    ax.step(t_mid, result.runoff * 86400e3, where='mid', label='Runoff')
+if rain is not None:
+    ax.bar(np.arange(len(rain)) + 0.5, rain, width=1., color='lightblue', alpha=0.6, label='Rain')
+ax.set_xlabel('Time (%s)' % label, fontsize=12)
+ax.set_ylabel('Flux (mm/d)', fontsize=12)
+ax.grid(alpha=0.3)
+ax.legend()
+plotting.show(fig)
+
+# WATER BALANCE
+st.subheader('Water balance')
+columns = st.columns(4)
+columns[0].metric('Storage change (mm)', '%.2f' % (balance['storage_change'] * 1000.))
+columns[1].metric('Inflow at the surface (mm)', '%.2f' % (balance['inflow_top'] * 1000.))
+columns[2].metric('Inflow at the bottom (mm)', '%.2f' % (balance['inflow_bottom'] * 1000.))
+columns[3].metric('Runoff (mm)', '%.2f' % (balance['runoff'] * 1000.))
+st.write('Balance error: %.3g mm (%.2g %% of the water turned over) after %d time steps (%d rejected) with %d Picard iterations; the time steps were between %.3g s and %.3g h.'
+         % (balance['error'] * 1000., abs(balance['relative_error']) * 100., balance['steps'], balance['rejected'],
+            balance['iterations'], result.dt.min(), result.dt.max() / 3600.))
@@ -1,9 +1,14 @@
 import streamlit as st
+import sys
+from pathlib import Path
+root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from hydrokit import plotting
 import streamlit.components.v1 as components
 import os
 import math
 import numpy as np
-import matplotlib.pyplot as plt
 
 # Define path to the Bokeh HTML file inside the "DATA" folder
 html_file_path = os.path.join("99_INCOMING/DATA/Theis_Testing.html")
@@ -62,7 +67,7 @@ def some_streamlit_content(v):
         p_plot.append(p)
         kr_plot.append(kr)
             
-    fig = plt.figure(figsize=(9,6))
+    fig = plotting.figure(figsize=(9,6))
     ax  = fig.add_subplot()
     ax.plot(t_plot, p_plot, 'r', markersize=3)
     ax.vlines(x= tr, ymin=1e-1, ymax=1e+5, linestyle='--')      
@@ -72,15 +77,15 @@ def some_streamlit_content(v):
     ax.vlines(x= FC, ymin=1e-1, ymax=10**1.8, colors='b')
     ax.set(xlabel='water content [-]', ylabel ='suction head [cm]', xlim = [0, 0.7], ylim = [1e-1,1e+5], yscale = 'log' )
     ax.grid(which="both", color='grey',linewidth=0.5)
-    st.pyplot(fig)
+    plotting.show(fig)
     
     if plot4 == 1:
-        fig = plt.figure(figsize=(6,4))
+        fig = plotting.figure(figsize=(6,4))
         ax  = fig.add_subplot()
         ax.plot(t_plot, kr_plot, 'b', markersize = 3)
         ax.set(xlabel='water content [-]', ylabel='rel hydraulic conductivity [cm/d]', xlim = [0, 0.7], ylim = [0,1] )
         ax.grid(which="major", color='grey',linewidth=0.5)
-        st.pyplot(fig)
+        plotting.show(fig)
         
     st.write('Van Genuchten             m:', '{:.5f}'.format(m) )
     st.write('Permanent Wilting Point PWP:', '{:.2f}'.format(PWP) )
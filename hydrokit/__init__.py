@@ -0,0 +1,28 @@
+"""Shared computational kernels for the iNUX notebooks and Streamlit apps.
+
+The Streamlit pages in this repository are plain scripts that are re-run on
+every widget interaction. The functions collected here replace the helper
+functions that used to be copied into every page (well functions, drawdown
+solutions, ...). They work on NumPy arrays and broadcast over all arguments,
+so a complete curve or field is computed with one call instead of a Python
+loop over single values.
+
+The apps are started from their own directory, so they put the repository
+root on ``sys.path`` before importing this package::
+
+    import sys
+    from pathlib import Path
+    root = str(next(p for p in Path(__file__).resolve().parents if (p / "hydrokit").is_dir()))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    from hydrokit import wells
+
+Directories of pumping-test data can be evaluated without Streamlit with
+``python -m hydrokit.batch`` (see ``hydrokit/batch.py``). The kernels and
+pages are timed with ``python -m hydrokit.bench``, and the well-function
+tables shared by all server processes are built with
+``python -m hydrokit.tables``. Reruns of instrumented pages are timed with
+the environment variable ``HYDROKIT_PROFILE`` (see ``hydrokit/profiling.py``).
+"""
+
+__version__ = "0.1.0"
@@ -0,0 +1,180 @@
+"""Batch evaluation of pumping tests from the command line.
+
+Fits the Theis, Hantush-Jacob and/or Neuman solution to every time-drawdown
+file of a directory or glob pattern and writes one table with the fitted
+parameters, their confidence intervals and the fit statistics. The files are
+distributed over a pool of worker processes in chunks; each chunk is fitted
+with one call of ``fitting.fit_pumping_tests``.
+
+Example (run from the repository root)::
+
+    python -m hydrokit.batch 05_Applied_hydrogeology/DATA/Pumping_tests/Pirna24 \\
+        --r 91 --Q 0.01967 --model theis hantush_jacob --output pirna.csv --png-dir figs
+
+The input files have two columns, time (in minutes unless --time-factor is
+given) and drawdown in m, with or without a header line. Distances and
+pumping rates that differ between the wells are given in a CSV file with the
+columns name, r and Q (--wells), where name is the file name without suffix.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .fitting import MODELS, fit_pumping_tests, read_pumping_test
+from .wells import theis, hantush_jacob, neuman
+
+_SOLUTIONS = {'theis': theis, 'hantush_jacob': hantush_jacob, 'neuman': neuman}
+
+
+def find_files(inputs, pattern='*.csv'):
+    """Files given directly, as directories (searched for pattern) or as glob patterns."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            files += sorted(glob.glob(os.path.join(item, pattern)))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            files += sorted(glob.glob(item, recursive=True))
+    # remove duplicates but keep the order
+    return list(dict.fromkeys(os.path.normpath(f) for f in files))
+
+
+def _drawdown(model, r, t, Q, p):
+    """Drawdown of a model for the fitted parameters p (ordered as in MODELS)."""
+    if model == 'neuman':
+        return neuman(r, t, p[0], p[1], p[2], Q, p[3])
+    return _SOLUTIONS[model](r, t, p[0], p[1], Q, *p[2:])
+
+
+def _plot(path, name, t, s, r, Q, params):
+    """Save a log-log plot of the data and the fitted curves ({model: parameters})."""
+    # imported here, so that workers without PNG output do not load matplotlib
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    keep = (t > 0.) & (s > 0.)
+    t_plot = np.logspace(np.log10(t[keep].min()), np.log10(t[keep].max()), 200)
+    fig, ax = plt.subplots(figsize=(8, 6))
+    ax.plot(t[keep], s[keep], 'o', color='mediumorchid', markersize=3, label='measured drawdown')
+    for model, p in params.items():
+        ax.plot(t_plot, _drawdown(model, r, t_plot, Q, p), label='%s (T = %.2e m²/s)' % (model, p[0]))
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('time t in (s)')
+    ax.set_ylabel('drawdown s in (m)')
+    ax.set_title(name)
+    ax.grid(which='both')
+    ax.legend()
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+
+
+def fit_files(files, r, Q, models, time_factor=60., png_dir=None):
+    """Fit all models to the files; returns a list of result rows (dicts).
+
+    r and Q are sequences with one value per file.
+    """
+    names = [Path(f).stem for f in files]
+    data = [read_pumping_test(f, time_factor) for f in files]
+    fits = {model: fit_pumping_tests([d[0] for d in data], [d[1] for d in data], r, Q, model) for model in models}
+    rows = []
+    for model, fit in fits.items():
+        for i, (f, name) in enumerate(zip(files, names)):
+            row = {'file': f, 'well': name, 'model': model, 'r': r[i], 'Q': Q[i], 'n': fit.stats['n'][i]}
+            for j, p in enumerate(fit.names):
+                row[p] = fit.params[i, j]
+                row[p + '_lower'], row[p + '_upper'] = fit.ci[i, j]
+            for key in ('rmse', 'me', 'mae', 'r2', 'aic'):
+                row[key] = fit.stats[key][i]
+            row['success'] = bool(fit.success[i])
+            row['n_iter'] = int(fit.n_iter[i])
+            rows.append(row)
+    if png_dir is not None:
+        for i, (name, (t, s)) in enumerate(zip(names, data)):
+            _plot(os.path.join(png_dir, name + '.png'), name, t, s, r[i], Q[i],
+                  {model: fit.params[i] for model, fit in fits.items()})
+    return rows
+
+
+def run(files, r, Q, models=('theis',), time_factor=60., png_dir=None, jobs=None, chunk_size=64):
+    """Fit the models to all files in a process pool and return a DataFrame.
+
+    The table has one row per file and model. With jobs=1 everything runs in
+    the calling process.
+    """
+    r = np.broadcast_to(np.asarray(r, dtype=float), (len(files),))
+    Q = np.broadcast_to(np.asarray(Q, dtype=float), (len(files),))
+    for model in models:
+        if model not in MODELS:
+            raise ValueError("model must be one of %s" % ', '.join(MODELS))
+    if png_dir is not None:
+        os.makedirs(png_dir, exist_ok=True)
+    chunks = [slice(i, i + chunk_size) for i in range(0, len(files), chunk_size)]
+    args = [(files[c], r[c], Q[c], models, time_factor, png_dir) for c in chunks]
+    if jobs == 1 or len(chunks) <= 1:
+        rows = [fit_files(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rows = list(pool.map(fit_files, *zip(*args)))
+    return pd.DataFrame([row for chunk in rows for row in chunk])
+
+
+def write_table(table, path):
+    """Write the result table as Parquet (.parquet) or CSV (any other suffix)."""
+    if str(path).endswith('.parquet'):
+        table.to_parquet(path, index=False)
+    else:
+        table.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hydrokit.batch', description=__doc__.split('\n\n')[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help='CSV files, directories or glob patterns')
+    parser.add_argument('--model', nargs='+', default=['theis'], choices=list(MODELS),
+                        help='solutions to fit (default: theis)')
+    parser.add_argument('--r', type=float, help='distance of the observation wells in m')
+    parser.add_argument('--Q', type=float, help='pumping rate in m³/s')
+    parser.add_argument('--wells', help='CSV file with the columns name, r and Q for the individual wells')
+    parser.add_argument('--time-factor', type=float, default=60.,
+                        help='factor that converts the times of the files to s (default: 60, minutes)')
+    parser.add_argument('--output', default='pumping_tests.csv', help='result table (.csv or .parquet)')
+    parser.add_argument('--png-dir', help='directory for a plot of every well')
+    parser.add_argument('--jobs', type=int, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='wells fitted together by one worker')
+    args = parser.parse_args(argv)
+
+    files = find_files(args.inputs)
+    if not files:
+        parser.error('no input files found')
+    names = [Path(f).stem for f in files]
+    r = pd.Series(args.r, index=names, dtype=float)
+    Q = pd.Series(args.Q, index=names, dtype=float)
+    if args.wells:
+        wells = pd.read_csv(args.wells, dtype={'name': str}).set_index('name')
+        r.update(wells['r'])
+        Q.update(wells['Q'])
+    missing = r.index[r.isna() | Q.isna()]
+    if len(missing):
+        parser.error('no distance and pumping rate for: %s (use --r/--Q or --wells)' % ', '.join(missing))
+
+    table = run(files, r.values, Q.values, args.model, args.time_factor, args.png_dir, args.jobs, args.chunk_size)
+    write_table(table, args.output)
+    failed = table.loc[~table['success'], ['well', 'model']]
+    print('%i wells, %i fits written to %s' % (len(files), len(table), args.output))
+    if len(failed):
+        print('not converged: ' + ', '.join(failed['well'] + ' (' + failed['model'] + ')'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
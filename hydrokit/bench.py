@@ -0,0 +1,381 @@
+"""Benchmarks of the computational kernels and the Streamlit pages.
+
+Times the kernels of hydrokit at several problem sizes and runs every
+Streamlit page of the repository headlessly with
+``streamlit.testing.v1.AppTest``, and writes the results as JSON, so that
+the runs before and after a change (or on different servers) can be
+compared::
+
+    python -m hydrokit.bench --output before.json
+    python -m hydrokit.bench --output after.json --compare before.json
+    python -m hydrokit.bench --no-pages --kernels theis plume   # some kernels only
+    python -m hydrokit.bench --no-kernels --pages '05_Applied*'   # some pages only
+
+A kernel is called once to warm up and then ``--repeat`` times; the best
+time is reported together with the peak of the memory allocated during one
+call (``tracemalloc``). Every page runs in a fresh Python process in the
+directory the app is started from: the first run of the script is the cold
+start (including the imports of the page), the median of ``--reruns``
+further runs without any widget change the warm rerun latency, and the
+peak resident memory of the process is reported. Pages that raise (e.g.
+because an optional package is missing) are recorded with the error.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import scipy
+
+from . import __version__
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# Kernels: each function builds the input of the size n and returns the call
+# that is timed.
+
+def _theis(n):
+    from .wells import theis
+    r, t = np.logspace(0., 3., n)[:, None], np.logspace(1., 7., n)[None, :]
+    return lambda: theis(r, t, 1e-3, 1e-4, 0.01)
+
+
+def _hantush(n):
+    from .wells import hantush_well_function
+    rng = np.random.default_rng(1)
+    u, rb = 10. ** rng.uniform(-8., 1., n), 10. ** rng.uniform(-3., 1., n)
+    return lambda: hantush_well_function(u, rb)
+
+
+def _neuman(n):
+    from .wells import neuman_well_function
+    rng = np.random.default_rng(1)
+    u, beta = 10. ** rng.uniform(-5., 0.5, n), 10. ** rng.uniform(-3., 1., n)
+    return lambda: neuman_well_function(u, np.inf, beta) + neuman_well_function(0., u, beta)
+
+
+def _breakthrough(n):
+    from .transport import breakthrough
+    x, t = np.linspace(0., 100., n)[:, None], np.linspace(1., 1e7, n)[None, :]
+    return lambda: breakthrough(x, t, 1e-5, 1e-4, 1., duration=5e6, R=2., decay=1e-8)
+
+
+def _plume(n):
+    from .transport import PlumeField
+
+    def run():
+        field = PlumeField((0., 500.), (-50., 50.), (-10., 10.), n=n)
+        field.update(c0=1., v=1e-5, Dx=1e-5, Dy=1e-6, Dz=1e-7, t=3e7, Y=10., Z=5., down_only=False)
+        return field.xy(), field.xz()
+    return run
+
+
+def _solve_flow(n):
+    from .fdm import solve_flow
+    chd = [(0, row, 0, 10.) for row in range(n)] + [(0, row, n - 1, 5.) for row in range(n)]
+    wel = [(0, n // 2, n // 2, -0.01)]
+    return lambda: solve_flow(np.full(n, 10.), np.full(n, 10.), 20., 0., 1e-4, chd=chd, wel=wel, rch=1e-9)
+
+
+def _iterate_1d(n):
+    from .fdm import iterate_1d
+    return lambda: iterate_1d(n, 1000. / n, 1e-3, 1e-8, 10., 5., method='sor', omega=1.8, max_iter=100000,
+                              epsilon=1e-6)
+
+
+def _fit(n):
+    from .fitting import fit_pumping_tests
+    from .wells import theis
+    rng = np.random.default_rng(1)
+    t = [np.logspace(1., 5., 40)] * n
+    s = [theis(50., ti, 1e-3, 1e-4, 0.01) + rng.normal(0., 0.005, ti.size) for ti in t]
+    return lambda: fit_pumping_tests(t, s, 50., 0.01)
+
+
+def _capture(n):
+    from .capture import WellField
+    field = WellField([(0., 0., 0.01), (100., 50., 0.005)], q0=1e-5)
+    x, y = np.meshgrid(np.linspace(-500., 500., n), np.linspace(-300., 300., n))
+    return lambda: field.stream_function(x, y)
+
+
+def _capture_probability(n):
+    from scipy import stats
+    from .capture import capture_probability
+    x, y = np.meshgrid(np.linspace(-200., 50., 100), np.linspace(-100., 100., 80))
+    K = stats.lognorm(0.5, scale=1e-4)
+    return lambda: list(capture_probability(K, 0.001, 20., 0.01, x, y, n=n, seed=1))
+
+
+def _decay(n):
+    from .decay import DecayChain, U238_SERIES, decay_constants
+    chain = DecayChain(decay_constants([h for name, h in U238_SERIES]))
+    m0 = np.zeros(len(U238_SERIES))
+    m0[0] = 1.
+    t = np.linspace(0., 1e13, n)
+    return lambda: chain.masses(t, m0)
+
+
+def _superposition(n):
+    from .superposition import Boundary, PumpingSchedule
+    times = np.arange(n) * 3600.
+    rates = np.where(np.arange(n) % 24 < 8, 0.01, 0.)
+    wells = PumpingSchedule([0., 200.], [100., 150.], times, rates, 1e-3, 1e-4,
+                            boundaries=[Boundary(0., 0., np.pi / 2., 'no-flow')])
+    return lambda: wells.hydrographs([50., 300.], [100., 100.], times)
+
+
+def _utility_sweep(n):
+    from .uncertainty import lognormal_ensemble, pareto_front, utility_sweep
+    T, S = lognormal_ensemble(1e-3, 1e-4, 0.1, n, seed=1)
+    Q = np.linspace(20., 500., 1000) / 86400.
+    t = np.array([1., 5., 9.9]) * 3.15e7
+    return lambda: pareto_front(utility_sweep(Q, T, S, [100., 2500., 7500.], t, [5., 4.5, 1.], [8., 1., .5]).mean)
+
+
+def _fit_retention(n):
+    from .soil import Soil, fit_retention
+    rng = np.random.default_rng(1)
+    params = [rng.uniform(0.02, 0.15, n), rng.uniform(0.35, 0.55, n), 10. ** rng.uniform(-3., -1., n),
+              rng.uniform(1.2, 3., n)]
+    h = np.broadcast_to(np.logspace(0., 5., 20), (n, 20))
+    theta = Soil('van_genuchten', [p[:, None] for p in params]).water_content(h) + rng.normal(0., 0.003, (n, 20))
+    return lambda: fit_retention(h, theta)
+
+
+def _richards(n):
+    from .richards import hydrostatic, solve_richards
+    from .soil import Soil
+    soil = Soil('van_genuchten', dict(theta_r=0.065, theta_s=0.41, alpha=7.5, n=1.89), Ks=1.23e-5)
+    rng = np.random.default_rng(1)
+    # 30 days of rain (mm/d) minus an evaporation of 1.5 mm/d on a 10 m column above a water table
+    rain = np.where(rng.uniform(size=30) < 0.3, rng.exponential(8., 30), 0.)
+    q_top = (np.arange(30) * 86400., (rain - 1.5) / 1000. / 86400.)
+    z = np.linspace(0., 10., n)
+    return lambda: solve_richards(z, soil, hydrostatic(z, 0.), 30 * 86400., q_top=q_top, bottom='head')
+
+
+def _infiltration(n):
+    from .infiltration import partition
+    rng = np.random.default_rng(1)
+    # 10 years of hourly rain (mm), 8 % of the hours wet, on n Green-Ampt columns
+    rain = np.where(rng.uniform(size=87600) < 0.08, rng.exponential(2., 87600), 0.)
+    Ks = 5. * 10. ** (0.3 * rng.standard_normal(n))
+    return lambda: partition(rain, 1., 'green_ampt', dict(Ks=Ks, psi_f=110., d_theta=0.3), recovery=0.02)
+
+
+def _bucket(n):
+    from .climate import bucket_recharge, extraterrestrial_radiation, oudin
+    rng = np.random.default_rng(1)
+    # 30 years of daily rain and Oudin ETP (mm/d) on n stations (one as a 1D series)
+    days = np.arange(30 * 365) % 365 + 1
+    T = 10. + 9. * np.sin(2. * np.pi * (days - 110) / 365.)[:, None] + rng.normal(0., 2., (len(days), n))
+    ETP = oudin(extraterrestrial_radiation(days, 50.)[:, None], T)
+    P = np.where(rng.uniform(size=(len(days), n)) < 0.4, rng.exponential(5., (len(days), n)), 0.)
+    if n == 1:
+        P, ETP = P[:, 0], ETP[:, 0]
+    return lambda: bucket_recharge(P, ETP)
+
+
+def _reservoir_calibration(n):
+    from .reservoir import calibrate, simulate
+    rng = np.random.default_rng(1)
+    # 10 years of daily recharge (mm/d) and the noisy outflow of a Nash cascade, n parameter sets
+    R = np.where(rng.uniform(size=3650) < 0.2, rng.exponential(3., 3650), 0.)
+    Q = simulate(R, 'linear', dict(k=0.05, n=3)) * np.exp(0.1 * rng.standard_normal(3650))
+    return lambda: calibrate(R, Q, 'linear', n_samples=n, warmup=365, seed=1)
+
+
+#: name: (sizes, setup); the size is the number of points, cells, wells or samples
+KERNELS = {
+    'theis': ((100, 300, 1000), _theis),
+    'hantush': ((1000, 10000, 100000), _hantush),
+    'neuman': ((100, 1000, 10000), _neuman),
+    'breakthrough': ((100, 300, 1000), _breakthrough),
+    'plume': ((100, 300, 1000), _plume),
+    'solve_flow': ((50, 100, 200), _solve_flow),
+    'iterate_1d': ((50, 100, 200), _iterate_1d),
+    'fit_pumping_tests': ((1, 10, 100), _fit),
+    'stream_function': ((100, 300, 1000), _capture),
+    'capture_probability': ((10000, 100000), _capture_probability),
+    'decay_chain': ((1000, 10000, 100000), _decay),
+    'superposition': ((1000, 8760, 87600), _superposition),
+    'utility_sweep': ((1000, 10000, 100000), _utility_sweep),
+    'fit_retention': ((100, 1000, 10000), _fit_retention),
+    'richards': ((100, 1000, 3000), _richards),
+    'infiltration': ((100, 1000, 10000), _infiltration),
+    'bucket': ((1, 100, 1000), _bucket),
+    'reservoir_calibration': ((1000, 3000, 10000), _reservoir_calibration),
+}
+
+
+def time_kernel(name, n, repeat=5):
+    """Best time (s) of repeat calls and the peak allocated memory (MB) of one call of a kernel."""
+    call = KERNELS[name][1](n)
+    call()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dict(kernel=name, size=n, seconds=min(times), peak_mb=peak / 2 ** 20)
+
+
+def find_pages(patterns=None):
+    """Streamlit scripts of the repository (paths relative to the root), optionally matching glob patterns."""
+    pages = []
+    for path in sorted(ROOT.rglob('*.py')):
+        relative = path.relative_to(ROOT).as_posix()
+        if relative.startswith(('hydrokit/', '.')) or '/.' in relative:
+            continue
+        if patterns and not any(fnmatch.fnmatch(relative, p) for p in patterns):
+            continue
+        if 'import streamlit as st' in path.read_text(encoding='utf-8', errors='ignore'):
+            pages.append(relative)
+    return pages
+
+
+def _app_directory(path):
+    """Directory an app is started from: the parent of its pages directory, else the directory of the script."""
+    for parent in path.parents:
+        if parent.name == 'pages':
+            return parent.parent
+    return path.parent
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _run_page(page, reruns, timeout):
+    """Cold and warm run of one page in this process (called in a fresh process per page)."""
+    from streamlit.testing.v1 import AppTest
+    path = str(ROOT / page)
+    start = time.perf_counter()
+    at = AppTest.from_file(path, default_timeout=timeout).run()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(reruns if not at.exception else 0):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+    error = at.exception[0].message if at.exception else None
+    return dict(page=page, status='error' if error else 'ok', cold_s=cold,
+                warm_s=statistics.median(warm) if warm else None, peak_rss_mb=_peak_rss_mb(), error=error)
+
+
+def time_page(page, reruns=3, timeout=300.):
+    """Run a page in a fresh Python process; returns the record of ``_run_page``."""
+    command = [sys.executable, '-m', 'hydrokit.bench', '--run-page', page, '--reruns', str(reruns),
+               '--timeout', str(timeout)]
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    try:
+        done = subprocess.run(command, cwd=_app_directory(ROOT / page), env=env, capture_output=True, text=True,
+                              timeout=timeout * (reruns + 1) + 60.)
+    except subprocess.TimeoutExpired:
+        return dict(page=page, status='timeout', cold_s=None, warm_s=None, peak_rss_mb=None, error=None)
+    lines = done.stdout.strip().splitlines()
+    if done.returncode or not lines:
+        error = (done.stderr.strip().splitlines() or ['exit code %d' % done.returncode])[-1]
+        return dict(page=page, status='error', cold_s=None, warm_s=None, peak_rss_mb=None, error=error)
+    return json.loads(lines[-1])
+
+
+def environment():
+    """Versions and host of a benchmark run."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return dict(date=time.strftime('%Y-%m-%dT%H:%M:%S'), commit=commit, hydrokit=__version__,
+                python=platform.python_version(), numpy=np.__version__, scipy=scipy.__version__,
+                machine=platform.machine(), system=platform.system(), processor=platform.processor())
+
+
+def compare(old, new):
+    """Lines with the ratios new / old of the times of the kernels and pages in both results."""
+    lines = []
+    before = {(k['kernel'], k['size']): k for k in old.get('kernels', [])}
+    for k in new.get('kernels', []):
+        o = before.get((k['kernel'], k['size']))
+        if o:
+            lines.append('%-22s %8d  %10.4f s -> %10.4f s  x%.2f' % (k['kernel'], k['size'], o['seconds'],
+                                                                   k['seconds'], k['seconds'] / o['seconds']))
+    before = {p['page']: p for p in old.get('pages', [])}
+    for p in new.get('pages', []):
+        o = before.get(p['page'])
+        for key in ('cold_s', 'warm_s'):
+            if o and o.get(key) and p.get(key):
+                lines.append('%-60s %s %8.3f s -> %8.3f s  x%.2f' % (p['page'][-60:], key[:4], o[key], p[key],
+                                                                   p[key] / o[key]))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hydrokit.bench', description=__doc__.split('\n\n')[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='bench.json', help='result file (default: bench.json)')
+    parser.add_argument('--compare', help='earlier result file to compare with')
+    parser.add_argument('--kernels', nargs='*', choices=list(KERNELS), help='kernels to time (default: all)')
+    parser.add_argument('--no-kernels', action='store_true', help='do not time the kernels')
+    parser.add_argument('--quick', action='store_true', help='time the kernels at the smallest size only')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls of every kernel (default: 5)')
+    parser.add_argument('--pages', nargs='*', help='glob patterns of the pages to run (default: all)')
+    parser.add_argument('--no-pages', action='store_true', help='do not run the pages')
+    parser.add_argument('--reruns', type=int, default=3, help='warm reruns of every page (default: 3)')
+    parser.add_argument('--timeout', type=float, default=300., help='timeout of a page run in s (default: 300)')
+    parser.add_argument('--run-page', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_page:
+        print(json.dumps(_run_page(args.run_page, args.reruns, args.timeout)))
+        return 0
+
+    result = dict(environment=environment(), kernels=[], pages=[])
+    if not args.no_kernels:
+        for name in args.kernels or KERNELS:
+            sizes = KERNELS[name][0]
+            for n in sizes[:1] if args.quick else sizes:
+                record = time_kernel(name, n, args.repeat)
+                result['kernels'].append(record)
+                print('%-22s %8d  %10.4f s  %8.1f MB' % (name, n, record['seconds'], record['peak_mb']))
+    if not args.no_pages:
+        for page in find_pages(args.pages):
+            record = time_page(page, args.reruns, args.timeout)
+            result['pages'].append(record)
+            if record['status'] == 'ok':
+                print('%-60s cold %7.2f s  warm %7.2f s  %7.0f MB' % (page[-60:], record['cold_s'],
+                                                                   record['warm_s'] or np.nan,
+                                                                   record['peak_rss_mb'] or np.nan))
+            else:
+                print('%-60s %s: %s' % (page[-60:], record['status'], record['error']))
+    Path(args.output).write_text(json.dumps(result, indent=1), encoding='utf-8')
+    print('results written to %s' % args.output)
+    if args.compare:
+        print('\n'.join(compare(json.loads(Path(args.compare).read_text(encoding='utf-8')), result)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""Results shared by all sessions of a Streamlit server.
+
+A Streamlit page is re-run for every session and every widget change, so
+many users on the default settings compute the same curves and figures
+again and again. All sessions of a server run in one process and share
+the modules, so a cache at module level serves all of them. Results are
+keyed on the name and version of the computation and its arguments, with
+floats rounded to a few significant digits (slider values that differ
+only by rounding give the same result)::
+
+    @cache.cached(version='2')
+    def type_curve(u_min, u_max, n):
+        ...
+
+Pages cache figures with ``plotting.show_cached``. The cache holds at most
+``HYDROKIT_CACHE_MB`` MB (environment variable, default 256) and drops the
+least recently used results first and results older than
+``HYDROKIT_CACHE_TTL`` seconds (default 3600); ``CACHE.stats()`` reports
+hits, misses and the memory in use. Cached arrays are shared between the
+sessions and therefore read-only.
+"""
+
+import functools
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from . import __version__
+
+_MISSING = object()
+
+
+def quantize(value, digits=6):
+    """Hashable key of value with floats rounded to digits significant digits.
+
+    Works for numbers, strings, None, sequences, dicts, NumPy arrays
+    (hashed, exact) and pandas objects (via ``to_numpy``).
+    """
+    if isinstance(value, (bool, int, str, bytes, type(None), np.bool_, np.integer)):
+        return value.item() if isinstance(value, np.generic) else value
+    if isinstance(value, (float, np.floating)):
+        return float('%.*g' % (digits, value))
+    if isinstance(value, (tuple, list)):
+        return (type(value).__name__,) + tuple(quantize(v, digits) for v in value)
+    if isinstance(value, dict):
+        return ('dict',) + tuple(sorted((k, quantize(v, digits)) for k, v in value.items()))
+    if hasattr(value, 'to_numpy') and not isinstance(value, np.ndarray):
+        value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        if value.dtype == object:
+            return ('array', value.shape, quantize(value.tolist(), digits))
+        return ('array', value.shape, value.dtype.str, hashlib.blake2b(value.view(np.uint8), digest_size=16).digest())
+    raise TypeError('cannot build a cache key from %s' % type(value).__name__)
+
+
+def _nbytes(value):
+    """Approximate memory of a result."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value) + 49
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value.values())
+    if hasattr(value, 'memory_usage'):
+        return int(np.sum(value.memory_usage(deep=True)))
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    """Make the arrays of a shared result read-only."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            _freeze(v)
+    return value
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a memory bound (bytes) and a time to live (s, None: unlimited).
+
+    Concurrent requests of a result that is being computed wait for it
+    instead of computing it again.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20, ttl=None):
+        self.max_bytes, self.ttl = max_bytes, ttl
+        self._entries = OrderedDict()     # key: (value, size, time of storage)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._counts = dict(hits=0, misses=0, waits=0, evictions=0, expirations=0)
+
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if self.ttl is not None and now - entry[2] > self.ttl:
+            self._drop(key)
+            self._counts['expirations'] += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _drop(self, key):
+        value, size, stored = self._entries.pop(key)
+        self._bytes -= size
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key, time.monotonic()) is not _MISSING
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            self._counts['hits' if value is not _MISSING else 'misses'] += 1
+        return default if value is _MISSING else value
+
+    def put(self, key, value):
+        """Store a result (not stored if it is larger than the memory bound)."""
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+        _freeze(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counts['evictions'] += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Cached result of key, computed with compute() if it is not cached."""
+        with self._lock:
+            value = self._lookup(key, time.monotonic())
+            if value is not _MISSING:
+                self._counts['hits'] += 1
+                return value
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = threading.Event()
+                self._counts['misses'] += 1
+            else:
+                self._counts['waits'] += 1
+        if not owner:
+            pending.wait()
+            with self._lock:
+                value = self._lookup(key, time.monotonic())
+            if value is not _MISSING:
+                return value
+            # the computation failed or the result was not stored
+            return compute()
+        try:
+            return self.put(key, compute())
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Counts of hits, misses, waits for a running computation, evictions and expirations, and the memory in use."""
+        with self._lock:
+            return dict(self._counts, entries=len(self._entries), mb=self._bytes / 2 ** 20,
+                        max_mb=self.max_bytes / 2 ** 20)
+
+
+#: Cache of the process, shared by all sessions
+CACHE = ResultCache(max_bytes=int(float(os.environ.get('HYDROKIT_CACHE_MB', 256)) * 2 ** 20),
+                    ttl=float(os.environ.get('HYDROKIT_CACHE_TTL', 3600)) or None)
+
+
+def function_key(func, args=(), kwargs=None, version=None, digits=6):
+    """Key of the call func(*args, **kwargs): file and name of func, version and quantized arguments.
+
+    The version defaults to the version of hydrokit; it has to be raised
+    when a function defined in a page changes its results.
+    """
+    code = getattr(func, '__code__', None)
+    origin = code.co_filename if code is not None else func.__module__
+    return (origin, func.__qualname__, version or __version__, quantize(args, digits),
+            quantize(kwargs or {}, digits))
+
+
+def cached(func=None, *, version=None, digits=6, cache=None):
+    """Decorator: results of func are kept in the cache (default ``CACHE``) for all sessions."""
+    if func is None:
+        return functools.partial(cached, version=version, digits=digits, cache=cache)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = function_key(func, args, kwargs, version, digits)
+        return (cache or CACHE).get_or_compute(key, lambda: func(*args, **kwargs))
+    return wrapper
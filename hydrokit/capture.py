@@ -0,0 +1,314 @@
+"""Flow field and capture zones of wells in a uniform regional flow.
+
+The flow of pumping and injection wells in a confined aquifer with a
+uniform regional flow is the superposition of the complex potentials
+
+    Ω(z) = -q0 exp(-iα) z + Σ Q_k / (2π) ln(z - z_k),    z = x + iy,
+
+of the regional flow (discharge per unit width q0 = K i b in m²/s in the
+direction α) and of the wells at z_k (Q_k in m³/s, positive for pumping,
+negative for injection), e.g. Strack (1989). The real part of Ω is the
+discharge potential Φ = T h + const, the imaginary part the stream
+function Ψ, which is constant along streamlines; the difference of Ψ
+between two streamlines is the discharge between them.
+
+A ``WellField`` evaluates Φ, Ψ and the discharge vector on arrays of
+points (e.g. ``x[None, :]`` and ``y[:, None]`` for a grid), finds the
+stagnation points and traces the dividing streamlines through them::
+
+    field = capture.WellField([(0., -300., 0.01), (0., 300., 0.01)], q0=K * i * b)
+    psi = field.stream_function(x[None, :], y[:, None], cut_width=dx)
+    lines = field.dividing_streamlines((x[0], x[-1], y[0], y[-1]))
+
+The capture zone of a single well is determined by its width Q / (K i b)
+far upstream. ``capture_probability`` propagates uncertain K, i, b and Q
+through this width: it draws an ensemble of realizations in chunks and
+yields the probability of capture on a grid after every chunk::
+
+    for state in capture.capture_probability(stats.lognorm(0.5, scale=K), i, b, Q, x[None, :], y[:, None]):
+        image.set_data(state.probability)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+#: Dividing streamline through stagnation point number ``stagnation``,
+#: traced against the flow (``upstream=True``) or with the flow; ``well``
+#: is the index of the well at which it ends, -1 if it leaves the extent or
+#: ends at another stagnation point; ``boundary`` marks the boundaries of
+#: capture zones
+Streamline = namedtuple('Streamline', 'x y stagnation upstream well boundary')
+
+#: Monte Carlo ensemble after n realizations: probability of capture on the
+#: points and the capture zone widths Q / (K i b) (m) at the percentiles
+CaptureProbability = namedtuple('CaptureProbability', 'probability n percentiles width')
+
+# bins of log10 of the capture zone width (m) for the percentiles of an ensemble
+_WIDTH_BINS = np.linspace(-6., 12., 18001)
+
+
+class WellField:
+    """Pumping and injection wells in a uniform regional flow.
+
+    wells is a sequence of (x, y, Q) records with the pumping rate Q in
+    m³/s (positive for pumping, negative for injection); q0 is the
+    regional discharge per unit width K i b (m²/s) in the direction angle
+    (radians, counter-clockwise from the x axis). The head of a confined
+    aquifer is ``potential / T`` plus a constant.
+    """
+
+    def __init__(self, wells, q0=0., angle=0.):
+        wells = np.asarray(wells, dtype=float).reshape(-1, 3)
+        self.xw, self.yw, self.Q = wells.T.copy()
+        self.q0, self.angle = float(q0), float(angle)
+        # well positions in the frame in which the regional flow runs along +x;
+        # the branch cuts of ln(z - z_k) then point upstream from the wells
+        self._xr, self._yr = self._rotated(self.xw, self.yw)
+
+    def _rotated(self, x, y):
+        c, s = np.cos(self.angle), np.sin(self.angle)
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        return x * c + y * s, y * c - x * s
+
+    def _offsets(self, xr, yr):
+        """Rotated coordinates relative to each well and its rate; the buffers are reused."""
+        dx, dy = np.empty(xr.shape), np.empty(yr.shape)
+        for xk, yk, Q in zip(self._xr, self._yr, self.Q):
+            if Q != 0.:
+                np.subtract(xr, xk, out=dx)
+                np.subtract(yr, yk, out=dy)
+                yield dx, dy, Q
+
+    def potential(self, x, y):
+        """Discharge potential Φ (m³/s)."""
+        xr, yr = self._rotated(x, y)
+        phi = -self.q0 * xr
+        for dx, dy, Q in self._offsets(xr, yr):
+            dx *= dx
+            dy *= dy
+            dx += dy
+            np.log(dx, out=dx)
+            dx *= Q / (4. * np.pi)
+            phi += dx
+        return phi
+
+    def stream_function(self, x, y, cut_width=0.):
+        """Stream function Ψ (m³/s).
+
+        Ψ jumps by Q_k across the branch cut of well k, a straight line
+        from the well in upstream direction. A contour plot would draw the
+        jump as a bundle of lines; with cut_width > 0 (at least half the
+        diagonal of a grid cell), Ψ is set to NaN within this distance of
+        the cuts, which removes them from the plot.
+        """
+        xr, yr = self._rotated(x, y)
+        psi = -self.q0 * yr
+        cut = np.zeros(psi.shape, dtype=bool) if cut_width > 0. else None
+        for dx, dy, Q in self._offsets(xr, yr):
+            if cut is not None:
+                cut |= (np.abs(dy) < cut_width) & (dx < 0.)
+            np.arctan2(dy, dx, out=dx)
+            dx *= Q / (2. * np.pi)
+            psi += dx
+        if cut is not None:
+            psi[cut] = np.nan
+        return psi
+
+    def complex_potential(self, x, y):
+        """Complex potential Ω = Φ + iΨ."""
+        return self.potential(x, y) + 1j * self.stream_function(x, y)
+
+    def discharge(self, x, y):
+        """Discharge per unit width (qx, qy) in m²/s."""
+        xr, yr = self._rotated(x, y)
+        qx, qy = np.full(xr.shape, self.q0), np.zeros(yr.shape)
+        r2 = np.empty(xr.shape)
+        for dx, dy, Q in self._offsets(xr, yr):
+            np.multiply(dx, dx, out=r2)
+            r2 += dy * dy
+            r2 /= -Q / (2. * np.pi)
+            qx += dx / r2
+            qy += dy / r2
+        c, s = np.cos(self.angle), np.sin(self.angle)
+        return qx * c - qy * s, qx * s + qy * c
+
+    def _conj_discharge(self, z):
+        """qx - i qy at the points z (1D complex array, few points)."""
+        a = self.Q / (2. * np.pi)
+        return self.q0 * np.exp(-1j * self.angle) - (a / (z[:, None] - (self.xw + 1j * self.yw))).sum(1)
+
+    def stagnation_points(self):
+        """Points of zero discharge, as complex numbers x + iy sorted by x."""
+        pumped = self.Q != 0.
+        zw = (self.xw + 1j * self.yw)[pumped]
+        a = self.Q[pumped] / (2. * np.pi)
+        if len(a) == 0:
+            return np.empty(0, dtype=complex)
+        # zeros of -conj(q) = c + Σ a_k / (z - z_k)
+        c = -self.q0 * np.exp(-1j * self.angle)
+        if c != 0.:
+            # eigenvalues of diag(z_k) - a 1ᵀ / c (secular equation), which
+            # are better conditioned than the roots of the polynomial
+            z = np.linalg.eigvals(np.diag(zw) - np.outer(a, np.ones(len(a))) / c)
+        else:
+            # without regional flow: roots of Σ a_k Π_{j≠k} (z - z_j) in
+            # coordinates relative to the centre of the well field
+            centre = zw.mean()
+            scale = max(np.abs(zw - centre).max(), 1.)
+            zs = (zw - centre) / scale
+            coeffs = sum(ak * np.poly(np.delete(zs, k)) for k, ak in enumerate(a))
+            z = np.roots(np.atleast_1d(coeffs)) * scale + centre
+        # Newton iterations on the rational function
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(3):
+                d = z[:, None] - zw
+                step = (c + (a / d).sum(1)) / -(a / d ** 2).sum(1)
+                z = np.where(np.isfinite(step), z - step, z)
+        z = z[np.isfinite(z)]
+        return z[np.lexsort((z.imag, z.real))]
+
+    def dividing_streamlines(self, extent, step=None, max_length=None):
+        """Streamlines through the stagnation points within extent = (xmin, xmax, ymin, ymax).
+
+        A stagnation point is a saddle of the flow field with two incoming
+        and two outgoing streamlines. The incoming streamlines are traced
+        upstream; if the outgoing ones, traced downstream, end at different
+        wells (or one of them leaves the extent), the incoming streamlines
+        separate the water of different wells or of a well and the regional
+        flow: they are boundaries of capture zones. The streamlines are traced
+        with the classical Runge-Kutta scheme along the discharge direction
+        with a fixed step length (default 1/1000 of the diagonal of the
+        extent) until they leave the extent, reach a well, another
+        stagnation point or the length max_length (default: twice the
+        perimeter of the extent). Returns a list of ``Streamline``.
+        """
+        xmin, xmax, ymin, ymax = extent
+        if step is None:
+            step = np.hypot(xmax - xmin, ymax - ymin) / 1000.
+        if max_length is None:
+            max_length = 4. * (xmax - xmin + ymax - ymin)
+        zs = self.stagnation_points()
+        zs = zs[(zs.real >= xmin) & (zs.real <= xmax) & (zs.imag >= ymin) & (zs.imag <= ymax)]
+        if len(zs) == 0:
+            return []
+
+        # the streamlines through a saddle of Ω ≈ Ω'' (z - z_s)² / 2 have the
+        # directions exp(iφ) with Ω'' exp(2iφ) real: incoming for Ω'' exp(2iφ) > 0
+        zw = self.xw + 1j * self.yw
+        d2 = -(self.Q / (2. * np.pi) / (zs[:, None] - zw) ** 2).sum(1)
+        phi = -np.angle(d2)[:, None] / 2. + np.arange(4) * np.pi / 2.
+        stagnation = np.repeat(np.arange(len(zs)), 4)
+        upstream = np.tile([True, False, True, False], len(zs))
+        sign = np.where(upstream, -1., 1.)
+        z = (zs[:, None] + step * np.exp(1j * phi)).ravel()
+
+        def direction(z, sign):
+            q = np.conj(self._conj_discharge(z))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return sign * q / np.abs(q)
+
+        # end points: pumping wells downstream, injection wells upstream
+        sinks = np.where(upstream[:, None], self.Q < 0., self.Q > 0.)
+        n_steps = int(np.ceil(max_length / step))
+        path = np.full((n_steps + 2, len(z)), np.nan + 0j)
+        path[0] = np.repeat(zs, 4)
+        path[1] = z
+        length = np.full(len(z), n_steps + 2)
+        well = np.full(len(z), -1)
+        active = np.arange(len(z))
+        last = direction(z, sign)
+        for n in range(2, n_steps + 2):
+            za, sa = z[active], sign[active]
+            k1 = direction(za, sa)
+            k2 = direction(za + step / 2. * k1, sa)
+            k3 = direction(za + step / 2. * k2, sa)
+            k4 = direction(za + step * k3, sa)
+            move = (k1 + 2. * k2 + 2. * k3 + k4) / 6.
+            z[active] = za = za + step * move
+            path[n, active] = za
+            # stop at wells, outside of the extent and where the direction
+            # reverses (overshoot at another stagnation point)
+            dist = np.abs(za[:, None] - zw)
+            hit = (dist < step) & sinks[active]
+            reached = hit.any(1)
+            well[active[reached]] = np.argmax(hit[reached], axis=1)
+            path[n, active[reached]] = zw[well[active[reached]]]
+            outside = (za.real < xmin) | (za.real > xmax) | (za.imag < ymin) | (za.imag > ymax)
+            stalled = ~np.isfinite(move) | ((move * np.conj(last[active])).real < 0.)
+            last[active] = move
+            done = reached | outside | stalled
+            length[active[done]] = n + 1 - stalled[done]
+            active = active[~done]
+            if len(active) == 0:
+                break
+        ends = well.reshape(-1, 4)
+        boundary = np.repeat(ends[:, 1] != ends[:, 3], 4) & upstream
+        return [Streamline(path[:m, j].real, path[:m, j].imag, stagnation[j], bool(upstream[j]), int(well[j]),
+                           bool(boundary[j])) for j, m in enumerate(length)]
+
+
+def capture_boundary(width, n=200):
+    """Boundary of the capture zone of a well at the origin in a regional flow along +x.
+
+    width is the width Q / (K i b) of the capture zone far upstream (m);
+    returns x and y of n points of x = y / tan(2π y / width).
+    """
+    y = np.linspace(-0.4995, 0.4995, n) * width
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = np.where(y == 0., width / (2. * np.pi), y / np.tan(2. * np.pi * y / width))
+    return x, y
+
+
+def _width_threshold(x, y):
+    """Smallest capture zone width Q / (K i b) of a well at the origin that captures (x, y)."""
+    ay = np.abs(y)
+    theta = np.arctan2(ay, x)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(ay > 0., 2. * np.pi * ay / theta, np.where(x > 0., 2. * np.pi * x, 0.))
+
+
+def _sample(value, n, rng):
+    if hasattr(value, 'rvs'):
+        return value.rvs(size=n, random_state=rng)
+    return np.full(n, float(value))
+
+
+def capture_probability(K, i, b, Q, x, y, n=100000, chunk=10000, percentiles=(5., 50., 95.), seed=None):
+    """Monte Carlo probability of capture by a well at the origin in a regional flow along +x.
+
+    K (m/s), i, b (m) and Q (m³/s) are numbers or distributions with an
+    ``rvs`` method, e.g. the frozen distributions of scipy.stats; their
+    realizations must be positive. A realization captures the point (x, y)
+    if its width Q / (K i b) exceeds a threshold of the point alone, so the
+    probability of capture on the points x, y (broadcast, e.g. a grid) is
+    the fraction of the widths above the thresholds, which are counted for
+    all points at once in the sorted widths of a chunk.
+
+    The n realizations are drawn in chunks of chunk realizations, which
+    bounds the memory. This is a generator that yields a
+    ``CaptureProbability`` after every chunk, so a plot can be refined
+    while the ensemble grows. The widths at the percentiles come from a
+    histogram of the widths (relative resolution 0.25 %); their
+    ``capture_boundary`` is the contour of the probability
+    1 - percentile / 100.
+    """
+    rng = np.random.default_rng(seed)
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    threshold = _width_threshold(x, y)
+    captured = np.zeros(threshold.shape, dtype=np.int64)
+    counts = np.zeros(len(_WIDTH_BINS) - 1, dtype=np.int64)
+    percentiles = np.asarray(percentiles, dtype=float)
+    done = 0
+    while done < n:
+        m = min(chunk, n - done)
+        width = _sample(Q, m, rng) / (_sample(K, m, rng) * _sample(i, m, rng) * _sample(b, m, rng))
+        width.sort()
+        captured += m - np.searchsorted(width, threshold, side='right')
+        with np.errstate(divide='ignore'):
+            bins = np.searchsorted(_WIDTH_BINS[1:-1], np.log10(width), side='right')
+        counts += np.bincount(bins, minlength=len(counts))
+        done += m
+        cumulative = np.concatenate(([0], np.cumsum(counts)))
+        quantiles = 10. ** np.interp(percentiles / 100. * done, cumulative, _WIDTH_BINS)
+        yield CaptureProbability(captured / done, done, percentiles, quantiles)
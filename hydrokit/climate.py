@@ -0,0 +1,286 @@
+"""Potential evapotranspiration and groundwater recharge of long climate records.
+
+The ETP formulas work on whole arrays (one value per day or hour):
+
+* ``oudin`` (Oudin et al. 2005): ETP = Re / λ (T + 5) / 100;
+* ``haude`` (Haude 1954): ETP = k(month) E(T_14) (1 - F_14 / 100) <= 7 mm/d
+  with the saturation vapour pressure E at 14:00;
+* ``hargreaves`` (Hargreaves and Samani 1985):
+  ETP = 0.0023 Re / λ (T + 17.8) √(Tmax - Tmin),
+
+with the extraterrestrial radiation Re of FAO-56 for days or hours
+(``extraterrestrial_radiation``). ``bucket_recharge`` is the soil-moisture
+bucket of the GW_recharge notebook: the actual evapotranspiration falls
+linearly below the fraction p of the available water capacity and the
+water above the capacity recharges the groundwater.
+
+Climate files of many stations are processed from the command line. The
+files are read in chunks, the bucket carries its soil moisture from one
+chunk to the next and the results are appended to one CSV file per
+station, so records of any length need only the memory of one chunk.
+Annual sums of all stations are collected in a summary table. Example (run
+from the repository root)::
+
+    python -m hydrokit.climate 04_Basic_hydrogeology/DATA/GW_recharge_data.csv --lat 47 \\
+        --method oudin hargreaves --output-dir recharge --summary recharge/summary.csv
+
+Files with steps shorter than a day (e.g. hourly) get the radiation of
+their steps and the ETP per step; Haude needs the values at 14:00 and is
+daily only. Excel files (.xlsx) cannot be read in parts and are loaded as
+a whole and then processed in chunks.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+LAMBDA = 2.45  # latent heat of vaporization (MJ/kg)
+
+#: Haude factors (mm/(d hPa)) of the months January to December
+HAUDE_K = (0.22, 0.22, 0.22, 0.29, 0.29, 0.28, 0.26, 0.25, 0.23, 0.22, 0.22, 0.22)
+
+METHODS = ('oudin', 'haude', 'hargreaves')
+
+#: Column names of the climate files (the GW_recharge and ETP notebooks)
+DEFAULT_COLUMNS = dict(date='datum', T='T (°C)', T_14='T_14', rh_14='F_rel_14', T_min='T_min', T_max='T_max',
+                       P='N (mm/d)')
+
+#: Actual evapotranspiration, soil moisture (end of the steps) and recharge (steps x stations)
+Bucket = namedtuple('Bucket', 'ETR soil_moisture recharge')
+
+
+def extraterrestrial_radiation(doy, lat, hour=None, hours=1.):
+    """Extraterrestrial radiation Re (MJ/m²) of the days of the year doy at the latitude lat (degrees).
+
+    With hour, the radiation of the periods from hour to hour + hours
+    (local solar time, FAO-56 eq. 28) instead of whole days (eq. 21).
+    """
+    phi = np.radians(lat)
+    b = 2. * np.pi * np.asarray(doy, dtype=float) / 365.
+    dr = 1. + 0.033 * np.cos(b)
+    delta = 0.409 * np.sin(b - 1.39)
+    # sunset hour angle (polar day and night included)
+    ws = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1., 1.))
+    if hour is None:
+        return 24. * 60. / np.pi * 0.082 * dr * (ws * np.sin(phi) * np.sin(delta)
+                                                 + np.cos(phi) * np.cos(delta) * np.sin(ws))
+    hour = np.asarray(hour, dtype=float)
+    w1 = np.clip(np.pi / 12. * (hour - 12.), -ws, ws)
+    w2 = np.clip(np.pi / 12. * (hour + hours - 12.), -ws, ws)
+    return 12. * 60. / np.pi * 0.082 * dr * ((w2 - w1) * np.sin(phi) * np.sin(delta)
+                                             + np.cos(phi) * np.cos(delta) * (np.sin(w2) - np.sin(w1)))
+
+
+def oudin(Re, T):
+    """ETP after Oudin (mm per period of Re) from the radiation Re (MJ/m²) and the mean temperature T (°C)."""
+    return np.maximum(Re / LAMBDA * (T + 5.) / 100., 0.)
+
+
+def haude(T_14, rh_14, month, k=HAUDE_K, cap=7.):
+    """ETP after Haude (mm/d) from the temperature (°C) and the relative humidity (%) at 14:00."""
+    E = 6.108 * 10. ** (7.5 * T_14 / (237.3 + T_14))
+    factor = np.asarray(k, dtype=float)[np.asarray(month) - 1]
+    return np.clip(factor * E * (1. - rh_14 / 100.), 0., cap)
+
+
+def hargreaves(Re, T, T_min, T_max):
+    """ETP after Hargreaves (mm per period of Re) from the mean, minimum and maximum temperature (°C)."""
+    return np.maximum(0.0023 * Re / LAMBDA * (T + 17.8) * np.sqrt(np.maximum(T_max - T_min, 0.)), 0.)
+
+
+def bucket_recharge(P, ETP, awc=150., p=0.7, S0=None):
+    """Soil-moisture bucket of the steps of P and ETP (mm, steps x stations or steps).
+
+    The actual evapotranspiration is ETP while the soil moisture S of the
+    last step is at least p awc and falls linearly to 0 at S = 0; the
+    water above the available water capacity awc (mm) recharges. S0 is
+    the soil moisture before the first step (default awc). All stations
+    are advanced together; the loop runs over the steps.
+    """
+    P, ETP = np.broadcast_arrays(np.asarray(P, dtype=float), np.asarray(ETP, dtype=float))
+    awc = np.broadcast_to(np.asarray(awc, dtype=float), P.shape[1:])
+    threshold = p * awc
+    S = np.array(np.broadcast_to(awc if S0 is None else np.asarray(S0, dtype=float), P.shape[1:]))
+    ETR, moisture, recharge = np.empty(P.shape), np.empty(P.shape), np.empty(P.shape)
+    if P.ndim == 1:
+        # one station: Python floats are an order of magnitude faster than 0-d arrays
+        S, awc, threshold = float(S), float(awc), float(threshold)
+        for i, (rain, demand) in enumerate(zip(P.tolist(), ETP.tolist())):
+            etr = min(min(max(S / threshold, 0.), 1.) * demand, S + rain)
+            S = S + rain - etr
+            excess = max(S - awc, 0.)
+            S -= excess
+            ETR[i], moisture[i], recharge[i] = etr, S, excess
+        return Bucket(ETR, moisture, recharge)
+    for i in range(len(P)):
+        etr = np.minimum(np.clip(S / threshold, 0., 1.) * ETP[i], S + P[i])
+        S = S + P[i] - etr
+        excess = np.maximum(S - awc, 0.)
+        S = S - excess
+        ETR[i], moisture[i], recharge[i] = etr, S, excess
+    return Bucket(ETR, moisture, recharge)
+
+
+def find_files(inputs, patterns=('*.csv', '*.xlsx')):
+    """Files given directly, as directories (searched for the patterns) or as glob patterns."""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            files += sorted(f for pattern in patterns for f in glob.glob(os.path.join(item, pattern)))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            files += sorted(glob.glob(item, recursive=True))
+    return list(dict.fromkeys(os.path.normpath(f) for f in files))
+
+
+def read_chunks(path, date_column='datum', chunksize=100000):
+    """DataFrames of chunksize rows of a CSV or Excel file with the dates parsed."""
+    if str(path).endswith(('.xlsx', '.xls')):
+        data = pd.read_excel(path)
+        chunks = (data.iloc[i:i + chunksize] for i in range(0, len(data), chunksize))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunksize)
+    for chunk in chunks:
+        chunk = chunk.copy()
+        dates = chunk[date_column]
+        # dates like 20030401 (integers) or ISO strings
+        chunk[date_column] = pd.to_datetime(dates.astype(str), format='%Y%m%d' if dates.dtype.kind in 'iu' else None)
+        yield chunk
+
+
+def evapotranspiration(chunk, lat, methods, columns, step_hours=24.):
+    """ETP (mm per step) of the methods for a chunk; columns maps T, T_14, rh_14, T_min, T_max to column names."""
+    dates = pd.DatetimeIndex(chunk[columns['date']])
+    hour = None if step_hours >= 24. else dates.hour + dates.minute / 60.
+    Re = extraterrestrial_radiation(dates.dayofyear, lat, hour, step_hours)
+    out = {}
+    for method in methods:
+        if method == 'oudin':
+            out['ETP_oudin'] = oudin(Re, chunk[columns['T']].to_numpy(dtype=float))
+        elif method == 'hargreaves':
+            out['ETP_hargreaves'] = hargreaves(Re, *(chunk[columns[c]].to_numpy(dtype=float) for c in ('T', 'T_min', 'T_max')))
+        elif method == 'haude':
+            if step_hours < 24.:
+                raise ValueError('Haude needs daily values')
+            out['ETP_haude'] = haude(chunk[columns['T_14']].to_numpy(dtype=float),
+                                     chunk[columns['rh_14']].to_numpy(dtype=float), dates.month)
+        else:
+            raise ValueError("method must be one of %s" % ', '.join(METHODS))
+    return out
+
+
+def process_station(path, output, lat, methods=('oudin',), recharge=None, columns=None, awc=150., p=0.7,
+                    chunksize=100000):
+    """Stream one climate file through the ETP formulas and the bucket; returns the annual sums.
+
+    The results of every step are appended to the CSV file output. The
+    bucket is driven by the ETP of recharge (default the first method) if
+    the file has a precipitation column (columns['P']).
+    """
+    columns = dict(DEFAULT_COLUMNS, **(columns or {}))
+    recharge = recharge or methods[0]
+    if os.path.exists(output):
+        os.remove(output)
+    S, step_hours, annual = None, None, []
+    for chunk in read_chunks(path, columns['date'], chunksize):
+        dates = chunk[columns['date']]
+        if step_hours is None:
+            step_hours = dates.diff().median().total_seconds() / 3600. if len(chunk) > 1 else 24.
+        result = pd.DataFrame({'date': dates.to_numpy()})
+        for name, values in evapotranspiration(chunk, lat, methods, columns, step_hours).items():
+            result[name] = values
+        if columns['P'] in chunk:
+            result['P'] = chunk[columns['P']].to_numpy(dtype=float)
+            bucket = bucket_recharge(result['P'].to_numpy(), result['ETP_' + recharge].to_numpy(), awc, p, S)
+            S = bucket.soil_moisture[-1]
+            result['ETR'], result['soil_moisture'], result['recharge'] = bucket
+        result.to_csv(output, mode='a', header=not os.path.exists(output), index=False)
+        annual.append(result.drop(columns=['date', 'soil_moisture'], errors='ignore').groupby(dates.dt.year.to_numpy()).sum())
+    summary = pd.concat(annual).groupby(level=0).sum()
+    summary.index.name = 'year'
+    summary.insert(0, 'station', Path(path).stem)
+    return summary.reset_index()
+
+
+def run(files, lat, output_dir, methods=('oudin',), recharge=None, columns=None, awc=150., p=0.7,
+        chunksize=100000, jobs=None):
+    """Process the stations (one file each) in a process pool; returns the annual sums of all stations.
+
+    lat and awc are scalars or have one value per file. With jobs=1
+    everything runs in the calling process.
+    """
+    for method in methods:
+        if method not in METHODS:
+            raise ValueError("method must be one of %s" % ', '.join(METHODS))
+    lat = np.broadcast_to(np.asarray(lat, dtype=float), (len(files),))
+    awc = np.broadcast_to(np.asarray(awc, dtype=float), (len(files),))
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [os.path.join(output_dir, Path(f).stem + '.csv') for f in files]
+    args = [(f, o, la, methods, recharge, columns, a, p, chunksize) for f, o, la, a in zip(files, outputs, lat, awc)]
+    if jobs == 1 or len(files) <= 1:
+        tables = [process_station(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            tables = list(pool.map(process_station, *zip(*args)))
+    return pd.concat(tables, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hydrokit.climate', description=__doc__.split('\n\n')[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='+', help='CSV or Excel files (one per station), directories or glob patterns')
+    parser.add_argument('--method', nargs='+', default=['oudin'], choices=METHODS, help='ETP formulas (default: oudin)')
+    parser.add_argument('--recharge', choices=METHODS, help='ETP that drives the bucket (default: the first method)')
+    parser.add_argument('--lat', type=float, help='latitude of the stations in degrees')
+    parser.add_argument('--awc', type=float, default=150., help='available water capacity in mm (default: 150)')
+    parser.add_argument('--p', type=float, default=0.7,
+                        help='fraction of the capacity below which the evapotranspiration falls (default: 0.7)')
+    parser.add_argument('--stations', help='CSV file with the columns name, lat and (optionally) awc of the stations')
+    for key, column in DEFAULT_COLUMNS.items():
+        parser.add_argument('--column-' + key.lower().replace('_', '-'), dest='column_' + key, default=column,
+                            help='column of %s (default: %s)' % (key, column))
+    parser.add_argument('--chunksize', type=int, default=100000, help='rows read at once (default: 100000)')
+    parser.add_argument('--output-dir', default='climate', help='directory of the results of the stations')
+    parser.add_argument('--summary', default='climate_summary.csv', help='table of the annual sums (.csv or .parquet)')
+    parser.add_argument('--jobs', type=int, help='number of worker processes (default: number of CPUs)')
+    args = parser.parse_args(argv)
+
+    files = find_files(args.inputs)
+    if not files:
+        parser.error('no input files found')
+    names = [Path(f).stem for f in files]
+    lat = pd.Series(args.lat, index=names, dtype=float)
+    awc = pd.Series(args.awc, index=names, dtype=float)
+    if args.stations:
+        stations = pd.read_csv(args.stations, dtype={'name': str}).set_index('name')
+        lat.update(stations['lat'])
+        if 'awc' in stations:
+            awc.update(stations['awc'])
+    missing = lat.index[lat.isna()]
+    if len(missing):
+        parser.error('no latitude for: %s (use --lat or --stations)' % ', '.join(missing))
+
+    columns = {key: getattr(args, 'column_' + key) for key in DEFAULT_COLUMNS}
+    try:
+        summary = run(files, lat.values, args.output_dir, args.method, args.recharge, columns, awc.values, args.p,
+                      args.chunksize, args.jobs)
+    except (KeyError, ValueError) as error:
+        parser.error('%s' % error)
+    if str(args.summary).endswith('.parquet'):
+        summary.to_parquet(args.summary, index=False)
+    else:
+        summary.to_csv(args.summary, index=False)
+    print('%i stations, %i station-years written to %s and %s' % (len(files), len(summary), args.output_dir, args.summary))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Decay chains of first-order reactions.
+
+The masses M of the members of a decay chain (radionuclides, or species
+of a sequential degradation like PCE -> TCE -> DCE -> VC) obey
+
+    dM/dt = A M,    A[k, k] = -λ_k,    A[d, p] = f_pd λ_p,
+
+with the decay constants λ_k and the fractions f_pd of the decays of the
+parent p that produce the daughter d (branching ratios, 1 for a simple
+chain). With the members ordered from parents to daughters, A is lower
+triangular, its eigenvalues are the -λ_k and M(t) = V exp(-Λt) V⁻¹ M(0) is
+the Bateman solution, which ``DecayChain`` evaluates for all times with one
+array expression::
+
+    chain = decay.DecayChain([0.3, 0.2, 0.])
+    m = chain.masses(np.linspace(0., 100., 1001), [1000., 0., 0.])
+
+For (nearly) equal decay constants of a parent and one of its
+descendants, the eigenvectors are (nearly) parallel and the Bateman
+terms cancel. The masses are then computed from the matrix exponential
+exp(A t) instead.
+"""
+
+import numpy as np
+import scipy.linalg
+
+#: Main decay path of the uranium-238 series: nuclide and half-life in s
+#: (the branches below 0.1 % are neglected; Pb-206 is stable)
+U238_SERIES = (('U-238', 1.4099e17), ('Th-234', 2.0822e6), ('Pa-234m', 70.2), ('U-234', 7.7472e12),
+               ('Th-230', 2.3794e12), ('Ra-226', 5.0492e10), ('Rn-222', 3.3035e5), ('Po-218', 185.88),
+               ('Pb-214', 1608.), ('Bi-214', 1194.), ('Po-214', 1.643e-4), ('Pb-210', 7.0056e8),
+               ('Bi-210', 4.3304e5), ('Po-210', 1.1956e7), ('Pb-206', np.inf))
+
+# largest admissible amplification of the rounding errors by the cancellation
+# of the Bateman terms
+_MAX_AMPLIFICATION = 1e6
+
+
+def decay_constants(half_lives):
+    """Decay constants ln 2 / T½ (0 for an infinite half-life, i.e. a stable member)."""
+    return np.log(2.) / np.asarray(half_lives, dtype=float)
+
+
+class DecayChain:
+    """Members with the decay constants rates (1/time), ordered from parents to daughters.
+
+    branches is a sequence of (parent, daughter, fraction) records with the
+    indices of the members; by default every member decays completely into
+    the next one. Decays that are not assigned to a daughter (the rest of
+    the fractions of a member) leave the chain.
+    """
+
+    def __init__(self, rates, branches=None):
+        self.rates = np.asarray(rates, dtype=float)
+        n = len(self.rates)
+        if branches is None:
+            branches = [(k, k + 1, 1.) for k in range(n - 1)]
+        self.matrix = np.diag(-self.rates)
+        for parent, daughter, fraction in branches:
+            if not 0 <= parent < daughter < n:
+                raise ValueError('members must be ordered from parents to daughters')
+            self.matrix[daughter, parent] += fraction * self.rates[parent]
+        self._modes = self._eigenvectors()
+
+    def _eigenvectors(self):
+        """Unit lower triangular eigenvectors (columns) of the rate matrix, None if they do not exist."""
+        A, d = self.matrix, -self.rates
+        n = len(d)
+        V = np.eye(n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in range(1, n):
+                # forward substitution of (A - d_k I) v_k = 0 for all k < i at once
+                coupling = A[i, :i] @ V[:i, :i]
+                V[i, :i] = np.where(coupling == 0., 0., coupling / (d[:i] - d[i]))
+        return V if np.all(np.isfinite(V)) else None
+
+    def masses(self, t, m0):
+        """Masses of the members (array of shape (len(t), members)) at the times t for the masses m0 at t = 0."""
+        t = np.asarray(t, dtype=float)
+        m0 = np.asarray(m0, dtype=float)
+        if self._modes is not None:
+            V = self._modes
+            c = scipy.linalg.solve_triangular(V, m0, lower=True, unit_diagonal=True)
+            # the terms of the sums are at most as large as at t = 0
+            scale = np.abs(V) @ np.abs(c)
+            if scale.max() <= _MAX_AMPLIFICATION * max(np.abs(m0).max(), np.finfo(float).tiny):
+                return (np.exp(np.multiply.outer(t, -self.rates)) * c) @ V.T
+        return self._exponential(t.ravel(), m0).reshape(t.shape + m0.shape)
+
+    def _exponential(self, t, m0):
+        """Masses from exp(A t) m0; blocks of powers of exp(A dt) on a uniform time grid."""
+        n = len(t)
+        if n > 2:
+            dt = (t[-1] - t[0]) / (n - 1)
+            uniform = np.abs(np.diff(t) - dt).max() <= 1e-9 * np.abs(t).max()
+        else:
+            uniform = False
+        if not uniform:
+            out = np.empty((n, len(m0)))
+            for s in range(0, n, 1000):
+                out[s:s + 1000] = scipy.linalg.expm(t[s:s + 1000, None, None] * self.matrix) @ m0
+            return out
+        # m(t0 + (jb + k) dt) = exp(A jb dt) exp(A k dt) m(t0) for the blocks j of b steps
+        b = int(np.ceil(np.sqrt(n)))
+        step = scipy.linalg.expm(self.matrix * dt)
+        head = np.empty((b, len(m0)))
+        head[0] = scipy.linalg.expm(self.matrix * t[0]) @ m0
+        for k in range(1, b):
+            head[k] = step @ head[k - 1]
+        block = scipy.linalg.expm(self.matrix * (b * dt))
+        out = np.empty((-(-n // b) * b, len(m0)))
+        power = np.eye(len(m0))
+        for s in range(0, n, b):
+            out[s:s + b] = head @ power.T
+            power = block @ power
+        return out[:n]
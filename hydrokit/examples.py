@@ -0,0 +1,57 @@
+"""Model setups of the groundwater modelling tutorials.
+
+The functions return the keyword arguments of ``fdm.solve_flow``, so a
+tutorial model runs inside an app without MODELMUSE and MODFLOW::
+
+    from hydrokit import examples, fdm
+    model = examples.synthetic_catchment()
+    result = fdm.solve_flow(**model)
+"""
+
+import numpy as np
+
+from .fdm import polyline_cells
+
+#: Wells of the synthetic catchment: name, x and y in m
+SYNTHETIC_WELLS = (('W1', 3060.8, 1651.3), ('W2', 3064.1, 1348.3))
+
+
+def synthetic_catchment(k=5e-3, k_zone=2e-3, rch_west=150., rch_east=200., q_wells=(-2000., -5000.),
+                        river_cond=1000., convertible=True):
+    """The 2D synthetic catchment of ``Tutorial_2D_Synth`` (``DATA/2D_Synthetic.gpt``).
+
+    40 x 25 cells of 100 m, one layer from 250 to 265 m, hydraulic
+    conductivity k (m/s) and k_zone in the north-east (x > 2500 m,
+    y > 1500 m). Defined heads of 260 m along the western border and of 256
+    (south) to 254 m (north) along the eastern border, recharge rch_west and
+    rch_east in mm/a west and east of x = 2000 m, the river from the
+    south-west corner to (2506, 1490) with the stage falling from 260 to
+    258 m, the bottom from 255 to 253 m and the conductance river_cond in
+    m²/d per m of river length, and the wells W1 and W2 with the pumping
+    rates q_wells in m³/d (negative for pumping). Returns the arguments of
+    ``fdm.solve_flow`` (row 0 is the northern row).
+    """
+    ncol, nrow, size = 40, 25, 100.
+    x_edges = np.arange(ncol + 1) * size
+    y_edges = (nrow - np.arange(nrow + 1)) * size
+    x = (x_edges[:-1] + x_edges[1:]) / 2.
+    y = (y_edges[:-1] + y_edges[1:]) / 2.
+    X, Y = np.meshgrid(x, y)
+
+    hk = np.where((X > 2500.) & (Y > 1500.), k_zone, k)
+    mm_per_year = 1e-3 / (365.25 * 86400.)
+    rch = np.where(X < 2000., rch_west, rch_east) * mm_per_year
+
+    chd = [(0, row, 0, 260.) for row in range(nrow)]
+    chd += [(0, row, ncol - 1, 256. - 2. * y[row] / 2500.) for row in range(nrow)]
+
+    rows, cols, length = polyline_cells([(-5., -9.), (2506., 1490.)], x_edges, y_edges)
+    xr = x[cols]
+    riv = [(0, r, c, 260. - 2. * xc / 2500., river_cond / 86400. * dl, 255. - 2. * xc / 2500.)
+           for r, c, xc, dl in zip(rows, cols, xr, length)]
+
+    wel = [(0, int((y_edges[0] - yw) // size), int(xw // size), q / 86400.)
+           for (name, xw, yw), q in zip(SYNTHETIC_WELLS, q_wells)]
+
+    return dict(delr=np.full(ncol, size), delc=np.full(nrow, size), top=265., botm=250., k=hk,
+                chd=chd, wel=wel, riv=riv, rch=rch, convertible=convertible, h0=257.)
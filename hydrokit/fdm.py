@@ -0,0 +1,494 @@
+"""Finite-difference models of groundwater flow.
+
+The 1D model is node centred: the first and the last node carry defined
+heads, every inner node i balances the flow from its neighbours and the
+recharge R (in m/s),
+
+    c[i-1] (h[i-1] - h[i]) + c[i] (h[i+1] - h[i]) + R[i] = 0,
+
+with the conductances c = T / dx² between the nodes (harmonic mean of the
+transmissivities of both nodes). The system is tridiagonal; it is either
+solved directly or with one of the iterative schemes that are taught with
+the model (Jacobi, Gauss-Seidel, SOR), vectorized over all nodes.
+
+The 2D/3D model (``solve_flow``) is block centred like MODFLOW: a grid of
+nlay x nrow x ncol cells (layer 0 on top, row 0 in the north), with the
+conductances between the cells from the harmonic mean of the
+transmissivities, the boundary packages CHD, RCH, WEL, RIV and GHB and the
+storage term of a transient step. The sparse system is solved with the
+conjugate gradient method, preconditioned with an algebraic multigrid
+V-cycle (smoothed aggregation) or with the matrix diagonal, or with a sparse
+LU decomposition. No MODFLOW executable is needed.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+
+METHODS = ('jacobi', 'gauss-seidel', 'sor')
+
+SOLVERS = ('amg', 'pcg', 'direct')
+
+IterationResult = namedtuple('IterationResult', 'h n_iter converged head_change residual')
+
+FlowResult = namedtuple('FlowResult', 'head budget n_outer converged flows')
+
+#: Cell-by-cell flows in m³/s as in MODFLOW: through the right face (to the
+#: next column, nlay x nrow x ncol-1), the front face (to the next row,
+#: nlay x nrow-1 x ncol) and the lower face (to the next layer,
+#: nlay-1 x nrow x ncol), and the saturated thickness of the cells in m
+FaceFlows = namedtuple('FaceFlows', 'right front lower saturated')
+
+
+def _conductance_1d(cells, dx, T):
+    """Conductances between neighbouring nodes (length cells - 1)."""
+    T = np.broadcast_to(np.asarray(T, dtype=float), (cells,))
+    return 2. * T[:-1] * T[1:] / (T[:-1] + T[1:]) / dx ** 2
+
+
+def _recharge_1d(cells, R):
+    return np.broadcast_to(np.asarray(R, dtype=float), (cells,))
+
+
+def confined_1d_system(cells, dx, T, R, h_left, h_right):
+    """Banded matrix (3 x cells, as for scipy.linalg.solve_banded) and right-hand side of the 1D model.
+
+    T and R are scalars or arrays with one value per node; the boundary
+    nodes get the rows h = h_left and h = h_right.
+    """
+    c = _conductance_1d(cells, dx, T)
+    ab = np.zeros((3, cells))
+    ab[0, 2:] = c[1:]                  # upper diagonal
+    ab[1, 1:-1] = -(c[:-1] + c[1:])    # main diagonal
+    ab[2, :-2] = c[:-1]                # lower diagonal
+    ab[1, 0] = ab[1, -1] = 1.
+    rhs = -_recharge_1d(cells, R).copy()
+    rhs[0], rhs[-1] = h_left, h_right
+    return ab, rhs
+
+
+def solve_confined_1d(cells, dx, T, R, h_left, h_right):
+    """Heads of the 1D model from a direct solution of the tridiagonal system.
+
+    The LAPACK band solver works like the Thomas algorithm; 10^6 nodes take
+    a few tens of milliseconds.
+    """
+    ab, rhs = confined_1d_system(cells, dx, T, R, h_left, h_right)
+    return scipy.linalg.solve_banded((1, 1), ab, rhs)
+
+
+def iterations_1d(cells, dx, T, R, h_left, h_right, method='jacobi', omega=1.5, h0=None):
+    """Generator of the iterations of the 1D model.
+
+    Yields (h, head_change, residual) after every iteration: the heads, the
+    maximum head change of the iteration (the closure criterion of the
+    apps) and the maximum absolute flow imbalance of a node (in m/s). The
+    initial heads h0 default to the mean of the boundary heads. Gauss-Seidel
+    and SOR (relaxation factor omega) update the odd and then the even
+    nodes (red-black ordering), so both half-sweeps are vectorized; the
+    convergence rate is the same as for the node-by-node sweep.
+    """
+    if method not in METHODS:
+        raise ValueError("method must be one of %s" % ', '.join(METHODS))
+    c = _conductance_1d(cells, dx, T)
+    R = _recharge_1d(cells, R)
+    cl, cr, r_in = c[:-1], c[1:], R[1:-1]
+    diag = cl + cr
+    h = np.full(cells, (h_left + h_right) / 2.) if h0 is None else np.array(h0, dtype=float)
+    h[0], h[-1] = h_left, h_right
+    w = 1. if method == 'gauss-seidel' else omega
+    while True:
+        h_old = h.copy()
+        if method == 'jacobi':
+            h[1:-1] = (cl * h[:-2] + cr * h[2:] + r_in) / diag
+        else:
+            for start in (1, 2):
+                # nodes i = start, start + 2, ...; k = i - 1 indexes cl, cr, r_in and diag
+                i, k = slice(start, cells - 1, 2), slice(start - 1, cells - 2, 2)
+                left, right = slice(start - 1, cells - 2, 2), slice(start + 1, cells, 2)
+                gs = (cl[k] * h[left] + cr[k] * h[right] + r_in[k]) / diag[k]
+                h[i] += w * (gs - h[i])
+        residual = np.abs(cl * h[:-2] + cr * h[2:] - diag * h[1:-1] + r_in)
+        yield h, np.max(np.abs(h - h_old)), np.max(residual, initial=0.)
+
+
+def iterate_1d(cells, dx, T, R, h_left, h_right, method='jacobi', omega=1.5, max_iter=1000, epsilon=1e-3,
+               h0=None):
+    """Iterate the 1D model until the maximum head change is at most epsilon.
+
+    Returns an IterationResult with the heads, the number of iterations, the
+    convergence flag and the histories (one value per iteration) of the
+    maximum head change and the maximum residual. See ``iterations_1d``.
+    """
+    changes, residuals = [], []
+    h = None
+    for h, dh, res in iterations_1d(cells, dx, T, R, h_left, h_right, method, omega, h0):
+        changes.append(dh)
+        residuals.append(res)
+        if dh <= epsilon or len(changes) >= max_iter:
+            break
+    return IterationResult(h, len(changes), changes[-1] <= epsilon, np.array(changes), np.array(residuals))
+
+
+# 2D/3D block-centred model
+
+def _layers(delr, delc, top, botm):
+    """Grid arrays: cell widths, tops and bottoms with shape (nlay, nrow, ncol)."""
+    delr, delc = np.asarray(delr, dtype=float), np.asarray(delc, dtype=float)
+    shape2 = (delc.size, delr.size)
+    botm = np.asarray(botm, dtype=float)
+    if botm.ndim in (0, 2):
+        botm = botm[None]
+    elif botm.ndim == 1:
+        botm = botm[:, None, None]
+    botm = np.broadcast_to(botm, (botm.shape[0],) + shape2)
+    tops = np.concatenate([np.broadcast_to(np.asarray(top, dtype=float), shape2)[None], botm[:-1]])
+    return delr, delc, tops, botm
+
+
+def _harmonic(a, b, la, lb):
+    """Harmonic mean of a and b over the lengths la and lb, divided by (la + lb) / 2; 0 for a or b = 0."""
+    den = a * lb + b * la
+    return np.divide(2. * a * b, den, out=np.zeros(np.broadcast(a, b, den).shape), where=den > 0.)
+
+
+def _conductances(delr, delc, k, k33, thk, sat):
+    """Conductances along the rows, along the columns and between the layers.
+
+    The horizontal conductances use the saturated thickness sat, the
+    vertical ones the full cell thickness (as MODFLOW does by default).
+    """
+    T = k * sat
+    c_row = delc[None, :, None] * _harmonic(T[..., :-1], T[..., 1:], delr[:-1], delr[1:])
+    c_col = delr[None, None, :] * _harmonic(T[:, :-1], T[:, 1:], delc[:-1, None], delc[1:, None])
+    area = delc[:, None] * delr[None, :]
+    c_lay = area * _harmonic(k33[:-1], k33[1:], thk[:-1], thk[1:])
+    return np.concatenate([c_row.ravel(), c_col.ravel(), c_lay.ravel()])
+
+
+def _connections(shape):
+    """Cell numbers of the two cells of every connection (same order as _conductances)."""
+    idx = np.arange(np.prod(shape)).reshape(shape)
+    first = np.concatenate([idx[..., :-1].ravel(), idx[:, :-1].ravel(), idx[:-1].ravel()])
+    second = np.concatenate([idx[..., 1:].ravel(), idx[:, 1:].ravel(), idx[1:].ravel()])
+    return first, second
+
+
+def _cells(records, shape, n_values):
+    """Cell numbers and value columns of package records (layer, row, column, value, ...)."""
+    records = np.asarray(records, dtype=float).reshape(-1, 3 + n_values)
+    cells = np.ravel_multi_index(tuple(records[:, :3].astype(int).T), shape)
+    return cells, records[:, 3:].T
+
+
+def _amg_hierarchy(A, coords, max_coarse=500, size=3, threshold=0.25):
+    """Smoothed-aggregation multigrid hierarchy of the SPD matrix A.
+
+    coords are the grid indices (layer, row, column) of the unknowns. The
+    aggregates are blocks of up to size cells along the grid directions
+    with strong coupling; a direction is only aggregated when the mean
+    coupling of neighbours along it is at least threshold times that of the
+    strongest direction (semi-coarsening of anisotropic problems, e.g. of
+    thin layers). The coupling of the aggregates follows from that of the
+    cells like the conductance of a block of cells. The tentative
+    prolongator is smoothed with one damped Jacobi step; the coarse matrices
+    are the Galerkin products P^T A P.
+    """
+    C = A.tocoo()
+    off = C.row != C.col
+    direction = (coords[C.row[off]] != coords[C.col[off]]).argmax(1)
+    dims = coords.shape[1]
+    strength = np.bincount(direction, -C.data[off], dims) / np.maximum(np.bincount(direction, minlength=dims), 1)
+    levels = []
+    while A.shape[0] > max_coarse:
+        factor = np.where(strength >= threshold * strength.max(), size, 1)
+        coarse = coords // factor
+        key = np.ravel_multi_index(tuple(coarse.T), tuple(coarse.max(0) + 1))
+        uniq, agg = np.unique(key, return_inverse=True)
+        if uniq.size == A.shape[0]:
+            break
+        n = A.shape[0]
+        tentative = scipy.sparse.csr_matrix((np.ones(n), (np.arange(n), agg)), shape=(n, uniq.size))
+        dinv = 1. / A.diagonal()
+        # for diagonally dominant matrices the spectral radius of D^-1 A is at
+        # most 2, so 2/3 is the usual damping factor 4/3 / rho
+        P = (tentative - scipy.sparse.diags(2. / 3. * dinv) @ (A @ tentative)).tocsr()
+        levels.append((A, P, dinv))
+        A = (P.T @ A @ P).tocsr()
+        coords = np.array(np.unravel_index(uniq, tuple(coarse.max(0) + 1))).T
+        strength = strength * np.prod(factor) / factor ** 2
+    return levels, scipy.sparse.linalg.splu(A.tocsc())
+
+
+def _amg_vcycle(levels, coarse_lu, b, level=0):
+    """One V-cycle with damped Jacobi pre- and post-smoothing (symmetric, usable as CG preconditioner)."""
+    if level == len(levels):
+        return coarse_lu.solve(b)
+    A, P, dinv = levels[level]
+    x = 2. / 3. * dinv * b
+    x += P @ _amg_vcycle(levels, coarse_lu, P.T @ (b - A @ x), level + 1)
+    x += 2. / 3. * dinv * (b - A @ x)
+    return x
+
+
+class _LinearSolver:
+    """Solves the systems of the outer iterations and time steps of one model run.
+
+    The multigrid hierarchy is set up once and reused as preconditioner for
+    the following systems, whose matrices differ only by the head-dependent
+    terms; it is rebuilt when CG does not converge with the old one.
+    """
+
+    def __init__(self, method, coords):
+        if method not in SOLVERS:
+            raise ValueError("solver must be one of %s" % ', '.join(SOLVERS))
+        self.method, self.coords = method, coords
+        self.max_iter = 10000 if method == 'pcg' else 500
+        self.hierarchy = None
+
+    def __call__(self, A, b, x0, rtol=1e-10):
+        if self.method == 'direct':
+            return scipy.sparse.linalg.spsolve(A.tocsc(), b)
+        for attempt in range(2):
+            if self.method == 'pcg':
+                M = scipy.sparse.diags(1. / A.diagonal())
+            else:
+                if self.hierarchy is None or attempt:
+                    self.hierarchy = _amg_hierarchy(A, self.coords)
+                M = scipy.sparse.linalg.LinearOperator(A.shape, lambda r: _amg_vcycle(*self.hierarchy, r))
+            x, info = scipy.sparse.linalg.cg(A, b, x0, rtol=rtol, atol=0., maxiter=self.max_iter, M=M)
+            if info == 0 or self.method == 'pcg':
+                break
+        if info != 0:
+            raise RuntimeError('CG did not converge in %i iterations' % self.max_iter)
+        return x
+
+
+def solve_flow(delr, delc, top, botm, k, k33=None, chd=(), wel=(), riv=(), ghb=(), rch=0., convertible=False,
+               active=None, h0=None, ss=1e-5, sy=0.2, steps=None, solver='amg', hclose=1e-5, max_outer=100):
+    """Heads of a steady or transient 2D/3D block-centred flow model.
+
+    Grid: delr are the widths of the ncol columns, delc the widths of the
+    nrow rows (in m), top the top of layer 0 (nrow x ncol) and botm the
+    bottoms of the layers (nlay x nrow x ncol; a scalar or an nrow x ncol
+    array for a single layer). k and k33 (default k) are the horizontal and
+    vertical hydraulic conductivities in m/s, scalars or arrays per cell.
+    Cells with active == False (or 0) do not take part.
+
+    Boundary packages, each a sequence of records with the zero-based cell
+    indices (layer, row, column) as in flopy:
+
+    * chd (layer, row, column, head): defined head
+    * wel (layer, row, column, Q): pumping (Q < 0) or injection in m³/s
+    * riv (layer, row, column, stage, conductance, rbot): river, the
+      leakage C (stage - h) is limited to C (stage - rbot) for h < rbot
+    * ghb (layer, row, column, head, conductance): general head boundary
+
+    rch is the recharge in m/s (scalar or nrow x ncol array), applied to
+    layer 0. With convertible=True (a flag for all or one per layer) the
+    transmissivity of a layer is computed from the saturated thickness
+    h - bottom (at most the layer thickness; dry cells keep a thin saturated
+    thickness of 1e-4 of the layer thickness instead of being switched off).
+    Head-dependent terms are handled with Picard (outer) iterations until
+    the maximum head change is at most hclose.
+
+    For a transient run, steps are the lengths of the time steps in s; the
+    stresses are constant, several stress periods are run one after the
+    other with h0 = the last heads of the previous period. ss is the
+    specific storage (1/m), sy the specific yield of convertible layers
+    below their top (implicit time stepping). The storage of a convertible
+    cell is split at its top as in MODFLOW, sy (min(h, top) - min(h_old,
+    top)) + ss b (max(h, top) - max(h_old, top)), so a head crossing the top
+    between two steps is charged with both parts. h0 are the initial heads
+    (starting heads of the iterations for a steady run), by default the
+    cell tops.
+
+    solver: 'amg' (CG with a multigrid preconditioner, fast for large
+    grids, 10^6 cells in a few seconds), 'pcg' (CG with the diagonal as
+    preconditioner) or 'direct' (sparse LU, for small grids).
+
+    Returns a FlowResult with the heads (nlay x nrow x ncol, NaN in
+    inactive cells; for a transient run with a leading time axis of
+    len(steps) + 1 including h0), the water budget of the (last) solution
+    ({package: (inflow, outflow)} in m³/s, see ``budget_discrepancy``), the
+    number of outer iterations (of the last step), the convergence flag and
+    the cell-by-cell flows (``FaceFlows``, e.g. for particle tracking with
+    ``tracking.pollock``).
+    """
+    delr, delc, tops, botm = _layers(delr, delc, top, botm)
+    shape = botm.shape
+    thk = tops - botm
+    area = np.broadcast_to(delc[:, None] * delr[None, :], shape)
+    k = np.broadcast_to(np.asarray(k, dtype=float), shape)
+    k33 = k if k33 is None else np.broadcast_to(np.asarray(k33, dtype=float), shape)
+    convertible = np.broadcast_to(np.asarray(convertible, dtype=bool).reshape(-1, 1, 1), shape)
+    active = np.ones(shape, bool) if active is None else np.broadcast_to(np.asarray(active, dtype=bool), shape)
+
+    n = int(np.prod(shape))
+    chd_cells, (chd_head,) = _cells(chd, shape, 1)
+    fixed = np.zeros(n, bool)
+    fixed[chd_cells] = True
+    fixed_head = np.zeros(n)
+    fixed_head[chd_cells] = chd_head
+    free = active.ravel() & ~fixed
+    number = np.full(n, -1)
+    number[free] = np.arange(free.sum())
+
+    # connections between two active cells
+    first, second = _connections(shape)
+    keep = active.ravel()[first] & active.ravel()[second]
+    first, second = first[keep], second[keep]
+
+    wel_cells, (wel_q,) = _cells(wel, shape, 1)
+    riv_cells, (riv_stage, riv_cond, riv_bot) = _cells(riv, shape, 3)
+    ghb_cells, (ghb_head, ghb_cond) = _cells(ghb, shape, 2)
+    recharge = np.zeros(shape)
+    recharge[0] = np.asarray(rch, dtype=float) * area[0]
+    recharge = recharge.ravel()
+    area = area.ravel()
+    steady = steps is None
+    nonlinear = np.any(convertible) or len(riv_cells) > 0
+    # storage capacities (m²) below and above the cell tops; confined cells have ss thk on both sides
+    s_s = (ss * thk).ravel() * area
+    s_y = np.where(convertible, sy, ss * thk).ravel() * area
+    cell_top = np.broadcast_to(tops, shape).ravel()
+
+    def assemble(h, h_old, dt):
+        """Matrix and right-hand side of the free cells for the heads h of the last iteration."""
+        h = h.reshape(shape)
+        sat = np.where(convertible, np.clip(h - botm, 1e-4 * thk, thk), thk)
+        cond = _conductances(delr, delc, k, k33, thk, sat)[keep]
+        diag = np.bincount(first, cond, n) + np.bincount(second, cond, n)
+        b = recharge.copy()
+        np.add.at(b, wel_cells, wel_q)
+        np.add.at(diag, ghb_cells, ghb_cond)
+        np.add.at(b, ghb_cells, ghb_cond * ghb_head)
+        wet = h.ravel()[riv_cells] > riv_bot
+        np.add.at(diag, riv_cells, np.where(wet, riv_cond, 0.))
+        np.add.at(b, riv_cells, riv_cond * np.where(wet, riv_stage, riv_stage - riv_bot))
+        if not steady:
+            # split storage of MODFLOW: sy below the top, ss thk above it, linearised on the side of the iterate
+            below = h.ravel() < cell_top
+            ratio = np.where(below, s_y, s_s) / dt
+            diag += ratio
+            b += ratio * np.where(below, np.minimum(h_old, cell_top), np.maximum(h_old, cell_top))
+            b -= np.where(below, s_s * (cell_top - np.maximum(h_old, cell_top)),
+                          s_y * (cell_top - np.minimum(h_old, cell_top))) / dt
+        # flow from the defined heads to the free cells moves to the right-hand side
+        for i, j in ((first, second), (second, first)):
+            to_fixed = free[i] & fixed[j]
+            np.add.at(b, i[to_fixed], cond[to_fixed] * fixed_head[j[to_fixed]])
+        inner = free[first] & free[second]
+        rows = np.concatenate([number[first[inner]], number[second[inner]], number[free]])
+        cols = np.concatenate([number[second[inner]], number[first[inner]], number[free]])
+        values = np.concatenate([-cond[inner], -cond[inner], diag[free]])
+        size = number.max() + 1
+        A = scipy.sparse.csr_matrix((values, (rows, cols)), shape=(size, size))
+        return A, b[free]
+
+    linear_solver = _LinearSolver(solver, np.array(np.unravel_index(np.flatnonzero(free), shape)).T)
+
+    def step(h, dt=None):
+        """Outer iterations of a steady solution or of one time step, starting from h."""
+        h_old = h.copy()
+        change = np.inf
+        for n_outer in range(1, max_outer + 1):
+            A, b = assemble(h, h_old, dt)
+            # inexact solutions while the outer iterations are far from convergence
+            exact = not nonlinear or change <= 100. * hclose
+            h_new = h.copy()
+            h_new[free] = linear_solver(A, b, h[free], 1e-10 if exact else 1e-6)
+            change = np.max(np.abs(h_new - h)[free], initial=0.)
+            h = h_new
+            if not nonlinear or exact and change <= hclose:
+                return h, n_outer, True
+        return h, max_outer, False
+
+    h = np.array(np.broadcast_to(tops[0] if h0 is None else np.asarray(h0, dtype=float), shape)).ravel()
+    h[fixed] = fixed_head[fixed]
+    if steady:
+        h, n_outer, converged = step(h)
+        heads = h.reshape(shape)
+    else:
+        heads = [h]
+        for dt in np.atleast_1d(steps):
+            h_old = h
+            h, n_outer, converged = step(h, dt)
+            heads.append(h)
+        heads = np.array(heads).reshape((-1,) + shape)
+
+    # water budget of the last solution
+    h_grid = h.reshape(shape)
+    sat = np.where(convertible, np.clip(h_grid - botm, 1e-4 * thk, thk), thk)
+    cond = _conductances(delr, delc, k, k33, thk, sat)[keep]
+    flows = {}
+    flows['CHD'] = np.concatenate([cond * (h[first] - h[second]) * (fixed[first] & free[second]),
+                                   cond * (h[second] - h[first]) * (fixed[second] & free[first])])
+    flows['RCH'] = recharge[active.ravel() & ~fixed]
+    flows['WEL'] = wel_q[free[wel_cells]]
+    flows['RIV'] = (riv_cond * (riv_stage - np.maximum(h[riv_cells], riv_bot)))[free[riv_cells]]
+    flows['GHB'] = (ghb_cond * (ghb_head - h[ghb_cells]))[free[ghb_cells]]
+    if not steady:
+        stored = (s_y * (np.minimum(h, cell_top) - np.minimum(h_old, cell_top))
+                  + s_s * (np.maximum(h, cell_top) - np.maximum(h_old, cell_top)))
+        flows['STORAGE'] = (-stored / dt)[free]
+    budget = {name: (q[q > 0.].sum(), -q[q < 0.].sum()) for name, q in flows.items()}
+
+    # face flows between active cells, zero at inactive cells and the grid boundary
+    face = np.zeros(len(keep))
+    face[keep] = cond * (h[first] - h[second])
+    nlay, nrow, ncol = shape
+    n_right, n_front = nlay * nrow * (ncol - 1), nlay * (nrow - 1) * ncol
+    faces = FaceFlows(face[:n_right].reshape(nlay, nrow, ncol - 1),
+                      face[n_right:n_right + n_front].reshape(nlay, nrow - 1, ncol),
+                      face[n_right + n_front:].reshape(nlay - 1, nrow, ncol), np.where(active, sat, 0.))
+
+    heads[..., ~active] = np.nan
+    return FlowResult(heads, budget, n_outer, converged, faces)
+
+
+def budget_discrepancy(budget):
+    """Difference of total inflow and outflow of a water budget in percent of their mean."""
+    inflow = sum(q_in for q_in, q_out in budget.values())
+    outflow = sum(q_out for q_in, q_out in budget.values())
+    return 100. * (inflow - outflow) / ((inflow + outflow) / 2.)
+
+
+def polyline_cells(points, x_edges, y_edges):
+    """Cells crossed by a polyline and the length of the line in every cell.
+
+    points are the vertices (x, y) of the line, x_edges and y_edges the cell
+    boundaries of the columns and rows (increasing or decreasing, e.g.
+    decreasing y for row 0 in the north). Returns the arrays row, column and
+    length with one entry per cell; parts outside the grid are ignored. Used
+    to place line features such as rivers, e.g. with a conductance per unit
+    length multiplied by the length.
+    """
+    points = np.asarray(points, dtype=float)
+    x_edges, y_edges = np.asarray(x_edges, dtype=float), np.asarray(y_edges, dtype=float)
+    cells = {}
+    for (x0, y0), (x1, y1) in zip(points[:-1], points[1:]):
+        # parameters of the crossings with all grid lines, then the pieces between them
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = np.concatenate([(x_edges - x0) / (x1 - x0), (y_edges - y0) / (y1 - y0)])
+        s = np.unique(np.concatenate([[0., 1.], s[(s > 0.) & (s < 1.)]]))
+        xm, ym = x0 + (x1 - x0) * (s[:-1] + s[1:]) / 2., y0 + (y1 - y0) * (s[:-1] + s[1:]) / 2.
+        length = np.diff(s) * np.hypot(x1 - x0, y1 - y0)
+        col = _edge_index(x_edges, xm)
+        row = _edge_index(y_edges, ym)
+        inside = (col >= 0) & (row >= 0)
+        for r, c, ds in zip(row[inside], col[inside], length[inside]):
+            cells[r, c] = cells.get((r, c), 0.) + ds
+    row, col = (np.array(index, dtype=int) for index in zip(*cells)) if cells else (np.zeros(0, int),) * 2
+    return row, col, np.array(list(cells.values()))
+
+
+def _edge_index(edges, coord):
+    """Index of the interval between the edges that contains coord, -1 outside."""
+    if edges[0] > edges[-1]:
+        edges, coord = -edges, -coord
+    index = np.searchsorted(edges, coord) - 1
+    return np.where((coord >= edges[0]) & (coord <= edges[-1]), np.clip(index, 0, edges.size - 2), -1)
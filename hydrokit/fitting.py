@@ -0,0 +1,337 @@
+"""Least-squares fitting of pumping-test data.
+
+The aquifer parameters of the Theis, Hantush-Jacob and Neuman solutions are
+estimated with a Levenberg-Marquardt algorithm in the natural logarithms of
+the parameters, which keeps them positive and makes the problem much better
+conditioned than fitting T and S directly. The algorithm works on a batch of
+observation wells at once: all wells are iterated together with NumPy, so
+fitting hundreds of drawdown curves costs little more than fitting one.
+
+Drawdowns are given in m, times in s, distances in m and pumping rates in
+m³/s. Parameters are always ordered as in ``MODELS``.
+"""
+
+import glob
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import scipy.stats
+
+from .wells import theis, theis_u, hantush_jacob, neuman
+
+MODELS = {
+    'theis': ('T', 'S'),
+    'hantush_jacob': ('T', 'S', 'r_div_B'),
+    'neuman': ('T', 'S', 'Sy', 'beta'),
+}
+
+# Bounds of the parameters during the fit. The Neuman series needs more terms
+# for small beta (about 10 / sqrt(beta)), which bounds beta from below.
+BOUNDS = {
+    'T': (1e-9, 10.),
+    'S': (1e-9, 1.),
+    'Sy': (1e-4, 1.),
+    'r_div_B': (1e-6, 10.),
+    'beta': (1e-3, 1e2),
+}
+
+FitResult = namedtuple('FitResult', 'names params log10_cov ci stats success n_iter')
+FitResult.__doc__ = """Result of a pumping-test fit.
+
+params are the best-fit parameter values and ci the (lower, upper) bounds of
+their confidence intervals; log10_cov is the covariance matrix of the log10 of
+the parameters. stats holds the error statistics of the fit (see
+``fit_statistics``). For a batch fit, all fields except names have a leading
+axis over the observation wells.
+"""
+
+_FD_STEP = 1e-3  # step in ln(parameter) for numerical derivatives
+_GRID_SIZE = 64  # times per well for the interpolation of the Neuman solution
+
+
+def compute_statistics(measured, computed):
+    """Mean error, mean absolute error and root mean squared error."""
+    error = np.asarray(computed, dtype=float) - np.asarray(measured, dtype=float)
+    return np.mean(error), np.mean(np.abs(error)), np.sqrt(np.mean(error ** 2))
+
+
+def fit_statistics(measured, computed, n_params=0, mask=None):
+    """Error statistics along the last axis, ignoring entries where mask is False.
+
+    Returns a dict with the number of observations n, the degrees of freedom
+    dof, me, mae, rmse, the sum of squared residuals ssr, the coefficient of
+    determination r2 and Akaike's information criterion aic.
+    """
+    measured = np.asarray(measured, dtype=float)
+    error = np.asarray(computed, dtype=float) - measured
+    if mask is None:
+        mask = np.ones(error.shape, dtype=bool)
+    error = np.where(mask, error, 0.)
+    n = mask.sum(axis=-1)
+    mean = np.where(mask, measured, 0.).sum(axis=-1) / n
+    ssr = np.sum(error ** 2, axis=-1)
+    sst = np.sum(np.where(mask, measured - mean[..., None], 0.) ** 2, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'n': n,
+            'dof': n - n_params,
+            'me': error.sum(axis=-1) / n,
+            'mae': np.abs(error).sum(axis=-1) / n,
+            'rmse': np.sqrt(ssr / n),
+            'ssr': ssr,
+            'r2': 1. - ssr / sst,
+            'aic': n * np.log(ssr / n) + 2. * n_params,
+        }
+
+
+def _neuman_interpolated(r, t, T, S, Sy, Q, beta):
+    """Neuman drawdown at the times t (wells, observations), interpolated in time.
+
+    The parameters may have additional leading axes. For long records the
+    drawdown of every well is computed at _GRID_SIZE log-spaced times between
+    its first and last observation and interpolated with a cubic
+    (Catmull-Rom) spline of log(s) over log(t), which is much cheaper than
+    evaluating the Neuman solution at every observation.
+    """
+    if t.shape[-1] <= _GRID_SIZE:
+        return neuman(r, t, T, S, Sy, Q, beta)
+    log_t = np.log(t)
+    lo = log_t.min(axis=-1, keepdims=True)
+    h = np.maximum(log_t.max(axis=-1, keepdims=True) - lo, 1e-6) / (_GRID_SIZE - 1)
+    # one additional node on both sides for the first and last interval
+    grid = lo + h * np.arange(-1, _GRID_SIZE + 1)
+    f = np.log(np.maximum(neuman(r, np.exp(grid), T, S, Sy, Q, beta), 1e-30))
+    xi = (log_t - lo) / h
+    i = np.clip(np.floor(xi).astype(int), 0, _GRID_SIZE - 2)
+    d = xi - i
+    p0, p1, p2, p3 = (np.take_along_axis(f, np.broadcast_to(i + k, f.shape[:-1] + i.shape[-1:]), axis=-1)
+                      for k in range(4))
+    return np.exp(p1 + 0.5 * d * (p2 - p0 + d * (2. * p0 - 5. * p1 + 4. * p2 - p3 + d * (3. * (p1 - p2) + p3 - p0))))
+
+
+def _drawdown_and_jacobian(model, x, t, r, Q):
+    """Drawdown and its derivatives with respect to the ln-parameters x.
+
+    x has shape (m, k), t (m, n) and r, Q (m, 1). The Theis derivatives and
+    those with respect to T and S of the Hantush-Jacob solution are analytic
+    (dW/du = -exp(-u - (r/B)²/4u) / u); the remaining ones are forward
+    differences. Since the drawdown depends on T also through u, its
+    derivative with respect to ln T is -s minus the sum of the derivatives
+    with respect to the storage parameters.
+    """
+    p = np.exp(x)[:, None, :]
+    T, S = p[..., 0], p[..., 1]
+    J = np.empty(t.shape + (x.shape[1],))
+    if model == 'theis':
+        s = theis(r, t, T, S, Q)
+        J[..., 1] = -Q / 4. / np.pi / T * np.exp(-theis_u(T, S, r, t))
+    elif model == 'hantush_jacob':
+        rb = p[..., 2]
+        s = hantush_jacob(r, t, T, S, Q, rb)
+        u = theis_u(T, S, r, t)
+        J[..., 1] = -Q / 4. / np.pi / T * np.exp(-u - rb ** 2 / 4. / u)
+        J[..., 2] = (hantush_jacob(r, t, T, S, Q, rb * np.exp(_FD_STEP)) - s) / _FD_STEP
+    else:
+        # the drawdown and the three perturbed curves in one call
+        step = np.exp(_FD_STEP * np.vstack([np.zeros(3), np.eye(3)]))[:, :, None, None]
+        s_all = _neuman_interpolated(r, t, T, S * step[:, 0], p[..., 2] * step[:, 1], Q, p[..., 3] * step[:, 2])
+        s = s_all[0]
+        J[..., 1:] = np.moveaxis(s_all[1:] - s, 0, -1) / _FD_STEP
+    J[..., 0] = -s - (J[..., 1] + J[..., 2] if model == 'neuman' else J[..., 1])
+    return s, J
+
+
+def _levenberg_marquardt(fun, x0, lower, upper, max_iter=100, xtol=1e-8, ftol=1e-10, gtol=1e-6):
+    """Minimize the sum of squared residuals for a batch of problems.
+
+    fun(x, idx) returns the residuals (m, n) and their Jacobian (m, n, k) for
+    the rows idx of x (m, k). Each row keeps its own damping parameter and
+    stops iterating once it has converged. Parameters on one of the bounds
+    (lower, upper) are held fixed while the gradient points outwards, and
+    steps that leave the bounds are projected back onto them. The convergence
+    tests follow MINPACK: a small relative step (xtol), small actual and
+    predicted relative reductions of the cost (ftol), or residuals that are
+    nearly orthogonal to the columns of the Jacobian (gtol).
+    """
+    x = np.clip(np.array(x0, dtype=float), lower, upper)
+    m, k = x.shape
+    res, J = fun(x, np.arange(m))
+    cost = np.sum(res ** 2, axis=-1)
+    lam = np.full(m, 1e-3)
+    n_iter = np.zeros(m, dtype=int)
+    done = np.zeros(m, dtype=bool)
+    success = np.zeros(m, dtype=bool)
+    eye = np.eye(k)
+    for _ in range(max_iter):
+        a = np.flatnonzero(~done)
+        if a.size == 0:
+            break
+        g = np.einsum('mni,mn->mi', J[a], res[a])
+        free = ~(((x[a] <= lower) & (g > 0.)) | ((x[a] >= upper) & (g < 0.)))
+        Jf = J[a] * free[:, None, :]
+        A = np.einsum('mni,mnj->mij', Jf, Jf)
+        g = g * free
+        diag = np.diagonal(A, axis1=1, axis2=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cosine = np.max(np.abs(g) / np.sqrt(diag * cost[a, None]), axis=-1, initial=0., where=diag > 0.)
+        stationary = cosine <= gtol
+        success[a[stationary]] = done[a[stationary]] = True
+        a, Jf, A, g = a[~stationary], Jf[~stationary], A[~stationary], g[~stationary]
+        if a.size == 0:
+            break
+        n_iter[a] += 1
+        # Marquardt scaling of the damping term; the small addition keeps the
+        # system regular for fixed parameters and those without influence
+        diag = np.diagonal(A, axis1=1, axis2=2)
+        D = (diag + 1e-12 * np.max(diag, axis=-1, keepdims=True))[:, None, :] * eye
+        step = np.linalg.solve(A + lam[a, None, None] * D, -g[..., None])[..., 0]
+        # Limit the change of each parameter to a factor of e**2
+        step = np.clip(step, -2., 2.)
+        x_new = np.clip(x[a] + step, lower, upper)
+        step = x_new - x[a]
+        predicted = cost[a] - np.sum((res[a] + np.einsum('mni,mi->mn', Jf, step)) ** 2, axis=-1)
+        res_new, J_new = fun(x_new, a)
+        cost_new = np.sum(res_new ** 2, axis=-1)
+        better = cost_new <= cost[a]
+        small_step = np.max(np.abs(step), axis=-1) <= xtol * (1. + np.max(np.abs(x_new), axis=-1))
+        small_reduction = (cost[a] - cost_new <= ftol * cost[a]) & (predicted <= ftol * cost[a])
+        converged = better & (small_step | small_reduction)
+        b = a[better]
+        x[b], res[b], J[b], cost[b] = x_new[better], res_new[better], J_new[better], cost_new[better]
+        lam[a] = np.where(better, np.maximum(lam[a] / 10., 1e-12), lam[a] * 10.)
+        success[a] = converged
+        done[a] = converged | (lam[a] > 1e12)
+    return x, res, J, success, n_iter
+
+
+def _initial_guess(model, t, s, r, Q, mask):
+    """Starting values from a Cooper-Jacob straight line.
+
+    For the Theis solution the line is fitted to the second half of the
+    observations. The Hantush-Jacob and Neuman curves flatten out at later
+    times, so there the steepest straight line through a quarter of the
+    observations is used; for the Neuman solution, it gives the specific yield
+    if it lies in the second half of the data and the elastic storativity
+    otherwise.
+    """
+    log_t = np.log10(np.where(mask, t, 1.))
+    n_obs = mask.sum(axis=-1, keepdims=True)
+    w = np.where(mask, 1., 0.)
+    if model == 'theis':
+        window = np.full(n_obs.shape, n_obs.max())
+        late = mask & (np.cumsum(mask, axis=-1) > n_obs / 2)
+        w = np.where(late, 1., 0.)
+    else:
+        window = np.maximum(n_obs // 4, 3)
+    # Sums over sliding windows of the observations from cumulative sums
+    sums = [np.concatenate([np.zeros((t.shape[0], 1)), np.cumsum(w * v, axis=-1)], axis=-1)
+            for v in (1., log_t, s, log_t * s, log_t ** 2)]
+    end = np.minimum(np.arange(1, t.shape[1] + 1) + window - 1, t.shape[1])
+    n, sx, sy, sxy, sxx = (np.take_along_axis(c, end, axis=-1) - c[:, :-1] for c in sums)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+    slope = np.where(np.isfinite(slope) & (n >= 3), slope, -np.inf)
+    i = np.argmax(slope, axis=-1)[:, None]
+    slope, n, sx, sy = (np.take_along_axis(v, i, axis=-1)[:, 0] for v in (slope, n, sx, sy))
+    mx, my = sx / np.maximum(n, 1.), sy / np.maximum(n, 1.)
+    slope = np.where(slope > 0., slope, np.maximum(my, 1e-3))
+    T = 2.3 * Q[:, 0] / 4. / np.pi / slope
+    t0 = 10. ** (mx - my / slope)
+    S = np.clip(2.25 * T * t0 / r[:, 0] ** 2, 1e-7, 0.5)
+    if model == 'theis':
+        p = [T, S]
+    elif model == 'hantush_jacob':
+        p = [T, S, np.full(T.shape, 0.1)]
+    else:
+        late = i[:, 0] >= n_obs[:, 0] / 2
+        Sy = np.where(late, S, np.clip(100. * S, 0.01, 0.3))
+        p = [T, np.where(late, S / 100., S), Sy, np.full(T.shape, 0.1)]
+    return np.stack(p, axis=-1)
+
+
+def _as_batch(values):
+    """Pad a sequence of 1D arrays with NaN into a 2D array."""
+    values = [np.atleast_1d(np.asarray(v, dtype=float)) for v in values]
+    out = np.full((len(values), max(v.size for v in values)), np.nan)
+    for i, v in enumerate(values):
+        out[i, :v.size] = v
+    return out
+
+
+def fit_pumping_tests(t, s, r, Q, model='theis', p0=None, confidence=0.95, max_iter=100):
+    """Fit a drawdown solution to the data of several observation wells.
+
+    t and s are sequences (one entry per well) of times in s and measured
+    drawdowns in m; the wells may have different numbers of observations.
+    r and Q are scalars or one value per well. model is one of the keys of
+    ``MODELS`` and p0 optional starting values with shape (n_wells, k) or
+    (k,); by default they are derived from a Cooper-Jacob straight line.
+    Observations at t <= 0 and NaN values are ignored.
+
+    Returns a FitResult with a leading axis over the wells. The covariance
+    matrix is the usual linearized estimate sigma² (JᵀJ)⁻¹ at the optimum and
+    the confidence intervals use Student's t distribution in log space.
+    """
+    if model not in MODELS:
+        raise ValueError("model must be one of %s" % ', '.join(MODELS))
+    t, s = _as_batch(t), _as_batch(s)
+    mask = np.isfinite(t) & np.isfinite(s) & (np.nan_to_num(t) > 0.)
+    # ignored entries get the last time of their well, so they do not change
+    # the range of times
+    t = np.where(mask, t, np.max(np.where(mask, t, 1.), axis=-1, keepdims=True))
+    s = np.where(mask, s, 0.)
+    m, k = t.shape[0], len(MODELS[model])
+    r = np.broadcast_to(np.asarray(r, dtype=float), (m,))[:, None]
+    Q = np.broadcast_to(np.asarray(Q, dtype=float), (m,))[:, None]
+    if p0 is None:
+        p0 = _initial_guess(model, t, s, r, Q, mask)
+    x0 = np.log(np.broadcast_to(np.asarray(p0, dtype=float), (m, k)))
+
+    def fun(x, idx):
+        model_s, J = _drawdown_and_jacobian(model, x, t[idx], r[idx], Q[idx])
+        m_idx = mask[idx]
+        return np.where(m_idx, model_s - s[idx], 0.), np.where(m_idx[..., None], J, 0.)
+
+    lower, upper = np.log(np.array([BOUNDS[name] for name in MODELS[model]])).T
+    x, res, J, success, n_iter = _levenberg_marquardt(fun, x0, lower, upper, max_iter=max_iter)
+
+    stats = fit_statistics(s, s + res, k, mask)
+    dof = stats['dof']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma2 = stats['ssr'] / dof
+        cov = sigma2[:, None, None] * np.linalg.pinv(np.einsum('mni,mnj->mij', J, J))
+        half_width = scipy.stats.t.ppf(0.5 + confidence / 2., dof)[:, None] * np.sqrt(np.diagonal(cov, axis1=1,
+                                                                                                axis2=2))
+    ci = np.exp(np.stack([x - half_width, x + half_width], axis=-1))
+    return FitResult(MODELS[model], np.exp(x), cov / np.log(10.) ** 2, ci, stats, success, n_iter)
+
+
+def fit_pumping_test(t, s, r, Q, model='theis', p0=None, confidence=0.95, max_iter=100):
+    """Fit a drawdown solution to the data of one observation well.
+
+    See ``fit_pumping_tests``; the fields of the result have no batch axis.
+    """
+    result = fit_pumping_tests([t], [s], r, Q, model, None if p0 is None else [p0], confidence, max_iter)
+    return result._replace(params=result.params[0], log10_cov=result.log10_cov[0], ci=result.ci[0],
+                           stats={key: v[0] for key, v in result.stats.items()}, success=result.success[0],
+                           n_iter=result.n_iter[0])
+
+
+def read_pumping_test(path, time_factor=60.):
+    """Read a two-column CSV file (time, drawdown).
+
+    A header line and incomplete rows are skipped. The times are multiplied by
+    time_factor (default: minutes to seconds).
+    """
+    data = np.genfromtxt(path, delimiter=',', usecols=(0, 1), ndmin=2)
+    data = data[np.all(np.isfinite(data), axis=1)]
+    return data[:, 0] * time_factor, data[:, 1]
+
+
+def read_pumping_tests(pattern, time_factor=60.):
+    """Read all files matching a glob pattern, e.g. ``DATA/Pumping_tests/Pirna24/g*.csv``.
+
+    Returns a dict {file name without suffix: (t, s)} sorted by name.
+    """
+    return {Path(f).stem: read_pumping_test(f, time_factor) for f in sorted(glob.glob(str(pattern)))}
@@ -0,0 +1,210 @@
+"""Infiltration and runoff of rainfall series on many soil columns at once.
+
+The infiltration capacity of a soil falls with the water that has already
+infiltrated. Three models give the cumulative infiltration F(τ) after the
+time τ of ponding (consistent units, e.g. mm and h):
+
+* ``green_ampt`` (Green and Ampt 1911): Ks τ = F - S ln(1 + F/S) with the
+  capillary drive S = psi_f d_theta (suction at the wetting front x
+  moisture deficit) and the capacity f = Ks (1 + S/F);
+* ``horton`` (Horton 1940): f = fc + (f0 - fc) exp(-k τ);
+* ``philip`` (Philip 1957): F = S √τ + A τ with the sorptivity S and A
+  (between Ks/3 and Ks).
+
+Rain that falls slower than the capacity infiltrates completely. The
+surface ponds once the capacity has dropped to the rain rate; for Green-
+Ampt and a constant rate r from a dry start that is after the ponding time
+t_p = S Ks / (r (r - Ks)) of Mein and Larson (1973). From then on the soil
+takes its capacity, which follows the ponded curve shifted in time so that
+it starts at the water infiltrated so far (time compression), and the rest
+of the rain runs off. ``partition`` applies this to every step of a rain
+series and to all columns together (parameters as arrays, one value per
+column)::
+
+    result = partition(P, 1., 'green_ampt', dict(Ks=Ks, psi_f=110., d_theta=0.3))
+    result.runoff          # mean runoff of all columns in every step
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+MODELS = {
+    'green_ampt': ('Ks', 'psi_f', 'd_theta'),
+    'horton': ('f0', 'fc', 'k'),
+    'philip': ('S', 'A'),
+}
+
+#: Infiltration and runoff (depth per step) and the runoff area (fraction of
+#: the columns with runoff) of every step as weighted means of the columns
+#: (steps x columns if full), the final cumulative infiltration F and the
+#: total infiltration and runoff of every column
+Partition = namedtuple('Partition', 'infiltration runoff runoff_area F column_infiltration column_runoff')
+
+
+def _newton(g, dg, x, tol=1e-12, max_iter=50):
+    """Root of the monotonic g from x; the steps of all values stop together."""
+    for _ in range(max_iter):
+        step = g(x) / dg(x)
+        x = x - step
+        if np.all(np.abs(step) <= tol * np.maximum(np.abs(x), 1.)):
+            break
+    return x
+
+
+# Every model has the cumulative infiltration F(τ) of ponding, its inverse
+# τ(F), the cumulative infiltration at which the capacity equals the rate r
+# and the capacity f(τ, F).
+
+def _green_ampt(p):
+    Ks, S = p['Ks'], p['psi_f'] * p['d_theta']
+
+    def cumulative(tau):
+        # convex in F: Newton from above decreases monotonically
+        return _newton(lambda F: F - S * np.log1p(F / S) - Ks * tau, lambda F: F / (S + F),
+                       np.sqrt(2. * S * Ks * tau) + Ks * tau + S * 1e-9)
+
+    def compressed_time(F):
+        return (F - S * np.log1p(F / S)) / Ks
+
+    def at_capacity(r):
+        with np.errstate(divide='ignore'):
+            return np.where(r > Ks, S * Ks / np.maximum(r - Ks, 0.), np.inf)
+
+    def capacity(tau, F):
+        with np.errstate(divide='ignore'):
+            return Ks * (1. + S / F)
+
+    return cumulative, compressed_time, at_capacity, capacity
+
+
+def _horton(p):
+    f0, fc, k = p['f0'], p['fc'], p['k']
+
+    def cumulative(tau):
+        return fc * tau + (f0 - fc) * -np.expm1(-k * tau) / k
+
+    def compressed_time(F):
+        # concave in τ: Newton from the lower bound F / f0 increases monotonically
+        return _newton(lambda tau: cumulative(tau) - F, lambda tau: fc + (f0 - fc) * np.exp(-k * tau), F / f0)
+
+    def at_capacity(r):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tau = np.where(r >= f0, 0., np.where(r > fc, np.log((f0 - fc) / (r - fc)) / k, np.inf))
+        return cumulative(tau)
+
+    def capacity(tau, F):
+        return fc + (f0 - fc) * np.exp(-k * tau)
+
+    return cumulative, compressed_time, at_capacity, capacity
+
+
+def _philip(p):
+    S, A = p['S'], p['A']
+
+    def cumulative(tau):
+        return S * np.sqrt(tau) + A * tau
+
+    def compressed_time(F):
+        return (2. * F / (S + np.sqrt(S ** 2 + 4. * A * F))) ** 2
+
+    def at_capacity(r):
+        with np.errstate(divide='ignore'):
+            root = np.where(r > A, S / (2. * np.maximum(r - A, 0.)), np.inf)
+        return S * root + A * root ** 2
+
+    def capacity(tau, F):
+        with np.errstate(divide='ignore'):
+            return S / (2. * np.sqrt(tau)) + A
+
+    return cumulative, compressed_time, at_capacity, capacity
+
+
+_FUNCTIONS = {'green_ampt': _green_ampt, 'horton': _horton, 'philip': _philip}
+
+
+def _parameters(model, params, shape=None):
+    if model not in MODELS:
+        raise ValueError("model must be one of %s" % ', '.join(MODELS))
+    if not isinstance(params, dict):
+        params = dict(zip(MODELS[model], params))
+    arrays = [np.asarray(params[name], dtype=float) for name in MODELS[model]]
+    if shape is not None:
+        arrays = [np.broadcast_to(a, shape).copy() for a in arrays]
+    return dict(zip(MODELS[model], arrays))
+
+
+def ponded_infiltration(t, model, params):
+    """Cumulative infiltration F and capacity f after the time t of ponding (broadcast over t and params)."""
+    functions = _FUNCTIONS[model](_parameters(model, params))
+    t = np.asarray(t, dtype=float)
+    F = functions[0](t)
+    return F, functions[3](t, F)
+
+
+def ponding_time(rate, model, params, F0=0.):
+    """Time until a constant rain rate ponds the surface after the infiltration F0 (inf if it never does)."""
+    at_capacity = _FUNCTIONS[model](_parameters(model, params))[2]
+    rate = np.asarray(rate, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(rate > 0., np.maximum(at_capacity(rate) - F0, 0.) / rate, np.inf)
+
+
+def partition(P, dt, model, params, F0=0., recovery=0., weights=None, full=False):
+    """Split the rain depths P of a series of steps of length dt into infiltration and runoff.
+
+    P holds one depth per step (the same rain on all columns) or steps x
+    columns; the parameters of model (dict or sequence in the order of
+    ``MODELS``) and F0 are scalars or have one value per column. Within a
+    step the rain rate is constant; the capacity follows the model with
+    time compression (see the module). During steps without rain the
+    cumulative infiltration decays as exp(-recovery t), so the capacity
+    recovers while the soil drains (recovery = 0: no recovery). weights
+    (e.g. areas) weight the columns in the means.
+
+    Only the steps with rain are computed. Returns ``Partition``.
+    """
+    P = np.asarray(P, dtype=float)
+    steps = len(P)
+    columns = np.broadcast_shapes(P.shape[1:], np.shape(F0),
+                                  *(np.shape(v) for v in _parameters(model, params).values())) or (1,)
+    p = _parameters(model, params, columns)
+    F = np.array(np.broadcast_to(np.asarray(F0, dtype=float), columns))
+    weights = np.broadcast_to(np.full(columns, 1.) if weights is None else np.asarray(weights, dtype=float), columns)
+    weights = weights / weights.sum()
+    shape = (steps,) + columns if full else (steps,)
+    infiltration, runoff, runoff_area = np.zeros(shape), np.zeros(shape), np.zeros(steps)
+    column_infiltration, column_runoff = np.zeros(columns), np.zeros(columns)
+
+    rainy = np.flatnonzero((P > 0.).reshape(steps, -1).any(axis=1))
+    at_capacity = _FUNCTIONS[model](p)[2]
+    last = -1
+    for i in rainy:
+        if recovery > 0. and i - last > 1:
+            F *= np.exp(-recovery * dt * (i - last - 1))
+        last = i
+        depth = np.broadcast_to(P[i], columns)
+        rate = depth / dt
+        F_r = at_capacity(rate)
+        # time of the step until the capacity has fallen to the rain rate
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_p = np.where(F >= F_r, 0., np.minimum((F_r - F) / rate, dt))
+        F_new = F + depth
+        ponded = np.flatnonzero(t_p < dt)
+        if ponded.size:
+            sub = _FUNCTIONS[model]({name: v[ponded] for name, v in p.items()})
+            start = np.maximum(F[ponded], F_r[ponded])
+            F_new[ponded] = np.minimum(sub[0](sub[1](start) + dt - t_p[ponded]), F_new[ponded])
+        infiltrated = F_new - F
+        excess = depth - infiltrated
+        F = F_new
+        column_infiltration += infiltrated
+        column_runoff += excess
+        if full:
+            infiltration[i], runoff[i] = infiltrated, excess
+        else:
+            infiltration[i], runoff[i] = np.sum(weights * infiltrated), np.sum(weights * excess)
+        runoff_area[i] = np.sum(weights[excess > 1e-9 * depth])
+    if recovery > 0. and steps - last > 1:
+        F *= np.exp(-recovery * dt * (steps - last - 1))
+    return Partition(infiltration, runoff, runoff_area, F, column_infiltration, column_runoff)
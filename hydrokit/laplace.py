@@ -0,0 +1,48 @@
+"""Numerical inversion of Laplace transforms.
+
+The well functions of the leaky (Hantush-Jacob) and unconfined (Neuman)
+aquifer have simple closed forms in the Laplace domain. They are brought back
+to the time domain with the Gaver-Stehfest algorithm, which only needs real
+values of the transform and works well for the smooth, monotonic drawdown
+curves of pumping tests.
+"""
+
+from functools import lru_cache
+from math import factorial, log
+
+import numpy as np
+
+LN2 = log(2.)
+
+
+@lru_cache(maxsize=None)
+def stehfest_coefficients(N=16):
+    """Stehfest weights V_k, k = 1..N, for an even number of terms N."""
+    if N % 2:
+        raise ValueError("N must be even")
+    h = N // 2
+    V = np.zeros(N)
+    for k in range(1, N + 1):
+        total = 0.
+        for j in range((k + 1) // 2, min(k, h) + 1):
+            total += (j ** h * factorial(2 * j) / factorial(h - j) / factorial(j) / factorial(j - 1)
+                      / factorial(k - j) / factorial(2 * j - k))
+        V[k - 1] = (-1) ** (k + h) * total
+    V.setflags(write=False)
+    return V
+
+
+def stehfest(F, t, N=16):
+    """Invert the Laplace transform F at the times t.
+
+    F is called once with an array p of shape ``t.shape + (N,)`` and must
+    return the transform at these values; additional parameters of F
+    therefore need a trailing axis of length 1 (``beta[..., None]``).
+    N = 16 gives a relative accuracy of about 1e-6 in double precision; the
+    accuracy degrades where the result is very small compared with its
+    values at later times.
+    """
+    t = np.asarray(t, dtype=float)
+    V = stehfest_coefficients(N)
+    p = np.arange(1, N + 1) * LN2 / t[..., None]
+    return LN2 / t * np.sum(V * F(p), axis=-1)
@@ -0,0 +1,216 @@
+"""Helpers for the figures of the Streamlit apps.
+
+The pages create their figures with ``figure`` or ``subplots`` instead of
+``plt.figure`` and ``plt.subplots``: these are plain matplotlib Figure
+objects that pyplot does not know. Pyplot keeps every figure in a
+process-wide registry until it is closed, so figures of pages that were
+never closed accumulated with every rerun of every session; the registry
+(and the current figure of ``plt.plot``) is also shared between the
+sessions that a server runs in parallel threads. ``show`` renders a figure
+with ``st.pyplot`` and releases it::
+
+    fig, ax = plotting.subplots(figsize=(10, 6))
+    ax.plot(x, h)
+    plotting.show(fig)
+
+A figure that only depends on a few parameters is rendered once for all
+sessions with ``show_cached``, which calls a function that builds it only
+if its PNG is not in ``cache.CACHE`` yet::
+
+    def profile(h0, h1, K):
+        fig, ax = plotting.subplots(figsize=(10, 6))
+        ...
+        return fig
+
+    plotting.show_cached(profile, h0, h1, K)
+
+``memory_stats`` reports the figures and the memory of the server process.
+"""
+
+import io
+import threading
+import time
+import weakref
+
+import matplotlib.figure
+import matplotlib.pyplot as plt
+import psutil
+
+from . import cache, profiling
+
+# figures created with figure() / subplots() that were not collected yet
+_alive = weakref.WeakSet()
+_counts = {'created': 0, 'shown': 0, 'cached': 0}
+_lock = threading.Lock()
+
+
+def figure(**kwargs):
+    """New figure (matplotlib.figure.Figure) that is not registered with pyplot.
+
+    Takes the arguments of ``plt.figure`` (figsize, dpi, layout, ...). The
+    figure is garbage collected with its last reference.
+    """
+    fig = matplotlib.figure.Figure(**kwargs)
+    with _lock:
+        _alive.add(fig)
+        _counts['created'] += 1
+    return fig
+
+
+def subplots(nrows=1, ncols=1, *, sharex=False, sharey=False, squeeze=True, width_ratios=None,
+             height_ratios=None, subplot_kw=None, gridspec_kw=None, **fig_kw):
+    """Figure and axes as from ``plt.subplots``, without pyplot (see ``figure``)."""
+    fig = figure(**fig_kw)
+    axes = fig.subplots(nrows, ncols, sharex=sharex, sharey=sharey, squeeze=squeeze, width_ratios=width_ratios,
+                        height_ratios=height_ratios, subplot_kw=subplot_kw, gridspec_kw=gridspec_kw)
+    return fig, axes
+
+
+def close(fig):
+    """Release a figure: remove it from pyplot (if it was created there) and delete its artists."""
+    plt.close(fig)
+    fig.clear()
+
+
+def _png(fig):
+    """PNG of a figure as rendered by ``st.pyplot`` (200 dpi, tight bounding box)."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _image(target, png):
+    with profiling.phase('transfer'):
+        profiling.count('png_bytes', len(png))
+        return target.image(png, width='stretch')
+
+
+def _pyplot(target, fig, **kwargs):
+    """target.pyplot(fig); while a rerun is profiled, the PNG is rendered here to time and count it."""
+    profiling.count('figures')
+    if not profiling.active() or kwargs:
+        with profiling.phase('render'):
+            return target.pyplot(fig, **kwargs)
+    with profiling.phase('render'):
+        png = _png(fig)
+    return _image(target, png)
+
+
+def show(fig, target=None, **kwargs):
+    """Render the figure with ``st.pyplot`` (or ``target.pyplot`` of a container) and close it.
+
+    The figure is empty afterwards, so a copy for a download button has to
+    be saved with ``fig.savefig`` before; kwargs are passed to ``st.pyplot``.
+    """
+    if target is None:
+        import streamlit as st
+        target = st
+    try:
+        return _pyplot(target, fig, **kwargs)
+    finally:
+        close(fig)
+        with _lock:
+            _counts['shown'] += 1
+
+
+def show_cached(build, *args, target=None, version=None, **kwargs):
+    """Render the figure ``build(*args, **kwargs)`` like ``show``, with the PNG cached.
+
+    The key of the PNG is made of build (file and name) and its arguments
+    (see ``cache.function_key``), so build must not depend on other
+    variables of the page; version has to be changed when build changes
+    its output. The figure is rendered as by ``st.pyplot`` (200 dpi,
+    tight bounding box) and shown with ``target.image``.
+    """
+    if target is None:
+        import streamlit as st
+        target = st
+
+    def render():
+        with profiling.phase('plot'):
+            fig = build(*args, **kwargs)
+        try:
+            with profiling.phase('render'):
+                return _png(fig)
+        finally:
+            close(fig)
+
+    key = ('figure',) + cache.function_key(build, args, kwargs, version)
+    png = cache.CACHE.get_or_compute(key, render)
+    with _lock:
+        _counts['cached'] += 1
+    profiling.count('figures')
+    return _image(target, png)
+
+
+def memory_stats():
+    """Figures and memory of the current process.
+
+    Returns a dict with the number of figures created with ``figure`` /
+    ``subplots`` (created), rendered with ``show`` (shown) and still alive
+    (alive) and shown from the cache with ``show_cached`` (cached), the
+    figures open in pyplot (pyplot), i.e. figures of pages that still use
+    ``plt.figure`` and do not close them, and the resident set size of the
+    process in MB (rss_mb).
+    """
+    with _lock:
+        stats = dict(_counts, alive=len(_alive))
+    stats['pyplot'] = len(plt.get_fignums())
+    stats['rss_mb'] = psutil.Process().memory_info().rss / 2 ** 20
+    return stats
+
+
+class Animation:
+    """Repeated rendering of one figure into a Streamlit placeholder.
+
+    An iterative computation builds the figure once, updates the data of
+    its artists after every step (``line.set_ydata(h)``, ``text.set_text``)
+    and calls ``frame()``. The figure is only sent to the browser every
+    every-th call and when the last frame has been shown for at least
+    1/fps seconds (no limit for fps=None); rendering the PNG takes much
+    longer than one iteration, so the time between two frames is measured
+    from the end of the last rendering. Leaving the ``with`` block renders
+    the last state, if it was skipped, and closes the figure::
+
+        with Animation(fig, st.empty(), fps=5) as animation:
+            for h in iterations:
+                line.set_ydata(h)
+                animation.frame()
+    """
+
+    def __init__(self, fig, placeholder, fps=5., every=1):
+        self.fig, self.placeholder = fig, placeholder
+        self.interval = 1. / fps if fps else 0.
+        self.every = max(int(every), 1)
+        self.calls = self.frames = 0
+        self._last = None
+        self._pending = False
+
+    def frame(self, force=False):
+        """Render the figure if it is due (or forced); returns True if it was rendered."""
+        self.calls += 1
+        now = time.perf_counter()
+        due = self.calls % self.every == 0 and (self._last is None or now - self._last >= self.interval)
+        if not (due or force):
+            self._pending = True
+            return False
+        _pyplot(self.placeholder, self.fig)
+        self._last = time.perf_counter()
+        self._pending = False
+        self.frames += 1
+        return True
+
+    def close(self):
+        """Render a skipped last state and close the figure."""
+        if self._pending:
+            _pyplot(self.placeholder, self.fig)
+            self._pending = False
+            self.frames += 1
+        close(self.fig)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
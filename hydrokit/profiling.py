@@ -0,0 +1,261 @@
+"""Opt-in timing of the reruns of the Streamlit pages.
+
+Set the environment variable ``HYDROKIT_PROFILE`` before starting the
+server to find out where the time of a rerun goes::
+
+    HYDROKIT_PROFILE=1 streamlit run app.py            # phase timers
+    HYDROKIT_PROFILE=cprofile streamlit run app.py     # and a cProfile of every rerun
+    HYDROKIT_PROFILE=pyinstrument streamlit run app.py # and a pyinstrument trace
+
+A page starts the record of a rerun after its imports, names the phases
+of the script with ``mark`` (or times blocks and functions with ``phase``
+and ``timed``) and finishes the record at the end::
+
+    profiling.start()
+    profiling.mark('input')
+    Q = st.slider(...)
+    profiling.mark('compute')
+    s = theis(r, t, T, S, Q)
+    profiling.mark('plot')
+    fig, ax = plotting.subplots()
+    ...
+    plotting.show(fig)
+    profiling.finish()
+
+``plotting`` times the rendering of the figures ('render') and the
+handing over of the PNGs to Streamlit ('transfer') and counts the figures
+and PNG bytes; the messages sent to the browser and their bytes are
+counted as well. ``finish`` shows the record in a diagnostics expander of
+the sidebar (with ``plotting.memory_stats`` and ``cache.CACHE.stats``) and
+appends it as a JSON line to ``HYDROKIT_PROFILE_LOG`` (if set); the cProfile
+statistics (.prof) and pyinstrument traces (.html) are written next to the
+log. Without ``HYDROKIT_PROFILE`` all functions return at once.
+"""
+
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+#: '' (off), '1', 'cprofile' or 'pyinstrument'
+MODE = os.environ.get('HYDROKIT_PROFILE', '').strip().lower()
+if MODE in ('0', 'false', 'off', 'no'):
+    MODE = ''
+LOG = os.environ.get('HYDROKIT_PROFILE_LOG')
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class _Rerun:
+    """Record of one rerun of a page."""
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.phases = Counter()
+        self.counts = Counter()
+        # open phases: [name, start, time of the nested phases]
+        self.stack = [['other', self.start, 0.]]
+        self.profiler = None
+        self.context = None
+        self.enqueue = None
+
+    def close(self, entry, now):
+        name, start, nested = entry
+        elapsed = now - start
+        self.phases[name] += elapsed - nested
+        return elapsed
+
+
+def _current():
+    return getattr(_local, 'rerun', None)
+
+
+def active():
+    """True if the rerun of the current thread is being recorded."""
+    return _current() is not None
+
+
+def _count_messages(rerun):
+    """Count the messages that Streamlit sends to the browser during the rerun."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    enqueue = ctx._enqueue
+
+    def counting(msg):
+        rerun.counts['messages'] += 1
+        rerun.counts['message_bytes'] += msg.ByteSize()
+        enqueue(msg)
+    rerun.context, rerun.enqueue = ctx, enqueue
+    ctx._enqueue = counting
+
+
+def _start_profiler(rerun):
+    if MODE == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            rerun.counts['pyinstrument_missing'] = 1
+        else:
+            rerun.profiler = Profiler()
+            rerun.profiler.start()
+            return
+    if MODE in ('cprofile', 'pyinstrument'):
+        rerun.profiler = cProfile.Profile()
+        try:
+            rerun.profiler.enable()
+        except ValueError:
+            # Python >= 3.12 allows one cProfile at a time (another session is being profiled)
+            rerun.profiler = None
+            rerun.counts['profiler_busy'] = 1
+
+
+def start(page=None):
+    """Start the record of a rerun (page defaults to the file of the calling script)."""
+    if not MODE:
+        return
+    if page is None:
+        import inspect
+        page = Path(inspect.stack()[1].filename).stem
+    rerun = _current()
+    if rerun is not None:
+        # the last rerun of this thread did not finish (st.stop, exception)
+        if rerun.context is not None:
+            rerun.context._enqueue = rerun.enqueue
+        if isinstance(rerun.profiler, cProfile.Profile):
+            rerun.profiler.disable()
+        elif rerun.profiler is not None:
+            rerun.profiler.stop()
+    rerun = _local.rerun = _Rerun(page)
+    _count_messages(rerun)
+    _start_profiler(rerun)
+
+
+def mark(name):
+    """End the current top-level phase of the script and start the phase name."""
+    rerun = _current()
+    if rerun is None:
+        return
+    now = time.perf_counter()
+    base = rerun.stack[0]
+    rerun.close(base, now)
+    base[:] = [name, now, 0.]
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a block as the phase name (the time of nested phases is not counted twice)."""
+    rerun = _current()
+    if rerun is None:
+        yield
+        return
+    entry = [name, time.perf_counter(), 0.]
+    rerun.stack.append(entry)
+    try:
+        yield
+    finally:
+        elapsed = rerun.close(entry, time.perf_counter())
+        rerun.stack.remove(entry)
+        rerun.stack[-1][2] += elapsed
+
+
+def timed(name):
+    """Decorator: the calls of a function are timed as the phase name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    """Add n to the counter name of the current rerun."""
+    rerun = _current()
+    if rerun is not None:
+        rerun.counts[name] += n
+
+
+def _stop_profiler(rerun, record):
+    """Stop the profiler, write the profile next to the log and return it as text (25 most expensive functions)."""
+    profiler = rerun.profiler
+    stem = '%s-%s' % (rerun.page, time.strftime('%Y%m%d-%H%M%S', time.localtime(rerun.started)))
+    directory = Path(LOG).parent if LOG else None
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(25)
+        write = profiler.dump_stats
+        suffix = '.prof'
+    else:
+        profiler.stop()
+        out = io.StringIO(profiler.output_text(unicode=True))
+        suffix = '.html'
+
+        def write(path):
+            Path(path).write_text(profiler.output_html(), encoding='utf-8')
+    if directory:
+        try:
+            write(directory / (stem + suffix))
+            record['profile'] = str(directory / (stem + suffix))
+        except OSError as error:
+            record['log_error'] = str(error)
+    return out.getvalue()
+
+
+def finish(sidebar=True):
+    """End the record of the rerun, log it and show it in the sidebar; returns the record (None if off)."""
+    rerun = _current()
+    if rerun is None:
+        return None
+    _local.rerun = None
+    now = time.perf_counter()
+    while len(rerun.stack) > 1:
+        entry = rerun.stack.pop()
+        rerun.stack[-1][2] += rerun.close(entry, now)
+    rerun.close(rerun.stack[0], now)
+    if rerun.context is not None:
+        rerun.context._enqueue = rerun.enqueue
+    record = dict(page=rerun.page, time=time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(rerun.started)),
+                  total_s=now - rerun.start, phases=dict(rerun.phases), counts=dict(rerun.counts),
+                  thread=threading.current_thread().name)
+    text = _stop_profiler(rerun, record) if rerun.profiler is not None else None
+    from . import cache, plotting
+    record['memory'] = plotting.memory_stats()
+    record['cache'] = cache.CACHE.stats()
+    if LOG:
+        try:
+            with _log_lock, open(LOG, 'a', encoding='utf-8') as log:
+                log.write(json.dumps(record) + '\n')
+        except OSError as error:
+            # diagnostics must not break the page
+            record['log_error'] = str(error)
+    if sidebar:
+        _show(record, text)
+    return record
+
+
+def _show(record, text):
+    import streamlit as st
+    with st.sidebar.expander('Diagnostics (HYDROKIT_PROFILE)'):
+        st.markdown('**Rerun of %s: %.3f s**' % (record['page'], record['total_s']))
+        phases = sorted(record['phases'].items(), key=lambda item: -item[1])
+        st.table({'phase': [name for name, _ in phases], 's': ['%.4f' % t for _, t in phases]})
+        st.json(dict(counts=record['counts'], memory=record['memory'], cache=record['cache']), expanded=False)
+        if text:
+            st.code(text, language=None)
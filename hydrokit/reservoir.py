@@ -0,0 +1,258 @@
+"""Lumped rainfall-runoff models: cascades of linear and nonlinear reservoirs.
+
+A reservoir stores the volume V (depth, e.g. mm) and releases Q = k V
+(linear) or Q = k V^b (nonlinear). Inflows I are rates per step of length
+dt that are constant within the step. The linear reservoir is a first-order
+recursive filter of the inflow,
+
+    V_n = a V_(n-1) + c I_n,
+
+with a = exp(-k dt) and c = (1 - a) / k for the exact solution of the
+constant inflow or a = 1 - k dt and c = dt for the explicit (Euler) scheme
+of the notebooks. It is computed with ``scipy.signal.lfilter`` instead of
+a Python loop over the steps. The nonlinear reservoir is advanced
+implicitly (Newton iterations of all parameter sets together). In both
+cases the outflow of a step is the mean rate I - ΔV/dt, so the water
+balance closes exactly, and it is the inflow of the next reservoir of a
+cascade (Nash cascade for n equal linear reservoirs).
+
+Parameters are scalars or arrays with one value per parameter set; the
+outflows then have the shape steps x sets. ``calibrate`` fits the
+reservoir constants to an observed discharge by scoring thousands of
+sampled parameter sets in a process pool and refining around the best one::
+
+    result = reservoir.calibrate(recharge, Q_obs, 'linear', n_samples=10000)
+    result.params          # dict of the best parameters
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.signal
+
+MODELS = {
+    'linear': ('k', 'n'),
+    'nonlinear': ('k', 'b', 'n'),
+}
+
+#: Default sampling ranges of the parameters (k log-uniform, n integer)
+BOUNDS = {'k': (1e-3, 1.), 'b': (0.3, 3.), 'n': (1, 5)}
+
+SCHEMES = ('exact', 'euler')
+
+OBJECTIVES = ('nse', 'kge', 'rmse')
+
+#: Best parameters and their score, the sampled parameter sets (dict of
+#: arrays) and their scores (larger is better, -RMSE for 'rmse')
+Calibration = namedtuple('Calibration', 'params score samples scores')
+
+
+def _inflow(I, sets):
+    """Inflow rates as steps x sets (a single series is shared by all sets)."""
+    I = np.asarray(I, dtype=float)
+    I = I.reshape(I.shape[:1] + (1,) * (len(sets) - I.ndim + 1) + I.shape[1:])
+    return np.broadcast_to(I, I.shape[:1] + sets)
+
+
+def linear_reservoir(I, k, dt=1., V0=0., scheme='exact'):
+    """Outflow rates Q and volumes V (end of the steps) of linear reservoirs with the constants k.
+
+    I holds the inflow rates of the steps (steps or steps x sets); k and V0
+    are scalars or have one value per set.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError("scheme must be one of %s" % ', '.join(SCHEMES))
+    sets = np.broadcast_shapes(np.shape(I)[1:], np.shape(k), np.shape(V0))
+    I = _inflow(I, sets)
+    k = np.broadcast_to(np.asarray(k, dtype=float), sets)
+    V0 = np.broadcast_to(np.asarray(V0, dtype=float), sets)
+    if scheme == 'exact':
+        a = np.exp(-k * dt)
+        c = np.where(k > 0., -np.expm1(-k * dt) / np.where(k > 0., k, 1.), dt)
+    else:
+        a = 1. - k * dt
+        c = np.full(sets, float(dt))
+    if np.ndim(k) == 0 or np.all(k == k.flat[0]):
+        # one filter for all sets
+        V = scipy.signal.lfilter([c.flat[0]], [1., -a.flat[0]], I, axis=0, zi=(a.flat[0] * V0)[None])[0]
+    else:
+        # one filter per set, on contiguous rows of sets x steps
+        rows = np.array(I.reshape(len(I), -1).T, order='C')
+        a, c, start = a.ravel(), c.ravel(), (a * V0).ravel()
+        for j in range(len(rows)):
+            rows[j] = scipy.signal.lfilter([c[j]], [1., -a[j]], rows[j], zi=start[j:j + 1])[0]
+        V = rows.T.reshape(I.shape)
+    return I - np.diff(V, axis=0, prepend=V0[None]) / dt, V
+
+
+def nonlinear_reservoir(I, k, b, dt=1., V0=0., tol=1e-10, max_iter=50):
+    """Outflow rates Q and volumes V of reservoirs with Q = k V^b (implicit Euler steps).
+
+    Every step solves V + k dt V^b = V_(n-1) + I dt. The unknown is V (b >=
+    1) or V^b (b < 1), so the equation is convex and the Newton iterations
+    from the upper bound V_(n-1) + I dt decrease monotonically; all sets
+    are iterated together.
+    """
+    sets = np.broadcast_shapes(np.shape(I)[1:], np.shape(k), np.shape(b), np.shape(V0))
+    I = _inflow(I, sets)
+    k, b = (np.broadcast_to(np.asarray(v, dtype=float), sets) for v in (k, b))
+    m = np.minimum(b, 1.)
+    kdt = k * dt
+    V = np.array(np.broadcast_to(np.asarray(V0, dtype=float), sets))
+    Q, volumes = np.empty(I.shape), np.empty(I.shape)
+    for i in range(len(I)):
+        # round-off of an upstream reservoir may leave tiny negative inflows
+        total = np.maximum(V + I[i] * dt, 0.)
+        u = total ** m
+        for _ in range(max_iter):
+            g = u ** (1. / m) + kdt * u ** (b / m) - total
+            dg = u ** (1. / m - 1.) / m + kdt * b / m * u ** (b / m - 1.)
+            step = g / dg
+            u = np.maximum(u - step, 0.)
+            if np.all(np.abs(step) <= tol * np.maximum(u, 1.)):
+                break
+        V_new = u ** (1. / m)
+        Q[i] = I[i] - (V_new - V) / dt
+        volumes[i] = V = V_new
+    return Q, volumes
+
+
+def cascade(I, k, n=1, b=1., dt=1., V0=0., scheme='exact'):
+    """Outflow rates of cascades of n equal reservoirs (linear if b == 1, else nonlinear).
+
+    n is an integer or has one value per set; the outflow of the n-th
+    reservoir of every set is returned.
+    """
+    n = np.asarray(n, dtype=int)
+    if np.any(n < 1):
+        raise ValueError('a cascade needs at least one reservoir')
+    linear = np.all(np.asarray(b) == 1.)
+    if n.ndim == 1:
+        # one row of sets: every stage routes only the sets that have more reservoirs
+        I = _inflow(I, n.shape)
+        k, b, V0 = (np.broadcast_to(np.asarray(v, dtype=float), n.shape) for v in (k, b, V0))
+        out = np.empty(I.shape)
+        active = np.arange(len(n))
+        Q = I
+        for stage in range(1, n.max() + 1):
+            keep = n[active] >= stage
+            active, Q = active[keep], Q[:, keep]
+            if linear:
+                Q = linear_reservoir(Q, k[active], dt, V0[active], scheme)[0]
+            else:
+                Q = nonlinear_reservoir(Q, k[active], b[active], dt, V0[active])[0]
+            done = n[active] == stage
+            out[:, active[done]] = Q[:, done]
+        return out
+    Q = np.asarray(I, dtype=float)
+    out = None
+    for stage in range(1, n.max() + 1):
+        if linear:
+            Q = linear_reservoir(Q, k, dt, V0, scheme)[0]
+        else:
+            Q = nonlinear_reservoir(Q, k, b, dt, V0)[0]
+        out = Q if out is None else np.where(n == stage, Q, out)
+    return out
+
+
+def simulate(I, model, params, dt=1., V0=0., scheme='exact'):
+    """Outflow of the model ('linear' or 'nonlinear') with params (dict or sequence in the order of ``MODELS``)."""
+    if model not in MODELS:
+        raise ValueError("model must be one of %s" % ', '.join(MODELS))
+    if not isinstance(params, dict):
+        params = dict(zip(MODELS[model], params))
+    return cascade(I, params['k'], params.get('n', 1), params.get('b', 1.), dt, V0, scheme)
+
+
+def score(Q_obs, Q, objective='nse'):
+    """Goodness of fit of the simulated Q (steps or steps x sets) to Q_obs (NaN ignored), larger is better.
+
+    'nse': Nash-Sutcliffe efficiency, 'kge': Kling-Gupta efficiency,
+    'rmse': minus the root mean squared error.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError("objective must be one of %s" % ', '.join(OBJECTIVES))
+    Q_obs = np.asarray(Q_obs, dtype=float)
+    valid = ~np.isnan(Q_obs)
+    obs = Q_obs[valid].reshape((-1,) + (1,) * (np.ndim(Q) - 1))
+    sim = np.asarray(Q, dtype=float)[valid]
+    if objective == 'rmse':
+        return -np.sqrt(np.mean((sim - obs) ** 2, axis=0))
+    if objective == 'nse':
+        return 1. - np.sum((sim - obs) ** 2, axis=0) / np.sum((obs - obs.mean()) ** 2)
+    r = np.sum((sim - sim.mean(0)) * (obs - obs.mean()), axis=0) / (len(obs) * sim.std(0) * obs.std())
+    return 1. - np.sqrt((r - 1.) ** 2 + (sim.std(0) / obs.std() - 1.) ** 2 + (sim.mean(0) / obs.mean() - 1.) ** 2)
+
+
+def _scores(I, Q_obs, model, params, dt, V0, scheme, objective, warmup):
+    return score(Q_obs[warmup:], simulate(I, model, params, dt, V0, scheme)[warmup:], objective)
+
+
+def _sample(model, bounds, n_samples, rng):
+    samples = {}
+    for name in MODELS[model]:
+        low, high = bounds[name]
+        if name == 'n':
+            samples[name] = rng.integers(int(low), int(high) + 1, n_samples)
+        elif name == 'k':
+            samples[name] = 10. ** rng.uniform(np.log10(low), np.log10(high), n_samples)
+        else:
+            samples[name] = rng.uniform(low, high, n_samples)
+    return samples
+
+
+def _score_sets(I, Q_obs, model, samples, dt, V0, scheme, objective, warmup, jobs, chunk):
+    """Scores of the parameter sets (dict of arrays) in chunks of chunk sets, by jobs processes."""
+    count = len(next(iter(samples.values())))
+    args = [(I[:, None], Q_obs, model, {name: v[s:s + chunk] for name, v in samples.items()}, dt, V0, scheme,
+             objective, warmup) for s in range(0, count, chunk)]
+    if jobs == 1 or len(args) <= 1:
+        scores = [_scores(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            scores = list(pool.map(_scores, *zip(*args)))
+    return np.nan_to_num(np.concatenate(scores), nan=-np.inf)
+
+
+def calibrate(I, Q_obs, model='linear', bounds=None, n_samples=10000, dt=1., V0=0., scheme='exact', objective='nse',
+              warmup=0, polish=3, jobs=None, chunk=1000, seed=None):
+    """Fit the reservoir constants of model to the observed outflow Q_obs (NaN for gaps) of the inflow I.
+
+    n_samples parameter sets are drawn from bounds (dict of (low, high),
+    default ``BOUNDS``; k log-uniform, n as integers) and scored in chunks
+    of chunk sets by jobs worker processes (default: number of CPUs; 1
+    runs in the calling process). The first warmup steps are not scored.
+    polish rounds of chunk sets each then sample boxes around the best set
+    that shrink by a factor of 4 per round (n fixed), so the refinement is
+    batched like the search. The samples and scores of the result hold all
+    evaluated sets. Returns ``Calibration``.
+    """
+    if model not in MODELS:
+        raise ValueError("model must be one of %s" % ', '.join(MODELS))
+    bounds = dict(BOUNDS, **(bounds or {}))
+    I, Q_obs = np.asarray(I, dtype=float), np.asarray(Q_obs, dtype=float)
+    rng = np.random.default_rng(seed)
+    samples = _sample(model, bounds, n_samples, rng)
+    scores = _score_sets(I, Q_obs, model, samples, dt, V0, scheme, objective, warmup, jobs, chunk)
+
+    # boxes in log10 k and b
+    scale = {name: np.log10 if name == 'k' else np.asarray for name in MODELS[model] if name != 'n'}
+    width = {name: scale[name](bounds[name][1]) - scale[name](bounds[name][0]) for name in scale}
+    for _ in range(polish):
+        best = int(np.argmax(scores))
+        box = {}
+        for name, w in width.items():
+            width[name] = w = w / 4.
+            low, high = scale[name](bounds[name][0]), scale[name](bounds[name][1])
+            centre = np.clip(scale[name](samples[name][best]), low + w / 2., high - w / 2.)
+            values = rng.uniform(centre - w / 2., centre + w / 2., chunk)
+            box[name] = 10. ** values if name == 'k' else values
+        if 'n' in samples:
+            box['n'] = np.full(chunk, samples['n'][best])
+        samples = {name: np.concatenate([v, box[name]]) for name, v in samples.items()}
+        scores = np.concatenate([scores, _score_sets(I, Q_obs, model, box, dt, V0, scheme, objective, warmup, jobs,
+                                                     chunk)])
+    best = int(np.argmax(scores))
+    return Calibration({name: v[best].item() for name, v in samples.items()}, float(scores[best]), samples, scores)
@@ -0,0 +1,255 @@
+"""Soil hydraulic functions and the batch fitting of retention curves.
+
+The retention curve θ(h) and the relative hydraulic conductivity of the
+models of van Genuchten (1980), Brooks and Corey (1964), Kosugi (1996) and
+the bimodal model of Durner (1994) with the conductivity model of Mualem
+(1976). h is the suction head (positive in the unsaturated zone; h <= 0 is
+saturated) in the units of 1/alpha, h_b and h_m, the conductivities have the
+units of Ks::
+
+    soil = Soil('van_genuchten', dict(theta_r=0.1, theta_s=0.5, alpha=0.005, n=2.), Ks=100.)
+    theta = soil.water_content(h)        # θ(h)
+    K = soil.conductivity(h)             # K(h)
+    C = soil.capacity(h)                 # C(h) = dθ/dψ with the pressure head ψ = -h
+    D = soil.diffusivity(theta)          # D(θ) = K / C
+
+All methods broadcast over h and the parameters, so one Soil holds the
+parameters of many soils (``params`` as arrays with a leading axis over the
+soils) and evaluates them all at once with h[:, None]. ``fit_retention``
+fits a model to the retention data of many samples together with the
+batch Levenberg-Marquardt algorithm of ``fitting``.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import scipy.special
+
+from .fitting import _as_batch, _levenberg_marquardt, fit_statistics
+
+MODELS = {
+    'van_genuchten': ('theta_r', 'theta_s', 'alpha', 'n'),
+    'brooks_corey': ('theta_r', 'theta_s', 'h_b', 'lam'),
+    'kosugi': ('theta_r', 'theta_s', 'h_m', 'sigma'),
+    'durner': ('theta_r', 'theta_s', 'w1', 'alpha1', 'n1', 'alpha2', 'n2'),
+}
+
+# Bounds of the parameters during the fit; the parameters marked with True
+# are fitted in their logarithms.
+BOUNDS = {
+    'theta_r': (0., 0.5, False),
+    'theta_s': (0.01, 1., False),
+    'w1': (0.01, 0.99, False),
+    'alpha': (1e-6, 1e3, True),
+    'alpha1': (1e-6, 1e3, True),
+    'alpha2': (1e-6, 1e3, True),
+    'n': (1.005, 20., True),
+    'n1': (1.005, 20., True),
+    'n2': (1.005, 20., True),
+    'h_b': (1e-3, 1e6, True),
+    'h_m': (1e-3, 1e7, True),
+    'lam': (0.01, 10., True),
+    'sigma': (0.05, 10., True),
+}
+
+RetentionFit = namedtuple('RetentionFit', 'names params stats success n_iter')
+RetentionFit.__doc__ = """Result of a retention-curve fit.
+
+params are the best-fit parameters (samples, parameters) in the order of
+``MODELS`` and stats the error statistics of every sample (see
+``fitting.fit_statistics``).
+"""
+
+_FD_STEP = 1e-6  # step of the transformed parameters for numerical derivatives
+
+
+def _vg_modes(h, alpha, n):
+    """Effective saturation, its derivative with respect to h and the Mualem integral ratio of one van Genuchten mode."""
+    m = 1. - 1. / n
+    y = (alpha * h) ** n
+    Se = (1. + y) ** -m
+    # 1 - Se^(1/m) = y / (1 + y) = 1 / (1 + 1 / y) avoids the cancellation close to saturation
+    dry = 1. / (1. + 1. / y)
+    dSe = np.where(h > 0., -m * n * Se * dry / h, 0.)
+    return Se, dSe, 1. - dry ** m
+
+
+class Soil:
+    """Hydraulic functions of a soil model (or of many soils with array parameters).
+
+    model is one of the keys of ``MODELS``, params a dict of the parameters
+    or a sequence in the order of ``MODELS[model]`` (e.g. the transposed
+    ``RetentionFit.params``); Ks is the saturated hydraulic conductivity
+    and l the tortuosity parameter of Mualem.
+    """
+
+    def __init__(self, model, params, Ks=1., l=0.5):
+        if model not in MODELS:
+            raise ValueError("model must be one of %s" % ', '.join(MODELS))
+        names = MODELS[model]
+        if isinstance(params, dict):
+            params = [params[name] for name in names]
+        if len(params) != len(names):
+            raise ValueError("model %s has the parameters %s" % (model, ', '.join(names)))
+        self.model, self.Ks, self.l = model, Ks, l
+        self.params = {name: np.asarray(p, dtype=float) for name, p in zip(names, params)}
+
+    def _functions(self, h):
+        """Effective saturation Se, dSe/dh and the relative conductivity at the suction heads h."""
+        p = self.params
+        h = np.maximum(np.asarray(h, dtype=float), 0.)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            if self.model == 'van_genuchten':
+                Se, dSe, ratio = _vg_modes(h, p['alpha'], p['n'])
+                kr = ratio ** 2
+            elif self.model == 'durner':
+                w1 = p['w1']
+                Se1, dSe1, ratio1 = _vg_modes(h, p['alpha1'], p['n1'])
+                Se2, dSe2, ratio2 = _vg_modes(h, p['alpha2'], p['n2'])
+                Se, dSe = w1 * Se1 + (1. - w1) * Se2, w1 * dSe1 + (1. - w1) * dSe2
+                # Mualem integral of the bimodal curve (Priesack and Durner 2006)
+                a1, a2 = w1 * p['alpha1'], (1. - w1) * p['alpha2']
+                kr = ((a1 * ratio1 + a2 * ratio2) / (a1 + a2)) ** 2
+            elif self.model == 'brooks_corey':
+                lam = p['lam']
+                wet = h <= p['h_b']
+                Se = np.where(wet, 1., (h / p['h_b']) ** -lam)
+                dSe = np.where(wet, 0., -lam / h * Se)
+                kr = Se ** (2. + 2. / lam)
+            else:
+                z = np.log(h / p['h_m']) / p['sigma']
+                Se = 0.5 * scipy.special.erfc(z / np.sqrt(2.))
+                dSe = np.where(h > 0., -np.exp(-0.5 * z ** 2) / (h * p['sigma'] * np.sqrt(2. * np.pi)), 0.)
+                kr = (0.5 * scipy.special.erfc((z + p['sigma']) / np.sqrt(2.))) ** 2
+        return Se, dSe, Se ** self.l * kr
+
+    def saturation(self, h):
+        """Effective saturation Se = (θ - θr) / (θs - θr) at the suction heads h."""
+        return self._functions(h)[0]
+
+    def water_content(self, h):
+        """Water content θ(h)."""
+        p = self.params
+        return p['theta_r'] + (p['theta_s'] - p['theta_r']) * self.saturation(h)
+
+    def capacity(self, h):
+        """Specific moisture capacity C(h) = dθ/dψ = -dθ/dh (1 / units of h)."""
+        p = self.params
+        return (p['theta_s'] - p['theta_r']) * (0. - self._functions(h)[1])
+
+    def relative_conductivity(self, h):
+        """Relative hydraulic conductivity Kr(h) of Mualem."""
+        return self._functions(h)[2]
+
+    def conductivity(self, h):
+        """Hydraulic conductivity K(h) = Ks Kr(h)."""
+        return self.Ks * self.relative_conductivity(h)
+
+    def state(self, h):
+        """Water content θ, capacity C and conductivity K at the suction heads h in one evaluation."""
+        p = self.params
+        Se, dSe, kr = self._functions(h)
+        return p['theta_r'] + (p['theta_s'] - p['theta_r']) * Se, (p['theta_s'] - p['theta_r']) * (0. - dSe), self.Ks * kr
+
+    def suction(self, theta, iterations=60):
+        """Suction head h(θ), the inverse of ``water_content`` (inf at θ <= θr, 0 at θ >= θs).
+
+        The bimodal curve has no closed-form inverse; it is found by
+        bisection of log h between 1e-6 / alpha and 1e12 / alpha (the larger
+        and smaller of alpha1 and alpha2).
+        """
+        p = self.params
+        Se = np.clip((np.asarray(theta, dtype=float) - p['theta_r']) / (p['theta_s'] - p['theta_r']), 0., 1.)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            if self.model == 'van_genuchten':
+                n = p['n']
+                h = (Se ** (-n / (n - 1.)) - 1.) ** (1. / n) / p['alpha']
+            elif self.model == 'brooks_corey':
+                h = p['h_b'] * Se ** (-1. / p['lam'])
+            elif self.model == 'kosugi':
+                h = p['h_m'] * np.exp(p['sigma'] * np.sqrt(2.) * scipy.special.erfcinv(2. * Se))
+            else:
+                lo = np.log(1e-6 / np.maximum(p['alpha1'], p['alpha2'])) + 0. * Se
+                hi = np.log(1e12 / np.minimum(p['alpha1'], p['alpha2'])) + 0. * Se
+                for _ in range(iterations):
+                    mid = 0.5 * (lo + hi)
+                    wet = self.saturation(np.exp(mid)) > Se
+                    lo, hi = np.where(wet, mid, lo), np.where(wet, hi, mid)
+                h = np.exp(0.5 * (lo + hi))
+            return np.where(Se <= 0., np.inf, np.where(Se >= 1., 0., h))
+
+    def diffusivity(self, theta):
+        """Soil water diffusivity D(θ) = K / C (units of Ks times units of h).
+
+        K vanishes faster than C towards the residual water content; at
+        θ <= θr, where both are zero, the limit D = 0 is returned.
+        """
+        h = self.suction(theta)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(np.isinf(h), 0., self.conductivity(h) / self.capacity(h))
+
+
+def _initial_guess(model, h, theta, mask):
+    """Starting values: θs and θr from the wettest and driest observation, the scale from the suction at half saturation."""
+    theta_s = np.max(np.where(mask, theta, -np.inf), axis=-1)
+    theta_min = np.min(np.where(mask, theta, np.inf), axis=-1)
+    theta_r = np.clip(0.5 * theta_min, 0., None)
+    # suction of the observation closest to half saturation
+    Se = (theta - theta_r[:, None]) / np.maximum(theta_s - theta_r, 1e-6)[:, None]
+    i = np.argmin(np.where(mask & (h > 0.), np.abs(Se - 0.5), np.inf), axis=-1)
+    h_half = np.maximum(np.take_along_axis(h, i[:, None], axis=-1)[:, 0], 1e-3)
+    ones = np.ones(theta_s.shape)
+    if model == 'van_genuchten':
+        p = [theta_r, theta_s, 1. / h_half, 1.5 * ones]
+    elif model == 'brooks_corey':
+        p = [theta_r, theta_s, 0.3 * h_half, 0.5 * ones]
+    elif model == 'kosugi':
+        p = [theta_r, theta_s, h_half, 1.5 * ones]
+    else:
+        p = [theta_r, theta_s, 0.5 * ones, 3. / h_half, 2. * ones, 0.03 / h_half, 2. * ones]
+    return np.stack(p, axis=-1)
+
+
+def fit_retention(h, theta, model='van_genuchten', p0=None, max_iter=200):
+    """Fit a retention model to the (h, θ) data of many samples at once.
+
+    h and theta are sequences (one entry per sample) of suction heads and
+    water contents; the samples may have different numbers of observations
+    and NaN values are ignored. p0 are optional starting values with shape
+    (samples, k) or (k,). The parameters marked in ``BOUNDS`` are fitted in
+    their logarithms and all are kept within their bounds; the derivatives
+    are forward differences of all samples together.
+
+    Returns a RetentionFit with a leading axis over the samples.
+    """
+    if model not in MODELS:
+        raise ValueError("model must be one of %s" % ', '.join(MODELS))
+    h, theta = _as_batch(h), _as_batch(theta)
+    mask = np.isfinite(h) & np.isfinite(theta)
+    h, theta = np.where(mask, h, 0.), np.where(mask, theta, 0.)
+    names = MODELS[model]
+    m, k = h.shape[0], len(names)
+    lower, upper, log = (np.array(v) for v in zip(*(BOUNDS[name] for name in names)))
+    lower, upper = np.where(log, np.log(np.maximum(lower, 1e-300)), lower), np.where(log, np.log(upper), upper)
+    if p0 is None:
+        p0 = _initial_guess(model, h, theta, mask)
+    p0 = np.broadcast_to(np.asarray(p0, dtype=float), (m, k))
+    x0 = np.where(log, np.log(np.where(log, p0, 1.)), p0)
+
+    def residuals(x, idx):
+        params = np.where(log, np.exp(x), x)
+        model_theta = Soil(model, params.T[:, :, None]).water_content(h[idx])
+        return np.where(mask[idx], model_theta - theta[idx], 0.)
+
+    def fun(x, idx):
+        res = residuals(x, idx)
+        J = np.empty(res.shape + (k,))
+        for i in range(k):
+            dx = np.zeros(k)
+            dx[i] = _FD_STEP
+            J[..., i] = (residuals(x + dx, idx) - res) / dx[i]
+        return res, J
+
+    x, res, J, success, n_iter = _levenberg_marquardt(fun, x0, lower, upper, max_iter=max_iter)
+    stats = fit_statistics(theta, theta + res, k, mask)
+    return RetentionFit(names, np.where(log, np.exp(x), x), stats, success, n_iter)
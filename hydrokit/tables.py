@@ -0,0 +1,186 @@
+"""Precomputed tables of the well functions, memory-mapped by all processes.
+
+The Hantush and Neuman well functions are integrals that take about a
+second per grid to evaluate, and every server process used to compute its
+own grids. ``python -m hydrokit.tables`` computes fine grids of log W once
+and writes them as versioned ``.npy`` files::
+
+    python -m hydrokit.tables             # into hydrokit/data
+    python -m hydrokit.tables /srv/tables # or HYDROKIT_TABLES=/srv/tables
+
+At runtime ``load`` maps the files read-only into memory, so all processes
+of a host share the same pages, and ``wells.hantush_well_function`` and
+``wells.neuman_well_function`` interpolate in them (without the files they
+fall back to the grids computed per process). Each ``Table`` knows the
+largest relative error of its interpolation against the direct evaluation,
+which is measured when the table is built::
+
+    table = tables.load('hantush')
+    w = table(u, r_div_B)          # |w / W - 1| <= table.error
+"""
+
+import json
+import os
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import scipy.special
+
+from . import __version__, wells
+
+#: Version of the file format and the grids; tables of another version are ignored
+TABLE_VERSION = 1
+
+# name: ((log10 of the lower and upper bound, points per decade) per argument,
+# required relative accuracy)
+GRIDS = {
+    'theis': (((-12., 2., 200),), 1e-7),
+    'hantush': (((-8., 1., 50), (-3., 1., 50)), 1e-4),
+    'neuman_a': (((np.log10(0.3), np.log10(3e5), 30), (-3., 1., 30)), 1e-4),
+    'neuman_b': (((-4., 5., 30), (-3., 1., 30)), 1e-4),
+}
+
+
+def _theis(u):
+    return scipy.special.exp1(u)
+
+
+# direct evaluation of the tabulated functions of x (u or 1/u) and p (r/B or beta)
+FUNCTIONS = {
+    'theis': _theis,
+    'hantush': wells._hantush_direct,
+    'neuman_a': lambda x, p: wells._neuman_direct(1. / x, p, 0.),
+    'neuman_b': lambda x, p: wells._neuman_direct(1. / x, p, 0., late=True),
+}
+
+
+def directory():
+    """Directory of the tables: ``HYDROKIT_TABLES`` or hydrokit/data."""
+    return Path(os.environ.get('HYDROKIT_TABLES', Path(__file__).parent / 'data'))
+
+
+def _axes(name):
+    """Natural logarithm of the lower bound, step and number of points of the axes of a table."""
+    axes = []
+    for lo, hi, per_decade in GRIDS[name][0]:
+        n = int(round((hi - lo) * per_decade)) + 1
+        axes.append((lo * np.log(10.), (hi - lo) * np.log(10.) / (n - 1), n))
+    return tuple(axes)
+
+
+def _weights(t):
+    """Weights of the cubic Lagrange polynomial through the nodes -1, 0, 1, 2 at 0 <= t <= 1."""
+    return np.stack([-t * (t - 1.) * (t - 2.) / 6., (t + 1.) * (t - 1.) * (t - 2.) / 2.,
+                     -(t + 1.) * t * (t - 2.) / 2., (t + 1.) * t * (t - 1.) / 6.])
+
+
+class Table:
+    """log W of a well function on a uniform grid of the logarithms of its arguments.
+
+    values is the (memory-mapped) array of log W, axes the (log of the
+    lower bound, step, points) of each argument and error the largest
+    relative interpolation error. Calls interpolate log W with cubic
+    polynomials through the 4 (4 x 4) nearest nodes; outside of the grid,
+    the function is evaluated directly.
+    """
+
+    def __init__(self, name, values, axes, error):
+        self.name, self.values, self.axes, self.error = name, values, axes, error
+
+    def bounds(self):
+        """Lower and upper bounds of the arguments."""
+        return [(np.exp(lo), np.exp(lo + step * (n - 1))) for lo, step, n in self.axes]
+
+    def __call__(self, *args):
+        args = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in args))
+        inside = np.ones(args[0].shape, dtype=bool)
+        positions = []
+        for a, (lo, step, n) in zip(args, self.axes):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                position = (np.log(a) - lo) / step
+            inside &= (position >= 0.) & (position <= n - 1)
+            positions.append(position)
+        w = np.empty(args[0].shape)
+        if inside.any():
+            w[inside] = np.exp(self._interpolate([p[inside] for p in positions]))
+        if (~inside).any():
+            w[~inside] = FUNCTIONS[self.name](*(a[~inside] for a in args))
+        return w
+
+    def _interpolate(self, positions):
+        # first of the 4 nodes and the weights of each dimension
+        starts, weights = [], []
+        for position, (lo, step, n) in zip(positions, self.axes):
+            start = np.clip(np.floor(position).astype(int) - 1, 0, n - 4)
+            starts.append(start)
+            weights.append(_weights(position - start - 1.))
+        if len(starts) == 1:
+            return sum(weights[0][k] * self.values[starts[0] + k] for k in range(4))
+        return sum(weights[0][k] * weights[1][m] * self.values[starts[0] + k, starts[1] + m]
+                   for k in range(4) for m in range(4))
+
+
+def _nodes(axes, offsets):
+    """Arguments at the nodes of the axes shifted by the offsets (in steps)."""
+    grids = [np.exp(lo + step * (np.arange(n - (offset > 0)) + offset)) for (lo, step, n), offset in zip(axes, offsets)]
+    return np.meshgrid(*grids, indexing='ij')
+
+
+def build(path=None, names=None, log=None):
+    """Compute the tables and write them into the directory path (default ``directory()``).
+
+    The interpolation error of each table is measured at the centers
+    between the nodes, where it is largest; a table that misses the
+    required accuracy raises a ValueError.
+    """
+    path = Path(path or directory())
+    path.mkdir(parents=True, exist_ok=True)
+    manifest_file = path / ('manifest-v%d.json' % TABLE_VERSION)
+    manifest = json.loads(manifest_file.read_text()) if manifest_file.exists() else {}
+    for name in names or GRIDS:
+        start = time.perf_counter()
+        axes = _axes(name)
+        f = FUNCTIONS[name]
+        values = np.log(f(*_nodes(axes, [0.] * len(axes))))
+        table = Table(name, values, axes, None)
+        # all combinations of centers and nodes except the nodes themselves
+        error = 0.
+        for offsets in np.ndindex(*(2,) * len(axes)):
+            if any(offsets):
+                args = _nodes(axes, [0.5 * o for o in offsets])
+                error = max(error, np.abs(table(*args) / f(*args) - 1.).max())
+        if not error <= GRIDS[name][1]:
+            raise ValueError('table %s: interpolation error %.2e above %.0e' % (name, error, GRIDS[name][1]))
+        np.save(path / ('%s-v%d.npy' % (name, TABLE_VERSION)), values)
+        manifest[name] = dict(axes=[list(a) for a in axes], error=error, hydrokit=__version__)
+        if log:
+            log('%-9s %8d points  error %.1e  %.1f s' % (name, values.size, error, time.perf_counter() - start))
+    manifest_file.write_text(json.dumps(manifest, indent=1))
+    load.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def load(name, path=None):
+    """Memory-mapped table of a well function, None if there is no valid table file.
+
+    name is one of 'theis', 'hantush', 'neuman_a' (type A curve, argument
+    1/u_A) and 'neuman_b' (type B curve, argument 1/u_B). Tables built for
+    other grids or another ``TABLE_VERSION`` are ignored.
+    """
+    path = Path(path or directory())
+    try:
+        entry = json.loads((path / ('manifest-v%d.json' % TABLE_VERSION)).read_text())[name]
+        values = np.load(path / ('%s-v%d.npy' % (name, TABLE_VERSION)), mmap_mode='r')
+    except (OSError, KeyError, ValueError):
+        return None
+    axes = _axes(name)
+    if not np.allclose(entry['axes'], axes, rtol=1e-12) or values.shape != tuple(n for lo, step, n in axes):
+        return None
+    return Table(name, values, axes, entry['error'])
+
+
+if __name__ == '__main__':
+    build(sys.argv[1] if len(sys.argv) > 1 else None, log=print)
@@ -0,0 +1,259 @@
+"""Particle tracking: pathlines and travel times of groundwater.
+
+Particles move with the seepage velocity v = q / (n b) (discharge per unit
+width q, porosity n, saturated thickness b). Both trackers advance all
+particles of a run together, vectorized over the particles:
+
+* ``track`` integrates the velocity of an analytic flow field (e.g. a
+  ``capture.WellField``) with the adaptive Runge-Kutta scheme of Dormand
+  and Prince (RK45) and a step size per particle.
+* ``pollock`` moves the particles through the cells of a finite-difference
+  solution (``fdm.solve_flow``) with the semi-analytic method of Pollock
+  (1988) that MODPATH uses: within a cell, each velocity component is
+  interpolated linearly between the two faces, so the time to the next
+  face and the position at any time are computed exactly.
+
+Both return the positions at given times (``Tracks``). With
+``backward=True`` the particles move against the flow, e.g. from a well to
+the isochrones of a wellhead protection zone (``isochrones``)::
+
+    def backward(x, y, times):
+        return tracking.track(field, x, y, times, porosity=0.25, thickness=20., backward=True)
+    days = np.array([50., 100., 365.])
+    zones = tracking.isochrones(backward, [(0., 0.)], days * 86400., radius=1.)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+#: Positions of the particles at the output times (len(times) x number of
+#: particles; particles that stopped keep their last position) and their
+#: status after the last time: 'active', 'sink' (stopped at a well or in a
+#: cell that the water leaves through a boundary package), 'outside' (left
+#: the grid or entered an inactive cell) or 'stagnant' (no flow)
+Tracks = namedtuple('Tracks', 'x y status')
+
+#: Closed line of equal travel time around well number ``well``
+Isochrone = namedtuple('Isochrone', 'well time x y')
+
+# Dormand-Prince 5(4) coefficients: stages and error weights (5th minus 4th order)
+_DP_A = ((), (1 / 5,), (3 / 40, 9 / 40), (44 / 45, -56 / 15, 32 / 9),
+         (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+         (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+         (35 / 384, 0., 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84))
+_DP_E = (71 / 57600, 0., -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def _record(out, nxt, t, times, z, todo):
+    """Store the positions of the particles todo that reached their next output time."""
+    while True:
+        due = todo[(nxt[todo] < len(times))]
+        due = due[t[due] >= times[nxt[due]]]
+        if len(due) == 0:
+            return
+        out[nxt[due], due] = z[due]
+        nxt[due] += 1
+
+
+def _tracks(out, nxt, z, status):
+    """Fill the outputs after the stop of a particle with its last position."""
+    later = np.arange(out.shape[0])[:, None] >= nxt[None, :]
+    out = np.where(later, z[None, :], out)
+    return Tracks(out.real, out.imag, status)
+
+
+def track(field, x, y, times, porosity, thickness, backward=False, tol=0.01, radius=0.1, max_steps=100000):
+    """Pathlines in an analytic flow field (adaptive RK45).
+
+    field has a method ``discharge(x, y)`` that returns the discharge per
+    unit width (qx, qy) in m²/s, such as ``capture.WellField``; porosity
+    and thickness (m) convert it to the seepage velocity. The particles
+    start at x, y (arrays) at t = 0; times are the output times in s. tol
+    is the local error of a step in m. Particles within radius of a well
+    that removes water (pumping wells, injection wells for backward
+    tracking) stop there. Returns ``Tracks``.
+    """
+    z = np.ravel(np.asarray(x, dtype=float) + 1j * np.asarray(y, dtype=float))
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    sign = -1. if backward else 1.
+    Q = getattr(field, 'Q', np.zeros(0))
+    sinks = (getattr(field, 'xw', np.zeros(0)) + 1j * getattr(field, 'yw', np.zeros(0)))[sign * Q > 0.]
+
+    def velocity(z):
+        qx, qy = field.discharge(z.real, z.imag)
+        return sign * (qx + 1j * qy) / (porosity * thickness)
+
+    n = z.size
+    out = np.full((len(times), n), np.nan + 0j)
+    nxt = np.zeros(n, dtype=int)
+    t = np.zeros(n)
+    status = np.full(n, 'active', dtype='<U8')
+    _record(out, nxt, t, times, z, np.arange(n))
+    k1 = velocity(z)
+    speed = np.abs(k1)
+    with np.errstate(divide='ignore'):
+        h = np.minimum(10. * tol / speed, times[-1])
+    status[speed == 0.] = 'stagnant'
+    if len(sinks):
+        status[(np.abs(z[:, None] - sinks) < radius).any(1)] = 'sink'
+    active = np.flatnonzero((status == 'active') & (nxt < len(times)))
+    for _ in range(max_steps):
+        if len(active) == 0:
+            break
+        za = z[active]
+        ha = np.minimum(h[active], times[nxt[active]] - t[active])
+        k = [k1[active]]
+        for a in _DP_A[1:]:
+            k.append(velocity(za + ha * sum(aj * kj for aj, kj in zip(a, k))))
+        z_new = za + ha * sum(aj * kj for aj, kj in zip(_DP_A[-1], k))
+        err = np.abs(ha * sum(ej * kj for ej, kj in zip(_DP_E, k)))
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * (tol / err) ** 0.2, 0.2, 5.)
+        ok = err <= tol
+        done = active[ok]
+        z[done], t[done], k1[done] = z_new[ok], t[done] + ha[ok], k[-1][ok]
+        h[active] = ha * factor
+        _record(out, nxt, t, times, z, done)
+        if len(sinks):
+            status[done[(np.abs(z[done, None] - sinks) < radius).any(1)]] = 'sink'
+        status[done[k1[done] == 0.]] = 'stagnant'
+        active = active[(status[active] == 'active') & (nxt[active] < len(times))]
+    return _tracks(out, nxt, z, status)
+
+
+def _exit_time(v1, v2, v, u, size):
+    """Time to leave a cell in one direction and the direction (+1, -1 or 0).
+
+    v1 and v2 are the velocities at the faces at 0 and size, v the velocity
+    at the local coordinate u. With the linear velocity v1 + A u, the time
+    to the face ue is log(v(ue) / v) / A, written with log1p for A -> 0.
+    """
+    forward, back = (v > 0.) & (v2 > 0.), (v < 0.) & (v1 < 0.)
+    ue = np.where(forward, size, 0.)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w = (ue - u) / v
+        s = (v2 - v1) / size * w
+        f = np.where(np.abs(s) > 1e-8, np.log1p(np.maximum(s, -1.)) / s, 1. - s / 2.)
+        dt = np.where(forward | back, w * f, np.inf)
+    return np.maximum(dt, 0.), np.where(forward, 1, np.where(back, -1, 0))
+
+
+def _move(v1, v2, v, u, size, dt):
+    """Local coordinate after the time dt: u + v (exp(A dt) - 1) / A."""
+    s = (v2 - v1) / size * dt
+    with np.errstate(invalid='ignore'):
+        g = np.where(np.abs(s) > 1e-8, np.expm1(s) / s, 1. + s / 2.)
+    return u + v * dt * g
+
+
+def pollock(delr, delc, flows, x, y, times, porosity=0.2, layer=0, backward=False, stop_cells=None,
+            max_iter=1000000):
+    """Pathlines in one layer of a finite-difference solution (Pollock's method).
+
+    delr and delc are the column and row widths of the grid, flows the
+    ``FaceFlows`` of a ``fdm.solve_flow`` result and porosity a scalar or an
+    array per cell. x is measured from the western edge of the grid, y from
+    its southern edge (row 0 is the northern row). The particles start at
+    x, y at t = 0; times are the output times (in the time unit of the
+    flows). The flow between the layers and recharge act as sources or
+    sinks within the layer. Particles stop in cells that they cannot leave
+    (strong sinks such as most well cells) and when they enter one of the
+    cells with stop_cells == True (nrow x ncol, e.g. cells with weak
+    sinks). Returns ``Tracks``.
+    """
+    delr, delc = np.asarray(delr, dtype=float), np.asarray(delc, dtype=float)
+    nrow, ncol = delc.size, delr.size
+    x_edges = np.concatenate([[0.], np.cumsum(delr)])
+    s_edges = np.concatenate([[0.], np.cumsum(delc)])  # from the northern edge
+    sign = -1. if backward else 1.
+    b = flows.saturated[layer]
+    n_eff = np.broadcast_to(np.asarray(porosity, dtype=float), flows.saturated.shape)[layer] * b
+    active = b > 0.
+    stop_cells = np.zeros((nrow, ncol), bool) if stop_cells is None else np.asarray(stop_cells, dtype=bool)
+
+    # velocities at the western / eastern and northern / southern faces of
+    # every cell, positive towards east and south
+    qx = np.zeros((nrow, ncol + 1))
+    qx[:, 1:-1] = sign * flows.right[layer]
+    qs = np.zeros((nrow + 1, ncol))
+    qs[1:-1] = sign * flows.front[layer]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vw = np.where(active, qx[:, :-1] / (delc[:, None] * n_eff), 0.)
+        ve = np.where(active, qx[:, 1:] / (delc[:, None] * n_eff), 0.)
+        vn = np.where(active, qs[:-1] / (delr[None, :] * n_eff), 0.)
+        vs = np.where(active, qs[1:] / (delr[None, :] * n_eff), 0.)
+    net_inflow = qx[:, :-1] - qx[:, 1:] + qs[:-1] - qs[1:]
+
+    z = np.ravel(np.asarray(x, dtype=float) + 1j * np.asarray(y, dtype=float))
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    n = z.size
+    col = np.searchsorted(x_edges, z.real, side='right') - 1
+    row = np.searchsorted(s_edges, s_edges[-1] - z.imag, side='right') - 1
+    inside = (col >= 0) & (col < ncol) & (row >= 0) & (row < nrow)
+    col, row = np.clip(col, 0, ncol - 1), np.clip(row, 0, nrow - 1)
+    u = z.real - x_edges[col]
+    w = s_edges[-1] - z.imag - s_edges[row]
+
+    out = np.full((len(times), n), np.nan + 0j)
+    nxt = np.zeros(n, dtype=int)
+    t = np.zeros(n)
+    status = np.where(inside & active[row, col], 'active', 'outside').astype('<U8')
+    _record(out, nxt, t, times, z, np.arange(n))
+    todo = np.flatnonzero((status == 'active') & (nxt < len(times)))
+    for _ in range(max_iter):
+        if len(todo) == 0:
+            break
+        r, c = row[todo], col[todo]
+        dx, ds = delr[c], delc[r]
+        v_x = vw[r, c] + (ve[r, c] - vw[r, c]) / dx * u[todo]
+        v_s = vn[r, c] + (vs[r, c] - vn[r, c]) / ds * w[todo]
+        tx, ex = _exit_time(vw[r, c], ve[r, c], v_x, u[todo], dx)
+        ts, es = _exit_time(vn[r, c], vs[r, c], v_s, w[todo], ds)
+        dt = np.minimum(np.minimum(tx, ts), times[nxt[todo]] - t[todo])
+        u[todo] = np.where(dt >= tx, np.where(ex > 0, dx, 0.), _move(vw[r, c], ve[r, c], v_x, u[todo], dx, dt))
+        w[todo] = np.where(dt >= ts, np.where(es > 0, ds, 0.), _move(vn[r, c], vs[r, c], v_s, w[todo], ds, dt))
+        t[todo] += dt
+        z[todo] = x_edges[c] + u[todo] + 1j * (s_edges[-1] - s_edges[r] - w[todo])
+        _record(out, nxt, t, times, z, todo)
+
+        # into the next cell
+        cross_x, cross_s = dt >= tx, dt >= ts
+        c_new = np.where(cross_x, c + ex, c)
+        r_new = np.where(cross_s, r + es, r)
+        leave = (c_new < 0) | (c_new >= ncol) | (r_new < 0) | (r_new >= nrow)
+        c_new, r_new = np.clip(c_new, 0, ncol - 1), np.clip(r_new, 0, nrow - 1)
+        leave |= ~active[r_new, c_new]
+        status[todo[leave]] = 'outside'
+        enter = (cross_x | cross_s) & ~leave
+        i = todo[enter]
+        u[i] = np.where(cross_x[enter], np.where(ex[enter] > 0, 0., delr[c_new[enter]]), u[i])
+        w[i] = np.where(cross_s[enter], np.where(es[enter] > 0, 0., delc[r_new[enter]]), w[i])
+        col[i], row[i] = c_new[enter], r_new[enter]
+        status[i[stop_cells[row[i], col[i]]]] = 'sink'
+        # no exit from the cell: strong sink or stagnation point
+        trapped = ~(cross_x | cross_s) & np.isinf(tx) & np.isinf(ts) & (nxt[todo] >= len(times))
+        status[todo[trapped]] = np.where(net_inflow[r[trapped], c[trapped]] > 0., 'sink', 'stagnant')
+        todo = todo[(status[todo] == 'active') & (nxt[todo] < len(times))]
+    return _tracks(out, nxt, z, status)
+
+
+def isochrones(tracker, wells, times, radius, n=72):
+    """Isochrones (lines of equal travel time) around wells.
+
+    Particles are released on a circle of the given radius around each
+    well (records x, y) and tracked backward with tracker(x, y, times),
+    e.g. a ``track`` or ``pollock`` call with backward=True. Returns a list
+    of ``Isochrone`` for every well and time (closed lines).
+    """
+    wells = np.asarray(wells, dtype=float).reshape(-1, 2)
+    angle = np.linspace(0., 2. * np.pi, n, endpoint=False)
+    x = (wells[:, :1] + radius * np.cos(angle)).ravel()
+    y = (wells[:, 1:] + radius * np.sin(angle)).ravel()
+    tracks = tracker(x, y, np.atleast_1d(times))
+    lines = []
+    for k in range(len(wells)):
+        for j, time in enumerate(np.atleast_1d(times)):
+            xs, ys = tracks.x[j, k * n:(k + 1) * n], tracks.y[j, k * n:(k + 1) * n]
+            lines.append(Isochrone(k, time, np.append(xs, xs[0]), np.append(ys, ys[0])))
+    return lines
@@ -0,0 +1,183 @@
+"""Uncertain aquifer parameters in decisions: utility sweeps and ensemble calibration.
+
+Stakeholders judge a pumping rate Q by the drawdown s at their distance r
+and time t with a utility that changes linearly from 0 at the drawdown
+s_U0 to 1 at s_U1 (``linear_utility``). For an ensemble of (T, S) samples
+with weights, ``utility_sweep`` returns the expected utilities and their
+percentiles for many rates at once. The Theis drawdown is proportional to
+Q, s = Q w with the unit drawdown w = W(S r² / (4Tt)) / (4πT) of a sample,
+so the utilities of all rates follow from the sorted unit drawdowns and
+their cumulative sums; the cost grows with rates + samples instead of
+rates x samples::
+
+    sweep = uncertainty.utility_sweep(Q, T, S, r=[100., 2500., 7500.], t=[...], s_U0=[...], s_U1=[...])
+    front = uncertainty.pareto_front(sweep.mean)
+
+The (T, S) ensembles are drawn from a prior (``lognormal_ensemble``) or
+conditioned on a pumping test with ``glue`` (informal likelihood and a
+behavioural threshold) or ``metropolis`` (adaptive Metropolis sampler of
+the posterior for Gaussian measurement errors).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .wells import theis, well_function
+
+#: Expected utilities (rates x stakeholders) and their percentiles (percentiles x rates x stakeholders)
+UtilitySweep = namedtuple('UtilitySweep', 'Q mean percentiles levels')
+
+#: Parameter samples with normalized weights, their RMSE against the data and
+#: the acceptance rate (fraction of behavioural samples for GLUE)
+Ensemble = namedtuple('Ensemble', 'T S weights rmse acceptance')
+
+
+def linear_utility(s, s_U0, s_U1):
+    """Utility of the drawdown s: 0 at s_U0, 1 at s_U1, linear in between and constant outside."""
+    return np.clip((np.asarray(s, dtype=float) - s_U0) / (s_U1 - s_U0), 0., 1.)
+
+
+def lognormal_ensemble(T, S, sigma_log10, n, seed=None):
+    """n samples of T and S, log-normally distributed around T and S with the standard deviation sigma_log10 of log10."""
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((2, n)) * sigma_log10
+    return T * 10. ** z[0], S * 10. ** z[1]
+
+
+def _weights(weights, n):
+    if weights is None:
+        return np.full(n, 1. / n)
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def weighted_quantile(values, weights, q, axis=0):
+    """Quantiles q (0..1) of the samples along axis of values with the weights (quantiles along the first axis)."""
+    values = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+    order = np.argsort(values, axis=-1)
+    values = np.take_along_axis(values, order, axis=-1)
+    cumulative = np.cumsum(np.asarray(weights, dtype=float)[order], axis=-1)
+    cumulative /= cumulative[..., -1:]
+    q = np.atleast_1d(np.asarray(q, dtype=float)).reshape((-1,) + (1,) * cumulative.ndim)
+    index = np.minimum((cumulative < q).sum(-1), values.shape[-1] - 1)
+    return np.take_along_axis(values[None], index[..., None], axis=-1)[..., 0]
+
+
+def utility_sweep(Q, T, S, r, t, s_U0, s_U1, weights=None, percentiles=(5., 50., 95.)):
+    """Utilities of the stakeholders for the pumping rates Q and the (T, S) samples.
+
+    Q (m³/s, > 0) is a 1D array of rates, T and S are 1D arrays of samples
+    with optional weights; r (m), t (s), s_U0 and s_U1 (m) have one entry
+    per stakeholder. Returns ``UtilitySweep`` with the expected utilities
+    and the weighted percentiles of the utilities of each rate. The
+    utility of a stakeholder is monotonic in the drawdown, so its
+    percentiles are the utilities of the drawdown percentiles (the lower
+    drawdown percentiles for stakeholders that prefer small drawdowns).
+    """
+    Q = np.atleast_1d(np.asarray(Q, dtype=float))
+    T, S = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(S, dtype=float))
+    r, t, s_U0, s_U1 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in (r, t, s_U0, s_U1)))
+    p = _weights(weights, T.size)
+    levels = np.asarray(percentiles, dtype=float) / 100.
+    mean = np.empty((len(Q), len(r)))
+    quantiles = np.empty((len(levels), len(Q), len(r)))
+    for k in range(len(r)):
+        # unit drawdown of the samples, sorted, with the cumulative weights and weighted sums
+        w = well_function(S * r[k] ** 2 / (4. * T * t[k])) / (4. * np.pi * T)
+        order = np.argsort(w)
+        w, pk = w[order], p[order]
+        mass = np.concatenate([[0.], np.cumsum(pk)])
+        first = np.concatenate([[0.], np.cumsum(pk * w)])
+        lo, hi = min(s_U0[k], s_U1[k]), max(s_U0[k], s_U1[k])
+        # samples with Q w < lo, lo <= Q w <= hi and Q w > hi
+        i1 = np.searchsorted(w, lo / Q, side='left')
+        i2 = np.searchsorted(w, hi / Q, side='right')
+        below, above = mass[i1], mass[-1] - mass[i2]
+        middle_mass, middle_w = mass[i2] - mass[i1], first[i2] - first[i1]
+        mean[:, k] = (below * linear_utility(lo, s_U0[k], s_U1[k]) + above * linear_utility(hi, s_U0[k], s_U1[k])
+                      + (Q * middle_w - s_U0[k] * middle_mass) / (s_U1[k] - s_U0[k]))
+        # drawdown percentiles; stakeholders with decreasing utility take the complementary level
+        q = levels if s_U1[k] > s_U0[k] else 1. - levels
+        index = np.minimum(np.searchsorted(mass[1:] / mass[-1], q), len(w) - 1)
+        quantiles[:, :, k] = linear_utility(np.outer(w[index], Q), s_U0[k], s_U1[k])
+    return UtilitySweep(Q, np.clip(mean, 0., 1.), quantiles, levels * 100.)
+
+
+def pareto_front(objectives, chunk=1000):
+    """Mask of the rows of objectives (n x m, larger is better) that no other row dominates."""
+    objectives = np.asarray(objectives, dtype=float)
+    front = np.ones(len(objectives), dtype=bool)
+    for start in range(0, len(objectives), chunk):
+        block = objectives[start:start + chunk, None, :]
+        dominated = (np.all(objectives[None] >= block, axis=-1) & np.any(objectives[None] > block, axis=-1)).any(-1)
+        front[start:start + chunk] = ~dominated
+    return front
+
+
+def _rmse(t, s_obs, r, Q, T, S, batch=20000):
+    """RMSE of the Theis drawdowns of the samples T, S against the observations s_obs at the times t."""
+    t, s_obs = np.asarray(t, dtype=float), np.asarray(s_obs, dtype=float)
+    out = np.empty(len(T))
+    for start in range(0, len(T), batch):
+        s = theis(r, t[None, :], T[start:start + batch, None], S[start:start + batch, None], Q)
+        out[start:start + batch] = np.sqrt(np.mean((s - s_obs) ** 2, axis=-1))
+    return out
+
+
+def glue(t, s_obs, r, Q, n=10000, log10_T=(-6., -1.), log10_S=(-6., -1.), threshold=None, shape=1., seed=None):
+    """GLUE ensemble: (T, S) samples conditioned on the drawdowns s_obs (m) at the times t (s).
+
+    n samples are drawn log-uniformly from the ranges of log10 T and log10
+    S and their RMSE is computed in batches. Samples with an RMSE of at
+    most threshold (m; default twice the smallest RMSE) are behavioural and
+    weighted with the informal likelihood (1 / RMSE)^shape; all others get
+    the weight 0 and are dropped.
+    """
+    rng = np.random.default_rng(seed)
+    T = 10. ** rng.uniform(*log10_T, n)
+    S = 10. ** rng.uniform(*log10_S, n)
+    rmse = _rmse(t, s_obs, r, Q, T, S)
+    if threshold is None:
+        threshold = 2. * rmse.min()
+    keep = rmse <= threshold
+    weights = np.maximum(rmse[keep], 1e-12) ** -shape
+    return Ensemble(T[keep], S[keep], weights / weights.sum(), rmse[keep], keep.mean())
+
+
+def metropolis(t, s_obs, r, Q, sigma, n=10000, x0=(-3., -3.), chains=8, burn_in=0.25, step=0.1, seed=None):
+    """Adaptive Metropolis sampler of log10 T and log10 S for Gaussian errors with the standard deviation sigma (m).
+
+    chains chains start near x0 (log10 T, log10 S) and are advanced
+    together, so one step evaluates the drawdowns of all chains at once.
+    After every 100 steps the proposal covariance is set to 2.38²/2 times
+    the covariance of the samples so far (Haario et al. 2001); the initial
+    proposal has the standard deviation step. The first burn_in fraction
+    of every chain is dropped; about n samples with equal weights remain.
+    """
+    rng = np.random.default_rng(seed)
+    t, s_obs = np.asarray(t, dtype=float), np.asarray(s_obs, dtype=float)
+    steps = int(np.ceil(n / (1. - burn_in) / chains))
+
+    def log_likelihood(x):
+        s = theis(r, t[None, :], 10. ** x[:, :1], 10. ** x[:, 1:], Q)
+        return -0.5 * np.sum((s - s_obs) ** 2, axis=-1) / sigma ** 2
+
+    x = np.asarray(x0, dtype=float) + step * rng.standard_normal((chains, 2))
+    log_l = log_likelihood(x)
+    samples = np.empty((steps, chains, 2))
+    cov = step ** 2 * np.eye(2)
+    accepted = 0
+    for i in range(steps):
+        if i >= 100 and i % 100 == 0:
+            history = samples[i // 2:i].reshape(-1, 2)
+            cov = 2.38 ** 2 / 2. * np.cov(history.T) + 1e-10 * np.eye(2)
+        proposal = x + rng.standard_normal((chains, 2)) @ np.linalg.cholesky(cov).T
+        log_p = log_likelihood(proposal)
+        accept = np.log(rng.uniform(size=chains)) < log_p - log_l
+        x[accept], log_l[accept] = proposal[accept], log_p[accept]
+        accepted += accept.sum()
+        samples[i] = x
+    kept = samples[int(burn_in * steps):].reshape(-1, 2)
+    T, S = 10. ** kept[:, 0], 10. ** kept[:, 1]
+    return Ensemble(T, S, np.full(len(T), 1. / len(T)), _rmse(t, s_obs, r, Q, T, S), accepted / (steps * chains))
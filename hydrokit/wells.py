@@ -0,0 +1,269 @@
+"""Drawdown solutions for flow to a well.
+
+All functions accept scalars or NumPy arrays and broadcast over their
+arguments, e.g. ``theis(r[:, None], t[None, :], T, S, Q)`` returns the full
+r-t drawdown field. Units are consistent SI units (m, s, m²/s, m³/s).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import scipy.special
+from scipy.interpolate import RectBivariateSpline
+
+from .laplace import stehfest
+
+EULER_GAMMA = 0.5772156649015329
+
+
+def well_function(u):
+    """Theis well function W(u) (exponential integral E1)."""
+    return scipy.special.exp1(u)
+
+
+def theis_u(T, S, r, t):
+    """Dimensionless time variable u = r²S / (4Tt)."""
+    return r ** 2 * S / 4. / T / t
+
+
+def theis_s(Q, T, u):
+    """Drawdown for a given value of u."""
+    return Q / 4. / np.pi / T * well_function(u)
+
+
+def theis_wu(Q, T, s):
+    """Well function value that corresponds to a measured drawdown s."""
+    return s * 4. * np.pi * T / Q
+
+
+def theis(r, t, T, S, Q):
+    """Theis drawdown in a confined aquifer."""
+    return theis_s(Q, T, theis_u(T, S, r, t))
+
+
+def cooper_jacob(r, t, T, S, Q):
+    """Cooper-Jacob straight-line approximation of the Theis solution.
+
+    The approximation is valid for u < 0.01; negative values (large u) are
+    set to zero.
+    """
+    u = theis_u(T, S, r, t)
+    s = Q / 4. / np.pi / T * (-EULER_GAMMA - np.log(u))
+    return np.maximum(s, 0.)
+
+
+def theis_unconfined(r, t, T, S, Q, b):
+    """Theis drawdown with the Jacob correction for unconfined aquifers.
+
+    The Theis drawdown s' is converted with s = b - b * sqrt(1 - 2s'/b).
+    Where s' exceeds b/2 the correction is not defined and NaN is returned.
+    """
+    s_theis = theis(r, t, T, S, Q)
+    arg = 1. - 2. * s_theis / b
+    with np.errstate(invalid='ignore'):
+        return np.where(arg >= 0., b - b * np.sqrt(arg), np.nan)
+
+
+# Leaky and unconfined aquifers
+#
+# The Hantush-Jacob and Neuman well functions are obtained by numerical
+# inversion of their Laplace transforms with respect to the dimensionless time
+# tau = 1/(4u) = Tt/(Sr²). For the interactive apps, the functions are
+# evaluated once on a log-spaced grid and then interpolated with a cubic
+# spline; values outside of the grid are computed directly. If the tables of
+# ``hydrokit.tables`` have been built, they are interpolated instead, which
+# spares every process the computation of the grids.
+
+_LAGUERRE_X, _LAGUERRE_W = scipy.special.roots_laguerre(64)
+_W_FLOOR = 1e-12  # lower bound for log(W) on the interpolation grids
+_CHUNK = 2 ** 21  # max. number of series terms evaluated at once
+
+
+def _hantush_direct(u, r_div_B):
+    """Hantush-Jacob well function without interpolation.
+
+    For u < 0.2 the Laplace transform 2 K0(sqrt(p + (r/B)²)) / p is
+    inverted, for u >= 0.2 the integral definition is evaluated by
+    Gauss-Laguerre quadrature, which is more accurate where W is small.
+    """
+    u, r_div_B = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(r_div_B, dtype=float))
+    w = np.empty(u.shape)
+    early = u >= 0.2
+    late = ~early
+    if late.any():
+        rb = r_div_B[late][:, None]
+        w[late] = stehfest(lambda p: 2. * scipy.special.k0(np.sqrt(p + rb ** 2)) / p, 1. / (4. * u[late]))
+    if early.any():
+        y = u[early][:, None] + _LAGUERRE_X
+        w[early] = np.exp(-u[early]) * np.sum(_LAGUERRE_W * np.exp(-r_div_B[early][:, None] ** 2 / 4. / y) / y,
+                                              axis=-1)
+    return w
+
+
+def _neuman_roots(a, n_terms):
+    """First n_terms roots of lambda * tan(lambda) = a (a > 0 or inf)."""
+    a = a[..., None]
+    # n = 0: bisection on (0, pi/2), where lambda * tan(lambda) is increasing
+    lo = np.zeros(a.shape)
+    hi = np.full(a.shape, np.pi / 2.)
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        below = mid * np.tan(mid) < a
+        lo = np.where(below, mid, lo)
+        hi = np.where(below, hi, mid)
+    # n >= 1: lambda = n*pi + x with x = arctan(a / (n*pi + x)). This is a
+    # contraction with a factor below 1 / (2 n pi), so the higher roots need
+    # fewer iterations.
+    n_pi = np.arange(1, n_terms) * np.pi
+    x = np.arctan(a / (n_pi + np.pi / 4.))
+    iterations = np.ceil(17. / np.log10(2. * n_pi)).astype(int)
+    for k in range(iterations[0] if n_terms > 1 else 0):
+        m = np.count_nonzero(iterations > k)
+        x[..., :m] = np.arctan(a / (n_pi[:m] + x[..., :m]))
+    return np.concatenate([0.5 * (lo + hi), n_pi + x], axis=-1)
+
+
+def _neuman_direct(u, beta, sigma, late=False):
+    """Neuman well function without interpolation.
+
+    The drawdown averaged over the saturated thickness (fully penetrating
+    pumping and observation well) is the series
+    W(p) = 2/p * sum_n c_n K0(sqrt(q + beta * lambda_n²)) with
+    c_n = 2 sin²(lambda_n) / (lambda_n (lambda_n + sin(2 lambda_n) / 2))
+    and lambda_n * tan(lambda_n) = p / (sigma * beta). In terms of u = u_A
+    and sigma = S / Sy, q = p; sigma = 0 gives the type A curve. With
+    ``late=True``, u is u_B and the type B curve (sigma -> 0) is returned, for
+    which q = 0 and lambda_n * tan(lambda_n) = p / beta.
+    """
+    u, beta, sigma = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(beta, dtype=float),
+                                         np.asarray(sigma, dtype=float))
+    shape = u.shape
+    u, beta, sigma = u.ravel(), beta.ravel(), sigma.ravel()
+    w = np.empty(u.shape)
+    # Points are processed in chunks of similar beta. The series is truncated
+    # where K0(sqrt(beta) * lambda_n) < exp(-30).
+    order = np.argsort(beta)
+    i = 0
+    while i < order.size:
+        n_terms = int(np.ceil(30. / np.pi / np.sqrt(beta[order[i]]))) + 1
+        idx = order[i:i + max(1, _CHUNK // (16 * n_terms))]
+        i += idx.size
+        b = beta[idx, None, None]
+        s = sigma[idx, None]
+
+        def transform(p):
+            if not late and not s.any():
+                # Type A: the roots of tan(lambda) = inf
+                lam = (np.arange(n_terms) + 0.5) * np.pi
+            else:
+                with np.errstate(divide='ignore'):
+                    lam = _neuman_roots(p / (b[..., 0] if late else s * b[..., 0]), n_terms)
+            c = 2. * np.sin(lam) ** 2 / (lam * (lam + 0.5 * np.sin(2. * lam)))
+            q = 0. if late else p[..., None]
+            return 2. / p * np.sum(c * scipy.special.k0(np.sqrt(q + b * lam ** 2)), axis=-1)
+
+        w[idx] = stehfest(transform, 1. / (4. * u[idx]))
+    return np.maximum(w, 0.).reshape(shape)
+
+
+def _log_grid(lo, hi, per_decade):
+    return np.linspace(np.log(lo), np.log(hi), int(round(np.log10(hi / lo) * per_decade)) + 1)
+
+
+_HANTUSH_GRID = (_log_grid(1e-8, 10., 20), _log_grid(1e-3, 10., 20))
+_NEUMAN_A_GRID = (_log_grid(0.3, 3e5, 12), _log_grid(1e-3, 10., 8))
+_NEUMAN_B_GRID = (_log_grid(1e-4, 1e5, 12), _log_grid(1e-3, 10., 8))
+
+
+@lru_cache(maxsize=None)
+def _spline(name):
+    """Cubic spline of log(W) on the log-spaced grid of a well function.
+
+    The grid is computed on first use (about a second per function) and then
+    kept for the lifetime of the process.
+    """
+    if name == 'hantush':
+        (lx, lp), f = _HANTUSH_GRID, lambda x, p: _hantush_direct(x, p)
+    elif name == 'neuman_a':
+        (lx, lp), f = _NEUMAN_A_GRID, lambda x, p: _neuman_direct(1. / x, p, 0.)
+    else:
+        (lx, lp), f = _NEUMAN_B_GRID, lambda x, p: _neuman_direct(1. / x, p, 0., late=True)
+    x, p = np.meshgrid(np.exp(lx), np.exp(lp), indexing='ij')
+    w = f(x, p)
+    return RectBivariateSpline(lx, lp, np.log(np.maximum(w, _W_FLOOR)))
+
+
+def _interp(name, grid, x, p, direct):
+    """Evaluate the spline of a well function, falling back to direct where x or p are off the grid."""
+    from . import tables  # tables imports this module
+    table = tables.load(name)
+    if table is not None:
+        return table(x, p)
+    lx, lp = grid
+    x, p = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(p, dtype=float))
+    with np.errstate(divide='ignore'):
+        log_x, log_p = np.log(x), np.log(p)
+    inside = (log_x >= lx[0]) & (log_x <= lx[-1]) & (log_p >= lp[0]) & (log_p <= lp[-1])
+    w = np.empty(x.shape)
+    if inside.any():
+        w[inside] = np.exp(_spline(name)(log_x[inside], log_p[inside], grid=False))
+    if (~inside).any():
+        w[~inside] = direct(x[~inside], p[~inside])
+    return w
+
+
+def hantush_well_function(u, r_div_B):
+    """Hantush-Jacob leaky well function W(u, r/B).
+
+    Both arguments are continuous and broadcast against each other. Inside
+    1e-8 <= u <= 10 and 1e-3 <= r/B <= 10 the values are interpolated from a
+    cached grid or table (relative error about 1e-4), elsewhere they are computed
+    directly. r/B = 0 gives the Theis well function.
+    """
+    u, r_div_B = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(r_div_B, dtype=float))
+    w = _interp('hantush', _HANTUSH_GRID, u, np.where(r_div_B > 0., r_div_B, 1.), _hantush_direct)
+    return np.where(r_div_B > 0., w, well_function(u))
+
+
+def neuman_well_function(u_a, u_b, beta):
+    """Neuman well function W(u_A, u_B, beta) for unconfined aquifers.
+
+    u_a is computed with the elastic storativity S, u_b with the specific
+    yield Sy, and beta = Kz r² / (Kr b²) > 0; all arguments are continuous
+    and broadcast against each other. ``u_b=np.inf`` gives the early type A
+    curve and ``u_a=0`` the late type B curve of Neuman (S/Sy -> 0). Both are
+    interpolated from cached grids or tables for 1e-3 <= beta <= 10 (relative error
+    about 1e-4); the complete curve for a finite S/Sy = u_a/u_b is computed
+    directly.
+    """
+    u_a, u_b, beta = np.broadcast_arrays(np.asarray(u_a, dtype=float), np.asarray(u_b, dtype=float),
+                                         np.asarray(beta, dtype=float))
+    w = np.empty(u_a.shape)
+    type_a = np.isinf(u_b)
+    type_b = (u_a == 0.) & ~type_a
+    full = ~type_a & ~type_b
+    if type_a.any():
+        w[type_a] = _interp('neuman_a', _NEUMAN_A_GRID, 1. / u_a[type_a], beta[type_a],
+                            lambda x, p: _neuman_direct(1. / x, p, 0.))
+    if type_b.any():
+        w[type_b] = _interp('neuman_b', _NEUMAN_B_GRID, 1. / u_b[type_b], beta[type_b],
+                            lambda x, p: _neuman_direct(1. / x, p, 0., late=True))
+    if full.any():
+        w[full] = _neuman_direct(u_a[full], beta[full], u_a[full] / u_b[full])
+    return w
+
+
+def hantush_jacob(r, t, T, S, Q, r_div_B):
+    """Hantush-Jacob drawdown in a leaky confined aquifer."""
+    u = theis_u(T, S, r, t)
+    return Q / 4. / np.pi / T * hantush_well_function(u, r_div_B)
+
+
+def neuman(r, t, T, S, Sy, Q, beta):
+    """Neuman drawdown in an unconfined aquifer with delayed yield.
+
+    S is the elastic storativity (S = Ss * b) and Sy the specific yield.
+    """
+    u_a = theis_u(T, S, r, t)
+    u_b = theis_u(T, Sy, r, t)
+    return Q / 4. / np.pi / T * neuman_well_function(u_a, u_b, beta)
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# the tests import hydrokit from the repository root, as the pages do
+root = str(Path(__file__).resolve().parents[1])
+if root not in sys.path:
+    sys.path.insert(0, root)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+import scipy.linalg
+
+from hydrokit.decay import U238_SERIES, DecayChain, decay_constants
+
+
+def _expm(chain, t, m0):
+    """exp(A t) m0 of the dense matrix Q A Q' (Q orthogonal).
+
+    scipy treats triangular matrices separately and then loses digits for
+    nearly equal diagonal entries, like the Bateman terms.
+    """
+    Q = np.linalg.qr(np.random.default_rng(0).standard_normal(chain.matrix.shape))[0]
+    B = Q @ chain.matrix @ Q.T
+    return np.array([Q.T @ (scipy.linalg.expm(B * ti) @ (Q @ m0)) for ti in t])
+
+
+@pytest.mark.parametrize('rates, branches', [
+    ([0.3, 0.2, 0.], None),                                    # Bateman terms
+    ([0.1, 0.1, 0.05, 0.], None),                              # equal constants: exp(A t)
+    ([0.2, 0.2 * (1. + 1e-9), 0.], None),                      # nearly equal: exp(A t)
+    ([0.5, 0.1, 0.3, 0.], [(0, 1, 0.7), (0, 2, 0.3), (1, 3, 1.), (2, 3, 0.8)]),  # branches, 6 % of 2 leaves
+])
+@pytest.mark.parametrize('uniform', [True, False])
+def test_masses_match_the_matrix_exponential(rates, branches, uniform):
+    chain = DecayChain(rates, branches)
+    m0 = np.array([1000., 10.] + [0.] * (len(rates) - 2))
+    t = np.linspace(0., 60., 301) if uniform else np.geomspace(1e-3, 60., 200)
+    assert np.allclose(chain.masses(t, m0), _expm(chain, t, m0), rtol=1e-8, atol=1e-8 * m0.sum())
+
+
+def test_closed_chain_conserves_the_mass():
+    chain = DecayChain([0.3, 0.3, 1e-3, 0.])
+    m = chain.masses(np.linspace(0., 1e4, 1001), [5., 1., 0., 0.])
+    assert np.allclose(m.sum(axis=1), 6., rtol=1e-10)
+    assert np.all(m >= -1e-12)
+
+
+def test_uranium_series_reaches_secular_equilibrium():
+    """After 10 half-lives of U-234 the activities of U-234 .. Po-210 equal the activity of U-238."""
+    rates = decay_constants([half_life for name, half_life in U238_SERIES])
+    chain = DecayChain(rates)
+    m0 = np.zeros(len(rates))
+    m0[0] = 1.
+    t = np.array([1e14])
+    activity = (rates * chain.masses(t, m0))[0, :-1]
+    assert np.allclose(activity, activity[0], rtol=1e-3)
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from hydrokit.fdm import budget_discrepancy, solve_flow
+
+N = 21
+TOP, SY, SS = 20., 0.2, 1e-4
+
+
+def _model(h0, steps, rch=0., q=0.):
+    """Convertible layer (bottom 0, top 20 m) of 21 x 21 cells with a defined head of 18 m at the west."""
+    delr = delc = np.full(N, 50.)
+    chd = [(0, i, 0, 18.) for i in range(N)]
+    return solve_flow(delr, delc, np.full((N, N), TOP), 0., 1e-4, chd=chd, wel=[(0, 10, 10, q)], rch=rch,
+                      convertible=True, steps=steps, sy=SY, ss=SS, h0=h0)
+
+
+def _volume(h):
+    """Stored water (m³) of the free cells with the split storage of a convertible layer."""
+    h = h[0, :, 1:]
+    return np.sum((SY * np.minimum(h, TOP) + SS * TOP * np.maximum(h, TOP)) * 50. * 50.)
+
+
+@pytest.mark.parametrize('h0, rch, q', [
+    (19.9, 2e-6, 0.),       # recharge lifts the heads above the top
+    (20.05, 0., -0.02),     # pumping draws them below it
+    (None, 2.5e-7, -0.004),  # starting at the top
+])
+def test_transient_budget_closes_when_heads_cross_the_top(h0, rch, q):
+    dt = 86400.
+    result = _model(h0, [dt], rch, q)
+    assert result.converged
+    assert abs(budget_discrepancy(result.budget)) < 1e-6
+    # the inflows of the step equal the change of the stored water computed from the heads
+    net = sum(q_in - q_out for name, (q_in, q_out) in result.budget.items() if name != 'STORAGE') * dt
+    change = _volume(result.head[-1]) - _volume(result.head[0])
+    assert net == pytest.approx(change, rel=1e-6)
+
+
+def test_steady_budget_closes():
+    delr = delc = np.full(30, 100.)
+    botm = np.array([0., -30.]).reshape(2, 1, 1) * np.ones((2, 30, 30))
+    k = np.array([1e-4, 1e-5]).reshape(2, 1, 1)
+    result = solve_flow(delr, delc, 50., botm, k, chd=[(0, i, 0, 40.) for i in range(30)], wel=[(1, 15, 20, -0.01)],
+                        rch=3e-9, riv=[(0, 5, j, 42., 0.01, 38.) for j in range(30)], convertible=[True, False])
+    assert result.converged
+    assert abs(budget_discrepancy(result.budget)) < 1e-4
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from hydrokit.reservoir import cascade, linear_reservoir, nonlinear_reservoir, simulate
+
+DT = 0.5
+
+
+def _inflow():
+    rng = np.random.default_rng(3)
+    return np.where(rng.uniform(size=400) < 0.3, rng.exponential(10., 400), 0.)
+
+
+@pytest.mark.parametrize('scheme', ['exact', 'euler'])
+def test_linear_reservoir_water_balance(scheme):
+    I = _inflow()
+    k = np.array([0.01, 0.1, 1.])
+    Q, V = linear_reservoir(I, k, DT, V0=20., scheme=scheme)
+    assert Q.shape == V.shape == (400, 3)
+    assert np.allclose(np.cumsum(I[:, None] - Q, axis=0) * DT, V - 20., rtol=0., atol=1e-9)
+
+
+def test_linear_reservoir_exact_solution():
+    """Constant inflow: V(t) = I / k + (V0 - I / k) exp(-k t)."""
+    k, I, V0 = 0.2, 3., 50.
+    t = DT * np.arange(1, 101)
+    V = linear_reservoir(np.full(100, I), k, DT, V0)[1]
+    assert np.allclose(V, I / k + (V0 - I / k) * np.exp(-k * t), rtol=1e-12)
+
+
+@pytest.mark.parametrize('b', [0.5, 1.5, 2.5])
+def test_nonlinear_reservoir_water_balance(b):
+    I = _inflow()
+    Q, V = nonlinear_reservoir(I, 0.05, b, DT, V0=5.)
+    assert np.allclose(np.cumsum(I - Q) * DT, V - 5., rtol=0., atol=1e-9)
+    # implicit Euler: the outflow of every step is k V^b at its end
+    assert np.allclose(Q, 0.05 * V ** b, rtol=1e-8, atol=1e-10)
+
+
+def test_cascade_routes_through_the_reservoirs():
+    I = _inflow()
+    Q = I
+    volume = 0.
+    for _ in range(3):
+        Q, V = linear_reservoir(Q, 0.2, DT)
+        volume = volume + V[-1]
+    assert np.allclose(cascade(I, 0.2, 3, dt=DT), Q)
+    # the water that did not leave the last reservoir is stored in the cascade
+    assert np.sum(I - Q) * DT == pytest.approx(volume, rel=1e-10)
+    # parameter sets of different lengths at once
+    sets = cascade(I, [0.2, 0.2, 0.5], [3, 1, 2], dt=DT)
+    assert np.allclose(sets[:, 0], Q)
+    assert np.allclose(sets[:, 1], linear_reservoir(I, 0.2, DT)[0])
+    assert np.allclose(sets[:, 2], simulate(I, 'linear', dict(k=0.5, n=2), dt=DT))
+
+
+def test_nonlinear_cascade_water_balance():
+    I = _inflow()
+    Q = I
+    volume = 0.
+    for _ in range(2):
+        Q, V = nonlinear_reservoir(Q, 0.05, 1.5, DT)
+        volume = volume + V[-1]
+    assert np.allclose(simulate(I, 'nonlinear', dict(k=0.05, b=1.5, n=2), dt=DT), Q)
+    assert np.sum(I - Q) * DT == pytest.approx(volume, rel=1e-9)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from hydrokit.richards import hydrostatic, solve_richards
+from hydrokit.soil import Soil
+
+DAY = 86400.
+
+
+def _clay_loam():
+    return Soil('van_genuchten', dict(theta_r=0.095, theta_s=0.41, alpha=1.9, n=1.31), Ks=7.22e-7)
+
+
+def test_ponded_rain_keeps_the_balance_with_few_steps():
+    """100 mm/d every other day pond on the clay loam; the surface stays ponded instead of retrying the flux."""
+    z = np.linspace(0., 2., 201)
+    psi0 = hydrostatic(z, 0.)
+    rain = np.where(np.arange(10) % 2 == 0, 0.1, 0.) / DAY
+    result = solve_richards(z, _clay_loam(), psi0, 10 * DAY, q_top=(np.arange(10) * DAY, rain), bottom='head',
+                            psi_bottom=0.)
+    balance = result.balance
+    assert abs(balance['relative_error']) < 1e-6
+    assert balance['runoff'] > 0.
+    assert balance['steps'] < 3000
+    # the surface never holds more than the ponding head
+    assert np.all(result.psi[:, -1] <= 1e-9)
+
+
+@pytest.mark.parametrize('q', [5e-8, -5e-9])
+def test_flux_surface_takes_the_flux(q):
+    """A flux the soil can take (or deliver) enters completely, without runoff."""
+    z = np.linspace(0., 2., 101)
+    result = solve_richards(z, _clay_loam(), hydrostatic(z, 0.), 5 * DAY, q_top=q, bottom='head', psi_bottom=0.)
+    assert result.balance['runoff'] == 0.
+    assert np.allclose(result.q_top, q)
+    assert abs(result.balance['relative_error']) < 1e-6
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+import scipy.special
+
+from hydrokit.transport import PlumeField, advection_front, breakthrough, ogata_banks
+
+
+def _closed_form(x, t, v, D, R=1., decay=0.):
+    """Textbook form of Ogata-Banks (van Genuchten and Alves, 1982, with decay)."""
+    u = v * np.sqrt(1. + 4. * decay * R * D / v ** 2)
+    w = 2. * np.sqrt(D * R * t)
+    return 0.5 * (np.exp((v - u) * x / (2. * D)) * scipy.special.erfc((R * x - u * t) / w)
+                  + np.exp((v + u) * x / (2. * D)) * scipy.special.erfc((R * x + u * t) / w))
+
+
+@pytest.mark.parametrize('v, D, R, decay', [
+    (1e-5, 1e-6, 1., 0.),
+    (1e-5, 1e-5, 2.5, 0.),
+    (2e-6, 5e-7, 1., 1e-7),
+    (1e-5, 2e-6, 3., 5e-7),
+])
+def test_ogata_banks_matches_the_closed_form(v, D, R, decay):
+    x = np.linspace(0., 10., 21)[:, None]
+    t = np.geomspace(1e3, 1e7, 25)[None, :]
+    assert np.allclose(ogata_banks(x, t, v, D, R, decay), _closed_form(x, t, v, D, R, decay), rtol=1e-10, atol=1e-14)
+
+
+def test_ogata_banks_is_finite_for_large_peclet_numbers():
+    """exp(vx/D) overflows the textbook form; the result approaches the advective front erfc / 2.
+
+    The second term is about w / (2 sqrt(pi) (x + vt)) < 1e-4 at the front (w = 2 sqrt(Dt)).
+    """
+    x, t, v, D = 100., np.linspace(5e6, 1.5e7, 101), 1e-5, 1e-10
+    c = ogata_banks(x, t, v, D)
+    assert np.all(np.isfinite(c))
+    assert np.allclose(c, 0.5 * scipy.special.erfc((x - v * t) / (2. * np.sqrt(D * t))), rtol=0., atol=1e-4)
+    assert np.all(ogata_banks(x, [-1., 0.], v, D) == 0.)
+
+
+def test_finite_pulse_and_initial_concentration():
+    x, v, D, c0, ci, duration = 5., 1e-5, 1e-6, 2., 0.5, 2e5
+    t = np.linspace(1e3, 2e6, 200)
+    expected = (c0 * (_closed_form(x, t, v, D) - np.where(t > duration, _closed_form(x, np.maximum(t - duration, 1.), v, D), 0.))
+                + ci * (1. - _closed_form(x, t, v, D)))
+    assert np.allclose(breakthrough(x, t, v, D, c0, ci, duration), expected, rtol=1e-10, atol=1e-14)
+
+
+def test_advection_front_follows_the_breakthrough():
+    """ci before the arrival, c0 during the pulse and zero afterwards, as breakthrough without dispersion."""
+    t = np.array([0., 4.9, 5.1, 9.9, 15.1, 30.])
+    assert np.array_equal(advection_front(10., t, 2., 1., 0.2, 10.), [0.2, 0.2, 1., 1., 0., 0.])
+    late = np.array([30., 60.])
+    assert np.allclose(breakthrough(10., late, 2., 1e-6, 1., 0.2, 10.), advection_front(10., late, 2., 1., 0.2, 10.))
+    assert np.array_equal(advection_front(10., t, 4., 1., R=2.), [0., 0., 1., 1., 1., 1.])
+
+
+def test_plume_field_keeps_the_factors_of_the_coarse_and_the_fine_grid():
+    """The pages draw every rerun on 100 points first, then on the selected resolution."""
+    field = PlumeField((-10., 100.), (-20., 20.), (-10., 10.), n=100)
+    field.update(c0=1., v=1e-5, Dx=1e-5, Dy=1e-6, Dz=1e-7, t=1e6, Y=5., Z=2., down_only=True)
+    slices = {}
+    for n in (100, 400):
+        field.n = n
+        slices[n] = field.xy(0.), field._longitudinal(), field._transverse_grid('y')
+    for n in (100, 400):
+        field.n = n
+        assert field._longitudinal() is slices[n][1]
+        assert field._transverse_grid('y') is slices[n][2]
+        assert np.array_equal(field.xy(0.), slices[n][0], equal_nan=True)
+    # a changed time recomputes only the longitudinal factor
+    field.update(t=2e6)
+    assert field._transverse_grid('y') is slices[400][2]
+    assert field._longitudinal() is not slices[400][1]
+    # a third grid drops the oldest one
+    field.n = 200
+    field.xy(0.)
+    field.n = 100
+    assert field._transverse_grid('y') is not slices[100][2]
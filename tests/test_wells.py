@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import scipy.integrate
+import scipy.special
+
+from hydrokit.wells import _hantush_direct, hantush_well_function, neuman_well_function
+
+
+def _hantush_quad(u, r_div_B):
+    """W(u, r/B) = integral of exp(-y - (r/B)² / 4y) / y from u to inf, with y = exp(s)."""
+    f = lambda s: np.exp(-np.exp(s) - r_div_B ** 2 / 4. * np.exp(-s))
+    return scipy.integrate.quad(f, np.log(u), np.log(800.), epsabs=0., epsrel=1e-12, limit=200)[0]
+
+
+U = [1e-6, 1e-4, 1e-2, 0.1, 0.5, 2., 8.]
+
+
+@pytest.mark.parametrize('r_div_B', [0.005, 0.05, 0.5, 2., 5.])
+def test_hantush_matches_quadrature(r_div_B):
+    expected = np.array([_hantush_quad(u, r_div_B) for u in U])
+    # Stehfest inversion for u < 0.2, accurate to a few 1e-6
+    assert np.allclose(_hantush_direct(U, r_div_B), expected, rtol=1e-5, atol=0.)
+    # the interpolation grid, relative error about 1e-4
+    assert np.allclose(hantush_well_function(U, r_div_B), expected, rtol=5e-4, atol=0.)
+
+
+def test_hantush_outside_the_grid_and_theis_limit():
+    for u, r_div_B in [(1e-10, 0.1), (20., 1.), (1e-3, 30.)]:
+        assert hantush_well_function(u, r_div_B) == pytest.approx(_hantush_quad(u, r_div_B), rel=1e-5, abs=1e-300)
+    assert np.allclose(hantush_well_function(U, 0.), scipy.special.exp1(U), rtol=1e-12)
+
+
+@pytest.mark.parametrize('beta', [0.01, 0.1, 1., 5.])
+def test_neuman_type_a_matches_leaky_modes(beta):
+    """The type A curve is the sum of leaky wells 2 / λn² W(u, sqrt(beta) λn) of the modes λn = (n + 1/2) π."""
+    u = np.array([1e-3, 1e-2, 0.1, 1., 4.])
+    lam = (np.arange(int(40. / np.sqrt(beta) / np.pi) + 1) + 0.5) * np.pi
+    expected = [sum(2. / l ** 2 * _hantush_quad(x, np.sqrt(beta) * l) for l in lam) for x in u]
+    assert np.allclose(neuman_well_function(u, np.inf, beta), expected, rtol=5e-4, atol=1e-8)
+
+
+@pytest.mark.parametrize('beta', [0.01, 0.1, 1.])
+def test_neuman_late_curves_approach_theis(beta):
+    """At late times the type B and the complete curve approach the Theis curve of the specific yield."""
+    u_b = np.array([1e-4, 1e-3])
+    theis = [scipy.integrate.quad(lambda s: np.exp(-np.exp(s)), np.log(u), np.log(800.), epsrel=1e-12)[0]
+             for u in u_b]
+    assert np.allclose(neuman_well_function(0., u_b, beta), theis, rtol=2e-2)
+    assert np.allclose(neuman_well_function(1e-3 * u_b, u_b, beta), theis, rtol=2e-2)